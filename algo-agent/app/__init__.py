@@ -1,17 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.fet.jobs import get_job_manager
+from app.middleware import RequestDecompressionMiddleware
 from app.routes import api_router
 from app.settings import get_settings
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    yield
+    get_job_manager().shutdown()
+
+
 def create_app() -> FastAPI:
     """
     Build the FastAPI application with a single entry-point.
 
-    The service only exposes /api/v1/fet/run which orchestrates:
+    The service exposes /api/fet/run, which enqueues a job that orchestrates:
     1. Validación y normalización del payload recibido.
     2. Generación del archivo .fet esperado por FET.
     3. Ejecución del binario de FET y entrega de un resumen.
+
+    The job status and its summary are polled through /api/fet/jobs/{job_id}.
+    Request bodies may arrive gzip-compressed; they are decoded before routing.
     """
     settings = get_settings()
 
@@ -23,8 +36,12 @@ def create_app() -> FastAPI:
         redoc_url="/api/redoc",
         openapi_url="/api/openapi.json",
         debug=settings.debug,
+        lifespan=_lifespan,
     )
 
+    app.add_middleware(
+        RequestDecompressionMiddleware, max_body_bytes=settings.max_request_body_bytes
+    )
     app.include_router(api_router, prefix="/api")
     return app
 
@@ -1,3 +1,11 @@
+from app.fet.jobs import FetJobManager, get_job_manager
 from app.fet.service import FetRunRequest, FetRunResult, FetRunSummary, FetService
 
-__all__ = ["FetService", "FetRunRequest", "FetRunResult", "FetRunSummary"]
+__all__ = [
+    "FetService",
+    "FetRunRequest",
+    "FetRunResult",
+    "FetRunSummary",
+    "FetJobManager",
+    "get_job_manager",
+]
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.fet.schemas import FetRunRequest, FetRunSummary
+
+
+def _canonicalize(value: Any) -> Any:
+    """Normaliza el JSON para que el orden de listas y llaves no altere el hash."""
+    if isinstance(value, dict):
+        return {key: _canonicalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        items = [_canonicalize(item) for item in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, ensure_ascii=False))
+    return value
+
+
+def payload_fingerprint(payload: FetRunRequest, options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash estable del payload normalizado.
+
+    Las listas se comparan sin importar su orden y ``metadata.comments`` se excluye porque
+    no influye en el horario generado. ``options`` agrega parámetros de ejecución que sí
+    cambian el resultado esperado (por ejemplo, el tamaño del portafolio de semillas).
+    """
+    data = payload.model_dump(mode="json", exclude={"metadata": {"comments"}})
+    if options:
+        data = {"payload": data, "options": options}
+    canonical = json.dumps(
+        _canonicalize(data),
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class FetResultCache:
+    """
+    Caché en disco de resúmenes de FET direccionada por el hash del payload.
+
+    Cada entrada es un archivo ``<hash>.json`` bajo ``directory``. La recencia de uso se
+    refleja en el mtime del archivo, de modo que el orden LRU sobrevive reinicios. Cuando
+    se supera ``max_entries`` o ``max_bytes`` se eliminan las entradas menos usadas.
+    """
+
+    def __init__(self, directory: Path, max_entries: int, max_bytes: int):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[FetRunSummary]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key not in self._entries:
+                return None
+            path = self._path_for(key)
+            try:
+                summary = FetRunSummary.model_validate_json(path.read_bytes())
+            except (OSError, ValueError):
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return summary
+
+    def put(self, key: str, summary: FetRunSummary) -> None:
+        if not self.enabled:
+            return
+        data = summary.model_dump_json().encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path_for(key)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _load_index(self) -> None:
+        if not self.directory.exists():
+            return
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest_key = next(iter(self._entries))
+            self._drop(oldest_key)
+
+    def _drop(self, key: str) -> None:
+        self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            self._path_for(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+
+__all__ = ["FetResultCache", "payload_fingerprint"]
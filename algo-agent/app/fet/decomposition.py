@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import heapq
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from app.fet.schemas import (
+    ActivityData,
+    ConstraintActivityPreferredRoom,
+    ConstraintActivityPreferredStartingTime,
+    ConstraintMinDaysBetweenActivities,
+    ConstraintTeacherNotAvailable,
+    FetRunRequest,
+    FetRunSummary,
+    FetTimetables,
+    StudentYear,
+)
+
+
+class _DisjointSet:
+    def __init__(self) -> None:
+        self._parent: Dict[str, str] = {}
+
+    def find(self, key: str) -> str:
+        root = self._parent.setdefault(key, key)
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while key != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def union(self, left: str, right: str) -> None:
+        left_root, right_root = self.find(left), self.find(right)
+        if left_root != right_root:
+            self._parent[right_root] = left_root
+
+
+class ProblemDecomposer:
+    """
+    Divide un payload en subproblemas independientes y reúne sus resultados.
+
+    Dos actividades quedan en el mismo componente si comparten docente, conjunto de
+    estudiantes (una actividad del año conecta a todos sus grupos), una restricción de días
+    mínimos o una sala preferida (``ConstraintActivityPreferredRoom``, p. ej. las que fija el
+    warm start). FET solo asigna sala a las actividades con sala preferida, así que dos partes
+    nunca ocupan la misma sala; si aun así ocurre, la unión falla en lugar de descartar una de
+    las dos actividades.
+
+    Todos los subproblemas usan el mismo calendario, por lo que los índices de slot de cada
+    resultado son directamente comparables y la unión no requiere traducirlos.
+    """
+
+    def split(self, payload: FetRunRequest, max_parts: int) -> List[FetRunRequest]:
+        components = self._components(payload)
+        if len(components) <= 1 or max_parts <= 1:
+            return [payload]
+
+        # Reparto LPT: el componente más grande va a la parte con menos actividades.
+        parts: List[List[ActivityData]] = [[] for _ in range(min(max_parts, len(components)))]
+        heap = [(0, index) for index in range(len(parts))]
+        for component in sorted(components, key=len, reverse=True):
+            size, index = heapq.heappop(heap)
+            parts[index].extend(component)
+            heapq.heappush(heap, (size + len(component), index))
+
+        return [
+            self._sub_payload(payload, activities, part_index)
+            for part_index, activities in enumerate(parts)
+            if activities
+        ]
+
+    def merge(self, payload: FetRunRequest, parts: List[FetRunSummary], run_dir: str) -> FetRunSummary:
+        metadata = payload.metadata
+        soft_conflicts = [part.soft_conflicts for part in parts]
+        partial = any(part.status == "partial" for part in parts)
+        return FetRunSummary(
+            status="partial" if partial else "success",
+            semester=metadata.semester,
+            timetable_id=metadata.timetable_id,
+            fet_input_file=",".join(part.fet_input_file for part in parts),
+            output_directory=run_dir,
+            stdout="\n".join(part.stdout for part in parts if part.stdout),
+            stderr="\n".join(part.stderr for part in parts if part.stderr),
+            activities_schedule=[entry for part in parts for entry in part.activities_schedule],
+            rooms=parts[0].rooms if parts else [],
+            timetables=self._merge_timetables([part.timetables for part in parts]),
+            portfolio_size=parts[0].portfolio_size if parts else 1,
+            soft_conflicts=(
+                sum(soft_conflicts) if soft_conflicts and None not in soft_conflicts else None
+            ),
+            parts=len(parts),
+            unplaced_activities=[
+                activity_id for part in parts for activity_id in part.unplaced_activities
+            ],
+        )
+
+    def _components(self, payload: FetRunRequest) -> List[List[ActivityData]]:
+        sets = _DisjointSet()
+        # Los grupos de un año solo compiten entre sí si hay actividades del año completo.
+        referenced_years = {
+            activity.students_reference.id
+            for activity in payload.activities
+            if activity.students_reference.type == "year"
+        }
+        for year in payload.student_years:
+            if year.id not in referenced_years:
+                continue
+            for group in year.groups:
+                sets.union(f"students:{year.id}", f"students:{group.id}")
+
+        for activity in payload.activities:
+            node = f"activity:{activity.id}"
+            sets.union(node, f"teacher:{activity.teacher_id}")
+            sets.union(node, f"students:{activity.students_reference.id}")
+
+        for constraint in payload.time_constraints:
+            if isinstance(constraint, ConstraintMinDaysBetweenActivities):
+                ids = constraint.activity_ids
+                for activity_id in ids[1:]:
+                    sets.union(f"activity:{ids[0]}", f"activity:{activity_id}")
+
+        for constraint in payload.space.space_constraints:
+            if isinstance(constraint, ConstraintActivityPreferredRoom) and constraint.active:
+                sets.union(f"activity:{constraint.activity_id}", f"room:{constraint.room_id}")
+
+        grouped: Dict[str, List[ActivityData]] = defaultdict(list)
+        for activity in payload.activities:
+            grouped[sets.find(f"activity:{activity.id}")].append(activity)
+        return list(grouped.values())
+
+    def _sub_payload(
+        self,
+        payload: FetRunRequest,
+        activities: List[ActivityData],
+        part_index: int,
+    ) -> FetRunRequest:
+        activity_ids = {activity.id for activity in activities}
+        teacher_ids = {activity.teacher_id for activity in activities}
+        subject_ids = {activity.subject_id for activity in activities}
+        student_ids = {activity.students_reference.id for activity in activities}
+
+        time_constraints = []
+        for constraint in payload.time_constraints:
+            if isinstance(constraint, ConstraintTeacherNotAvailable):
+                if constraint.teacher_id not in teacher_ids:
+                    continue
+            elif isinstance(constraint, ConstraintMinDaysBetweenActivities):
+                if not activity_ids.intersection(constraint.activity_ids):
+                    continue
+            elif isinstance(constraint, ConstraintActivityPreferredStartingTime):
+                if constraint.activity_id not in activity_ids:
+                    continue
+            time_constraints.append(constraint)
+        space_constraints = [
+            constraint
+            for constraint in payload.space.space_constraints
+            if not isinstance(constraint, ConstraintActivityPreferredRoom)
+            or constraint.activity_id in activity_ids
+        ]
+
+        metadata = payload.metadata.model_copy(
+            update={"timetable_id": f"{payload.metadata.timetable_id}-part-{part_index}"}
+        )
+        return payload.model_copy(
+            update={
+                "metadata": metadata,
+                "subjects": [subject for subject in payload.subjects if subject.id in subject_ids],
+                "teachers": [teacher for teacher in payload.teachers if teacher.id in teacher_ids],
+                "student_years": self._sub_years(payload.student_years, student_ids),
+                "activities": activities,
+                "time_constraints": time_constraints,
+                "space": payload.space.model_copy(update={"space_constraints": space_constraints}),
+            }
+        )
+
+    def _sub_years(self, years: List[StudentYear], student_ids: set) -> List[StudentYear]:
+        result: List[StudentYear] = []
+        for year in years:
+            if year.id in student_ids:
+                result.append(year)
+                continue
+            groups = [group for group in year.groups if group.id in student_ids]
+            if groups:
+                result.append(year.model_copy(update={"groups": groups}))
+        return result
+
+    def _merge_timetables(self, parts: List[Optional[FetTimetables]]) -> Optional[FetTimetables]:
+        present = [part for part in parts if part is not None]
+        if not present:
+            return None
+        merged = FetTimetables(
+            slots_per_day=present[0].slots_per_day,
+            total_slots=present[0].total_slots,
+        )
+        for part in present:
+            merged.teachers.update(part.teachers)
+            merged.students.update(part.students)
+            for room_id, row in part.rooms.items():
+                current = merged.rooms.get(room_id)
+                if current is None:
+                    merged.rooms[room_id] = list(row)
+                    continue
+                for slot, activity_id in enumerate(row):
+                    if activity_id is None:
+                        continue
+                    if current[slot] is not None and current[slot] != activity_id:
+                        raise ValueError(
+                            f"La sala {room_id} quedó asignada a las actividades {current[slot]} "
+                            f"y {activity_id} en el slot {slot} por partes distintas"
+                        )
+                    current[slot] = activity_id
+        return merged
+
+
+__all__ = ["ProblemDecomposer"]
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List
+
+from app.fet.schemas import (
+    ActivityData,
+    ConstraintTeacherNotAvailable,
+    FeasibilityIssue,
+    FeasibilityReport,
+    FetRunRequest,
+)
+
+# FET solo trata como obligatorias las restricciones con peso 100%.
+_HARD_WEIGHT = 100.0
+_DEFAULT_DAYS = 5
+_DEFAULT_HOURS = 5
+
+
+class FeasibilityAnalyzer:
+    """
+    Cotas rápidas de factibilidad calculadas antes de generar el .fet.
+
+    La semana se representa como un bitmap entero de ``días * horas`` bits (slot
+    ``día * horas + hora``), de modo que disponibilidad, bloqueos y búsquedas de bloques
+    consecutivos se resuelven con operaciones de bits sobre toda la semana a la vez. Solo se
+    reportan condiciones que FET no podría satisfacer nunca; un payload que pasa el análisis
+    puede seguir siendo infactible por la combinación de restricciones.
+    """
+
+    def analyze(self, payload: FetRunRequest) -> FeasibilityReport:
+        hours_per_day = len(payload.calendar.hours) or _DEFAULT_HOURS
+        days = len(payload.calendar.days) or _DEFAULT_DAYS
+        total_slots = days * hours_per_day
+        full_week = (1 << total_slots) - 1
+
+        activities = [activity for activity in payload.activities if activity.active]
+        issues: List[FeasibilityIssue] = []
+        issues.extend(self._check_activity_lengths(activities, hours_per_day))
+        issues.extend(
+            self._check_teachers(payload, activities, hours_per_day, days, full_week)
+        )
+        issues.extend(self._check_students(payload, activities, total_slots))
+        issues.extend(self._check_rooms(payload, activities, total_slots))
+
+        return FeasibilityReport(
+            feasible=not issues,
+            total_slots=total_slots,
+            issues=issues,
+        )
+
+    def _check_activity_lengths(
+        self,
+        activities: List[ActivityData],
+        hours_per_day: int,
+    ) -> List[FeasibilityIssue]:
+        return [
+            FeasibilityIssue(
+                kind="activity_too_long",
+                entity_id=activity.id,
+                required=activity.duration,
+                available=hours_per_day,
+                message=(
+                    f"La actividad {activity.id} dura {activity.duration} bloques y el día "
+                    f"solo tiene {hours_per_day}"
+                ),
+            )
+            for activity in activities
+            if activity.duration > hours_per_day
+        ]
+
+    def _check_teachers(
+        self,
+        payload: FetRunRequest,
+        activities: List[ActivityData],
+        hours_per_day: int,
+        days: int,
+        full_week: int,
+    ) -> List[FeasibilityIssue]:
+        blocked = self._teacher_blocked_slots(payload, hours_per_day, days)
+        load: Dict[str, int] = defaultdict(int)
+        longest: Dict[str, int] = defaultdict(int)
+        for activity in activities:
+            load[activity.teacher_id] += activity.duration
+            longest[activity.teacher_id] = max(longest[activity.teacher_id], activity.duration)
+
+        issues: List[FeasibilityIssue] = []
+        for teacher_id, required in load.items():
+            available_mask = full_week & ~blocked.get(teacher_id, 0)
+            available = available_mask.bit_count()
+            if required > available:
+                issues.append(
+                    FeasibilityIssue(
+                        kind="teacher_overload",
+                        entity_id=teacher_id,
+                        required=required,
+                        available=available,
+                        message=(
+                            f"El docente {teacher_id} tiene {required} bloques de clases y solo "
+                            f"{available} bloques disponibles"
+                        ),
+                    )
+                )
+                continue
+
+            duration = longest[teacher_id]
+            if duration <= hours_per_day and not self._has_run(
+                available_mask, duration, hours_per_day, days
+            ):
+                issues.append(
+                    FeasibilityIssue(
+                        kind="teacher_no_consecutive_slots",
+                        entity_id=teacher_id,
+                        required=duration,
+                        available=self._longest_run(available_mask, hours_per_day, days),
+                        message=(
+                            f"El docente {teacher_id} no tiene {duration} bloques consecutivos "
+                            "disponibles en ningún día"
+                        ),
+                    )
+                )
+        return issues
+
+    def _check_students(
+        self,
+        payload: FetRunRequest,
+        activities: List[ActivityData],
+        total_slots: int,
+    ) -> List[FeasibilityIssue]:
+        year_load: Dict[str, int] = defaultdict(int)
+        group_load: Dict[str, int] = defaultdict(int)
+        for activity in activities:
+            reference = activity.students_reference
+            if reference.type == "year":
+                year_load[reference.id] += activity.duration
+            else:
+                group_load[reference.id] += activity.duration
+
+        issues: List[FeasibilityIssue] = []
+        for year in payload.student_years:
+            # Una actividad del año ocupa a todos sus grupos a la vez.
+            candidates = [(group.id, year_load[year.id] + group_load[group.id]) for group in year.groups]
+            if not year.groups:
+                candidates = [(year.id, year_load[year.id])]
+            for entity_id, required in candidates:
+                if required > total_slots:
+                    issues.append(
+                        FeasibilityIssue(
+                            kind="students_overload",
+                            entity_id=entity_id,
+                            required=required,
+                            available=total_slots,
+                            message=(
+                                f"El grupo {entity_id} tiene {required} bloques de clases y la "
+                                f"semana solo tiene {total_slots}"
+                            ),
+                        )
+                    )
+        return issues
+
+    def _check_rooms(
+        self,
+        payload: FetRunRequest,
+        activities: List[ActivityData],
+        total_slots: int,
+    ) -> List[FeasibilityIssue]:
+        rooms = payload.space.rooms
+        if not rooms:
+            return []
+
+        issues: List[FeasibilityIssue] = []
+        required = sum(activity.duration for activity in activities)
+        available = len(rooms) * total_slots
+        if required > available:
+            issues.append(
+                FeasibilityIssue(
+                    kind="rooms_overload",
+                    entity_id="*",
+                    required=required,
+                    available=available,
+                    message=(
+                        f"Las actividades suman {required} bloques-sala y las salas ofrecen "
+                        f"{available}"
+                    ),
+                )
+            )
+
+        # Una sala sin capacidad declarada no acota el tamaño de los grupos.
+        if any(room.capacity is None for room in rooms):
+            return issues
+        max_capacity = max(room.capacity for room in rooms)
+        group_students = {
+            group.id: group.students for year in payload.student_years for group in year.groups
+        }
+        year_students = {year.id: year.total_students for year in payload.student_years}
+        for activity in activities:
+            reference = activity.students_reference
+            lookup = year_students if reference.type == "year" else group_students
+            students = lookup.get(reference.id, 0)
+            if students > max_capacity:
+                issues.append(
+                    FeasibilityIssue(
+                        kind="room_capacity",
+                        entity_id=activity.id,
+                        required=students,
+                        available=max_capacity,
+                        message=(
+                            f"La actividad {activity.id} tiene {students} estudiantes y la sala "
+                            f"más grande admite {max_capacity}"
+                        ),
+                    )
+                )
+        return issues
+
+    def _teacher_blocked_slots(
+        self,
+        payload: FetRunRequest,
+        hours_per_day: int,
+        days: int,
+    ) -> Dict[str, int]:
+        # Los índices del calendario no tienen por qué ser correlativos; sin calendario se
+        # usan los días y bloques por defecto, donde índice y posición coinciden.
+        day_ordinals = {
+            day.index: ordinal
+            for ordinal, day in enumerate(sorted(payload.calendar.days, key=lambda day: day.index))
+        }
+        hour_ordinals = {
+            hour.index: ordinal
+            for ordinal, hour in enumerate(sorted(payload.calendar.hours, key=lambda hour: hour.index))
+        }
+        blocked: Dict[str, int] = defaultdict(int)
+        for constraint in payload.time_constraints:
+            if not isinstance(constraint, ConstraintTeacherNotAvailable):
+                continue
+            if not constraint.active or constraint.weight < _HARD_WEIGHT:
+                continue
+            for slot in constraint.not_available_slots:
+                day = day_ordinals.get(slot.day_index) if day_ordinals else slot.day_index
+                hour = hour_ordinals.get(slot.hour_index) if hour_ordinals else slot.hour_index
+                if day is None or hour is None or day >= days or hour >= hours_per_day:
+                    continue
+                blocked[constraint.teacher_id] |= 1 << (day * hours_per_day + hour)
+        return blocked
+
+    def _start_mask(self, duration: int, hours_per_day: int, days: int) -> int:
+        """Slots desde los que cabe un bloque de ``duration`` horas sin cruzar de día."""
+        day_mask = (1 << (hours_per_day - duration + 1)) - 1
+        mask = 0
+        for day in range(days):
+            mask |= day_mask << (day * hours_per_day)
+        return mask
+
+    def _has_run(self, available: int, duration: int, hours_per_day: int, days: int) -> bool:
+        runs = available
+        for offset in range(1, duration):
+            runs &= available >> offset
+        return bool(runs & self._start_mask(duration, hours_per_day, days))
+
+    def _longest_run(self, available: int, hours_per_day: int, days: int) -> int:
+        longest = 0
+        while longest < hours_per_day and self._has_run(available, longest + 1, hours_per_day, days):
+            longest += 1
+        return longest
+
+
+__all__ = ["FeasibilityAnalyzer"]
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+
+from app.fet.cache import FetResultCache, payload_fingerprint
+from app.fet.feasibility import FeasibilityAnalyzer
+from app.fet.pool import FetWorkerPool
+from app.fet.progress import FetEventLog
+from app.fet.schemas import (
+    FetJobInfo,
+    FetJobStatus,
+    FetPoolMetrics,
+    FetRunRequest,
+    FetRunSummary,
+    PortfolioStrategy,
+)
+from app.fet.service import FetService
+from app.settings import AppSettings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class _FetJob:
+    job_id: str
+    payload: FetRunRequest
+    cache_key: str
+    events: FetEventLog
+    seeds: int = 1
+    strategy: PortfolioStrategy = "best"
+    status: FetJobStatus = "queued"
+    submitted_at: datetime = field(default_factory=_utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[FetRunSummary] = None
+    error: Optional[str] = None
+    error_status_code: Optional[int] = None
+    cached: bool = False
+    # Se marca cuando ``submit`` decidió el envío: en cola, servido por la caché o rechazado
+    settled: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def set_status(self, status: FetJobStatus) -> None:
+        self.status = status
+        self.events.publish("status", status=status, line=self.error)
+        if self.is_finished:
+            self.events.close()
+
+    def to_info(self) -> FetJobInfo:
+        metadata = self.payload.metadata
+        return FetJobInfo(
+            job_id=self.job_id,
+            status=self.status,
+            timetable_id=metadata.timetable_id,
+            semester=metadata.semester,
+            submitted_at=self.submitted_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            error=self.error,
+            cached=self.cached,
+            placed=self.events.placed,
+            total=self.events.total,
+        )
+
+
+class FetJobManager:
+    """
+    Encola corridas de FET y las ejecuta fuera del event loop.
+
+    Cada job pasa por queued → running → succeeded/failed. La ejecución se delega en un
+    ``FetWorkerPool`` que limita los jobs concurrentes y rechaza trabajos cuando la cola está
+    llena; los procesos de fet-cl que lanza cada job cuentan contra las mismas
+    ``fet_max_concurrent_jobs`` posiciones (``FetProcessSlots`` del servicio). Los jobs
+    terminados se conservan en memoria (hasta ``max_retained_jobs``) para que los clientes
+    puedan consultar el estado y el resumen.
+    Cada job lleva un ``FetEventLog`` acotado con sus cambios de estado y el avance de FET.
+
+    Antes de encolar se consulta la caché de resultados: un payload equivalente a uno ya
+    resuelto produce un job terminado al instante, y uno idéntico a un job en curso reutiliza
+    ese job en lugar de lanzar otra corrida. Los payloads que ``FeasibilityAnalyzer``
+    descarta se rechazan con 422 sin llegar a encolarse.
+    """
+
+    def __init__(
+        self,
+        settings: AppSettings,
+        service: FetService | None = None,
+        pool: FetWorkerPool | None = None,
+        cache: FetResultCache | None = None,
+        analyzer: FeasibilityAnalyzer | None = None,
+    ):
+        self.settings = settings
+        self.service = service or FetService(settings=settings)
+        self.pool = pool or FetWorkerPool(
+            max_workers=settings.fet_max_concurrent_jobs,
+            max_queue_size=settings.fet_max_queued_jobs,
+            default_run_seconds=settings.fet_timeout_seconds,
+        )
+        self.cache = cache or FetResultCache(
+            directory=settings.fet_workdir / "cache",
+            max_entries=settings.fet_cache_max_entries,
+            max_bytes=settings.fet_cache_max_bytes,
+        )
+        self.analyzer = analyzer or FeasibilityAnalyzer()
+        self.max_retained_jobs = settings.fet_max_retained_jobs
+        self._jobs: "OrderedDict[str, _FetJob]" = OrderedDict()
+        self._inflight: Dict[str, _FetJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        payload: FetRunRequest,
+        force: bool = False,
+        seeds: int = 1,
+        strategy: PortfolioStrategy = "best",
+    ) -> FetJobInfo:
+        # Todo el portafolio debe caber en las posiciones de procesos para poder lanzarse.
+        max_seeds = min(
+            self.settings.fet_max_portfolio_seeds, self.service.process_slots.max_processes
+        )
+        if not 1 <= seeds <= max_seeds:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"seeds debe estar entre 1 y {max_seeds}",
+            )
+        options = {"seeds": seeds, "strategy": strategy} if seeds > 1 else None
+        job = _FetJob(
+            job_id=uuid4().hex,
+            payload=payload,
+            cache_key=payload_fingerprint(payload, options),
+            events=FetEventLog(self.settings.fet_event_buffer_size),
+            seeds=seeds,
+            strategy=strategy,
+        )
+        cache_key = job.cache_key
+
+        inflight = self._reserve(job, force)
+        if inflight is not None:
+            return inflight.to_info()
+
+        queued = False
+        try:
+            if not force:
+                cached_summary = self.cache.get(cache_key)
+                if cached_summary is not None:
+                    job.result = cached_summary
+                    job.cached = True
+                    job.started_at = job.finished_at = _utcnow()
+                    job.set_status("succeeded")
+                    with self._lock:
+                        self._store(job)
+                    return job.to_info()
+
+            report = self.analyzer.analyze(payload)
+            if not report.feasible:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={
+                        "message": "El payload no admite ningún horario válido",
+                        "report": report.model_dump(),
+                    },
+                )
+
+            job.set_status("queued")
+            info = job.to_info()
+            with self._lock:
+                self._store(job)
+            try:
+                self.pool.submit(self._run_job, job)
+            except HTTPException:
+                with self._lock:
+                    self._jobs.pop(job.job_id, None)
+                raise
+            queued = True
+            return info
+        finally:
+            if not queued:
+                with self._lock:
+                    self._release_inflight(job)
+            job.settled.set()
+
+    def _reserve(self, job: _FetJob, force: bool) -> Optional[_FetJob]:
+        """
+        Registrar ``job`` como el envío en curso de su payload, o retornar el job de un envío
+        idéntico que ya quedó en cola.
+
+        La reserva se toma antes de leer la caché y analizar el payload, así que dos envíos
+        idénticos simultáneos no lanzan FET dos veces: el segundo espera a que el primero se
+        decida y, si fue rechazado (422, 503), vuelve a intentarlo.
+        """
+        while True:
+            with self._lock:
+                inflight = None if force else self._inflight.get(job.cache_key)
+                if inflight is None:
+                    self._inflight[job.cache_key] = job
+                    return None
+            inflight.settled.wait()
+            with self._lock:
+                if inflight.job_id in self._jobs:
+                    return inflight
+
+    def get(self, job_id: str) -> FetJobInfo:
+        return self._get_job(job_id).to_info()
+
+    def get_events(self, job_id: str) -> FetEventLog:
+        return self._get_job(job_id).events
+
+    def get_result(self, job_id: str) -> FetRunSummary:
+        job = self._get_job(job_id)
+        if job.status == "failed":
+            raise HTTPException(
+                status_code=job.error_status_code or status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=job.error or "La ejecución de FET falló",
+            )
+        if job.result is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"El job {job_id} aún no termina (estado: {job.status})",
+            )
+        return job.result
+
+    def metrics(self) -> FetPoolMetrics:
+        return self.pool.metrics()
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
+    def _get_job(self, job_id: str) -> _FetJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No existe el job {job_id}",
+            )
+        return job
+
+    def _run_job(self, job: _FetJob) -> None:
+        # El job siempre termina y libera su entrada en curso; si no, los envíos idénticos
+        # quedarían asociados para siempre a un job que ya no avanza.
+        final_status: FetJobStatus = "failed"
+        try:
+            job.started_at = _utcnow()
+            job.set_status("running")
+            try:
+                job.result = self.service.run(
+                    job.payload,
+                    seeds=job.seeds,
+                    strategy=job.strategy,
+                    events=job.events,
+                )
+                final_status = "succeeded"
+            except HTTPException as exc:
+                job.error = str(exc.detail)
+                job.error_status_code = exc.status_code
+            except Exception as exc:
+                job.error = f"Error inesperado al ejecutar FET: {exc}"
+            if job.result is not None and job.result.status == "success":
+                try:
+                    self.cache.put(job.cache_key, job.result)
+                except Exception:
+                    logger.exception(
+                        "No se pudo guardar en caché el resultado del job %s", job.job_id
+                    )
+        finally:
+            if final_status == "failed" and job.error is None:
+                job.error = "La ejecución de FET se interrumpió"
+            job.finished_at = _utcnow()
+            job.set_status(final_status)
+            with self._lock:
+                self._release_inflight(job)
+
+    def _store(self, job: _FetJob) -> None:
+        self._jobs[job.job_id] = job
+        self._prune_finished_jobs()
+
+    def _release_inflight(self, job: _FetJob) -> None:
+        if self._inflight.get(job.cache_key) is job:
+            del self._inflight[job.cache_key]
+
+    def _prune_finished_jobs(self) -> None:
+        excess = len(self._jobs) - self.max_retained_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.is_finished][:excess]:
+            del self._jobs[job_id]
+
+
+@lru_cache
+def get_job_manager() -> FetJobManager:
+    return FetJobManager(settings=get_settings())
+
+
+__all__ = ["FetJobManager", "get_job_manager"]
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Deque, Iterator, Optional
+
+from fastapi import HTTPException, status
+
+from app.fet.schemas import FetPoolMetrics
+
+# Cantidad de corridas recientes usadas para promediar tiempos de espera y ejecución.
+_METRICS_WINDOW = 100
+# Cada cuánto revisa una espera de posiciones si su corrida fue cancelada.
+_CANCEL_POLL_SECONDS = 0.1
+
+
+class FetRunCancelled(Exception):
+    """La corrida se canceló mientras esperaba posiciones o ejecutaba FET."""
+
+
+class FetProcessSlots:
+    """
+    Semáforo compartido que acota los procesos de fet-cl de todos los jobs.
+
+    ``FetWorkerPool`` limita los jobs, pero un job puede lanzar varios procesos (un
+    portafolio de semillas, una instancia por parte del problema). Cada grupo de procesos que
+    se lanza junto reserva todas sus posiciones de una vez, en orden de llegada, así que en
+    total nunca corren más de ``max_processes`` procesos y dos grupos no quedan esperando cada
+    uno las posiciones que retiene el otro.
+    """
+
+    def __init__(self, max_processes: int):
+        self.max_processes = max(1, max_processes)
+        self._available = self.max_processes
+        self._waiters: Deque[object] = deque()
+        self._condition = threading.Condition()
+
+    @property
+    def in_use(self) -> int:
+        with self._condition:
+            return self.max_processes - self._available
+
+    @contextmanager
+    def reserve(self, count: int, cancel: Optional[threading.Event] = None) -> Iterator[None]:
+        """
+        Reserva ``count`` posiciones mientras dura el bloque. Si ``cancel`` se activa antes
+        de obtenerlas se lanza ``FetRunCancelled``.
+        """
+        if not 1 <= count <= self.max_processes:
+            raise ValueError(f"Se pueden reservar entre 1 y {self.max_processes} procesos")
+        ticket = object()
+        with self._condition:
+            self._waiters.append(ticket)
+            try:
+                while self._waiters[0] is not ticket or self._available < count:
+                    if cancel is not None and cancel.is_set():
+                        raise FetRunCancelled()
+                    self._condition.wait(timeout=_CANCEL_POLL_SECONDS)
+                self._available -= count
+            finally:
+                self._waiters.remove(ticket)
+                self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._available += count
+                self._condition.notify_all()
+
+
+class FetWorkerPool:
+    """
+    Pool de workers con concurrencia acotada para las corridas de FET.
+
+    - Como máximo ``max_workers`` jobs se ejecutan a la vez (uno por núcleo por defecto). Los
+      procesos de fet-cl que lanza cada job se acotan aparte con ``FetProcessSlots``.
+    - Los trabajos pendientes esperan en una cola FIFO de ``max_queue_size`` posiciones.
+    - Con la cola llena se rechaza el trabajo con 503 y un ``Retry-After`` estimado a partir
+      de la duración promedio de las corridas recientes.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, default_run_seconds: float):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self.default_run_seconds = default_run_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="fet-worker",
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_times: Deque[float] = deque(maxlen=_METRICS_WINDOW)
+        self._run_times: Deque[float] = deque(maxlen=_METRICS_WINDOW)
+
+    def submit(self, fn: Callable[..., None], *args) -> None:
+        with self._lock:
+            if self._queued + self._running >= self.max_workers + self.max_queue_size:
+                self._rejected += 1
+                retry_after = self._retry_after_seconds()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="La cola de ejecuciones de FET está llena, intenta más tarde",
+                    headers={"Retry-After": str(retry_after)},
+                )
+            self._queued += 1
+        self._executor.submit(self._run, fn, args, time.monotonic())
+
+    def metrics(self) -> FetPoolMetrics:
+        with self._lock:
+            wait_times = list(self._wait_times)
+            return FetPoolMetrics(
+                max_workers=self.max_workers,
+                max_queue_size=self.max_queue_size,
+                running=self._running,
+                queue_depth=self._queued,
+                completed=self._completed,
+                rejected=self._rejected,
+                avg_wait_seconds=sum(wait_times) / len(wait_times) if wait_times else 0.0,
+                max_wait_seconds=max(wait_times, default=0.0),
+                avg_run_seconds=self._avg_run_seconds(),
+                estimated_wait_seconds=self._estimated_wait_seconds(),
+            )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn: Callable[..., None], args: tuple, enqueued_at: float) -> None:
+        started_at = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_times.append(started_at - enqueued_at)
+        try:
+            fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_times.append(time.monotonic() - started_at)
+
+    def _avg_run_seconds(self) -> float:
+        if not self._run_times:
+            return float(self.default_run_seconds)
+        return sum(self._run_times) / len(self._run_times)
+
+    def _estimated_wait_seconds(self) -> float:
+        """Espera estimada para un trabajo que se encole ahora."""
+        if self._running + self._queued < self.max_workers:
+            return 0.0
+        rounds = math.ceil((self._queued + 1) / self.max_workers)
+        return rounds * self._avg_run_seconds()
+
+    def _retry_after_seconds(self) -> int:
+        """Tiempo estimado hasta que se libere una posición en la cola."""
+        return max(1, math.ceil(self._avg_run_seconds() / self.max_workers))
+
+
+__all__ = ["FetProcessSlots", "FetRunCancelled", "FetWorkerPool"]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Deque, List, Optional
+
+from app.fet.schemas import FetJobEvent, FetJobEventType
+
+# Línea que FET agrega a logs/max_placed_activities.txt cada vez que supera su máximo.
+_PROGRESS_PATTERN = re.compile(
+    r"At time (\d+) h (\d+) m (\d+) s, FET reached (\d+) activities placed"
+)
+
+
+def parse_progress_line(line: str) -> Optional[tuple[int, int]]:
+    """Retorna ``(segundos, actividades_colocadas)`` si la línea es de progreso."""
+    match = _PROGRESS_PATTERN.search(line)
+    if not match:
+        return None
+    hours, minutes, seconds, placed = (int(value) for value in match.groups())
+    return hours * 3600 + minutes * 60 + seconds, placed
+
+
+class LogTail:
+    """
+    Lee de forma incremental las líneas nuevas de un archivo que otro proceso va escribiendo.
+
+    Guarda solo el offset y la línea incompleta pendiente; las últimas ``max_lines`` líneas
+    completas quedan en un buffer circular para el resumen final.
+    """
+
+    def __init__(self, path: Path, max_lines: int):
+        self.path = path
+        self.lines: Deque[str] = deque(maxlen=max_lines)
+        self._offset = 0
+        self._pending = ""
+
+    def read_new_lines(self) -> List[str]:
+        try:
+            with self.path.open("rb") as handle:
+                handle.seek(self._offset)
+                chunk = handle.read()
+        except OSError:
+            return []
+        if not chunk:
+            return []
+        self._offset += len(chunk)
+        text = self._pending + chunk.decode("utf-8", errors="replace").lstrip("﻿")
+        *complete, self._pending = text.split("\n")
+        new_lines = [line.rstrip("\r") for line in complete]
+        self.lines.extend(new_lines)
+        return new_lines
+
+    def flush(self) -> List[str]:
+        """Lee lo que quede y entrega también la última línea aunque no termine en salto."""
+        new_lines = self.read_new_lines()
+        if self._pending:
+            new_lines.append(self._pending)
+            self.lines.append(self._pending)
+            self._pending = ""
+        return new_lines
+
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+class FetEventLog:
+    """
+    Eventos de un job en un buffer circular acotado.
+
+    Cada evento recibe un ``seq`` creciente que sirve como id de SSE, de modo que un cliente
+    que se reconecta puede pedir solo lo posterior a ``Last-Event-ID``. Los eventos más
+    antiguos que ``max_events`` se descartan, pero ``placed``/``total`` conservan el mejor
+    avance reportado para quien consulta el estado sin seguir el stream.
+    """
+
+    def __init__(self, max_events: int):
+        self._events: Deque[FetJobEvent] = deque(maxlen=max(1, max_events))
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._closed = False
+        self.placed: Optional[int] = None
+        self.total: Optional[int] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, event_type: FetJobEventType, **fields) -> None:
+        with self._lock:
+            self._seq += 1
+            if event_type == "progress" and fields.get("placed") is not None:
+                self.placed = max(self.placed or 0, fields["placed"])
+                self.total = fields.get("total", self.total)
+            self._events.append(
+                FetJobEvent(
+                    seq=self._seq,
+                    type=event_type,
+                    timestamp=datetime.now(timezone.utc),
+                    **fields,
+                )
+            )
+
+    def close(self) -> None:
+        self._closed = True
+
+    def since(self, seq: int) -> List[FetJobEvent]:
+        with self._lock:
+            return [event for event in self._events if event.seq > seq]
+
+
+__all__ = ["FetEventLog", "LogTail", "parse_progress_line"]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 from xml.etree import ElementTree as ET
@@ -13,8 +13,10 @@ from app.fet.schemas import (
     CalendarDay,
     CalendarHour,
     FetRunRequest,
+    FetTimetables,
     RoomData,
     RoomSummary,
+    SlotRow,
     StudentYear,
 )
 
@@ -26,107 +28,223 @@ class _ActivityMetadata:
     students_count: int
 
 
+@dataclass
+class _CalendarMapping:
+    hours_per_day: int
+    total_slots: int
+    day_lookup: Dict[str, int]
+    hour_lookup: Dict[str, int]
+
+    def day_index(self, day_name: str) -> Optional[int]:
+        return self.day_lookup.get(day_name.strip().lower())
+
+    def slot_for(self, day_index: Optional[int], hour_name: str) -> Optional[int]:
+        hour_index = self.hour_lookup.get(hour_name.strip().lower())
+        if day_index is None or hour_index is None:
+            return None
+        return day_index * self.hours_per_day + hour_index
+
+
+@dataclass
+class _SlotGrid:
+    """Ocupación por slot de un conjunto de entidades (docentes, grupos o salas)."""
+
+    total_slots: int
+    rows: Dict[str, SlotRow] = field(default_factory=dict)
+
+    def place(self, key: str, slot: int, activity_id: int | str) -> None:
+        if not 0 <= slot < self.total_slots:
+            return
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = [None] * self.total_slots
+        row[slot] = activity_id
+
+
 class TimetableResultsParser:
-    """Ayudas para interpretar los resultados de FET y mapearlos a datos de negocio."""
+    """
+    Ayudas para interpretar los resultados de FET y mapearlos a datos de negocio.
+
+    Los XML de salida se recorren con ``iterparse`` liberando cada nodo apenas se procesa,
+    por lo que la memoria no crece con el tamaño de los archivos sino solo con el resultado.
+    """
 
     timetable_folder_name = "timetables"
+    activities_file_suffix = "_activities.xml"
+    teachers_file_suffix = "_teachers.xml"
+    subgroups_file_suffix = "_subgroups.xml"
+    subgroup_name_suffix = "-sub"
+    highest_stage_suffix = "-highest"
 
     def extract_summary(
         self,
         payload: FetRunRequest,
-        workdir: Path,
-        input_file: Path,
-    ) -> Tuple[List[ActivityScheduleEntry], List[RoomSummary]]:
-        timetable_dir = self._resolve_timetable_dir(workdir, input_file.stem)
-        activities = self._parse_activities_file(payload, timetable_dir)
+        timetable_dir: Path,
+    ) -> Tuple[List[ActivityScheduleEntry], List[RoomSummary], Optional[FetTimetables]]:
         rooms = self._build_rooms_summary(payload.space.rooms, payload.space.buildings)
-        return activities, rooms
-
-    def _resolve_timetable_dir(self, workdir: Path, stem: str) -> Optional[Path]:
-        base_dir = workdir / self.timetable_folder_name
-        if not base_dir.exists():
-            return None
-
-        candidates = [
-            directory
-            for directory in base_dir.iterdir()
-            if directory.is_dir() and directory.name.startswith(stem)
-        ]
-        if not candidates:
-            return None
-
-        return max(candidates, key=lambda path: path.stat().st_mtime)
+        calendar = self._build_calendar_mapping(payload.calendar)
+        if not timetable_dir.is_dir() or calendar.hours_per_day <= 0:
+            return [], rooms, None
+
+        room_grid = _SlotGrid(calendar.total_slots)
+        activities = self._parse_activities_file(payload, timetable_dir, calendar, room_grid)
+
+        teacher_keys = {teacher.name: teacher.id for teacher in payload.teachers}
+        teacher_grid = self._parse_entity_file(
+            self._find_output_file(timetable_dir, self.teachers_file_suffix),
+            entity_tag="Teacher",
+            keys=teacher_keys,
+            calendar=calendar,
+        )
+        subgroup_keys = {
+            f"{group.id}{self.subgroup_name_suffix}": group.id
+            for year in payload.student_years
+            for group in year.groups
+        }
+        students_grid = self._parse_entity_file(
+            self._find_output_file(timetable_dir, self.subgroups_file_suffix),
+            entity_tag="Subgroup",
+            keys=subgroup_keys,
+            calendar=calendar,
+        )
+
+        timetables = FetTimetables(
+            slots_per_day=calendar.hours_per_day,
+            total_slots=calendar.total_slots,
+            teachers=teacher_grid.rows,
+            students=students_grid.rows,
+            rooms=room_grid.rows,
+        )
+        return activities, rooms, timetables
+
+    def timetable_dir_for(self, output_dir: Path, input_file: Path) -> Path:
+        """Directorio donde FET deja los horarios de ``input_file`` al usar ``--outputdir``."""
+        return output_dir / self.timetable_folder_name / input_file.stem
+
+    def partial_timetable_dir_for(self, output_dir: Path, input_file: Path) -> Path:
+        """
+        Directorio del horario de mayor avance que FET escribe al agotar ``--timelimitseconds``
+        o al recibir SIGTERM (junto a ``-current``, que puede tener menos actividades).
+        """
+        return output_dir / self.timetable_folder_name / f"{input_file.stem}{self.highest_stage_suffix}"
+
+    def has_timetable(self, timetable_dir: Path) -> bool:
+        return self._find_output_file(timetable_dir, self.activities_file_suffix) is not None
 
     def _parse_activities_file(
         self,
         payload: FetRunRequest,
-        timetable_dir: Optional[Path],
+        timetable_dir: Path,
+        calendar: _CalendarMapping,
+        room_grid: _SlotGrid,
     ) -> List[ActivityScheduleEntry]:
-        if not timetable_dir:
-            return []
-
-        xml_file = self._find_activities_file(timetable_dir)
-        if not xml_file or not xml_file.exists():
-            return []
-
-        hours_per_day, day_lookup, hour_lookup = self._build_calendar_mappings(payload.calendar)
-        if hours_per_day <= 0:
+        xml_file = self._find_output_file(timetable_dir, self.activities_file_suffix)
+        if not xml_file:
             return []
 
         metadata_lookup = self._build_activity_metadata(payload)
-
-        try:
-            tree = ET.parse(xml_file)
-        except ET.ParseError:
-            return []
+        room_ids = {room.name: room.id for room in payload.space.rooms}
 
         activity_entries: List[ActivityScheduleEntry] = []
-        root = tree.getroot()
-        for activity_node in root.findall("Activity"):
-            activity_id = (activity_node.findtext("Id") or "").strip()
-            if not activity_id or activity_id not in metadata_lookup:
-                continue
+        try:
+            events = ET.iterparse(xml_file, events=("start", "end"))
+            _, root = next(events)
+            for event, node in events:
+                if event != "end" or node.tag != "Activity":
+                    continue
+                activity_id = (node.findtext("Id") or "").strip()
+                day_name = node.findtext("Day") or ""
+                hour_name = node.findtext("Hour") or ""
+                room_name = (node.findtext("Room") or "").strip()
+                root.clear()
+
+                metadata = metadata_lookup.get(activity_id)
+                if metadata is None:
+                    continue
+                slot_start = calendar.slot_for(calendar.day_index(day_name), hour_name)
+                if slot_start is None:
+                    continue
 
-            day_name = (activity_node.findtext("Day") or "").strip().lower()
-            hour_name = (activity_node.findtext("Hour") or "").strip().lower()
-            if not day_name or not hour_name:
-                continue
+                coerced_id = self._coerce_activity_id(activity_id)
+                time_slots = [slot_start + offset for offset in range(metadata.duration)]
+                room_id = room_ids.get(room_name, room_name) if room_name else None
+                if room_id:
+                    for slot in time_slots:
+                        room_grid.place(room_id, slot, coerced_id)
+
+                activity_entries.append(
+                    ActivityScheduleEntry(
+                        id=coerced_id,
+                        subject=metadata.subject,
+                        time_slots=time_slots,
+                        students_count=metadata.students_count,
+                        room_id=room_id,
+                    )
+                )
+        except (ET.ParseError, StopIteration):
+            room_grid.rows.clear()
+            return []
 
-            day_index = day_lookup.get(day_name)
-            hour_index = hour_lookup.get(hour_name)
-            if day_index is None or hour_index is None:
-                continue
+        return activity_entries
 
-            metadata = metadata_lookup[activity_id]
-            slot_start = day_index * hours_per_day + hour_index
-            time_slots = [slot_start + offset for offset in range(metadata.duration)]
+    def _parse_entity_file(
+        self,
+        xml_file: Optional[Path],
+        entity_tag: str,
+        keys: Dict[str, str],
+        calendar: _CalendarMapping,
+    ) -> _SlotGrid:
+        """
+        Lee un horario por entidad de FET (``<Teacher name>`` o ``<Subgroup name>`` con
+        ``<Day name>/<Hour name>/<Activity id>``). FET repite la actividad en cada hora que
+        ocupa, así que cada ``<Activity>`` corresponde a exactamente un slot.
+        """
+        grid = _SlotGrid(calendar.total_slots)
+        if not xml_file:
+            return grid
+
+        entity_key: Optional[str] = None
+        day_index: Optional[int] = None
+        slot: Optional[int] = None
+        try:
+            events = ET.iterparse(xml_file, events=("start", "end"))
+            _, root = next(events)
+            for event, node in events:
+                if event == "start":
+                    if node.tag == entity_tag:
+                        name = node.get("name", "")
+                        entity_key = keys.get(name, name) or None
+                    elif node.tag == "Day":
+                        day_index = calendar.day_index(node.get("name", ""))
+                    elif node.tag == "Hour":
+                        slot = calendar.slot_for(day_index, node.get("name", ""))
+                    continue
 
-            activity_entries.append(
-                ActivityScheduleEntry(
-                    id=self._coerce_activity_id(activity_id),
-                    subject=metadata.subject,
-                    time_slots=time_slots,
-                    students_count=metadata.students_count,
-                )
-            )
+                if node.tag == "Activity":
+                    activity_id = (node.get("id") or "").strip()
+                    if entity_key and slot is not None and activity_id:
+                        grid.place(entity_key, slot, self._coerce_activity_id(activity_id))
+                elif node.tag == entity_tag:
+                    root.clear()
+        except (ET.ParseError, StopIteration):
+            return _SlotGrid(calendar.total_slots)
 
-        return activity_entries
+        return grid
 
-    def _find_activities_file(self, timetable_dir: Path) -> Optional[Path]:
-        matches = sorted(timetable_dir.glob("*_activities.xml"))
+    def _find_output_file(self, timetable_dir: Path, suffix: str) -> Optional[Path]:
+        matches = sorted(timetable_dir.glob(f"*{suffix}"))
         return matches[0] if matches else None
 
-    def _build_calendar_mappings(
-        self,
-        calendar: CalendarConfig,
-    ) -> Tuple[int, Dict[str, int], Dict[str, int]]:
+    def _build_calendar_mapping(self, calendar: CalendarConfig) -> _CalendarMapping:
         effective_days = self._effective_days(calendar.days)
         effective_hours = self._effective_hours(calendar.hours)
 
-        day_lookup = self._build_name_lookup(effective_days)
-        hour_lookup = self._build_name_lookup(effective_hours)
-
-        return len(effective_hours), day_lookup, hour_lookup
+        return _CalendarMapping(
+            hours_per_day=len(effective_hours),
+            total_slots=len(effective_days) * len(effective_hours),
+            day_lookup=self._build_name_lookup(effective_days),
+            hour_lookup=self._build_name_lookup(effective_hours),
+        )
 
     def _effective_days(self, days: List[CalendarDay]) -> List[CalendarDay]:
         sorted_days = sorted(days, key=lambda day: day.index)
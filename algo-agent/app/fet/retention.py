@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+
+def _directory_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+@dataclass
+class _RunEntry:
+    finished_at: float
+    size: int
+
+
+class FetRunRetention:
+    """
+    Retención de los directorios de corrida de FET (``<directory>/<run_id>/``).
+
+    Cada corrida terminada se registra con su tamaño. Se eliminan las corridas más antiguas
+    que ``max_age_seconds`` y, si el total supera ``max_bytes``, las más antiguas hasta volver
+    a la cuota. Las corridas en curso no se registran hasta terminar, así que nunca se borran.
+    El índice se reconstruye al iniciar a partir de los directorios existentes.
+    """
+
+    def __init__(self, directory: Path, max_age_seconds: int, max_bytes: int):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._runs: "OrderedDict[str, _RunEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def new_run_dir(self, run_id: str) -> Path:
+        run_dir = self.directory / run_id
+        run_dir.mkdir(parents=True, exist_ok=False)
+        return run_dir
+
+    def register(self, run_dir: Path) -> None:
+        """Registra una corrida terminada y aplica la política de retención."""
+        entry = _RunEntry(finished_at=time.time(), size=_directory_size(run_dir))
+        with self._lock:
+            previous = self._runs.pop(run_dir.name, None)
+            if previous is not None:
+                self._total_bytes -= previous.size
+            self._runs[run_dir.name] = entry
+            self._total_bytes += entry.size
+            expired = self._collect_expired(time.time())
+        self._remove(expired)
+
+    def collect(self) -> List[str]:
+        """Elimina las corridas vencidas o fuera de cuota y retorna sus ids."""
+        with self._lock:
+            expired = self._collect_expired(time.time())
+        self._remove(expired)
+        return expired
+
+    def _collect_expired(self, now: float) -> List[str]:
+        expired: List[str] = []
+        while self._runs:
+            run_id, entry = next(iter(self._runs.items()))
+            too_old = self.max_age_seconds > 0 and now - entry.finished_at > self.max_age_seconds
+            over_quota = self.max_bytes > 0 and self._total_bytes > self.max_bytes
+            if not (too_old or over_quota):
+                break
+            del self._runs[run_id]
+            self._total_bytes -= entry.size
+            expired.append(run_id)
+        return expired
+
+    def _remove(self, run_ids: List[str]) -> None:
+        for run_id in run_ids:
+            shutil.rmtree(self.directory / run_id, ignore_errors=True)
+
+    def _load_index(self) -> None:
+        if not self.directory.exists():
+            return
+        runs = []
+        for path in self.directory.iterdir():
+            if not path.is_dir():
+                continue
+            try:
+                finished_at = path.stat().st_mtime
+            except OSError:
+                continue
+            runs.append((finished_at, path.name, _directory_size(path)))
+        for finished_at, run_id, size in sorted(runs):
+            self._runs[run_id] = _RunEntry(finished_at=finished_at, size=size)
+            self._total_bytes += size
+        self._remove(self._collect_expired(time.time()))
+
+
+__all__ = ["FetRunRetention"]
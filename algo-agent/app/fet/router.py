@@ -1,33 +1,169 @@
-from fastapi import APIRouter, Depends, status
+import asyncio
+import time
+from typing import AsyncIterator, Optional
 
-from app.fet.schemas import FetRunRequest, FetRunSummary
-from app.fet.service import FetService
-from app.settings import AppSettings, get_settings
+from fastapi import APIRouter, Depends, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
 
-router = APIRouter()
+from app.fet.feasibility import FeasibilityAnalyzer
+from app.fet.jobs import FetJobManager, get_job_manager
+from app.fet.schemas import (
+    FeasibilityReport,
+    FetJobInfo,
+    FetPoolMetrics,
+    FetRunRequest,
+    FetRunSummary,
+    PortfolioStrategy,
+)
 
+router = APIRouter()
 
-def get_fet_service(
-    settings: AppSettings = Depends(get_settings),
-) -> FetService:
-    return FetService(settings=settings)
+_EVENTS_POLL_SECONDS = 0.5
+_EVENTS_KEEPALIVE_SECONDS = 15.0
 
 
+# Rutas síncronas: el hash, la lectura de la caché y el análisis de factibilidad corren en
+# el threadpool de FastAPI en vez de bloquear el event loop.
 @router.post(
     "/run",
     status_code=status.HTTP_202_ACCEPTED,
-    response_model=FetRunSummary,
-    summary="Ejecuta el algoritmo FET a partir de un payload ya consolidado",
+    response_model=FetJobInfo,
+    summary="Encola una ejecución de FET a partir de un payload ya consolidado",
 )
-async def run_fet(
+def run_fet(
     payload: FetRunRequest,
-    service: FetService = Depends(get_fet_service),
-) -> FetRunSummary:
+    force: bool = Query(False, description="Ignora la caché y fuerza una nueva corrida"),
+    seeds: int = Query(1, ge=1, description="Cantidad de procesos de FET con semillas distintas"),
+    strategy: PortfolioStrategy = Query(
+        "best",
+        description="first: primer horario completo; best: menor penalización blanda",
+    ),
+    jobs: FetJobManager = Depends(get_job_manager),
+) -> FetJobInfo:
     """
-    Ejecuta el flujo completo de generación de horarios a partir de un payload ya consolidado:
+    Encola el flujo completo de generación de horarios y retorna de inmediato el id del job:
 
     1. Valida y normaliza la data recibida.
     2. Genera el archivo .fet esperado por FET.
-    3. Ejecuta el binario de FET y retorna un resumen simple.
+    3. Ejecuta el binario de FET en segundo plano.
+
+    El estado se consulta en ``GET /fet/jobs/{job_id}`` y el resumen en
+    ``GET /fet/jobs/{job_id}/result``. Si la cola de ejecuciones está llena responde 503
+    con un ``Retry-After`` estimado. Si el payload es infactible responde 422 con el reporte
+    de ``POST /fet/feasibility``.
+
+    Si un payload equivalente ya fue resuelto, el job se retorna terminado (``cached=true``)
+    sin ejecutar FET; ``force=true`` omite la caché.
+
+    Con ``seeds=N`` se ejecutan N instancias de FET en paralelo con semillas distintas y se
+    conserva el primer horario completo (``strategy=first``) o el de menor penalización de
+    restricciones blandas (``strategy=best``).
+
+    Para regenerar tras cambios puntuales se envía ``warm_start`` con el
+    ``activities_schedule`` anterior y los ids modificados: solo se recalculan esas
+    actividades y las que comparten docente o estudiantes con ellas; el resto queda fijo.
+    """
+    return jobs.submit(payload, force=force, seeds=seeds, strategy=strategy)
+
+
+@router.post(
+    "/feasibility",
+    response_model=FeasibilityReport,
+    summary="Analiza si un payload puede tener solución sin ejecutar FET",
+)
+def check_feasibility(payload: FetRunRequest) -> FeasibilityReport:
+    """
+    Calcula cotas de carga por docente, grupo y sala. ``POST /fet/run`` aplica el mismo
+    análisis y responde 422 con este reporte cuando el payload es infactible.
+    """
+    return FeasibilityAnalyzer().analyze(payload)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=FetJobInfo,
+    summary="Consulta el estado de un job de FET",
+)
+async def get_fet_job(
+    job_id: str,
+    jobs: FetJobManager = Depends(get_job_manager),
+) -> FetJobInfo:
+    return jobs.get(job_id)
+
+
+@router.get(
+    "/jobs/{job_id}/result",
+    response_model=FetRunSummary,
+    summary="Obtiene el resumen de un job de FET terminado",
+)
+async def get_fet_job_result(
+    job_id: str,
+    jobs: FetJobManager = Depends(get_job_manager),
+) -> FetRunSummary:
+    """
+    Retorna el resumen de la corrida. Responde 409 si el job aún está en cola o en ejecución,
+    y propaga el error original si la corrida falló. Si FET agotó el tiempo, el resumen puede
+    traer ``status="partial"`` con el horario de mayor avance y ``unplaced_activities``.
+    """
+    return jobs.get_result(job_id)
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    summary="Stream de progreso de un job de FET (Server-Sent Events)",
+    response_class=StreamingResponse,
+)
+async def stream_fet_job_events(
+    job_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    jobs: FetJobManager = Depends(get_job_manager),
+) -> StreamingResponse:
     """
-    return service.run(payload)
+    Publica como SSE los cambios de estado (``status``), el avance de FET (``progress``:
+    actividades colocadas sobre el total y segundos transcurridos) y su salida (``log``).
+
+    El ``id`` de cada evento permite reconectar con ``Last-Event-ID`` y recibir solo lo
+    posterior, mientras siga en el buffer del job. El stream se cierra al terminar el job.
+    """
+    event_log = jobs.get_events(job_id)
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_stream() -> AsyncIterator[str]:
+        seq = after
+        last_sent = time.monotonic()
+        while True:
+            closed = event_log.closed
+            batch = event_log.since(seq)
+            for event in batch:
+                seq = event.seq
+                data = event.model_dump_json(exclude_none=True)
+                yield f"id: {event.seq}\nevent: {event.type}\ndata: {data}\n\n"
+            if closed:
+                return
+            if await request.is_disconnected():
+                return
+            if batch:
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= _EVENTS_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/metrics",
+    response_model=FetPoolMetrics,
+    summary="Métricas del pool de ejecuciones de FET",
+)
+async def get_fet_metrics(
+    jobs: FetJobManager = Depends(get_job_manager),
+) -> FetPoolMetrics:
+    """Profundidad de la cola, procesos en ejecución y tiempos de espera recientes."""
+    return jobs.metrics()
@@ -1,4 +1,5 @@
-from typing import List, Literal, Optional, Union
+from datetime import datetime
+from typing import Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -98,10 +99,19 @@ class ConstraintTeacherNotAvailable(TimeConstraintBase):
     not_available_slots: List[NotAvailableSlot] = Field(default_factory=list)
 
 
+class ConstraintActivityPreferredStartingTime(TimeConstraintBase):
+    type: Literal["activity_preferred_starting_time"]
+    activity_id: str = Field(..., min_length=1)
+    day_index: int = Field(..., ge=0)
+    hour_index: int = Field(..., ge=0)
+    permanently_locked: bool = False
+
+
 TimeConstraint = Union[
     ConstraintBasicCompulsoryTime,
     ConstraintMinDaysBetweenActivities,
     ConstraintTeacherNotAvailable,
+    ConstraintActivityPreferredStartingTime,
 ]
 
 
@@ -128,7 +138,17 @@ class ConstraintBasicCompulsorySpace(SpaceConstraintBase):
     type: Literal["basic_compulsory_space"]
 
 
-SpaceConstraint = ConstraintBasicCompulsorySpace
+class ConstraintActivityPreferredRoom(SpaceConstraintBase):
+    type: Literal["activity_preferred_room"]
+    activity_id: str = Field(..., min_length=1)
+    room_id: str = Field(..., min_length=1)
+    permanently_locked: bool = False
+
+
+SpaceConstraint = Union[
+    ConstraintBasicCompulsorySpace,
+    ConstraintActivityPreferredRoom,
+]
 
 
 class SpaceData(BaseModel):
@@ -137,6 +157,25 @@ class SpaceData(BaseModel):
     space_constraints: List[SpaceConstraint] = Field(default_factory=list)
 
 
+class ActivityScheduleEntry(BaseModel):
+    id: Union[int, str]
+    subject: str
+    time_slots: List[int] = Field(default_factory=list)
+    students_count: int = 0
+    room_id: Optional[str] = None
+
+
+class WarmStart(BaseModel):
+    """
+    Horario anterior (``activities_schedule`` de una corrida previa) y actividades que
+    cambiaron desde entonces. Las actividades no afectadas quedan fijas en su slot y sala.
+    """
+
+    previous_schedule: List[ActivityScheduleEntry] = Field(default_factory=list)
+    changed_activity_ids: List[str] = Field(default_factory=list)
+    lock_rooms: bool = True
+
+
 class FetRunRequest(BaseModel):
     metadata: Metadata
     calendar: CalendarConfig
@@ -146,13 +185,25 @@ class FetRunRequest(BaseModel):
     activities: List[ActivityData] = Field(default_factory=list)
     time_constraints: List[TimeConstraint] = Field(default_factory=list)
     space: SpaceData = Field(default_factory=SpaceData)
+    warm_start: Optional[WarmStart] = None
 
 
-class ActivityScheduleEntry(BaseModel):
-    id: Union[int, str]
-    subject: str
-    time_slots: List[int] = Field(default_factory=list)
-    students_count: int = 0
+SlotRow = List[Optional[Union[int, str]]]
+
+
+class FetTimetables(BaseModel):
+    """
+    Horarios por entidad indexados por slot (``día * slots_per_day + hora``).
+
+    Cada fila tiene ``total_slots`` posiciones con el id de la actividad que ocupa el slot
+    o ``None`` si está libre. Las llaves son los ids del payload (docente, grupo y sala).
+    """
+
+    slots_per_day: int
+    total_slots: int
+    teachers: Dict[str, SlotRow] = Field(default_factory=dict)
+    students: Dict[str, SlotRow] = Field(default_factory=dict)
+    rooms: Dict[str, SlotRow] = Field(default_factory=dict)
 
 
 class RoomSummary(BaseModel):
@@ -171,6 +222,86 @@ class FetRunSummary(BaseModel):
     stderr: str = ""
     activities_schedule: List[ActivityScheduleEntry] = Field(default_factory=list)
     rooms: List[RoomSummary] = Field(default_factory=list)
+    timetables: Optional[FetTimetables] = None
+    portfolio_size: int = 1
+    random_seeds: Optional[List[int]] = None
+    soft_conflicts: Optional[float] = None
+    parts: int = 1
+    unplaced_activities: List[str] = Field(default_factory=list)
+    locked_activities: int = 0
+
+
+PortfolioStrategy = Literal["first", "best"]
+
+
+FeasibilityIssueKind = Literal[
+    "activity_too_long",
+    "teacher_overload",
+    "teacher_no_consecutive_slots",
+    "students_overload",
+    "rooms_overload",
+    "room_capacity",
+]
+
+
+class FeasibilityIssue(BaseModel):
+    kind: FeasibilityIssueKind
+    entity_id: str
+    required: int
+    available: int
+    message: str
+
+
+class FeasibilityReport(BaseModel):
+    feasible: bool
+    total_slots: int
+    issues: List[FeasibilityIssue] = Field(default_factory=list)
+
+
+FetJobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class FetJobInfo(BaseModel):
+    job_id: str
+    status: FetJobStatus
+    timetable_id: str
+    semester: str
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    cached: bool = False
+    placed: Optional[int] = None
+    total: Optional[int] = None
+
+
+FetJobEventType = Literal["status", "progress", "log"]
+
+
+class FetJobEvent(BaseModel):
+    seq: int
+    type: FetJobEventType
+    timestamp: datetime
+    source: Optional[str] = None
+    status: Optional[FetJobStatus] = None
+    placed: Optional[int] = None
+    total: Optional[int] = None
+    elapsed_seconds: Optional[int] = None
+    stream: Optional[Literal["stdout", "stderr"]] = None
+    line: Optional[str] = None
+
+
+class FetPoolMetrics(BaseModel):
+    max_workers: int
+    max_queue_size: int
+    running: int
+    queue_depth: int
+    completed: int
+    rejected: int
+    avg_wait_seconds: float
+    max_wait_seconds: float
+    avg_run_seconds: float
+    estimated_wait_seconds: float
 
 
 __all__ = [
@@ -188,13 +319,26 @@ __all__ = [
     "ConstraintBasicCompulsoryTime",
     "ConstraintMinDaysBetweenActivities",
     "ConstraintTeacherNotAvailable",
+    "ConstraintActivityPreferredStartingTime",
     "SpaceData",
     "BuildingData",
     "RoomData",
     "SpaceConstraint",
     "ConstraintBasicCompulsorySpace",
-    "FetRunRequest",
+    "ConstraintActivityPreferredRoom",
     "ActivityScheduleEntry",
+    "WarmStart",
+    "FetRunRequest",
+    "SlotRow",
+    "FetTimetables",
     "RoomSummary",
     "FetRunSummary",
+    "PortfolioStrategy",
+    "FeasibilityIssue",
+    "FeasibilityReport",
+    "FetJobStatus",
+    "FetJobInfo",
+    "FetJobEventType",
+    "FetJobEvent",
+    "FetPoolMetrics",
 ]
@@ -1,53 +1,206 @@
 from __future__ import annotations
 
+import random
+import re
 import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
 from fastapi import HTTPException, status
 from pydantic import BaseModel
 
+from app.fet.decomposition import ProblemDecomposer
+from app.fet.pool import FetProcessSlots, FetRunCancelled
+from app.fet.progress import FetEventLog, LogTail, parse_progress_line
 from app.fet.results_parser import TimetableResultsParser
-from app.fet.schemas import FetRunRequest, FetRunSummary
+from app.fet.retention import FetRunRetention
+from app.fet.schemas import FetRunRequest, FetRunSummary, PortfolioStrategy
+from app.fet.warm_start import WarmStartPlanner
 from app.fet.xml_builder import FetXmlBuilder
 from app.settings import AppSettings
 
+# Rangos válidos de las dos mitades de la semilla aleatoria de FET (ver ``fet-cl --help``).
+_RANDOM_SEED_MAX_1 = 4294967086
+_RANDOM_SEED_MAX_2 = 4294944442
+_SOFT_CONFLICTS_PATTERN = re.compile(r"Total soft conflicts:\s*([0-9]+(?:\.[0-9]+)?)")
+_POLL_INTERVAL_SECONDS = 0.1
+
 
 class FetRunResult(BaseModel):
     input_file: str
     output_directory: str
+    timetable_directory: str
+    partial: bool = False
     stdout: str = ""
     stderr: str = ""
     return_code: int
+    random_seeds: Optional[List[int]] = None
+    soft_conflicts: Optional[float] = None
+
+
+@dataclass
+class _SeedProcess:
+    output_dir: Path
+    random_seeds: Optional[List[int]]
+    process: subprocess.Popen
+    source: str
+    stdout: LogTail
+    stderr: LogTail
+    progress: LogTail
+    placed: int = 0
 
 
 class FetService:
     """
     Servicio principal que recibe un payload de datos ya consolidados, genera el archivo .fet,
     ejecuta FET y devuelve un resumen de la corrida.
+
+    Cada corrida usa su propio directorio (``<fet_workdir>/runs/<run_id>``) como entrada y
+    ``--outputdir`` de FET, por lo que la ruta de los resultados se conoce de antemano. Al
+    terminar, el directorio queda bajo la política de retención de ``FetRunRetention``.
+
+    Con ``seeds > 1`` se lanza un portafolio de procesos de FET con semillas distintas sobre
+    el mismo archivo de entrada: ``strategy="first"`` se queda con el primer horario completo
+    y termina el resto; ``strategy="best"`` espera a todos y elige el de menor penalización
+    de restricciones blandas. Los procesos del portafolio reservan juntos sus posiciones en
+    ``process_slots``, compartido con los demás jobs, antes de lanzarse.
+
+    Si las actividades forman componentes independientes (sin docentes ni estudiantes en
+    común), cada parte se resuelve como una instancia de FET propia en paralelo y los
+    resultados se unen en un único resumen (ver ``ProblemDecomposer``). Cada parte reserva sus
+    propias posiciones de procesos; si una falla, las demás se detienen y el error se propaga.
+
+    Si se agota el tiempo sin un horario completo y ``fet_partial_on_timeout`` está activo,
+    FET se detiene con SIGTERM (o por su propio ``--timelimitseconds``) para que escriba el
+    horario de mayor avance; ese horario se retorna con ``status="partial"`` y la lista de
+    actividades que quedaron sin ubicar.
     """
 
+    runs_folder_name = "runs"
+
     def __init__(
         self,
         settings: AppSettings,
         xml_builder: FetXmlBuilder | None = None,
         results_parser: TimetableResultsParser | None = None,
+        retention: FetRunRetention | None = None,
+        decomposer: ProblemDecomposer | None = None,
+        warm_start: WarmStartPlanner | None = None,
+        process_slots: FetProcessSlots | None = None,
     ):
         self.settings = settings
+        self.process_slots = process_slots or FetProcessSlots(settings.fet_max_concurrent_jobs)
         self.xml_builder = xml_builder or FetXmlBuilder()
         self.results_parser = results_parser or TimetableResultsParser()
+        self.retention = retention or FetRunRetention(
+            directory=settings.fet_workdir / self.runs_folder_name,
+            max_age_seconds=settings.fet_run_retention_seconds,
+            max_bytes=settings.fet_run_max_bytes,
+        )
+        self.decomposer = decomposer or ProblemDecomposer()
+        self.warm_start = warm_start or WarmStartPlanner()
+
+    def run(
+        self,
+        payload: FetRunRequest,
+        seeds: int = 1,
+        strategy: PortfolioStrategy = "best",
+        events: FetEventLog | None = None,
+    ) -> FetRunSummary:
+        """
+        Ejecuta FET para el payload. Si se entrega ``events``, el progreso de cada proceso
+        (actividades colocadas y líneas de salida) se publica ahí mientras corre.
+
+        Si el payload trae ``warm_start``, las actividades fuera del vecindario de los cambios
+        quedan fijas en su horario anterior (ver ``WarmStartPlanner``).
+        """
+        payload, locked = self.warm_start.apply(payload)
+        run_dir = self.retention.new_run_dir(uuid4().hex)
+        try:
+            parts = [payload]
+            if self.settings.fet_decompose:
+                parts = self.decomposer.split(payload, self.settings.fet_decomposition_max_parts)
+            if len(parts) == 1:
+                summary = self._run_in(run_dir, payload, seeds, strategy, events, source="")
+            else:
+                summary = self._run_parts(run_dir, payload, parts, seeds, strategy, events)
+            summary.locked_activities = locked
+            return summary
+        finally:
+            self.retention.register(run_dir)
+
+    def _run_parts(
+        self,
+        run_dir: Path,
+        payload: FetRunRequest,
+        parts: List[FetRunRequest],
+        seeds: int,
+        strategy: PortfolioStrategy,
+        events: FetEventLog | None,
+    ) -> FetRunSummary:
+        part_dirs = [run_dir / f"part-{index}" for index in range(len(parts))]
+        for part_dir in part_dirs:
+            part_dir.mkdir()
+        cancel = threading.Event()
+        with ThreadPoolExecutor(max_workers=len(parts), thread_name_prefix="fet-part") as executor:
+            futures = [
+                executor.submit(
+                    self._run_in,
+                    part_dir,
+                    part,
+                    seeds,
+                    strategy,
+                    events,
+                    source=part_dir.name,
+                    cancel=cancel,
+                )
+                for part_dir, part in zip(part_dirs, parts)
+            ]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            failed = [future for future in futures if future in done and future.exception()]
+            if failed:
+                # Sin una parte no hay horario: se detienen las demás antes de propagar el error.
+                cancel.set()
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                raise failed[0].exception()
+            summaries = [future.result() for future in futures]
+        return self.decomposer.merge(payload, summaries, str(run_dir))
 
-    def run(self, payload: FetRunRequest) -> FetRunSummary:
-        fet_xml = self.xml_builder.build(payload)
-        input_file = self._write_input_file(fet_xml)
-        execution = self._execute_algorithm(input_file)
+    def _run_in(
+        self,
+        run_dir: Path,
+        payload: FetRunRequest,
+        seeds: int,
+        strategy: PortfolioStrategy,
+        events: FetEventLog | None,
+        source: str,
+        cancel: threading.Event | None = None,
+    ) -> FetRunSummary:
+        input_file = self._write_input_file(run_dir, payload)
+        total_activities = sum(1 for activity in payload.activities if activity.active)
+        execution = self._execute_algorithm(
+            input_file, run_dir, seeds, strategy, events, source, total_activities, cancel
+        )
         metadata = payload.metadata
-        activities_schedule, rooms = self.results_parser.extract_summary(
+        activities_schedule, rooms, timetables = self.results_parser.extract_summary(
             payload=payload,
-            workdir=self.settings.fet_workdir,
-            input_file=input_file,
+            timetable_dir=Path(execution.timetable_directory),
         )
+        placed_ids = {str(entry.id) for entry in activities_schedule}
+        unplaced = [
+            activity.id
+            for activity in payload.activities
+            if activity.active and activity.id.strip() not in placed_ids
+        ]
         return FetRunSummary(
+            status="partial" if execution.partial else "success",
             semester=metadata.semester,
             timetable_id=metadata.timetable_id,
             fet_input_file=execution.input_file,
@@ -56,16 +209,30 @@ class FetService:
             stderr=execution.stderr,
             activities_schedule=activities_schedule,
             rooms=rooms,
+            timetables=timetables,
+            portfolio_size=seeds,
+            random_seeds=execution.random_seeds,
+            soft_conflicts=execution.soft_conflicts,
+            unplaced_activities=unplaced if execution.partial else [],
         )
 
-    def _write_input_file(self, xml_payload: str) -> Path:
-        workdir = self.settings.fet_workdir
-        workdir.mkdir(parents=True, exist_ok=True)
-        file_path = workdir / f"fet-input-{uuid4().hex}.fet"
-        file_path.write_text(xml_payload, encoding="utf-8")
+    def _write_input_file(self, run_dir: Path, payload: FetRunRequest) -> Path:
+        file_path = run_dir / "fet-input.fet"
+        with file_path.open("w", encoding="utf-8") as stream:
+            self.xml_builder.write(payload, stream)
         return file_path
 
-    def _execute_algorithm(self, input_file: Path) -> FetRunResult:
+    def _execute_algorithm(
+        self,
+        input_file: Path,
+        run_dir: Path,
+        seeds: int,
+        strategy: PortfolioStrategy,
+        events: FetEventLog | None,
+        source: str,
+        total_activities: int,
+        cancel: threading.Event | None = None,
+    ) -> FetRunResult:
         binary = self.settings.fet_binary_path
         if not binary.exists():
             raise HTTPException(
@@ -73,42 +240,256 @@ class FetService:
                 detail=f"No se encontró el binario de FET en {binary}",
             )
 
+        candidates: List[_SeedProcess] = []
+        with self.process_slots.reserve(max(1, seeds), cancel):
+            try:
+                if seeds <= 1:
+                    candidates.append(
+                        self._start_process(binary, input_file, run_dir, None, source)
+                    )
+                else:
+                    for index in range(seeds):
+                        candidates.append(
+                            self._start_process(
+                                binary,
+                                input_file,
+                                run_dir / f"seed-{index}",
+                                self._random_seeds(),
+                                "/".join(filter(None, (source, f"seed-{index}"))),
+                            )
+                        )
+                winner, timetable_dir, partial = self._wait_for_portfolio(
+                    candidates, input_file, strategy, events, total_activities, cancel
+                )
+            finally:
+                for candidate in candidates:
+                    self._terminate(candidate)
+
+        return FetRunResult(
+            input_file=str(input_file),
+            output_directory=str(winner.output_dir),
+            timetable_directory=str(timetable_dir),
+            partial=partial,
+            stdout=winner.stdout.text(),
+            stderr=winner.stderr.text(),
+            return_code=winner.process.returncode,
+            random_seeds=winner.random_seeds,
+            soft_conflicts=self._soft_conflicts(timetable_dir, input_file),
+        )
+
+    def _start_process(
+        self,
+        binary: Path,
+        input_file: Path,
+        output_dir: Path,
+        random_seeds: Optional[List[int]],
+        source: str,
+    ) -> _SeedProcess:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        command = [
+            str(binary),
+            f"--inputfile={input_file}",
+            f"--outputdir={output_dir}",
+        ]
+        if self.settings.fet_partial_on_timeout:
+            command.append(f"--timelimitseconds={self.settings.fet_timeout_seconds}")
+        if random_seeds is not None:
+            names = ("s10", "s11", "s12", "s20", "s21", "s22")
+            command.extend(f"--randomseed{name}={value}" for name, value in zip(names, random_seeds))
+
+        stdout_path = output_dir / "stdout.log"
+        stderr_path = output_dir / "stderr.log"
         try:
-            completed = subprocess.run(
-                [
-                    str(binary),
-                    f"--inputfile={input_file}",
-                    f"--outputdir={self.settings.fet_workdir}",
-                ],
-                capture_output=True,
-                text=True,
-                cwd=binary.parent,
-                timeout=self.settings.fet_timeout_seconds,
-            )
-        except subprocess.TimeoutExpired as exc:  # noqa: F841
-            raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                detail="La ejecución de FET superó el tiempo máximo permitido",
-            ) from None
-        except FileNotFoundError as exc:  # noqa: F841
+            with stdout_path.open("wb") as stdout, stderr_path.open("wb") as stderr:
+                process = subprocess.Popen(
+                    command,
+                    stdout=stdout,
+                    stderr=stderr,
+                    cwd=binary.parent,
+                )
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="No se pudo ejecutar el binario de FET",
             ) from None
+        max_lines = self.settings.fet_log_buffer_lines
+        return _SeedProcess(
+            output_dir=output_dir,
+            random_seeds=random_seeds,
+            process=process,
+            source=source,
+            stdout=LogTail(stdout_path, max_lines),
+            stderr=LogTail(stderr_path, max_lines),
+            progress=LogTail(output_dir / "logs" / "max_placed_activities.txt", max_lines),
+        )
 
-        if completed.returncode != 0:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="FET finalizó con errores",
+    def _wait_for_portfolio(
+        self,
+        candidates: List[_SeedProcess],
+        input_file: Path,
+        strategy: PortfolioStrategy,
+        events: FetEventLog | None,
+        total_activities: int,
+        cancel: threading.Event | None = None,
+    ) -> Tuple[_SeedProcess, Path, bool]:
+        """
+        Espera al portafolio y retorna el proceso elegido, el directorio del horario a leer y
+        si ese horario es parcial.
+
+        FET termina con código 0 también al agotar ``--timelimitseconds``, así que un proceso
+        solo cuenta como exitoso si además escribió el horario completo. Si ``cancel`` se
+        activa se lanza ``FetRunCancelled`` y quien llama termina los procesos.
+        """
+        # Con horarios parciales FET corta por su cuenta; el plazo propio queda como respaldo.
+        timeout = self.settings.fet_timeout_seconds
+        if self.settings.fet_partial_on_timeout:
+            timeout += self.settings.fet_stop_grace_seconds
+        deadline = time.monotonic() + timeout
+        pending = list(candidates)
+        succeeded: List[_SeedProcess] = []
+
+        while pending:
+            if cancel is not None and cancel.is_set():
+                raise FetRunCancelled()
+            for candidate in list(pending):
+                finished = candidate.process.poll() is not None
+                self._publish_output(candidate, events, total_activities, final=finished)
+                if not finished:
+                    continue
+                pending.remove(candidate)
+                if candidate.process.returncode == 0 and self.results_parser.has_timetable(
+                    self.results_parser.timetable_dir_for(candidate.output_dir, input_file)
+                ):
+                    succeeded.append(candidate)
+            if succeeded and strategy == "first":
+                return self._complete(succeeded[0], input_file)
+            if pending and time.monotonic() >= deadline:
+                break
+            if pending:
+                time.sleep(_POLL_INTERVAL_SECONDS)
+
+        if succeeded:
+            winner = min(
+                succeeded,
+                key=lambda candidate: self._soft_conflicts_or_inf(
+                    self.results_parser.timetable_dir_for(candidate.output_dir, input_file),
+                    input_file,
+                ),
             )
+            return self._complete(winner, input_file)
 
-        return FetRunResult(
-            input_file=str(input_file),
-            output_directory=str(self.settings.fet_workdir),
-            stdout=completed.stdout,
-            stderr=completed.stderr,
-            return_code=completed.returncode,
+        if self.settings.fet_partial_on_timeout:
+            if pending:
+                self._stop_gracefully(pending, events, total_activities)
+            partial = self._best_partial(candidates, input_file)
+            if partial is not None:
+                return partial
+        if pending:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="La ejecución de FET superó el tiempo máximo permitido",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="FET finalizó con errores",
         )
 
+    def _complete(self, candidate: _SeedProcess, input_file: Path) -> Tuple[_SeedProcess, Path, bool]:
+        return candidate, self.results_parser.timetable_dir_for(candidate.output_dir, input_file), False
+
+    def _stop_gracefully(
+        self,
+        pending: List[_SeedProcess],
+        events: FetEventLog | None,
+        total_activities: int,
+    ) -> None:
+        """Envía SIGTERM para que FET escriba sus horarios parciales y espera el margen."""
+        for candidate in pending:
+            if candidate.process.poll() is None:
+                candidate.process.terminate()
+        deadline = time.monotonic() + self.settings.fet_stop_grace_seconds
+        for candidate in pending:
+            try:
+                candidate.process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                continue
+            finally:
+                self._publish_output(candidate, events, total_activities, final=True)
+
+    def _best_partial(
+        self,
+        candidates: List[_SeedProcess],
+        input_file: Path,
+    ) -> Optional[Tuple[_SeedProcess, Path, bool]]:
+        """Entre los procesos que dejaron horario parcial, el que más actividades ubicó."""
+        best: Optional[Tuple[_SeedProcess, Path, bool]] = None
+        for candidate in candidates:
+            if candidate.process.poll() is None:
+                continue
+            timetable_dir = self.results_parser.partial_timetable_dir_for(
+                candidate.output_dir, input_file
+            )
+            if not self.results_parser.has_timetable(timetable_dir):
+                continue
+            if best is None or candidate.placed > best[0].placed:
+                best = (candidate, timetable_dir, True)
+        return best
+
+    def _publish_output(
+        self,
+        candidate: _SeedProcess,
+        events: FetEventLog | None,
+        total_activities: int,
+        final: bool,
+    ) -> None:
+        """Lee la salida nueva del proceso y la publica como eventos del job."""
+        read = LogTail.flush if final else LogTail.read_new_lines
+        source = candidate.source or None
+        for line in read(candidate.progress):
+            progress = parse_progress_line(line)
+            if progress is None:
+                continue
+            elapsed_seconds, placed = progress
+            candidate.placed = max(candidate.placed, placed)
+            if events is not None:
+                events.publish(
+                    "progress",
+                    source=source,
+                    placed=placed,
+                    total=total_activities,
+                    elapsed_seconds=elapsed_seconds,
+                )
+        for stream, tail in (("stdout", candidate.stdout), ("stderr", candidate.stderr)):
+            for line in read(tail):
+                if events is not None and line:
+                    events.publish("log", source=source, stream=stream, line=line)
+
+    def _terminate(self, candidate: _SeedProcess) -> None:
+        if candidate.process.poll() is not None:
+            return
+        candidate.process.kill()
+        candidate.process.wait()
+
+    def _soft_conflicts(self, timetable_dir: Path, input_file: Path) -> Optional[float]:
+        report = timetable_dir / f"{input_file.stem}_soft_conflicts.txt"
+        match = _SOFT_CONFLICTS_PATTERN.search(self._read_log(report))
+        return float(match.group(1)) if match else None
+
+    def _soft_conflicts_or_inf(self, timetable_dir: Path, input_file: Path) -> float:
+        soft_conflicts = self._soft_conflicts(timetable_dir, input_file)
+        return float("inf") if soft_conflicts is None else soft_conflicts
+
+    def _random_seeds(self) -> List[int]:
+        rng = random.SystemRandom()
+        return [rng.randint(1, _RANDOM_SEED_MAX_1) for _ in range(3)] + [
+            rng.randint(1, _RANDOM_SEED_MAX_2) for _ in range(3)
+        ]
+
+    def _read_log(self, path: Path) -> str:
+        try:
+            return path.read_text(encoding="utf-8-sig", errors="replace")
+        except OSError:
+            return ""
+
 
 __all__ = ["FetService", "FetRunRequest", "FetRunSummary", "FetRunResult"]
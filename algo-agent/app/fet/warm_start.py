@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.fet.schemas import (
+    ActivityData,
+    ActivityScheduleEntry,
+    ConstraintActivityPreferredRoom,
+    ConstraintActivityPreferredStartingTime,
+    ConstraintBasicCompulsorySpace,
+    ConstraintBasicCompulsoryTime,
+    ConstraintMinDaysBetweenActivities,
+    ConstraintTeacherNotAvailable,
+    FetRunRequest,
+)
+
+# FET solo trata como obligatorias las restricciones con peso 100%.
+_HARD_WEIGHT = 100.0
+_DEFAULT_SLOTS = 5
+
+
+class WarmStartPlanner:
+    """
+    Convierte un ``warm_start`` en restricciones que fijan el horario anterior.
+
+    Se recalcula solo el vecindario de las actividades modificadas: ellas mismas, las que
+    comparten docente o estudiantes con alguna (una actividad del año comparte estudiantes
+    con las de sus grupos) y las ligadas por una restricción de días mínimos. El resto queda
+    bloqueado en su slot de inicio (y en su sala, con ``lock_rooms``) mediante restricciones
+    ``ActivityPreferredStartingTime`` / ``ActivityPreferredRoom`` con ``Permanently_Locked``.
+
+    No se fija una actividad si su bloque ya no cabe en el calendario o choca con una
+    indisponibilidad obligatoria de su docente; en ese caso FET la vuelve a ubicar.
+    """
+
+    def apply(self, payload: FetRunRequest) -> Tuple[FetRunRequest, int]:
+        """Retorna el payload con las actividades fijadas y cuántas se fijaron."""
+        warm_start = payload.warm_start
+        if warm_start is None:
+            return payload, 0
+
+        days = sorted(payload.calendar.days, key=lambda day: day.index)
+        hours = sorted(payload.calendar.hours, key=lambda hour: hour.index)
+        day_indexes = [day.index for day in days] or list(range(_DEFAULT_SLOTS))
+        hour_indexes = [hour.index for hour in hours] or list(range(_DEFAULT_SLOTS))
+        hours_per_day = len(hour_indexes)
+
+        previous = {str(entry.id).strip(): entry for entry in warm_start.previous_schedule}
+        affected = self._neighbourhood(payload, set(warm_start.changed_activity_ids))
+        blocked = self._teacher_blocked_slots(payload, day_indexes, hour_indexes)
+        room_ids = {room.id for room in payload.space.rooms}
+
+        time_constraints = list(payload.time_constraints) or [
+            ConstraintBasicCompulsoryTime(type="basic_compulsory_time", weight=_HARD_WEIGHT)
+        ]
+        space_constraints = list(payload.space.space_constraints) or [
+            ConstraintBasicCompulsorySpace(type="basic_compulsory_space", weight=_HARD_WEIGHT)
+        ]
+        locked = 0
+        for activity in payload.activities:
+            if not activity.active or activity.id in affected:
+                continue
+            start = self._start_slot(activity, previous.get(activity.id.strip()))
+            if start is None:
+                continue
+            day, hour = divmod(start, hours_per_day)
+            if day >= len(day_indexes) or hour + activity.duration > hours_per_day:
+                continue
+            slots = range(start, start + activity.duration)
+            if any(slot in blocked.get(activity.teacher_id, ()) for slot in slots):
+                continue
+
+            time_constraints.append(
+                ConstraintActivityPreferredStartingTime(
+                    type="activity_preferred_starting_time",
+                    weight=_HARD_WEIGHT,
+                    activity_id=activity.id,
+                    day_index=day_indexes[day],
+                    hour_index=hour_indexes[hour],
+                    permanently_locked=True,
+                )
+            )
+            room_id = previous[activity.id.strip()].room_id
+            if warm_start.lock_rooms and room_id in room_ids:
+                space_constraints.append(
+                    ConstraintActivityPreferredRoom(
+                        type="activity_preferred_room",
+                        weight=_HARD_WEIGHT,
+                        activity_id=activity.id,
+                        room_id=room_id,
+                        permanently_locked=True,
+                    )
+                )
+            locked += 1
+
+        pinned = payload.model_copy(
+            update={
+                "time_constraints": time_constraints,
+                "space": payload.space.model_copy(update={"space_constraints": space_constraints}),
+                "warm_start": None,
+            }
+        )
+        return pinned, locked
+
+    def _neighbourhood(self, payload: FetRunRequest, changed: Set[str]) -> Set[str]:
+        # Una actividad del año ocupa a todos sus grupos a la vez.
+        groups_of_year = {
+            year.id: {group.id for group in year.groups} or {year.id}
+            for year in payload.student_years
+        }
+
+        def occupied_groups(activity: ActivityData) -> Set[str]:
+            reference = activity.students_reference
+            if reference.type == "year":
+                return groups_of_year.get(reference.id, {reference.id})
+            return {reference.id}
+
+        teachers: Set[str] = set()
+        students: Set[str] = set()
+        for activity in payload.activities:
+            if activity.id in changed:
+                teachers.add(activity.teacher_id)
+                students |= occupied_groups(activity)
+
+        affected = set(changed)
+        for activity in payload.activities:
+            if activity.teacher_id in teachers or occupied_groups(activity) & students:
+                affected.add(activity.id)
+
+        for constraint in payload.time_constraints:
+            if isinstance(constraint, ConstraintMinDaysBetweenActivities):
+                if affected.intersection(constraint.activity_ids):
+                    affected.update(constraint.activity_ids)
+        return affected
+
+    def _start_slot(
+        self,
+        activity: ActivityData,
+        entry: Optional[ActivityScheduleEntry],
+    ) -> Optional[int]:
+        if entry is None or not entry.time_slots:
+            return None
+        slots = sorted(entry.time_slots)
+        # Si cambió la duración el bloque anterior ya no sirve como punto fijo.
+        if len(slots) != activity.duration or slots[-1] - slots[0] != activity.duration - 1:
+            return None
+        return slots[0]
+
+    def _teacher_blocked_slots(
+        self,
+        payload: FetRunRequest,
+        day_indexes: List[int],
+        hour_indexes: List[int],
+    ) -> Dict[str, Set[int]]:
+        day_ordinals = {index: ordinal for ordinal, index in enumerate(day_indexes)}
+        hour_ordinals = {index: ordinal for ordinal, index in enumerate(hour_indexes)}
+        blocked: Dict[str, Set[int]] = defaultdict(set)
+        for constraint in payload.time_constraints:
+            if not isinstance(constraint, ConstraintTeacherNotAvailable):
+                continue
+            if not constraint.active or constraint.weight < _HARD_WEIGHT:
+                continue
+            for slot in constraint.not_available_slots:
+                day = day_ordinals.get(slot.day_index)
+                hour = hour_ordinals.get(slot.hour_index)
+                if day is not None and hour is not None:
+                    blocked[constraint.teacher_id].add(day * len(hour_indexes) + hour)
+        return blocked
+
+
+__all__ = ["WarmStartPlanner"]
@@ -1,26 +1,90 @@
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
-from xml.dom import minidom
-from xml.etree.ElementTree import Element, SubElement, tostring
+from typing import Dict, List, Optional, TextIO
 
 from app.fet.schemas import (
     ActivityData,
     BuildingData,
     CalendarDay,
     CalendarHour,
+    ConstraintActivityPreferredRoom,
+    ConstraintActivityPreferredStartingTime,
     ConstraintBasicCompulsorySpace,
     ConstraintBasicCompulsoryTime,
     ConstraintMinDaysBetweenActivities,
     ConstraintTeacherNotAvailable,
     FetRunRequest,
+    RoomData,
     StudentGroup,
     StudentYear,
     TeacherData,
 )
 
 
+def _escape_text(text: str) -> str:
+    # FET lee el XML con un parser estándar: los saltos de línea se normalizan a "\n" igual
+    # que al re-parsear, y se escapan los mismos caracteres que escapaba minidom.
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+class _FetXmlWriter:
+    """
+    Escritor incremental del documento .fet.
+
+    Emite cada nodo directamente al ``stream`` con el mismo formato que
+    ``minidom.toprettyxml(indent="\t")``: un nodo por línea, tabulaciones como sangría y
+    ``<Tag/>`` para los nodos sin contenido. Un nodo abierto con ``start`` solo se cierra con
+    ``>`` al escribir su primer hijo, de modo que las listas vacías quedan como ``<Tag/>``.
+    """
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._depth = 0
+        self._open_pending = False
+
+    def declaration(self) -> None:
+        self._stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+
+    def start(self, tag: str, attributes: Optional[Dict[str, str]] = None) -> None:
+        self._close_pending()
+        indent = "\t" * self._depth
+        attrs = "".join(f' {name}="{_escape_text(value)}"' for name, value in (attributes or {}).items())
+        self._stream.write(f"{indent}<{tag}{attrs}")
+        self._open_pending = True
+        self._depth += 1
+
+    def end(self, tag: str) -> None:
+        self._depth -= 1
+        if self._open_pending:
+            self._stream.write("/>\n")
+            self._open_pending = False
+        else:
+            indent = "\t" * self._depth
+            self._stream.write(f"{indent}</{tag}>\n")
+
+    def element(self, tag: str, text: str) -> None:
+        self._close_pending()
+        indent = "\t" * self._depth
+        if text:
+            self._stream.write(f"{indent}<{tag}>{_escape_text(text)}</{tag}>\n")
+        else:
+            self._stream.write(f"{indent}<{tag}/>\n")
+
+    def _close_pending(self) -> None:
+        if self._open_pending:
+            self._stream.write(">\n")
+            self._open_pending = False
+
+
 @dataclass
 class _BuilderContext:
     payload: FetRunRequest
@@ -32,6 +96,7 @@ class _BuilderContext:
     day_lookup: Dict[int, CalendarDay] = field(default_factory=dict)
     hour_lookup: Dict[int, CalendarHour] = field(default_factory=dict)
     building_lookup: Dict[str, BuildingData] = field(default_factory=dict)
+    room_lookup: Dict[str, RoomData] = field(default_factory=dict)
 
     def __post_init__(self) -> None:
         self.teacher_lookup = {teacher.id: teacher for teacher in self.payload.teachers}
@@ -44,6 +109,7 @@ class _BuilderContext:
         self.day_lookup = {day.index: day for day in self.payload.calendar.days}
         self.hour_lookup = {hour.index: hour for hour in self.payload.calendar.hours}
         self.building_lookup = {building.id: building for building in self.payload.space.buildings}
+        self.room_lookup = {room.id: room for room in self.payload.space.rooms}
 
     def teacher_name(self, teacher_id: str) -> str:
         teacher = self.teacher_lookup.get(teacher_id)
@@ -73,6 +139,10 @@ class _BuilderContext:
             return hour.long_name or hour.name
         return f"Bloque {hour_index + 1}"
 
+    def room_name(self, room_id: str) -> str:
+        room = self.room_lookup.get(room_id)
+        return room.name if room else room_id
+
     def room_building_name(self, building_id: Optional[str]) -> str:
         if building_id is None:
             return ""
@@ -86,216 +156,279 @@ class FetXmlBuilder:
     fet_version = "6.0.0"
 
     def build(self, payload: FetRunRequest) -> str:
+        buffer = io.StringIO()
+        self.write(payload, buffer)
+        return buffer.getvalue()
+
+    def write(self, payload: FetRunRequest, stream: TextIO) -> None:
+        """Escribe el documento .fet sección por sección sobre ``stream`` sin armarlo en memoria."""
         context = _BuilderContext(payload=payload)
-        root = Element("fet", attrib={"version": self.fet_version})
+        writer = _FetXmlWriter(stream)
+        writer.declaration()
+        writer.start("fet", {"version": self.fet_version})
 
         metadata = payload.metadata
-        self._add_text(root, "Mode", "Official")
-        self._add_text(root, "Institution_Name", metadata.institution_name or "SGH")
-        self._add_text(root, "Comments", metadata.comments or f"Generado automáticamente para {metadata.semester}")
-
-        self._build_days_list(root, context)
-        self._build_hours_list(root, context)
-        self._build_students_list(root, context)
-        self._build_teachers_list(root, context)
-        self._build_subjects_list(root, context)
-        self._build_activity_tags(root)
-        self._build_activities(root, context)
-        self._build_buildings_list(root, context)
-        self._build_rooms_list(root, context)
-        self._build_time_constraints(root, context)
-        self._build_space_constraints(root, context)
-
-        raw_xml = tostring(root, encoding="utf-8")
-        parsed = minidom.parseString(raw_xml)
-        return parsed.toprettyxml(indent="\t", encoding="UTF-8").decode("utf-8")
-
-    def _add_text(self, parent: Element, tag: str, text: str) -> Element:
-        node = SubElement(parent, tag)
-        node.text = text
-        return node
-
-    def _build_days_list(self, root: Element, context: _BuilderContext) -> None:
-        days_node = SubElement(root, "Days_List")
+        writer.element("Mode", "Official")
+        writer.element("Institution_Name", metadata.institution_name or "SGH")
+        writer.element("Comments", metadata.comments or f"Generado automáticamente para {metadata.semester}")
+
+        self._build_days_list(writer, context)
+        self._build_hours_list(writer, context)
+        self._build_students_list(writer, context)
+        self._build_teachers_list(writer, context)
+        self._build_subjects_list(writer, context)
+        self._build_activity_tags(writer)
+        self._build_activities(writer, context)
+        self._build_buildings_list(writer, context)
+        self._build_rooms_list(writer, context)
+        self._build_time_constraints(writer, context)
+        self._build_space_constraints(writer, context)
+
+        writer.end("fet")
+
+    def _build_days_list(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Days_List")
         days = sorted(context.payload.calendar.days, key=lambda day: day.index)
         if not days:
             days = [CalendarDay(index=i, name=f"Day {i+1}", long_name=f"Day {i+1}") for i in range(5)]
-        SubElement(days_node, "Number_of_Days").text = str(len(days))
+        writer.element("Number_of_Days", str(len(days)))
         for day in days:
-            day_node = SubElement(days_node, "Day")
-            SubElement(day_node, "Name").text = day.long_name or day.name
+            writer.start("Day")
+            writer.element("Name", day.long_name or day.name)
+            writer.end("Day")
+        writer.end("Days_List")
 
-    def _build_hours_list(self, root: Element, context: _BuilderContext) -> None:
-        hours_node = SubElement(root, "Hours_List")
+    def _build_hours_list(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Hours_List")
         hours = sorted(context.payload.calendar.hours, key=lambda hour: hour.index)
         if not hours:
             hours = [
                 CalendarHour(index=i, name=f"{8 + i:02d}:00", long_name=f"Bloque {i+1}")
                 for i in range(5)
             ]
-        SubElement(hours_node, "Number_of_Hours").text = str(len(hours))
+        writer.element("Number_of_Hours", str(len(hours)))
         for hour in hours:
-            hour_node = SubElement(hours_node, "Hour")
-            SubElement(hour_node, "Name").text = hour.long_name or hour.name
+            writer.start("Hour")
+            writer.element("Name", hour.long_name or hour.name)
+            writer.end("Hour")
+        writer.end("Hours_List")
 
-    def _build_students_list(self, root: Element, context: _BuilderContext) -> None:
-        students_node = SubElement(root, "Students_List")
+    def _build_students_list(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Students_List")
         for year in context.payload.student_years:
-            year_node = SubElement(students_node, "Year")
-            SubElement(year_node, "Name").text = year.id
-            SubElement(year_node, "Number_of_Students").text = str(year.total_students)
-            SubElement(year_node, "Comments").text = year.name
-            SubElement(year_node, "Number_of_Categories").text = "0"
-            SubElement(year_node, "Separator").text = " "
+            writer.start("Year")
+            writer.element("Name", year.id)
+            writer.element("Number_of_Students", str(year.total_students))
+            writer.element("Comments", year.name)
+            writer.element("Number_of_Categories", "0")
+            writer.element("Separator", " ")
 
             for group in year.groups:
-                group_node = SubElement(year_node, "Group")
-                SubElement(group_node, "Name").text = group.id
-                SubElement(group_node, "Number_of_Students").text = str(group.students)
-                SubElement(group_node, "Comments").text = group.name
-
-                subgroup_node = SubElement(group_node, "Subgroup")
-                SubElement(subgroup_node, "Name").text = f"{group.id}-sub"
-                SubElement(subgroup_node, "Number_of_Students").text = str(group.students)
-                SubElement(subgroup_node, "Comments").text = group.name
-
-    def _build_teachers_list(self, root: Element, context: _BuilderContext) -> None:
-        teachers_node = SubElement(root, "Teachers_List")
+                writer.start("Group")
+                writer.element("Name", group.id)
+                writer.element("Number_of_Students", str(group.students))
+                writer.element("Comments", group.name)
+
+                writer.start("Subgroup")
+                writer.element("Name", f"{group.id}-sub")
+                writer.element("Number_of_Students", str(group.students))
+                writer.element("Comments", group.name)
+                writer.end("Subgroup")
+                writer.end("Group")
+            writer.end("Year")
+        writer.end("Students_List")
+
+    def _build_teachers_list(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Teachers_List")
         for teacher in context.payload.teachers:
-            teacher_node = SubElement(teachers_node, "Teacher")
-            SubElement(teacher_node, "Name").text = teacher.name
-            SubElement(teacher_node, "Target_Number_of_Hours").text = str(teacher.target_hours)
-            SubElement(teacher_node, "Qualified_Subjects").text = ""
-            SubElement(teacher_node, "Comments").text = teacher.comments or ""
-
-    def _build_subjects_list(self, root: Element, context: _BuilderContext) -> None:
-        subjects_node = SubElement(root, "Subjects_List")
+            writer.start("Teacher")
+            writer.element("Name", teacher.name)
+            writer.element("Target_Number_of_Hours", str(teacher.target_hours))
+            writer.element("Qualified_Subjects", "")
+            writer.element("Comments", teacher.comments or "")
+            writer.end("Teacher")
+        writer.end("Teachers_List")
+
+    def _build_subjects_list(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Subjects_List")
         for subject in context.payload.subjects:
-            subject_node = SubElement(subjects_node, "Subject")
-            SubElement(subject_node, "Name").text = subject.name
-            SubElement(subject_node, "Code").text = subject.code
-            SubElement(subject_node, "Comments").text = subject.comments or ""
-
-    def _build_activity_tags(self, root: Element) -> None:
-        SubElement(root, "Activity_Tags_List")
-
-    def _build_activities(self, root: Element, context: _BuilderContext) -> None:
-        activities_node = SubElement(root, "Activities_List")
+            writer.start("Subject")
+            writer.element("Name", subject.name)
+            writer.element("Code", subject.code)
+            writer.element("Comments", subject.comments or "")
+            writer.end("Subject")
+        writer.end("Subjects_List")
+
+    def _build_activity_tags(self, writer: _FetXmlWriter) -> None:
+        writer.start("Activity_Tags_List")
+        writer.end("Activity_Tags_List")
+
+    def _build_activities(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Activities_List")
         for activity in context.payload.activities:
-            self._append_activity(activities_node, activity, context)
-
-    def _append_activity(self, activities_node: Element, activity: ActivityData, context: _BuilderContext) -> None:
-        activity_node = SubElement(activities_node, "Activity")
-        SubElement(activity_node, "Teacher").text = context.teacher_name(activity.teacher_id)
-        SubElement(activity_node, "Subject").text = context.subject_name(activity.subject_id)
-        SubElement(activity_node, "Students").text = context.students_label(
-            activity.students_reference.type,
-            activity.students_reference.id,
+            self._append_activity(writer, activity, context)
+        writer.end("Activities_List")
+
+    def _append_activity(self, writer: _FetXmlWriter, activity: ActivityData, context: _BuilderContext) -> None:
+        writer.start("Activity")
+        writer.element("Teacher", context.teacher_name(activity.teacher_id))
+        writer.element("Subject", context.subject_name(activity.subject_id))
+        writer.element(
+            "Students",
+            context.students_label(
+                activity.students_reference.type,
+                activity.students_reference.id,
+            ),
         )
-        SubElement(activity_node, "Duration").text = str(activity.duration)
-        SubElement(activity_node, "Total_Duration").text = str(activity.total_duration)
-        SubElement(activity_node, "Id").text = str(activity.id)
-        SubElement(activity_node, "Activity_Group_Id").text = str(activity.group_id)
-        SubElement(activity_node, "Active").text = "true" if activity.active else "false"
-        SubElement(activity_node, "Comments").text = activity.comments or ""
-
-    def _build_buildings_list(self, root: Element, context: _BuilderContext) -> None:
-        buildings_node = SubElement(root, "Buildings_List")
+        writer.element("Duration", str(activity.duration))
+        writer.element("Total_Duration", str(activity.total_duration))
+        writer.element("Id", str(activity.id))
+        writer.element("Activity_Group_Id", str(activity.group_id))
+        writer.element("Active", "true" if activity.active else "false")
+        writer.element("Comments", activity.comments or "")
+        writer.end("Activity")
+
+    def _build_buildings_list(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Buildings_List")
         for building in context.payload.space.buildings:
-            building_node = SubElement(buildings_node, "Building")
-            SubElement(building_node, "Name").text = building.name
-            SubElement(building_node, "Short_Name").text = building.name[:10]
-            SubElement(building_node, "Comments").text = building.comments or ""
-
-    def _build_rooms_list(self, root: Element, context: _BuilderContext) -> None:
-        rooms_node = SubElement(root, "Rooms_List")
+            writer.start("Building")
+            writer.element("Name", building.name)
+            writer.element("Short_Name", building.name[:10])
+            writer.element("Comments", building.comments or "")
+            writer.end("Building")
+        writer.end("Buildings_List")
+
+    def _build_rooms_list(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Rooms_List")
         for room in context.payload.space.rooms:
-            room_node = SubElement(rooms_node, "Room")
-            SubElement(room_node, "Name").text = room.name
-            SubElement(room_node, "Long_Name").text = room.name
-            SubElement(room_node, "Code").text = room.id
-            SubElement(room_node, "Building").text = context.room_building_name(room.building_id)
-            SubElement(room_node, "Capacity").text = str(room.capacity or 0)
-            SubElement(room_node, "Virtual").text = "false"
-            SubElement(room_node, "Comments").text = room.comments or ""
-
-    def _build_time_constraints(self, root: Element, context: _BuilderContext) -> None:
-        constraints_node = SubElement(root, "Time_Constraints_List")
+            writer.start("Room")
+            writer.element("Name", room.name)
+            writer.element("Long_Name", room.name)
+            writer.element("Code", room.id)
+            writer.element("Building", context.room_building_name(room.building_id))
+            writer.element("Capacity", str(room.capacity or 0))
+            writer.element("Virtual", "false")
+            writer.element("Comments", room.comments or "")
+            writer.end("Room")
+        writer.end("Rooms_List")
+
+    def _build_time_constraints(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Time_Constraints_List")
         if not context.payload.time_constraints:
-            self._add_basic_compulsory_time(constraints_node, ConstraintBasicCompulsoryTime(type="basic_compulsory_time", weight=100.0))
-            return
-
-        for constraint in context.payload.time_constraints:
-            if isinstance(constraint, ConstraintBasicCompulsoryTime):
-                self._add_basic_compulsory_time(constraints_node, constraint)
-            elif isinstance(constraint, ConstraintMinDaysBetweenActivities):
-                self._add_min_days_constraint(constraints_node, constraint)
-            elif isinstance(constraint, ConstraintTeacherNotAvailable):
-                self._add_teacher_not_available(constraints_node, constraint, context)
-
-    def _build_space_constraints(self, root: Element, context: _BuilderContext) -> None:
-        constraints_node = SubElement(root, "Space_Constraints_List")
+            self._add_basic_compulsory_time(writer, ConstraintBasicCompulsoryTime(type="basic_compulsory_time", weight=100.0))
+        else:
+            for constraint in context.payload.time_constraints:
+                if isinstance(constraint, ConstraintBasicCompulsoryTime):
+                    self._add_basic_compulsory_time(writer, constraint)
+                elif isinstance(constraint, ConstraintMinDaysBetweenActivities):
+                    self._add_min_days_constraint(writer, constraint)
+                elif isinstance(constraint, ConstraintTeacherNotAvailable):
+                    self._add_teacher_not_available(writer, constraint, context)
+                elif isinstance(constraint, ConstraintActivityPreferredStartingTime):
+                    self._add_activity_preferred_starting_time(writer, constraint, context)
+        writer.end("Time_Constraints_List")
+
+    def _build_space_constraints(self, writer: _FetXmlWriter, context: _BuilderContext) -> None:
+        writer.start("Space_Constraints_List")
         if not context.payload.space.space_constraints:
-            self._add_basic_compulsory_space(constraints_node, ConstraintBasicCompulsorySpace(type="basic_compulsory_space", weight=100.0))
-            return
-
-        for constraint in context.payload.space.space_constraints:
-            if isinstance(constraint, ConstraintBasicCompulsorySpace):
-                self._add_basic_compulsory_space(constraints_node, constraint)
+            self._add_basic_compulsory_space(writer, ConstraintBasicCompulsorySpace(type="basic_compulsory_space", weight=100.0))
+        else:
+            for constraint in context.payload.space.space_constraints:
+                if isinstance(constraint, ConstraintBasicCompulsorySpace):
+                    self._add_basic_compulsory_space(writer, constraint)
+                elif isinstance(constraint, ConstraintActivityPreferredRoom):
+                    self._add_activity_preferred_room(writer, constraint, context)
+        writer.end("Space_Constraints_List")
 
     def _add_basic_compulsory_time(
         self,
-        constraints_node: Element,
+        writer: _FetXmlWriter,
         constraint: ConstraintBasicCompulsoryTime,
     ) -> None:
-        node = SubElement(constraints_node, "ConstraintBasicCompulsoryTime")
-        SubElement(node, "Weight_Percentage").text = str(constraint.weight)
-        SubElement(node, "Active").text = "true" if constraint.active else "false"
-        SubElement(node, "Comments").text = ""
+        writer.start("ConstraintBasicCompulsoryTime")
+        writer.element("Weight_Percentage", str(constraint.weight))
+        writer.element("Active", "true" if constraint.active else "false")
+        writer.element("Comments", "")
+        writer.end("ConstraintBasicCompulsoryTime")
 
     def _add_min_days_constraint(
         self,
-        constraints_node: Element,
+        writer: _FetXmlWriter,
         constraint: ConstraintMinDaysBetweenActivities,
     ) -> None:
-        node = SubElement(constraints_node, "ConstraintMinDaysBetweenActivities")
-        SubElement(node, "Weight_Percentage").text = str(constraint.weight)
-        SubElement(node, "Consecutive_If_Same_Day").text = "true" if constraint.consecutive_if_same_day else "false"
-        SubElement(node, "Number_of_Activities").text = str(len(constraint.activity_ids))
+        writer.start("ConstraintMinDaysBetweenActivities")
+        writer.element("Weight_Percentage", str(constraint.weight))
+        writer.element("Consecutive_If_Same_Day", "true" if constraint.consecutive_if_same_day else "false")
+        writer.element("Number_of_Activities", str(len(constraint.activity_ids)))
         for activity_id in constraint.activity_ids:
-            SubElement(node, "Activity_Id").text = str(activity_id)
-        SubElement(node, "MinDays").text = str(constraint.min_days)
-        SubElement(node, "Active").text = "true" if constraint.active else "false"
-        SubElement(node, "Comments").text = ""
+            writer.element("Activity_Id", str(activity_id))
+        writer.element("MinDays", str(constraint.min_days))
+        writer.element("Active", "true" if constraint.active else "false")
+        writer.element("Comments", "")
+        writer.end("ConstraintMinDaysBetweenActivities")
 
     def _add_teacher_not_available(
         self,
-        constraints_node: Element,
+        writer: _FetXmlWriter,
         constraint: ConstraintTeacherNotAvailable,
         context: _BuilderContext,
     ) -> None:
-        node = SubElement(constraints_node, "ConstraintTeacherNotAvailableTimes")
-        SubElement(node, "Weight_Percentage").text = str(constraint.weight)
-        SubElement(node, "Teacher").text = context.teacher_name(constraint.teacher_id)
-        SubElement(node, "Number_of_Not_Available_Times").text = str(len(constraint.not_available_slots))
+        writer.start("ConstraintTeacherNotAvailableTimes")
+        writer.element("Weight_Percentage", str(constraint.weight))
+        writer.element("Teacher", context.teacher_name(constraint.teacher_id))
+        writer.element("Number_of_Not_Available_Times", str(len(constraint.not_available_slots)))
 
         for slot in constraint.not_available_slots:
-            slot_node = SubElement(node, "Not_Available_Time")
-            SubElement(slot_node, "Day").text = context.day_name(slot.day_index)
-            SubElement(slot_node, "Hour").text = context.hour_name(slot.hour_index)
+            writer.start("Not_Available_Time")
+            writer.element("Day", context.day_name(slot.day_index))
+            writer.element("Hour", context.hour_name(slot.hour_index))
+            writer.end("Not_Available_Time")
 
-        SubElement(node, "Active").text = "true" if constraint.active else "false"
-        SubElement(node, "Comments").text = ""
+        writer.element("Active", "true" if constraint.active else "false")
+        writer.element("Comments", "")
+        writer.end("ConstraintTeacherNotAvailableTimes")
+
+    def _add_activity_preferred_starting_time(
+        self,
+        writer: _FetXmlWriter,
+        constraint: ConstraintActivityPreferredStartingTime,
+        context: _BuilderContext,
+    ) -> None:
+        writer.start("ConstraintActivityPreferredStartingTime")
+        writer.element("Weight_Percentage", str(constraint.weight))
+        writer.element("Activity_Id", str(constraint.activity_id))
+        writer.element("Day", context.day_name(constraint.day_index))
+        writer.element("Hour", context.hour_name(constraint.hour_index))
+        writer.element("Permanently_Locked", "true" if constraint.permanently_locked else "false")
+        writer.element("Active", "true" if constraint.active else "false")
+        writer.element("Comments", "")
+        writer.end("ConstraintActivityPreferredStartingTime")
 
     def _add_basic_compulsory_space(
         self,
-        constraints_node: Element,
+        writer: _FetXmlWriter,
         constraint: ConstraintBasicCompulsorySpace,
     ) -> None:
-        node = SubElement(constraints_node, "ConstraintBasicCompulsorySpace")
-        SubElement(node, "Weight_Percentage").text = str(constraint.weight)
-        SubElement(node, "Active").text = "true" if constraint.active else "false"
-        SubElement(node, "Comments").text = ""
+        writer.start("ConstraintBasicCompulsorySpace")
+        writer.element("Weight_Percentage", str(constraint.weight))
+        writer.element("Active", "true" if constraint.active else "false")
+        writer.element("Comments", "")
+        writer.end("ConstraintBasicCompulsorySpace")
+
+    def _add_activity_preferred_room(
+        self,
+        writer: _FetXmlWriter,
+        constraint: ConstraintActivityPreferredRoom,
+        context: _BuilderContext,
+    ) -> None:
+        writer.start("ConstraintActivityPreferredRoom")
+        writer.element("Weight_Percentage", str(constraint.weight))
+        writer.element("Activity_Id", str(constraint.activity_id))
+        writer.element("Room", context.room_name(constraint.room_id))
+        writer.element("Permanently_Locked", "true" if constraint.permanently_locked else "false")
+        writer.element("Active", "true" if constraint.active else "false")
+        writer.element("Comments", "")
+        writer.end("ConstraintActivityPreferredRoom")
 
 
 __all__ = ["FetXmlBuilder"]
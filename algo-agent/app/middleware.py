@@ -0,0 +1,117 @@
+import json
+import zlib
+from typing import List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# gzip con cabecera y checksum (wbits 16 + 15)
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+_CHUNK_BYTES = 64 * 1024
+
+
+class _DecodeError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class RequestDecompressionMiddleware:
+    """
+    Descomprime de forma transparente los cuerpos enviados con ``Content-Encoding: gzip``.
+
+    El cuerpo descomprimido no puede superar ``max_body_bytes`` (protege contra bombas de
+    compresión). Las rutas reciben el JSON ya decodificado, sin enterarse de la compresión.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers: List[Tuple[bytes, bytes]] = list(scope["headers"])
+        encodings = [
+            value.decode("latin-1").strip().lower()
+            for name, value in headers
+            if name == b"content-encoding"
+        ]
+        if not encodings or encodings == ["identity"]:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            if encodings != ["gzip"]:
+                raise _DecodeError(415, f"Content-Encoding no soportado: {', '.join(encodings)}")
+            body = await self._decompress(receive)
+        except _DecodeError as exc:
+            await self._reject(send, exc)
+            return
+
+        headers = [
+            (name, value)
+            for name, value in headers
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = dict(scope, headers=headers)
+
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, replay, send)
+
+    async def _decompress(self, receive: Receive) -> bytes:
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        output = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise _DecodeError(400, "La conexión se cerró antes de recibir el cuerpo")
+            more_body = message.get("more_body", False)
+            data = message.get("body", b"")
+            try:
+                while data:
+                    # Se limita cada paso para no inflar más de lo permitido en memoria
+                    room = self.max_body_bytes - len(output) + 1
+                    output += decompressor.decompress(data, min(room, _CHUNK_BYTES))
+                    if len(output) > self.max_body_bytes:
+                        raise _DecodeError(413, "El cuerpo descomprimido excede el tamaño máximo")
+                    data = decompressor.unconsumed_tail
+                    if decompressor.eof and decompressor.unused_data:
+                        # Varios miembros gzip concatenados
+                        data = decompressor.unused_data + data
+                        decompressor = zlib.decompressobj(_GZIP_WBITS)
+            except zlib.error as exc:
+                raise _DecodeError(400, f"Cuerpo gzip inválido: {exc}") from exc
+
+        if not decompressor.eof:
+            raise _DecodeError(400, "Cuerpo gzip incompleto")
+        return bytes(output)
+
+    async def _reject(self, send: Send, error: _DecodeError) -> None:
+        payload = json.dumps({"detail": error.detail}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": error.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+
+__all__ = ["RequestDecompressionMiddleware"]
@@ -33,6 +33,51 @@ class AppSettings:
     fet_timeout_seconds: int = field(
         default_factory=lambda: int(os.getenv("FET_TIMEOUT_SECONDS", "120"))
     )
+    fet_partial_on_timeout: bool = field(
+        default_factory=lambda: os.getenv("FET_PARTIAL_ON_TIMEOUT", "true").lower() in ("1", "true", "yes")
+    )
+    fet_stop_grace_seconds: int = field(
+        default_factory=lambda: int(os.getenv("FET_STOP_GRACE_SECONDS", "15"))
+    )
+    fet_max_concurrent_jobs: int = field(
+        default_factory=lambda: int(os.getenv("FET_MAX_CONCURRENT_JOBS", str(os.cpu_count() or 1)))
+    )
+    fet_max_queued_jobs: int = field(
+        default_factory=lambda: int(os.getenv("FET_MAX_QUEUED_JOBS", "32"))
+    )
+    fet_max_portfolio_seeds: int = field(
+        default_factory=lambda: int(os.getenv("FET_MAX_PORTFOLIO_SEEDS", str(os.cpu_count() or 1)))
+    )
+    fet_decompose: bool = field(
+        default_factory=lambda: os.getenv("FET_DECOMPOSE", "true").lower() in ("1", "true", "yes")
+    )
+    fet_decomposition_max_parts: int = field(
+        default_factory=lambda: int(os.getenv("FET_DECOMPOSITION_MAX_PARTS", str(os.cpu_count() or 1)))
+    )
+    fet_cache_max_entries: int = field(
+        default_factory=lambda: int(os.getenv("FET_CACHE_MAX_ENTRIES", "256"))
+    )
+    fet_cache_max_bytes: int = field(
+        default_factory=lambda: int(os.getenv("FET_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    )
+    fet_run_retention_seconds: int = field(
+        default_factory=lambda: int(os.getenv("FET_RUN_RETENTION_SECONDS", str(7 * 24 * 3600)))
+    )
+    fet_run_max_bytes: int = field(
+        default_factory=lambda: int(os.getenv("FET_RUN_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+    )
+    fet_log_buffer_lines: int = field(
+        default_factory=lambda: int(os.getenv("FET_LOG_BUFFER_LINES", "200"))
+    )
+    fet_event_buffer_size: int = field(
+        default_factory=lambda: int(os.getenv("FET_EVENT_BUFFER_SIZE", "500"))
+    )
+    fet_max_retained_jobs: int = field(
+        default_factory=lambda: int(os.getenv("FET_MAX_RETAINED_JOBS", "200"))
+    )
+    max_request_body_bytes: int = field(
+        default_factory=lambda: int(os.getenv("MAX_REQUEST_BODY_BYTES", str(64 * 1024 * 1024)))
+    )
     
     # Service-to-Service Authentication
     # Token compartido para validar peticiones del backend
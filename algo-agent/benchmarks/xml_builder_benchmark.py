@@ -0,0 +1,136 @@
+"""
+Benchmark del generador de archivos .fet.
+
+Mide tiempo y memoria máxima (tracemalloc) de ``FetXmlBuilder`` para payloads sintéticos
+de distintos tamaños, escribiendo a un string en memoria y directo a archivo.
+
+Uso (desde ``algo-agent/``):
+
+    python -m benchmarks.xml_builder_benchmark --activities 1000 10000 50000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+from app.fet.schemas import FetRunRequest
+from app.fet.xml_builder import FetXmlBuilder
+
+ACTIVITIES_PER_GROUP = 8
+GROUPS_PER_YEAR = 10
+
+
+def build_payload(n_activities: int) -> FetRunRequest:
+    n_groups = max(1, n_activities // ACTIVITIES_PER_GROUP)
+    n_teachers = max(1, n_groups // 2)
+    n_years = max(1, n_groups // GROUPS_PER_YEAR)
+
+    years = [
+        {
+            "id": f"year-{y}",
+            "name": str(y),
+            "total_students": 30 * GROUPS_PER_YEAR,
+            "groups": [
+                {"id": f"g-{y}-{g}", "name": f"{y} sección {g}", "students": 30}
+                for g in range(GROUPS_PER_YEAR)
+            ],
+        }
+        for y in range(n_years)
+    ]
+    group_ids = [group["id"] for year in years for group in year["groups"]]
+    activities = [
+        {
+            "id": str(i + 1),
+            "group_id": str(i // ACTIVITIES_PER_GROUP),
+            "teacher_id": f"t-{i % n_teachers}",
+            "subject_id": f"sub-{i % n_groups}",
+            "students_reference": {"type": "group", "id": group_ids[i % len(group_ids)]},
+            "duration": 2,
+            "total_duration": 4,
+            "comments": f"Sección: {i // ACTIVITIES_PER_GROUP} & <lab>",
+        }
+        for i in range(n_activities)
+    ]
+    return FetRunRequest.model_validate(
+        {
+            "metadata": {"timetable_id": "bench", "semester": "2025-1"},
+            "calendar": {
+                "days": [{"index": d, "name": f"dia {d}"} for d in range(5)],
+                "hours": [{"index": h, "name": f"Bloque {h + 1}"} for h in range(10)],
+            },
+            "subjects": [
+                {"id": f"sub-{s}", "name": f"Asignatura {s}", "code": f"A{s}"} for s in range(n_groups)
+            ],
+            "teachers": [{"id": f"t-{t}", "name": f"Docente {t}"} for t in range(n_teachers)],
+            "student_years": years,
+            "activities": activities,
+            "time_constraints": [
+                {
+                    "type": "teacher_not_available",
+                    "weight": 100,
+                    "teacher_id": f"t-{t}",
+                    "not_available_slots": [{"day_index": 4, "hour_index": h} for h in range(6, 10)],
+                }
+                for t in range(n_teachers)
+            ],
+            "space": {
+                "buildings": [{"id": "b-1", "name": "Edificio 1"}],
+                "rooms": [
+                    {"id": f"r-{r}", "name": f"Sala {r}", "building_id": "b-1", "capacity": 40}
+                    for r in range(max(1, n_groups // 4))
+                ],
+            },
+        }
+    )
+
+
+def measure(fn: Callable[[], int]) -> Tuple[float, int, int]:
+    """Retorna (segundos, pico de memoria en bytes, bytes escritos).
+
+    El tiempo se toma en una corrida sin tracemalloc para no inflarlo con su overhead.
+    """
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activities", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    args = parser.parse_args()
+
+    builder = FetXmlBuilder()
+    print(f"{'actividades':>12} {'modo':>8} {'tiempo (s)':>11} {'pico (MiB)':>11} {'tamaño (MiB)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "bench.fet"
+        for n_activities in args.activities:
+            payload = build_payload(n_activities)
+
+            def to_file() -> int:
+                with target.open("w", encoding="utf-8") as stream:
+                    builder.write(payload, stream)
+                return target.stat().st_size
+
+            def to_string() -> int:
+                return len(builder.build(payload).encode("utf-8"))
+
+            for mode, fn in (("string", to_string), ("archivo", to_file)):
+                elapsed, peak, size = measure(fn)
+                print(
+                    f"{n_activities:>12} {mode:>8} {elapsed:>11.3f} "
+                    f"{peak / 2**20:>11.2f} {size / 2**20:>13.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import pytest
+
+from app.fet.schemas import FetRunRequest
+
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes"]
+
+
+@pytest.fixture
+def crear_payload():
+    """
+    Fabrica payloads de FET a partir de actividades ``(id, docente, estudiantes, duración)``.
+
+    ``estudiantes`` es el id de un grupo del año ``anio`` o el id del propio año. Cada
+    actividad tiene su asignatura ``asig-<id>`` y los docentes se derivan de las actividades.
+    """
+
+    def crear(
+        actividades,
+        dias=5,
+        horas=4,
+        grupos=("g1", "g2", "g3"),
+        estudiantes_por_grupo=30,
+        salas=(("s1", 100),),
+        time_constraints=(),
+        space_constraints=(),
+        warm_start=None,
+    ) -> FetRunRequest:
+        docentes = sorted({docente for _, docente, _, _ in actividades})
+        return FetRunRequest.model_validate(
+            {
+                "metadata": {"timetable_id": "horario", "semester": "2025-1"},
+                "calendar": {
+                    "days": [{"index": d, "name": DIAS[d % len(DIAS)]} for d in range(dias)],
+                    "hours": [{"index": h, "name": f"Bloque {h + 1}"} for h in range(horas)],
+                },
+                "subjects": [
+                    {"id": f"asig-{id_}", "name": f"Asignatura {id_}", "code": f"A{id_}"}
+                    for id_, _, _, _ in actividades
+                ],
+                "teachers": [{"id": docente, "name": f"Docente {docente}"} for docente in docentes],
+                "student_years": [
+                    {
+                        "id": "anio",
+                        "name": "Primer año",
+                        "total_students": estudiantes_por_grupo * len(grupos),
+                        "groups": [
+                            {
+                                "id": grupo,
+                                "name": f"Sección {grupo}",
+                                "students": estudiantes_por_grupo,
+                            }
+                            for grupo in grupos
+                        ],
+                    }
+                ],
+                "activities": [
+                    {
+                        "id": id_,
+                        "group_id": id_,
+                        "teacher_id": docente,
+                        "subject_id": f"asig-{id_}",
+                        "students_reference": {
+                            "type": "year" if estudiantes == "anio" else "group",
+                            "id": estudiantes,
+                        },
+                        "duration": duracion,
+                        "total_duration": duracion,
+                    }
+                    for id_, docente, estudiantes, duracion in actividades
+                ],
+                "time_constraints": list(time_constraints),
+                "space": {
+                    "buildings": [{"id": "b1", "name": "Edificio 1"}],
+                    "rooms": [
+                        {
+                            "id": sala,
+                            "name": f"Sala {sala}",
+                            "building_id": "b1",
+                            "capacity": capacidad,
+                        }
+                        for sala, capacidad in salas
+                    ],
+                    "space_constraints": list(space_constraints),
+                },
+                "warm_start": warm_start,
+            }
+        )
+
+    return crear
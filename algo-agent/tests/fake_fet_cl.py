@@ -0,0 +1,90 @@
+"""
+fet-cl de prueba para los tests de jobs.
+
+Acepta los mismos argumentos que usa ``FetService`` y escribe los archivos de salida que lee
+``TimetableResultsParser``: las actividades activas se reparten por turno entre los días y
+cada una ocupa los primeros bloques libres del suyo.
+El comportamiento se ajusta con ``modo.json`` en el directorio de trabajo (el del binario):
+``sleep`` (segundos antes de terminar), ``exit_code`` (falla sin horario) y ``parcial``
+(espera ``--timelimitseconds`` y deja solo el horario de mayor avance, como FET al agotar el
+tiempo). Cada ejecución agrega una línea a ``llamadas.log``.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+
+def _escribir_horario(directorio: Path, stem: str, ubicadas) -> None:
+    directorio.mkdir(parents=True, exist_ok=True)
+    actividades = ET.Element("Activities_Timetable")
+    docentes = {}
+    for id_, docente, dia, horas in ubicadas:
+        nodo = ET.SubElement(actividades, "Activity")
+        for etiqueta, texto in (("Id", id_), ("Day", dia), ("Hour", horas[0]), ("Room", "")):
+            ET.SubElement(nodo, etiqueta).text = texto
+        for hora in horas:
+            docentes.setdefault(docente, []).append((dia, hora, id_))
+    ET.ElementTree(actividades).write(directorio / f"{stem}_activities.xml", encoding="utf-8")
+
+    raiz = ET.Element("Teachers_Timetable")
+    for docente, slots in docentes.items():
+        nodo = ET.SubElement(raiz, "Teacher", name=docente)
+        for dia, hora, id_ in slots:
+            hora_nodo = ET.SubElement(ET.SubElement(nodo, "Day", name=dia), "Hour", name=hora)
+            ET.SubElement(hora_nodo, "Activity", id=id_)
+    ET.ElementTree(raiz).write(directorio / f"{stem}_teachers.xml", encoding="utf-8")
+    (directorio / f"{stem}_soft_conflicts.txt").write_text("Total soft conflicts: 0\n")
+
+
+def main() -> int:
+    args = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--"))
+    modo_path = Path("modo.json")
+    modo = json.loads(modo_path.read_text()) if modo_path.exists() else {}
+    with open("llamadas.log", "a", encoding="utf-8") as log:
+        log.write(args["inputfile"] + "\n")
+
+    entrada = Path(args["inputfile"])
+    salida = Path(args["outputdir"])
+    raiz = ET.parse(entrada).getroot()
+    dias = [nodo.text for nodo in raiz.findall("Days_List/Day/Name")]
+    horas = [nodo.text for nodo in raiz.findall("Hours_List/Hour/Name")]
+    actividades = [
+        (nodo.findtext("Id"), nodo.findtext("Teacher"), int(nodo.findtext("Duration")))
+        for nodo in raiz.findall("Activities_List/Activity")
+        if nodo.findtext("Active") == "true"
+    ]
+    print(f"Actividades: {len(actividades)}", flush=True)
+
+    time.sleep(float(modo.get("sleep", 0)))
+    if modo.get("exit_code"):
+        print("No se pudo generar el horario", file=sys.stderr)
+        return int(modo["exit_code"])
+
+    libres = {dia: 0 for dia in dias}
+    ubicadas = []
+    for indice, (id_, docente, duracion) in enumerate(actividades):
+        dia = dias[indice % len(dias)]
+        if libres[dia] + duracion <= len(horas):
+            ubicadas.append((id_, docente, dia, horas[libres[dia] : libres[dia] + duracion]))
+            libres[dia] += duracion
+
+    logs = salida / "logs"
+    logs.mkdir(parents=True, exist_ok=True)
+    timetables = salida / "timetables"
+    if modo.get("parcial"):
+        time.sleep(float(args.get("timelimitseconds", 0)))
+        ubicadas = ubicadas[: len(ubicadas) // 2]
+        _escribir_horario(timetables / f"{entrada.stem}-highest", entrada.stem, ubicadas)
+    else:
+        _escribir_horario(timetables / entrada.stem, entrada.stem, ubicadas)
+    (logs / "max_placed_activities.txt").write_text(
+        f"At time 0 h 0 m 1 s, FET reached {len(ubicadas)} activities placed\n"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
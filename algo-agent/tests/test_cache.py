@@ -0,0 +1,114 @@
+import os
+
+from app.fet.cache import FetResultCache, payload_fingerprint
+from app.fet.schemas import FetRunRequest, FetRunSummary
+
+ACTIVIDADES = [("1", "d1", "g1", 1), ("2", "d2", "g2", 2), ("3", "d1", "anio", 1)]
+
+
+def _invertir_listas(payload: FetRunRequest) -> FetRunRequest:
+    data = payload.model_dump(mode="json")
+    for llave in ("subjects", "teachers", "activities", "time_constraints"):
+        data[llave].reverse()
+    data["calendar"]["days"].reverse()
+    data["calendar"]["hours"].reverse()
+    for anio in data["student_years"]:
+        anio["groups"].reverse()
+    data["space"]["rooms"].reverse()
+    for restriccion in data["time_constraints"]:
+        if "activity_ids" in restriccion:
+            restriccion["activity_ids"].reverse()
+    return FetRunRequest.model_validate(data)
+
+
+def _resumen(timetable_id: str = "horario") -> FetRunSummary:
+    return FetRunSummary(
+        semester="2025-1",
+        timetable_id=timetable_id,
+        fet_input_file="fet-input.fet",
+        output_directory="/tmp/run",
+    )
+
+
+def test_hash_estable_al_reordenar_listas(crear_payload):
+    payload = crear_payload(
+        ACTIVIDADES,
+        salas=(("s1", 40), ("s2", 20)),
+        time_constraints=[
+            {
+                "type": "min_days_between_activities",
+                "weight": 100,
+                "min_days": 1,
+                "activity_ids": ["1", "3"],
+            },
+            {"type": "basic_compulsory_time", "weight": 100},
+        ],
+    )
+
+    assert payload_fingerprint(payload) == payload_fingerprint(_invertir_listas(payload))
+
+
+def test_hash_ignora_comentarios_de_metadata(crear_payload):
+    payload = crear_payload(ACTIVIDADES)
+    comentado = payload.model_copy(
+        update={"metadata": payload.metadata.model_copy(update={"comments": "otra corrida"})}
+    )
+
+    assert payload_fingerprint(payload) == payload_fingerprint(comentado)
+
+
+def test_hash_cambia_con_el_contenido_y_las_opciones(crear_payload):
+    payload = crear_payload(ACTIVIDADES)
+    otro = crear_payload([*ACTIVIDADES[:2], ("3", "d1", "anio", 2)])
+
+    assert payload_fingerprint(payload) != payload_fingerprint(otro)
+    assert payload_fingerprint(payload) != payload_fingerprint(
+        payload, {"seeds": 2, "strategy": "best"}
+    )
+    assert payload_fingerprint(payload, {"seeds": 2, "strategy": "best"}) != payload_fingerprint(
+        payload, {"seeds": 2, "strategy": "first"}
+    )
+
+
+def test_cache_guarda_y_recupera_entre_instancias(tmp_path):
+    cache = FetResultCache(tmp_path, max_entries=4, max_bytes=1 << 20)
+    cache.put("a", _resumen("a"))
+
+    assert cache.get("a").timetable_id == "a"
+    assert FetResultCache(tmp_path, max_entries=4, max_bytes=1 << 20).get("a").timetable_id == "a"
+    assert cache.get("b") is None
+
+
+def test_cache_desaloja_la_entrada_menos_usada(tmp_path):
+    cache = FetResultCache(tmp_path, max_entries=2, max_bytes=1 << 20)
+    cache.put("a", _resumen("a"))
+    cache.put("b", _resumen("b"))
+    cache.get("a")
+    cache.put("c", _resumen("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["a", "c"]
+
+
+def test_cache_respeta_el_orden_lru_al_reiniciar(tmp_path):
+    cache = FetResultCache(tmp_path, max_entries=2, max_bytes=1 << 20)
+    cache.put("a", _resumen("a"))
+    cache.put("b", _resumen("b"))
+    os.utime(tmp_path / "a.json", (2_000_000_000, 2_000_000_000))
+
+    reiniciada = FetResultCache(tmp_path, max_entries=2, max_bytes=1 << 20)
+    reiniciada.put("c", _resumen("c"))
+
+    assert reiniciada.get("b") is None
+    assert reiniciada.get("a") is not None
+
+
+def test_cache_descarta_entradas_corruptas(tmp_path):
+    cache = FetResultCache(tmp_path, max_entries=4, max_bytes=1 << 20)
+    cache.put("a", _resumen("a"))
+    (tmp_path / "a.json").write_text("{no es json", encoding="utf-8")
+
+    assert cache.get("a") is None
+    assert not (tmp_path / "a.json").exists()
@@ -0,0 +1,179 @@
+import pytest
+
+from app.fet.decomposition import ProblemDecomposer
+from app.fet.schemas import ActivityScheduleEntry, FetRunSummary, FetTimetables
+
+
+def _componentes(partes):
+    return sorted(sorted(actividad.id for actividad in parte.activities) for parte in partes)
+
+
+def _sala_preferida(actividad, sala):
+    return {
+        "type": "activity_preferred_room",
+        "weight": 100,
+        "activity_id": actividad,
+        "room_id": sala,
+    }
+
+
+def _resumen(parte, actividades, salas, status="success", soft_conflicts=1.0):
+    return FetRunSummary(
+        status=status,
+        semester="2025-1",
+        timetable_id=f"horario-part-{parte}",
+        fet_input_file=f"part-{parte}/fet-input.fet",
+        output_directory=f"/tmp/run/part-{parte}",
+        activities_schedule=[
+            ActivityScheduleEntry(id=id_, subject="", time_slots=[slot])
+            for id_, slot in actividades
+        ],
+        timetables=FetTimetables(
+            slots_per_day=4,
+            total_slots=8,
+            teachers={f"d{parte}": [None] * 8},
+            rooms={
+                sala: [actividad if slot == i else None for i in range(8)]
+                for sala, slot, actividad in salas
+            },
+        ),
+        soft_conflicts=soft_conflicts,
+        unplaced_activities=[str(id_) for id_, slot in actividades if slot < 0],
+    )
+
+
+def test_divide_actividades_sin_docentes_ni_estudiantes_en_comun(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 1), ("2", "d1", "g1", 1), ("3", "d2", "g2", 1), ("4", "d3", "g3", 1)],
+        time_constraints=[
+            {"type": "basic_compulsory_time", "weight": 100},
+            {
+                "type": "teacher_not_available",
+                "weight": 100,
+                "teacher_id": "d2",
+                "not_available_slots": [],
+            },
+        ],
+    )
+
+    partes = ProblemDecomposer().split(payload, max_parts=8)
+
+    assert _componentes(partes) == [["1", "2"], ["3"], ["4"]]
+    parte_d2 = next(parte for parte in partes if parte.activities[0].id == "3")
+    assert [docente.id for docente in parte_d2.teachers] == ["d2"]
+    assert [subject.id for subject in parte_d2.subjects] == ["asig-3"]
+    assert [grupo.id for anio in parte_d2.student_years for grupo in anio.groups] == ["g2"]
+    assert [restriccion.type for restriccion in parte_d2.time_constraints] == [
+        "basic_compulsory_time",
+        "teacher_not_available",
+    ]
+    assert len({parte.metadata.timetable_id for parte in partes}) == 3
+
+
+@pytest.mark.parametrize(
+    "actividades, time_constraints, space_constraints",
+    [
+        # Docente compartido.
+        ([("1", "d1", "g1", 1), ("2", "d1", "g2", 1)], [], []),
+        # La actividad del año conecta a todos sus grupos.
+        ([("1", "d1", "g1", 1), ("2", "d2", "g2", 1), ("3", "d3", "anio", 1)], [], []),
+        # Restricción de días mínimos.
+        (
+            [("1", "d1", "g1", 1), ("2", "d2", "g2", 1)],
+            [
+                {
+                    "type": "min_days_between_activities",
+                    "weight": 100,
+                    "min_days": 1,
+                    "activity_ids": ["1", "2"],
+                }
+            ],
+            [],
+        ),
+        # Sala preferida compartida.
+        (
+            [("1", "d1", "g1", 1), ("2", "d2", "g2", 1)],
+            [],
+            [_sala_preferida("1", "s1"), _sala_preferida("2", "s1")],
+        ),
+    ],
+)
+def test_actividades_acopladas_quedan_en_el_mismo_componente(
+    crear_payload, actividades, time_constraints, space_constraints
+):
+    payload = crear_payload(
+        actividades, time_constraints=time_constraints, space_constraints=space_constraints
+    )
+
+    partes = ProblemDecomposer().split(payload, max_parts=8)
+
+    assert partes == [payload]
+
+
+def test_salas_preferidas_distintas_no_acoplan(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 1), ("2", "d2", "g2", 1)],
+        salas=(("s1", 100), ("s2", 100)),
+        space_constraints=[_sala_preferida("1", "s1"), _sala_preferida("2", "s2")],
+    )
+
+    partes = ProblemDecomposer().split(payload, max_parts=8)
+
+    assert _componentes(partes) == [["1"], ["2"]]
+    assert [
+        [restriccion.activity_id for restriccion in parte.space.space_constraints]
+        for parte in partes
+    ] == [[parte.activities[0].id] for parte in partes]
+
+
+def test_limita_la_cantidad_de_partes(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 1), ("2", "d1", "g1", 1), ("3", "d2", "g2", 1), ("4", "d3", "g3", 1)]
+    )
+
+    partes = ProblemDecomposer().split(payload, max_parts=2)
+
+    # El componente más grande queda solo y los dos pequeños comparten parte.
+    assert _componentes(partes) == [["1", "2"], ["3", "4"]]
+    assert ProblemDecomposer().split(payload, max_parts=1) == [payload]
+
+
+def test_une_los_resultados_de_las_partes(crear_payload):
+    payload = crear_payload([("1", "d1", "g1", 1), ("2", "d2", "g2", 1)])
+    partes = [
+        _resumen(1, [(1, 0)], [("s1", 0, 1)], soft_conflicts=1.5),
+        _resumen(
+            2, [(2, 0), (3, -1)], [("s1", 1, 2), ("s2", 0, 2)], status="partial", soft_conflicts=2.0
+        ),
+    ]
+
+    resumen = ProblemDecomposer().merge(payload, partes, "/tmp/run")
+
+    assert resumen.status == "partial"
+    assert resumen.parts == 2
+    assert resumen.timetable_id == "horario"
+    assert resumen.output_directory == "/tmp/run"
+    assert [entrada.id for entrada in resumen.activities_schedule] == [1, 2, 3]
+    assert resumen.soft_conflicts == 3.5
+    assert resumen.unplaced_activities == ["3"]
+    assert resumen.timetables.rooms["s1"][:2] == [1, 2]
+    assert resumen.timetables.rooms["s2"][0] == 2
+    assert sorted(resumen.timetables.teachers) == ["d1", "d2"]
+
+
+def test_la_union_falla_si_dos_partes_usan_la_misma_sala_y_slot(crear_payload):
+    payload = crear_payload([("1", "d1", "g1", 1), ("2", "d2", "g2", 1)])
+    partes = [_resumen(1, [(1, 0)], [("s1", 0, 1)]), _resumen(2, [(2, 0)], [("s1", 0, 2)])]
+
+    with pytest.raises(ValueError, match="La sala s1"):
+        ProblemDecomposer().merge(payload, partes, "/tmp/run")
+
+
+def test_sin_conflictos_blandos_en_una_parte_no_se_suman(crear_payload):
+    payload = crear_payload([("1", "d1", "g1", 1), ("2", "d2", "g2", 1)])
+    partes = [_resumen(1, [(1, 0)], [], soft_conflicts=None), _resumen(2, [(2, 0)], [])]
+
+    resumen = ProblemDecomposer().merge(payload, partes, "/tmp/run")
+
+    assert resumen.soft_conflicts is None
+    assert resumen.status == "success"
@@ -0,0 +1,125 @@
+import pytest
+
+from app.fet.feasibility import FeasibilityAnalyzer
+
+
+def _no_disponible(docente, slots, weight=100):
+    return {
+        "type": "teacher_not_available",
+        "weight": weight,
+        "teacher_id": docente,
+        "not_available_slots": [{"day_index": dia, "hour_index": hora} for dia, hora in slots],
+    }
+
+
+def _problemas(payload):
+    reporte = FeasibilityAnalyzer().analyze(payload)
+    return reporte, [
+        (issue.kind, issue.entity_id, issue.required, issue.available) for issue in reporte.issues
+    ]
+
+
+def test_payload_factible_no_reporta_problemas(crear_payload):
+    reporte, problemas = _problemas(crear_payload([("1", "d1", "g1", 2), ("2", "d2", "anio", 1)]))
+
+    assert reporte.feasible
+    assert reporte.total_slots == 20
+    assert problemas == []
+
+
+def test_rechaza_actividad_mas_larga_que_el_dia(crear_payload):
+    reporte, problemas = _problemas(crear_payload([("1", "d1", "g1", 5)], horas=4))
+
+    assert not reporte.feasible
+    assert ("activity_too_long", "1", 5, 4) in problemas
+
+
+def test_rechaza_docente_con_mas_clases_que_bloques_disponibles(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 4), ("2", "d1", "g2", 4), ("3", "d1", "g3", 3)],
+        dias=2,
+        salas=(("s1", 40), ("s2", 40)),
+        time_constraints=[_no_disponible("d1", [(0, 0)])],
+    )
+
+    _, problemas = _problemas(payload)
+
+    assert problemas == [("teacher_overload", "d1", 11, 7)]
+
+
+def test_rechaza_docente_sin_bloques_consecutivos(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 3)],
+        dias=2,
+        time_constraints=[_no_disponible("d1", [(0, 1), (1, 2)])],
+    )
+
+    _, problemas = _problemas(payload)
+
+    assert problemas == [("teacher_no_consecutive_slots", "d1", 3, 2)]
+
+
+@pytest.mark.parametrize(
+    "restriccion",
+    [
+        _no_disponible("d1", [(0, 1), (1, 2)], weight=90),
+        {**_no_disponible("d1", [(0, 1), (1, 2)]), "active": False},
+    ],
+)
+def test_indisponibilidad_blanda_o_inactiva_no_bloquea(crear_payload, restriccion):
+    payload = crear_payload([("1", "d1", "g1", 3)], dias=2, time_constraints=[restriccion])
+
+    reporte, _ = _problemas(payload)
+
+    assert reporte.feasible
+
+
+def test_rechaza_grupo_con_mas_clases_que_la_semana(crear_payload):
+    # La actividad del año ocupa a todos los grupos; solo g1 suma además la suya.
+    payload = crear_payload(
+        [("1", "d1", "anio", 3), ("2", "d2", "g1", 2)],
+        dias=1,
+        salas=(("s1", 100), ("s2", 100)),
+    )
+
+    _, problemas = _problemas(payload)
+
+    assert problemas == [("students_overload", "g1", 5, 4)]
+
+
+def test_rechaza_mas_bloques_que_los_que_ofrecen_las_salas(crear_payload):
+    payload = crear_payload([("1", "d1", "g1", 3), ("2", "d2", "g2", 3)], dias=1)
+
+    _, problemas = _problemas(payload)
+
+    assert problemas == [("rooms_overload", "*", 6, 4)]
+
+
+def test_rechaza_grupo_que_no_cabe_en_ninguna_sala(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 1), ("2", "d2", "anio", 1)],
+        salas=(("s1", 20), ("s2", 25)),
+    )
+
+    _, problemas = _problemas(payload)
+
+    assert problemas == [("room_capacity", "1", 30, 25), ("room_capacity", "2", 90, 25)]
+
+
+def test_sala_sin_capacidad_no_acota_los_grupos(crear_payload):
+    payload = crear_payload([("1", "d1", "anio", 1)], salas=(("s1", 20), ("s2", None)))
+
+    reporte, _ = _problemas(payload)
+
+    assert reporte.feasible
+
+
+def test_ignora_actividades_inactivas(crear_payload):
+    payload = crear_payload([("1", "d1", "g1", 5)], horas=4)
+    inactiva = payload.model_copy(
+        update={"activities": [payload.activities[0].model_copy(update={"active": False})]}
+    )
+
+    reporte, _ = _problemas(inactiva)
+
+    assert reporte.feasible
@@ -0,0 +1,261 @@
+import json
+import stat
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from app.fet.jobs import FetJobManager
+from app.settings import AppSettings
+
+FAKE_FET_CL = Path(__file__).parent / "fake_fet_cl.py"
+ACTIVIDADES = [("1", "d1", "g1", 1), ("2", "d1", "g2", 2), ("3", "d2", "g1", 1)]
+
+
+@pytest.fixture
+def fet_cl(tmp_path):
+    directorio = tmp_path / "bin"
+    directorio.mkdir()
+    binario = directorio / "fet-cl"
+    binario.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_FET_CL}" "$@"\n')
+    binario.chmod(binario.stat().st_mode | stat.S_IEXEC)
+    return binario
+
+
+@pytest.fixture
+def crear_manager(tmp_path, fet_cl):
+    managers = []
+
+    def crear(modo=None, **settings) -> FetJobManager:
+        (fet_cl.parent / "modo.json").write_text(json.dumps(modo or {}))
+        opciones = {
+            "fet_workdir": tmp_path / "work",
+            "fet_binary_path": fet_cl,
+            "fet_max_concurrent_jobs": 2,
+            "fet_max_queued_jobs": 4,
+            "fet_max_portfolio_seeds": 2,
+            "fet_timeout_seconds": 20,
+            "fet_partial_on_timeout": False,
+            "fet_decompose": False,
+            **settings,
+        }
+        manager = FetJobManager(settings=AppSettings(**opciones))
+        managers.append(manager)
+        return manager
+
+    yield crear
+    for manager in managers:
+        manager.shutdown()
+
+
+def _llamadas(fet_cl) -> int:
+    log = fet_cl.parent / "llamadas.log"
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def _esperar(manager, job_id, timeout=20.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        info = manager.get(job_id)
+        if info.status in ("succeeded", "failed"):
+            return info
+        time.sleep(0.05)
+    raise AssertionError(f"El job {job_id} no terminó en {timeout} segundos")
+
+
+def test_envio_y_consulta_hasta_obtener_el_resultado(crear_manager, crear_payload, fet_cl):
+    manager = crear_manager()
+
+    info = manager.submit(crear_payload(ACTIVIDADES))
+
+    assert info.status == "queued"
+    assert not info.cached
+    terminado = _esperar(manager, info.job_id)
+    assert terminado.status == "succeeded"
+    assert terminado.started_at is not None and terminado.finished_at is not None
+    resumen = manager.get_result(info.job_id)
+    assert resumen.status == "success"
+    assert sorted(entrada.id for entrada in resumen.activities_schedule) == [1, 2, 3]
+    assert resumen.timetables.teachers["d1"][:2] == [1, None]
+    assert resumen.soft_conflicts == 0
+    assert _llamadas(fet_cl) == 1
+    assert manager.metrics().completed == 1
+
+
+def test_resultado_antes_de_terminar_responde_409(crear_manager, crear_payload):
+    manager = crear_manager({"sleep": 1})
+
+    info = manager.submit(crear_payload(ACTIVIDADES))
+
+    with pytest.raises(HTTPException) as error:
+        manager.get_result(info.job_id)
+    assert error.value.status_code == 409
+    _esperar(manager, info.job_id)
+
+
+def test_job_inexistente_responde_404(crear_manager):
+    with pytest.raises(HTTPException) as error:
+        crear_manager().get("no-existe")
+
+    assert error.value.status_code == 404
+
+
+def test_envios_identicos_comparten_job_y_luego_usan_la_cache(crear_manager, crear_payload, fet_cl):
+    manager = crear_manager({"sleep": 1})
+    payload = crear_payload(ACTIVIDADES)
+    reordenado = crear_payload(list(reversed(ACTIVIDADES)))
+
+    primero = manager.submit(payload)
+    repetido = manager.submit(reordenado)
+
+    assert repetido.job_id == primero.job_id
+    _esperar(manager, primero.job_id)
+
+    cacheado = manager.submit(reordenado)
+    assert cacheado.job_id != primero.job_id
+    assert cacheado.cached
+    assert cacheado.status == "succeeded"
+    assert manager.get_result(cacheado.job_id) == manager.get_result(primero.job_id)
+    assert _llamadas(fet_cl) == 1
+
+    forzado = manager.submit(payload, force=True)
+    assert not forzado.cached
+    _esperar(manager, forzado.job_id)
+    assert _llamadas(fet_cl) == 2
+
+
+def test_envios_identicos_simultaneos_lanzan_fet_una_vez(crear_manager, crear_payload, fet_cl):
+    manager = crear_manager({"sleep": 1})
+    analizar = manager.analyzer.analyze
+    barrera = threading.Barrier(3)
+    resultados = []
+
+    def analizar_lento(payload):
+        # Ensancha la ventana entre la reserva del envío y su admisión en la cola.
+        time.sleep(0.2)
+        return analizar(payload)
+
+    def enviar():
+        barrera.wait()
+        resultados.append(manager.submit(crear_payload(ACTIVIDADES)))
+
+    manager.analyzer.analyze = analizar_lento
+    hilos = [threading.Thread(target=enviar) for _ in range(3)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len({info.job_id for info in resultados}) == 1
+    _esperar(manager, resultados[0].job_id)
+    assert _llamadas(fet_cl) == 1
+
+
+def test_cola_llena_responde_503_con_retry_after(crear_manager, crear_payload):
+    manager = crear_manager({"sleep": 1}, fet_max_concurrent_jobs=1, fet_max_queued_jobs=0)
+    primero = manager.submit(crear_payload(ACTIVIDADES))
+    otro = crear_payload(ACTIVIDADES[:2])
+
+    with pytest.raises(HTTPException) as error:
+        manager.submit(otro)
+
+    assert error.value.status_code == 503
+    assert int(error.value.headers["Retry-After"]) >= 1
+    assert manager.metrics().rejected == 1
+    # El envío rechazado no queda registrado como job en curso.
+    _esperar(manager, primero.job_id)
+    segundo = manager.submit(otro)
+    assert segundo.status == "queued"
+    assert _esperar(manager, segundo.job_id).status == "succeeded"
+
+
+def test_fallo_de_fet_termina_el_job_y_libera_el_envio(crear_manager, crear_payload, fet_cl):
+    manager = crear_manager({"exit_code": 3})
+    payload = crear_payload(ACTIVIDADES)
+
+    info = manager.submit(payload)
+
+    terminado = _esperar(manager, info.job_id)
+    assert terminado.status == "failed"
+    assert terminado.error == "FET finalizó con errores"
+    with pytest.raises(HTTPException) as error:
+        manager.get_result(info.job_id)
+    assert error.value.status_code == 500
+    reintento = manager.submit(payload)
+    assert reintento.job_id != info.job_id
+    assert not reintento.cached
+    _esperar(manager, reintento.job_id)
+    assert _llamadas(fet_cl) == 2
+
+
+def test_payload_infactible_se_rechaza_sin_ejecutar_fet(crear_manager, crear_payload, fet_cl):
+    manager = crear_manager()
+
+    with pytest.raises(HTTPException) as error:
+        manager.submit(crear_payload([("1", "d1", "g1", 5)], horas=4))
+
+    assert error.value.status_code == 422
+    assert error.value.detail["report"]["issues"][0]["kind"] == "activity_too_long"
+    assert _llamadas(fet_cl) == 0
+
+
+def test_semillas_fuera_de_rango_responden_422(crear_manager, crear_payload):
+    with pytest.raises(HTTPException) as error:
+        crear_manager().submit(crear_payload(ACTIVIDADES), seeds=3)
+
+    assert error.value.status_code == 422
+
+
+def test_portafolio_lanza_un_proceso_por_semilla(crear_manager, crear_payload, fet_cl):
+    manager = crear_manager()
+
+    info = manager.submit(crear_payload(ACTIVIDADES), seeds=2, strategy="best")
+
+    assert _esperar(manager, info.job_id).status == "succeeded"
+    resumen = manager.get_result(info.job_id)
+    assert resumen.portfolio_size == 2
+    assert len(resumen.random_seeds) == 6
+    assert _llamadas(fet_cl) == 2
+
+
+def test_tiempo_agotado_retorna_el_horario_parcial(crear_manager, crear_payload):
+    manager = crear_manager(
+        {"parcial": True},
+        fet_partial_on_timeout=True,
+        fet_timeout_seconds=1,
+        fet_stop_grace_seconds=5,
+    )
+
+    info = manager.submit(crear_payload(ACTIVIDADES))
+
+    assert _esperar(manager, info.job_id).status == "succeeded"
+    resumen = manager.get_result(info.job_id)
+    assert resumen.status == "partial"
+    assert [entrada.id for entrada in resumen.activities_schedule] == [1]
+    assert resumen.unplaced_activities == ["2", "3"]
+    assert manager.get(info.job_id).placed == 1
+    # Los horarios parciales no se guardan en la caché.
+    assert not manager.submit(crear_payload(ACTIVIDADES)).cached
+
+
+def test_componentes_independientes_se_resuelven_por_separado(crear_manager, crear_payload, fet_cl):
+    manager = crear_manager(fet_decompose=True, fet_decomposition_max_parts=2)
+    payload = crear_payload(
+        [("1", "d1", "g1", 1), ("2", "d2", "g2", 1)],
+        warm_start={
+            "previous_schedule": [{"id": "2", "subject": "", "time_slots": [5], "room_id": "s1"}],
+            "changed_activity_ids": ["1"],
+        },
+    )
+
+    info = manager.submit(payload)
+
+    assert _esperar(manager, info.job_id).status == "succeeded"
+    resumen = manager.get_result(info.job_id)
+    assert resumen.parts == 2
+    assert resumen.locked_activities == 1
+    assert sorted(entrada.id for entrada in resumen.activities_schedule) == [1, 2]
+    assert _llamadas(fet_cl) == 2
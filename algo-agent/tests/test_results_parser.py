@@ -0,0 +1,137 @@
+from pathlib import Path
+
+import pytest
+
+from app.fet.results_parser import TimetableResultsParser
+
+ACTIVIDADES = [("1", "d1", "g1", 2), ("2", "d2", "g2", 1), ("3", "d1", "anio", 1)]
+
+
+def _escribir_actividades(directorio: Path, asignaciones) -> None:
+    """``asignaciones``: tuplas ``(id, día, hora, sala)`` con los nombres que escribe FET."""
+    directorio.mkdir(parents=True, exist_ok=True)
+    filas = "".join(
+        f"<Activity><Id>{id_}</Id><Day>{dia}</Day><Hour>{hora}</Hour><Room>{sala}</Room></Activity>\n"
+        for id_, dia, hora, sala in asignaciones
+    )
+    (directorio / "fet-input_activities.xml").write_text(
+        f'<?xml version="1.0" encoding="UTF-8"?>\n<Activities_Timetable>\n{filas}</Activities_Timetable>\n',
+        encoding="utf-8",
+    )
+
+
+def _escribir_entidades(directorio: Path, archivo: str, raiz: str, etiqueta: str, horarios) -> None:
+    """``horarios``: ``{nombre: [(día, hora, id_actividad), ...]}``."""
+    cuerpo = ""
+    for nombre, slots in horarios.items():
+        cuerpo += f'<{etiqueta} name="{nombre}">'
+        for dia, hora, id_ in slots:
+            cuerpo += f'<Day name="{dia}"><Hour name="{hora}"><Activity id="{id_}"/></Hour></Day>'
+        cuerpo += f"</{etiqueta}>\n"
+    (directorio / archivo).write_text(f"<{raiz}>\n{cuerpo}</{raiz}>\n", encoding="utf-8")
+
+
+def test_extrae_actividades_y_horarios_por_slot(tmp_path, crear_payload):
+    payload = crear_payload(ACTIVIDADES, salas=(("s1", 40), ("s2", 40)))
+    directorio = tmp_path / "timetables" / "fet-input"
+    _escribir_actividades(
+        directorio,
+        [
+            ("1", "Lunes", "Bloque 1", "Sala s1"),
+            ("2", "martes", "BLOQUE 3", "Sala s2"),
+            ("3", "Viernes", "Bloque 4", ""),
+        ],
+    )
+    _escribir_entidades(
+        directorio,
+        "fet-input_teachers.xml",
+        "Teachers_Timetable",
+        "Teacher",
+        {"Docente d1": [("Lunes", "Bloque 1", "1"), ("Lunes", "Bloque 2", "1")]},
+    )
+    _escribir_entidades(
+        directorio,
+        "fet-input_subgroups.xml",
+        "Students_Timetable",
+        "Subgroup",
+        {"g2-sub": [("Martes", "Bloque 3", "2")]},
+    )
+
+    actividades, salas, horarios = TimetableResultsParser().extract_summary(payload, directorio)
+
+    por_id = {entrada.id: entrada for entrada in actividades}
+    assert por_id[1].time_slots == [0, 1]
+    assert por_id[1].room_id == "s1"
+    assert por_id[1].students_count == 30
+    assert por_id[2].time_slots == [6]
+    assert por_id[3].time_slots == [19]
+    assert por_id[3].room_id is None
+    assert por_id[3].students_count == 90
+    assert [sala.name for sala in salas] == ["Sala s1", "Sala s2"]
+
+    assert horarios.slots_per_day == 4
+    assert horarios.total_slots == 20
+    assert horarios.rooms["s1"][:2] == [1, 1]
+    assert horarios.rooms["s2"][6] == 2
+    assert horarios.teachers["d1"][:3] == [1, 1, None]
+    assert horarios.students["g2"][6] == 2
+
+
+def test_lee_el_horario_de_mayor_avance(tmp_path, crear_payload):
+    parser = TimetableResultsParser()
+    payload = crear_payload(ACTIVIDADES)
+    entrada = tmp_path / "fet-input.fet"
+    parcial = parser.partial_timetable_dir_for(tmp_path, entrada)
+    _escribir_actividades(parcial, [("2", "Lunes", "Bloque 2", "")])
+    _escribir_actividades(tmp_path / "timetables" / "fet-input-current", [])
+
+    assert parcial == tmp_path / "timetables" / "fet-input-highest"
+    assert not parser.has_timetable(parser.timetable_dir_for(tmp_path, entrada))
+    assert parser.has_timetable(parcial)
+
+    actividades, _, horarios = parser.extract_summary(payload, parcial)
+
+    assert [(entrada.id, entrada.time_slots) for entrada in actividades] == [(2, [1])]
+    assert horarios.teachers == {}
+
+
+def test_ignora_actividades_desconocidas_o_fuera_del_calendario(tmp_path, crear_payload):
+    payload = crear_payload(ACTIVIDADES)
+    directorio = tmp_path / "horario"
+    _escribir_actividades(
+        directorio,
+        [
+            ("99", "Lunes", "Bloque 1", ""),
+            ("1", "Domingo", "Bloque 1", ""),
+            ("2", "Lunes", "Bloque 9", ""),
+        ],
+    )
+
+    actividades, _, _ = TimetableResultsParser().extract_summary(payload, directorio)
+
+    assert actividades == []
+
+
+@pytest.mark.parametrize("contenido", ["", "<Activities_Timetable><Activity><Id>1</Id>"])
+def test_xml_incompleto_no_produce_actividades(tmp_path, crear_payload, contenido):
+    payload = crear_payload(ACTIVIDADES)
+    directorio = tmp_path / "horario"
+    directorio.mkdir()
+    (directorio / "fet-input_activities.xml").write_text(contenido, encoding="utf-8")
+
+    actividades, _, horarios = TimetableResultsParser().extract_summary(payload, directorio)
+
+    assert actividades == []
+    assert horarios.rooms == {}
+
+
+def test_sin_directorio_no_hay_horario(tmp_path, crear_payload):
+    payload = crear_payload(ACTIVIDADES)
+
+    actividades, salas, horarios = TimetableResultsParser().extract_summary(
+        payload, tmp_path / "no-existe"
+    )
+
+    assert actividades == []
+    assert len(salas) == 1
+    assert horarios is None
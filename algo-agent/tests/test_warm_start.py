@@ -0,0 +1,182 @@
+from xml.etree import ElementTree as ET
+
+from app.fet.schemas import ConstraintActivityPreferredRoom, ConstraintActivityPreferredStartingTime
+from app.fet.warm_start import WarmStartPlanner
+from app.fet.xml_builder import FetXmlBuilder
+
+
+def _warm_start(horario, cambiadas=(), lock_rooms=True):
+    """``horario``: ``{id: (slots, sala)}`` de la corrida anterior."""
+    return {
+        "previous_schedule": [
+            {"id": id_, "subject": "", "time_slots": list(slots), "room_id": sala}
+            for id_, (slots, sala) in horario.items()
+        ],
+        "changed_activity_ids": list(cambiadas),
+        "lock_rooms": lock_rooms,
+    }
+
+
+def _fijadas(payload):
+    inicios = {
+        restriccion.activity_id: (restriccion.day_index, restriccion.hour_index)
+        for restriccion in payload.time_constraints
+        if isinstance(restriccion, ConstraintActivityPreferredStartingTime)
+    }
+    salas = {
+        restriccion.activity_id: restriccion.room_id
+        for restriccion in payload.space.space_constraints
+        if isinstance(restriccion, ConstraintActivityPreferredRoom)
+    }
+    return inicios, salas
+
+
+def test_fija_las_actividades_fuera_del_vecindario_de_los_cambios(crear_payload):
+    payload = crear_payload(
+        [
+            ("1", "d1", "g1", 1),
+            ("2", "d1", "g2", 1),
+            ("3", "d2", "g1", 1),
+            ("4", "d3", "g3", 2),
+            ("5", "d4", "g2", 1),
+            ("6", "d5", "g3", 1),
+        ],
+        dias=2,
+        salas=(("s1", 100), ("s2", 100)),
+        time_constraints=[
+            {
+                "type": "min_days_between_activities",
+                "weight": 100,
+                "min_days": 1,
+                "activity_ids": ["3", "5"],
+            }
+        ],
+        warm_start=_warm_start(
+            {
+                "1": ([0], "s1"),
+                "2": ([1], "s1"),
+                "3": ([4], "s1"),
+                "4": ([6, 7], "s2"),
+                "5": ([5], "s1"),
+                "6": ([2], "s1"),
+            },
+            cambiadas=["1"],
+        ),
+    )
+
+    fijado, bloqueadas = WarmStartPlanner().apply(payload)
+
+    # 2 comparte docente, 3 comparte grupo y 5 está ligada a 3 por días mínimos.
+    inicios, salas = _fijadas(fijado)
+    assert bloqueadas == 2
+    assert inicios == {"4": (1, 2), "6": (0, 2)}
+    assert salas == {"4": "s2", "6": "s1"}
+    assert all(
+        restriccion.permanently_locked and restriccion.weight == 100
+        for restriccion in [*fijado.time_constraints[1:], *fijado.space.space_constraints[1:]]
+    )
+    assert fijado.warm_start is None
+    assert fijado.space.space_constraints[0].type == "basic_compulsory_space"
+
+
+def test_la_actividad_del_anio_comparte_estudiantes_con_sus_grupos(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 1), ("2", "d2", "anio", 1), ("3", "d3", "g3", 1)],
+        warm_start=_warm_start(
+            {"1": ([0], None), "2": ([1], None), "3": ([2], None)}, cambiadas=["2"]
+        ),
+    )
+
+    fijado, bloqueadas = WarmStartPlanner().apply(payload)
+
+    assert bloqueadas == 0
+    assert _fijadas(fijado) == ({}, {})
+
+
+def test_no_fija_bloques_que_ya_no_sirven(crear_payload):
+    payload = crear_payload(
+        [
+            ("1", "d1", "g1", 1),
+            ("2", "d2", "g2", 2),
+            ("3", "d3", "g3", 2),
+            ("4", "d4", "g1", 1),
+            ("5", "d5", "g2", 1),
+            ("6", "d6", "g3", 1),
+        ],
+        dias=2,
+        time_constraints=[
+            {
+                "type": "teacher_not_available",
+                "weight": 100,
+                "teacher_id": "d1",
+                "not_available_slots": [{"day_index": 0, "hour_index": 0}],
+            },
+            {
+                "type": "teacher_not_available",
+                "weight": 50,
+                "teacher_id": "d6",
+                "not_available_slots": [{"day_index": 1, "hour_index": 0}],
+            },
+        ],
+        warm_start=_warm_start(
+            {
+                # Choca con una indisponibilidad obligatoria de su docente.
+                "1": ([0], None),
+                # La duración cambió de 1 a 2 bloques.
+                "2": ([1], None),
+                # Cruza al día siguiente.
+                "3": ([3, 4], None),
+                # Fuera del calendario.
+                "4": ([9], None),
+                # "5" no estaba en el horario anterior.
+                # La indisponibilidad blanda no impide fijarla.
+                "6": ([4], None),
+            }
+        ),
+    )
+
+    fijado, bloqueadas = WarmStartPlanner().apply(payload)
+
+    assert bloqueadas == 1
+    assert _fijadas(fijado) == ({"6": (1, 0)}, {})
+
+
+def test_sin_lock_rooms_o_con_sala_desconocida_solo_fija_el_horario(crear_payload):
+    horario = {"1": ([0], "s1"), "2": ([1], "s-borrada")}
+    actividades = [("1", "d1", "g1", 1), ("2", "d2", "g2", 1)]
+
+    sin_salas, _ = WarmStartPlanner().apply(
+        crear_payload(actividades, warm_start=_warm_start(horario, lock_rooms=False))
+    )
+    sala_borrada, _ = WarmStartPlanner().apply(
+        crear_payload(actividades, warm_start=_warm_start(horario))
+    )
+
+    assert _fijadas(sin_salas) == ({"1": (0, 0), "2": (0, 1)}, {})
+    assert _fijadas(sala_borrada)[1] == {"1": "s1"}
+
+
+def test_sin_warm_start_no_cambia_el_payload(crear_payload):
+    payload = crear_payload([("1", "d1", "g1", 1)])
+
+    assert WarmStartPlanner().apply(payload) == (payload, 0)
+
+
+def test_las_actividades_fijadas_llegan_bloqueadas_al_fet(crear_payload):
+    payload = crear_payload(
+        [("1", "d1", "g1", 1), ("2", "d2", "g2", 1)],
+        warm_start=_warm_start({"1": ([0], "s1"), "2": ([6], "s1")}, cambiadas=["1"]),
+    )
+    fijado, _ = WarmStartPlanner().apply(payload)
+
+    raiz = ET.fromstring(FetXmlBuilder().build(fijado).encode("utf-8"))
+
+    inicio = raiz.find("Time_Constraints_List/ConstraintActivityPreferredStartingTime")
+    assert inicio.findtext("Activity_Id") == "2"
+    assert inicio.findtext("Day") == "Martes"
+    assert inicio.findtext("Hour") == "Bloque 3"
+    assert inicio.findtext("Permanently_Locked") == "true"
+    sala = raiz.find("Space_Constraints_List/ConstraintActivityPreferredRoom")
+    assert sala.findtext("Activity_Id") == "2"
+    assert sala.findtext("Room") == "Sala s1"
+    assert sala.findtext("Permanently_Locked") == "true"
@@ -0,0 +1,187 @@
+import io
+from pathlib import Path
+from xml.dom import minidom
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from app.fet.schemas import FetRunRequest
+from app.fet.xml_builder import FetXmlBuilder
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def _payload_completo() -> FetRunRequest:
+    return FetRunRequest.model_validate(
+        {
+            "metadata": {
+                "timetable_id": "t-1",
+                "semester": "2025-1",
+                "institution_name": "Universidad & <Co>",
+                "comments": 'Comentario con "comillas"\r\ny salto de línea',
+            },
+            "calendar": {
+                "days": [
+                    {"index": 1, "name": "ma", "long_name": "Martes"},
+                    {"index": 0, "name": "lu", "long_name": "Lunes"},
+                ],
+                "hours": [
+                    {"index": 0, "name": "08:00"},
+                    {"index": 1, "name": "09:00", "long_name": "Bloque 2"},
+                ],
+            },
+            "subjects": [
+                {"id": "sub-1", "name": "Cálculo", "code": "MAT1"},
+                {"id": "sub-2", "name": "Física <I>", "code": "FIS1", "comments": "Lab & teoría"},
+            ],
+            "teachers": [
+                {"id": "t-1", "name": "Ana Pérez", "target_hours": 4},
+                {"id": "t-2", "name": "Luis Soto", "comments": "Jornada parcial"},
+            ],
+            "student_years": [
+                {
+                    "id": "year-1",
+                    "name": "Primer año",
+                    "total_students": 60,
+                    "groups": [
+                        {"id": "g-1", "name": "Sección 1", "students": 30},
+                        {"id": "g-2", "name": "Sección 2", "students": 30},
+                    ],
+                },
+                {"id": "year-2", "name": "Segundo año", "total_students": 0},
+            ],
+            "activities": [
+                {
+                    "id": "1",
+                    "group_id": "1",
+                    "teacher_id": "t-1",
+                    "subject_id": "sub-1",
+                    "students_reference": {"type": "year", "id": "year-1"},
+                    "duration": 2,
+                    "total_duration": 4,
+                    "comments": "Cátedra",
+                },
+                {
+                    "id": "2",
+                    "group_id": "1",
+                    "teacher_id": "t-1",
+                    "subject_id": "sub-1",
+                    "students_reference": {"type": "year", "id": "year-1"},
+                    "duration": 2,
+                    "total_duration": 4,
+                },
+                {
+                    "id": "3",
+                    "group_id": "3",
+                    "teacher_id": "t-2",
+                    "subject_id": "sub-2",
+                    "students_reference": {"type": "group", "id": "g-2"},
+                    "duration": 1,
+                    "total_duration": 1,
+                    "active": False,
+                },
+                {
+                    "id": "4",
+                    "group_id": "4",
+                    "teacher_id": "t-desconocido",
+                    "subject_id": "sub-desconocida",
+                    "students_reference": {"type": "group", "id": "g-desconocido"},
+                    "duration": 1,
+                    "total_duration": 1,
+                },
+            ],
+            "time_constraints": [
+                {"type": "basic_compulsory_time", "weight": 100},
+                {
+                    "type": "min_days_between_activities",
+                    "weight": 95,
+                    "min_days": 1,
+                    "activity_ids": ["1", "2"],
+                    "consecutive_if_same_day": True,
+                },
+                {
+                    "type": "teacher_not_available",
+                    "weight": 100,
+                    "teacher_id": "t-2",
+                    "not_available_slots": [
+                        {"day_index": 0, "hour_index": 1},
+                        {"day_index": 6, "hour_index": 9},
+                    ],
+                    "active": False,
+                },
+            ],
+            "space": {
+                "buildings": [{"id": "b-1", "name": "Edificio Central Norte"}],
+                "rooms": [
+                    {"id": "r-1", "name": "Sala 101", "building_id": "b-1", "capacity": 40},
+                    {"id": "r-2", "name": "Laboratorio", "building_id": "b-x"},
+                    {"id": "r-3", "name": "Auditorio", "comments": "Sin edificio"},
+                ],
+                "space_constraints": [{"type": "basic_compulsory_space", "weight": 100}],
+            },
+        }
+    )
+
+
+def _payload_minimo() -> FetRunRequest:
+    return FetRunRequest.model_validate(
+        {"metadata": {"timetable_id": "t-0", "semester": "2025-2"}, "calendar": {}}
+    )
+
+
+@pytest.mark.parametrize(
+    "payload, archivo",
+    [(_payload_completo(), "legado_completo.fet"), (_payload_minimo(), "legado_minimo.fet")],
+)
+def test_salida_identica_al_generador_anterior(payload, archivo):
+    # Los archivos se generaron con el builder basado en ElementTree + minidom.toprettyxml.
+    esperado = (DATA_DIR / archivo).read_bytes().decode("utf-8")
+
+    assert FetXmlBuilder().build(payload) == esperado
+
+
+def test_escribir_en_stream_equivale_a_build():
+    payload = _payload_completo()
+    stream = io.StringIO()
+
+    FetXmlBuilder().write(payload, stream)
+
+    assert stream.getvalue() == FetXmlBuilder().build(payload)
+
+
+def test_salida_coincide_con_el_formato_de_minidom(crear_payload):
+    payload = crear_payload(
+        [(str(i), f"d{i % 3}", f"g{i % 3 + 1}", 1 + i % 2) for i in range(30)],
+        time_constraints=[
+            {
+                "type": "activity_preferred_starting_time",
+                "weight": 100,
+                "activity_id": "1",
+                "day_index": 0,
+                "hour_index": 0,
+                "permanently_locked": True,
+            }
+        ],
+        space_constraints=[
+            {
+                "type": "activity_preferred_room",
+                "weight": 100,
+                "activity_id": "1",
+                "room_id": "s1",
+                "permanently_locked": True,
+            }
+        ],
+    )
+    generado = FetXmlBuilder().build(payload)
+
+    # Se descarta la sangría del documento y se vuelve a formatear como lo hacía el builder
+    # anterior; el resultado debe ser el mismo texto.
+    raiz = ET.fromstring(generado.encode("utf-8"))
+    for nodo in raiz.iter():
+        if len(nodo):
+            nodo.text = None
+        nodo.tail = None
+    reformateado = minidom.parseString(ET.tostring(raiz, encoding="utf-8")).toprettyxml(
+        indent="\t", encoding="UTF-8"
+    )
+    assert generado == reformateado.decode("utf-8")
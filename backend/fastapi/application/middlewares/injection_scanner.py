@@ -0,0 +1,216 @@
+"""
+Detección de patrones de inyección en una sola pasada.
+
+``InjectionScanner`` evalúa los mismos patrones de ``SanitizationMiddleware`` con el mismo
+resultado, pero sin recorrer cada cadena una vez por patrón:
+
+1. Prefiltro: una sola expresión con los literales que todo patrón necesita para coincidir
+   (``select``, ``<``, ``=``, ``..``...). La gran mayoría de los valores no contiene ninguno y
+   se descarta con esa única pasada.
+
+   Los patrones originales se evalúan con ``re.IGNORECASE`` sobre el valor en minúsculas,
+   y con ``IGNORECASE`` ``ı`` y ``ſ`` equivalen a ``i`` y ``s``. Aquí se reemplazan esas dos
+   letras y se evalúa sin ``IGNORECASE``, que en ``re`` desactiva la búsqueda rápida de
+   literales y hace el prefiltro varias veces más lento.
+
+2. Confirmación: solo se evalúan los patrones cuyo literal apareció. Los patrones de la forma
+   ``A.*B`` (y ``<tag[^>]*>``) se evalúan como una secuencia de búsquedas hacia adelante, que
+   es equivalente pero lineal: ``re.search`` con ``.*`` retrocede carácter a carácter por cada
+   ``A`` sin ``B`` posterior y se vuelve cuadrático en valores largos.
+
+Además, los valores de más de ``max_scan_length`` caracteres no se inspeccionan y se
+rechazan directamente.
+"""
+
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+CATEGORY_SQL = "SQL Injection"
+CATEGORY_XSS = "XSS"
+CATEGORY_PATH = "Path Traversal"
+CATEGORY_TOO_LONG = "valor demasiado largo"
+
+# Tamaño máximo (caracteres) de un valor que se inspecciona
+MAX_SCAN_LENGTH = 100_000
+
+# Únicas letras en minúscula que re.IGNORECASE considera iguales a una letra ASCII
+_ASCII_FOLDS = str.maketrans({"ı": "i", "ſ": "s"})
+
+
+class ScanHit(NamedTuple):
+    """Patrón que coincidió y su categoría"""
+
+    category: str
+    pattern: str
+
+
+class _Sequence:
+    """
+    Equivalente lineal de ``A<gap>B<gap>C...`` para ``re.search``.
+
+    Cada paso es ``(regex, misma_línea)``: ``True`` equivale a separar con ``.*`` (el siguiente
+    paso debe empezar en la misma línea) y ``False`` a ``[^>]*`` seguido de ``>`` (la primera
+    coincidencia posterior, en cualquier línea). Los pasos de misma línea van al final.
+
+    Como cada paso es de largo fijo (o termina en la primera ``>``), tomar siempre la primera
+    coincidencia de cada paso da la respuesta exacta; y si la cadena de pasos de una línea
+    falla, fallan también todas las que empiezan más adelante en esa misma línea.
+    """
+
+    def __init__(self, first: str, *steps: Tuple[str, bool]):
+        self.first = re.compile(first)
+        self.steps = [(re.compile(pattern), same_line) for pattern, same_line in steps]
+        same_line = [flag for _, flag in steps]
+        if same_line != sorted(same_line):
+            raise ValueError("Los pasos de misma línea deben ir al final")
+        # Sin pasos que crucen líneas, si la cadena falla en una línea se salta a la siguiente
+        self._line_only = all(same_line)
+
+    def __call__(self, text: str) -> bool:
+        length = len(text)
+        pos = 0
+        failed_line_end = -1
+        last_any: Dict[int, Tuple[int, int]] = {}  # paso -> (inicio, fin) de su última coincidencia
+        while True:
+            match = self.first.search(text, pos)
+            if match is None:
+                return False
+            end = match.end()
+            line_end = None
+            for index, (regex, same_line) in enumerate(self.steps):
+                if same_line:
+                    if line_end is None:
+                        line_end = text.find("\n", end)
+                        if line_end < 0:
+                            line_end = length
+                        if line_end == failed_line_end:
+                            break
+                    found = regex.search(text, end, line_end)
+                    if found is None:
+                        failed_line_end = line_end
+                        break
+                    end = found.end()
+                else:
+                    previous = last_any.get(index)
+                    if previous is not None and end <= previous[0]:
+                        end = previous[1]
+                        continue
+                    found = regex.search(text, end)
+                    if found is None:
+                        # Ninguna coincidencia posterior del primer paso puede completarse
+                        return False
+                    last_any[index] = (found.start(), found.end())
+                    end = found.end()
+            else:
+                return True
+            if self._line_only and failed_line_end == line_end:
+                pos = line_end
+            else:
+                pos = match.end() if match.end() > match.start() else match.start() + 1
+
+
+def _search(pattern: str, flags: int = 0) -> Callable[[str], bool]:
+    regex = re.compile(pattern, flags)
+    return lambda text: regex.search(text) is not None
+
+
+def _keywords(first: str, second: str) -> Callable[[str], bool]:
+    return _Sequence(rf"\b{first}\b", (rf"\b{second}\b", True))
+
+
+def _quoted_or(quote: str) -> Callable[[str], bool]:
+    return _Sequence(quote, ("or", True), (quote, True), ("=", True), (quote, True))
+
+
+def _tag(name: str) -> Callable[[str], bool]:
+    return _Sequence(f"<{name}", (">", False))
+
+
+# Patrones conocidos: literal que necesitan para coincidir y evaluación equivalente.
+# Los patrones que no estén aquí se evalúan con ``re.search`` en cada valor.
+_KNOWN_PATTERNS: Dict[str, Tuple[str, Callable[[str], bool]]] = {
+    r"(\bunion\b.*\bselect\b)": ("union", _keywords("union", "select")),
+    r"(\bselect\b.*\bfrom\b)": ("select", _keywords("select", "from")),
+    r"(\binsert\b.*\binto\b)": ("insert", _keywords("insert", "into")),
+    r"(\bupdate\b.*\bset\b)": ("update", _keywords("update", "set")),
+    r"(\bdelete\b.*\bfrom\b)": ("delete", _keywords("delete", "from")),
+    r"(\bdrop\b.*\btable\b)": ("drop", _keywords("drop", "table")),
+    r"(;.*--)": ("--", _Sequence(";", ("--", True))),
+    r"('.*or.*'.*=.*')": ("=", _quoted_or("'")),
+    r"(\".*or.*\".*=.*\")": ("=", _quoted_or('"')),
+    r"(\bexec\b.*\()": ("exec", _Sequence(r"\bexec\b", (r"\(", True))),
+    r"(\bexecute\b.*\()": ("exec", _Sequence(r"\bexecute\b", (r"\(", True))),
+    r"<script[^>]*>.*?</script>": ("<", _Sequence("<script", (">", False), ("</script>", True))),
+    r"javascript:": ("javascript:", _search("javascript:")),
+    r"onerror\s*=": ("=", _search(r"onerror\s*=")),
+    r"onload\s*=": ("=", _search(r"onload\s*=")),
+    r"onclick\s*=": ("=", _search(r"onclick\s*=")),
+    r"<iframe[^>]*>": ("<", _tag("iframe")),
+    r"<object[^>]*>": ("<", _tag("object")),
+    r"<embed[^>]*>": ("<", _tag("embed")),
+    r"\.\./": ("..", _search(r"\.\./")),
+    r"\.\.": ("..", _search(r"\.\.")),
+    r"%2e%2e": ("%2e%2e", _search("%2e%2e")),
+    r"%252e%252e": ("%252e%252e", _search("%252e%252e")),
+}
+
+
+class InjectionScanner:
+    """
+    Evalúa grupos de patrones (``[(categoría, patrones), ...]``, en orden) sobre un valor.
+
+    ``scan`` retorna el primer patrón que coincide, en el mismo orden en que se evaluarían
+    uno a uno con ``re.search(patrón, valor.lower(), re.IGNORECASE)``.
+    """
+
+    def __init__(
+        self,
+        groups: Sequence[Tuple[str, Sequence[str]]],
+        max_scan_length: int = MAX_SCAN_LENGTH,
+    ):
+        self.max_scan_length = max_scan_length
+        anchors: List[str] = []
+        # (categoría, patrón, evaluación, literal requerido o None si es un patrón desconocido)
+        self._checks: List[Tuple[str, str, Callable[[str], bool], Optional[str]]] = []
+        for category, patterns in groups:
+            for pattern in patterns:
+                known = _KNOWN_PATTERNS.get(pattern)
+                if known is None:
+                    self._checks.append((category, pattern, _search(pattern, re.IGNORECASE), None))
+                    continue
+                anchor, check = known
+                if anchor not in anchors:
+                    anchors.append(anchor)
+                self._checks.append((category, pattern, check, anchor))
+
+        self._prefilter = re.compile("|".join(re.escape(anchor) for anchor in anchors)) if anchors else None
+        self._always = any(anchor is None for _, _, _, anchor in self._checks)
+
+    def scan(self, value: str) -> Optional[ScanHit]:
+        if len(value) > self.max_scan_length:
+            return ScanHit(CATEGORY_TOO_LONG, f"más de {self.max_scan_length} caracteres")
+
+        text = value.lower()
+        folded = text if text.isascii() else text.translate(_ASCII_FOLDS)
+        if not self._always and (self._prefilter is None or self._prefilter.search(folded) is None):
+            return None
+
+        for category, pattern, check, anchor in self._checks:
+            if anchor is None:
+                # Patrón desconocido: se evalúa tal como lo haría el middleware
+                if check(text):
+                    return ScanHit(category, pattern)
+            elif anchor in folded and check(folded):
+                return ScanHit(category, pattern)
+        return None
+
+
+__all__ = [
+    "CATEGORY_PATH",
+    "CATEGORY_SQL",
+    "CATEGORY_TOO_LONG",
+    "CATEGORY_XSS",
+    "InjectionScanner",
+    "MAX_SCAN_LENGTH",
+    "ScanHit",
+]
@@ -4,14 +4,15 @@ Middleware de rate limiting básico para prevenir abuso de la API.
 
 import logging
 import time
-from collections import defaultdict
-from typing import Dict, Tuple
+from typing import Optional
 
 from fastapi import status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
+from .rate_limit_store import InMemoryRateLimitStore, RateLimitDecision, RateLimitStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +24,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     - Límite de requests por ventana de tiempo
     - Tracking por IP
     - Diferentes límites para endpoints públicos y autenticados
-    - Limpieza automática de registros antiguos
+    - Ventana deslizante por contadores: costo O(1) por request
+    - Memoria acotada: tabla LRU con un máximo de IPs
+    - Almacenamiento intercambiable (``store``) para compartir los contadores entre workers
     """
 
     def __init__(
@@ -32,17 +35,18 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         requests_limit: int = 100,  # Requests por ventana
         window_seconds: int = 60,  # Ventana de tiempo en segundos
         auth_requests_limit: int = 200,  # Límite mayor para usuarios autenticados
-        cleanup_interval: int = 300,  # Limpiar cache cada 5 minutos
+        max_clients: int = 100_000,  # IPs con contadores en memoria (LRU)
+        store: Optional[RateLimitStore] = None,  # Contadores compartidos (por defecto, en memoria)
     ):
         super().__init__(app)
         self.requests_limit = requests_limit
         self.window_seconds = window_seconds
         self.auth_requests_limit = auth_requests_limit
-        self.cleanup_interval = cleanup_interval
 
-        # Storage: {ip: [(timestamp, is_authenticated), ...]}
-        self.request_counts: Dict[str, list] = defaultdict(list)
-        self.last_cleanup = time.time()
+        # Contadores por IP
+        if store is not None and store.window_seconds != window_seconds:
+            raise ValueError("La ventana del almacenamiento no coincide con window_seconds")
+        self.store = store or InMemoryRateLimitStore(window_seconds, max_keys=max_clients)
 
         # Endpoints que no requieren rate limiting estricto
         self.excluded_paths = ["/api/health", "/api/", "/api/docs", "/api/openapi.json"]
@@ -59,48 +63,31 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             # Obtener IP del cliente
             client_ip = self._get_client_ip(request)
 
-            # Limpiar registros antiguos periódicamente
-            current_time = time.time()
-            if current_time - self.last_cleanup > self.cleanup_interval:
-                self._cleanup_old_records(current_time)
-                self.last_cleanup = current_time
-
             # Verificar si está autenticado (buscar token en headers)
             is_authenticated = self._is_authenticated(request)
+            limit = self.auth_requests_limit if is_authenticated else self.requests_limit
 
-            # Verificar rate limit
-            if not self._check_rate_limit(client_ip, current_time, is_authenticated):
+            # Verificar y registrar la solicitud en una sola operación
+            decision = self.store.hit(client_ip, limit, time.time())
+            if not decision.allowed:
                 logger.warning(
                     f"Rate limit excedido para IP {client_ip} " f"(autenticado: {is_authenticated})"
                 )
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     content={
                         "detail": "Demasiadas solicitudes. Por favor, intenta más tarde.",
-                        "retry_after": self.window_seconds,
-                    },
-                    headers={
-                        "Retry-After": str(self.window_seconds),
-                        "X-RateLimit-Limit": str(
-                            self.auth_requests_limit if is_authenticated else self.requests_limit
-                        ),
-                        "X-RateLimit-Remaining": "0",
-                        "X-RateLimit-Reset": str(int(current_time + self.window_seconds)),
+                        "retry_after": decision.retry_after,
                     },
+                    headers={"Retry-After": str(decision.retry_after)},
                 )
-
-            # Registrar la solicitud
-            self.request_counts[client_ip].append((current_time, is_authenticated))
+                return self._add_rate_limit_headers(response, decision)
 
             # Procesar la solicitud
             response = await call_next(request)
 
             # Agregar headers de rate limit a la respuesta
-            response = self._add_rate_limit_headers(
-                response, client_ip, current_time, is_authenticated
-            )
-
-            return response
+            return self._add_rate_limit_headers(response, decision)
 
         except Exception as e:
             logger.error(f"Error en RateLimitMiddleware: {str(e)}")
@@ -131,55 +118,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         auth_header = request.headers.get("Authorization")
         return bool(auth_header and auth_header.startswith("Bearer "))
 
-    def _check_rate_limit(self, ip: str, current_time: float, is_authenticated: bool) -> bool:
-        """
-        Verifica si la IP ha excedido el rate limit.
-        Retorna True si está dentro del límite, False si lo excedió.
-        """
-        # Obtener límite según autenticación
-        limit = self.auth_requests_limit if is_authenticated else self.requests_limit
-
-        # Filtrar requests dentro de la ventana de tiempo
-        window_start = current_time - self.window_seconds
-        recent_requests = [(ts, auth) for ts, auth in self.request_counts[ip] if ts > window_start]
-
-        # Actualizar el storage con solo requests recientes
-        self.request_counts[ip] = recent_requests
-
-        # Verificar si excede el límite
-        return len(recent_requests) < limit
-
-    def _add_rate_limit_headers(
-        self, response: Response, ip: str, current_time: float, is_authenticated: bool
-    ) -> Response:
+    def _add_rate_limit_headers(self, response: Response, decision: RateLimitDecision) -> Response:
         """
         Agrega headers informativos sobre el rate limit a la respuesta.
         """
-        limit = self.auth_requests_limit if is_authenticated else self.requests_limit
-        window_start = current_time - self.window_seconds
-
-        recent_count = sum(1 for ts, _ in self.request_counts[ip] if ts > window_start)
-
-        remaining = max(0, limit - recent_count)
-
-        response.headers["X-RateLimit-Limit"] = str(limit)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(current_time + self.window_seconds))
+        response.headers["X-RateLimit-Limit"] = str(decision.limit)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+        response.headers["X-RateLimit-Reset"] = str(int(decision.reset_at))
 
         return response
-
-    def _cleanup_old_records(self, current_time: float):
-        """
-        Limpia registros antiguos para evitar crecimiento ilimitado de memoria.
-        """
-        window_start = current_time - self.window_seconds
-
-        # Crear una nueva estructura solo con datos recientes
-        cleaned_counts = defaultdict(list)
-        for ip, timestamps in self.request_counts.items():
-            recent = [(ts, auth) for ts, auth in timestamps if ts > window_start]
-            if recent:  # Solo mantener IPs con requests recientes
-                cleaned_counts[ip] = recent
-
-        self.request_counts = cleaned_counts
-        logger.info(f"Rate limit cache limpiado. IPs activas: {len(self.request_counts)}")
@@ -0,0 +1,398 @@
+"""
+Almacenamiento de contadores de rate limiting.
+
+Usa el algoritmo de ventana deslizante por contadores: por cada clave (IP) se guardan solo
+el número de la ventana fija actual, su contador y el de la ventana anterior. El uso en la
+ventana deslizante se estima como ``anterior * (fracción que aún se solapa) + actual``, así
+que cada request cuesta O(1) y cada clave ocupa un slot de tamaño fijo, sin importar el
+límite configurado.
+
+Hay tres implementaciones de ``RateLimitStore``:
+
+- ``InMemoryRateLimitStore``: memoria del proceso, tabla LRU acotada. Con varios workers
+  cada uno lleva su propia cuenta.
+- ``SharedMemoryRateLimitStore``: tabla hash de tamaño fijo en un archivo mapeado en
+  memoria (``/dev/shm``), compartida por todos los workers de un mismo host.
+- ``SQLiteRateLimitStore``: tabla SQLite en modo WAL; compartida entre workers y persistente
+  entre reinicios.
+
+En las compartidas, leer, decidir y actualizar el contador de una clave es una sola operación
+atómica entre procesos (bloqueo del archivo o transacción ``IMMEDIATE``), así que el límite se
+respeta sin importar cuántos workers haya. ``hit`` corre dentro del event loop del middleware:
+si el bloqueo no se obtiene en unas decenas de milisegundos la request se admite sin contarla
+(con un warning), en vez de congelar todas las requests del worker.
+"""
+
+import hashlib
+import logging
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Protocol, Tuple
+
+BACKEND_MEMORY = "memory"
+BACKEND_SHARED_MEMORY = "shared_memory"
+BACKEND_SQLITE = "sqlite"
+
+# Espera máxima por el bloqueo entre workers antes de admitir la request sin contarla
+DEFAULT_LOCK_TIMEOUT_MS = 50
+_LOCK_RETRY_SECONDS = 0.001
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitDecision(NamedTuple):
+    """Resultado de registrar una request"""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_at: float  # Inicio de la próxima ventana fija (epoch)
+    retry_after: int  # Segundos hasta que se admita una nueva request (0 si se admitió)
+
+
+class RateLimitStore(Protocol):
+    window_seconds: int
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> RateLimitDecision:
+        """Registrar una request de ``key`` si cabe dentro de ``limit`` (las rechazadas no cuentan)"""
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+# (ventana fija, contador actual, contador de la ventana anterior)
+WindowState = Tuple[int, int, int]
+
+
+def sliding_window(
+    window_seconds: int, limit: int, now: float, state: Optional[WindowState]
+) -> Tuple[RateLimitDecision, WindowState]:
+    """
+    Decidir una request contra los contadores ``state`` de su clave (``None`` si es nueva).
+
+    Retorna la decisión y el nuevo estado a guardar.
+    """
+    position = now / window_seconds
+    window = int(position)
+    if state is None:
+        current = previous = 0
+    else:
+        last_window, current, previous = state
+        if last_window != window:
+            previous = current if window == last_window + 1 else 0
+            current = 0
+
+    estimate = previous * (1.0 - (position - window)) + current
+    reset_at = (window + 1) * window_seconds
+    if estimate + 1 > limit:
+        retry_after = _retry_after(window_seconds, limit, now, window, current, previous)
+        return RateLimitDecision(False, limit, 0, reset_at, retry_after), (window, current, previous)
+
+    decision = RateLimitDecision(True, limit, max(0, int(limit - estimate - 1)), reset_at, 0)
+    return decision, (window, current + 1, previous)
+
+
+def _retry_after(window_seconds: int, limit: int, now: float, window: int, current: int, previous: int) -> int:
+    """Segundos hasta que la estimación baje lo suficiente para admitir una request"""
+    if limit <= 0:
+        return window_seconds
+    if current + 1 <= limit and previous:
+        # Basta con que siga bajando el aporte de la ventana anterior
+        fraction = 1.0 - (limit - current - 1) / previous
+        target = (window + fraction) * window_seconds
+    else:
+        # Hay que esperar a la próxima ventana, donde la actual pasa a ser la anterior
+        fraction = max(0.0, 1.0 - (limit - 1) / current) if current else 0.0
+        target = (window + 1 + fraction) * window_seconds
+    return max(1, math.ceil(target - now))
+
+
+def _fail_open(window_seconds: int, limit: int, now: float, reason: str) -> RateLimitDecision:
+    """Admitir una request que no se pudo registrar a tiempo (no cuenta para el límite)"""
+    logger.warning("Rate limiting no disponible (%s); se admite la request sin contarla", reason)
+    reset_at = (int(now / window_seconds) + 1) * window_seconds
+    return RateLimitDecision(True, limit, max(0, limit - 1), reset_at, 0)
+
+
+def _validate(window_seconds: int, max_keys: int) -> None:
+    if window_seconds <= 0:
+        raise ValueError("window_seconds debe ser mayor que 0")
+    if max_keys <= 0:
+        raise ValueError("max_keys debe ser mayor que 0")
+
+
+class _WindowSlot:
+    """Contadores de una clave: ventana fija actual, su contador y el de la anterior"""
+
+    __slots__ = ("window", "current", "previous")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+
+
+class InMemoryRateLimitStore:
+    """
+    Contadores de ventana deslizante en memoria del proceso, con tabla LRU acotada.
+
+    No es thread-safe: está pensado para usarse desde el event loop del middleware.
+    """
+
+    def __init__(self, window_seconds: int = 60, max_keys: int = 100_000):
+        _validate(window_seconds, max_keys)
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._slots: "OrderedDict[str, _WindowSlot]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def close(self) -> None:
+        self._slots.clear()
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> RateLimitDecision:
+        """
+        Registrar una request de ``key`` si cabe dentro de ``limit``.
+
+        Las requests rechazadas no se cuentan.
+        """
+        if now is None:
+            now = time.time()
+
+        slot = self._slots.get(key)
+        if slot is None:
+            if len(self._slots) >= self.max_keys:
+                self._slots.popitem(last=False)
+            slot = self._slots[key] = _WindowSlot(0)
+            state = None
+        else:
+            self._slots.move_to_end(key)
+            state = (slot.window, slot.current, slot.previous)
+
+        decision, (slot.window, slot.current, slot.previous) = sliding_window(
+            self.window_seconds, limit, now, state
+        )
+        return decision
+
+
+class SharedMemoryRateLimitStore:
+    """
+    Contadores en una tabla hash de tamaño fijo sobre un archivo mapeado en memoria.
+
+    Todos los workers que abren el mismo ``path`` comparten los contadores. Cada slot guarda
+    un hash de 64 bits de la clave y su estado (24 bytes); la tabla tiene al menos el doble
+    de slots que ``max_keys`` y se recorre con sondeo lineal. Si no queda un slot libre cerca,
+    se reutiliza el que lleva más tiempo sin requests, así que el archivo no crece nunca.
+
+    Cada ``hit`` toma un bloqueo exclusivo del archivo (``flock``) mientras lee y escribe el
+    slot, lo que lo hace atómico entre procesos. Si otro proceso lo retiene más de
+    ``lock_timeout_ms``, la request se admite sin contarla. Solo funciona en sistemas POSIX y
+    todos los workers deben usar la misma configuración: si cambian ``max_keys`` o
+    ``window_seconds`` la tabla se reinicia.
+    """
+
+    _HEADER = struct.Struct("<8sII")
+    _SLOT = struct.Struct("<QqII")
+    _MAGIC = b"SGHRL001"
+    _MAX_PROBES = 32
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window_seconds: int = 60,
+        max_keys: int = 100_000,
+        lock_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS,
+    ):
+        import fcntl
+
+        _validate(window_seconds, max_keys)
+        self._fcntl = fcntl
+        self.window_seconds = window_seconds
+        self.lock_timeout = lock_timeout_ms / 1000
+        self.path = path or os.path.join(_shm_dir(), "sgh-rate-limit")
+        self.n_slots = 1 << max(4, (2 * max_keys - 1).bit_length())
+        self._size = self._HEADER.size + self.n_slots * self._SLOT.size
+        self._lock = threading.Lock()
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, self._HEADER.size, 0)
+            expected = self._HEADER.pack(self._MAGIC, self.n_slots, window_seconds)
+            if header != expected or os.fstat(self._fd).st_size != self._size:
+                # Archivo nuevo o de otra configuración: tabla vacía
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self._size)
+                os.pwrite(self._fd, expected, 0)
+            self._map = mmap.mmap(self._fd, self._size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    def _try_lock(self) -> bool:
+        """Tomar el ``flock`` exclusivo esperando a lo más ``lock_timeout``"""
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_EX | self._fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(_LOCK_RETRY_SECONDS)
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> RateLimitDecision:
+        if now is None:
+            now = time.time()
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") | 1
+        mask = self.n_slots - 1
+        base = self._HEADER.size
+        unpack, pack = self._SLOT.unpack_from, self._SLOT.pack_into
+
+        with self._lock:
+            if not self._try_lock():
+                return _fail_open(self.window_seconds, limit, now, "bloqueo de la tabla compartida ocupado")
+            try:
+                offset = state = victim = None
+                oldest = None
+                for probe in range(self._MAX_PROBES):
+                    candidate = base + ((key_hash + probe) & mask) * self._SLOT.size
+                    slot_hash, window, current, previous = unpack(self._map, candidate)
+                    if slot_hash == key_hash:
+                        offset, state = candidate, (window, current, previous)
+                        break
+                    if slot_hash == 0:
+                        offset = candidate
+                        break
+                    if oldest is None or window < oldest:
+                        victim, oldest = candidate, window
+                if offset is None:
+                    offset = victim
+
+                decision, (window, current, previous) = sliding_window(self.window_seconds, limit, now, state)
+                pack(self._map, offset, key_hash, window, current, previous)
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+        return decision
+
+
+class SQLiteRateLimitStore:
+    """
+    Contadores en una tabla SQLite en modo WAL, persistentes y compartidos entre procesos.
+
+    Cada ``hit`` es una transacción ``BEGIN IMMEDIATE`` (lectura, decisión y escritura con el
+    bloqueo de escritura tomado), así que es atómico entre workers. Cada ``prune_every``
+    requests se borran las claves sin actividad en las dos últimas ventanas, que ya no
+    afectan ninguna decisión. Si la base sigue bloqueada por otro worker después de
+    ``busy_timeout_ms``, la request se admite sin contarla.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window_seconds: int = 60,
+        prune_every: int = 10_000,
+        busy_timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS,
+    ):
+        _validate(window_seconds, max_keys=1)
+        if prune_every <= 0:
+            raise ValueError("prune_every debe ser mayor que 0")
+        self.window_seconds = window_seconds
+        self.path = path or os.path.join(tempfile.gettempdir(), "sgh-rate-limit.sqlite3")
+        self.prune_every = prune_every
+        self._hits = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            " key TEXT PRIMARY KEY,"
+            " window INTEGER NOT NULL,"
+            " current INTEGER NOT NULL,"
+            " previous INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> RateLimitDecision:
+        if now is None:
+            now = time.time()
+        with self._lock:
+            conn = self._conn
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    state = conn.execute(
+                        "SELECT window, current, previous FROM rate_limit WHERE key = ?", (key,)
+                    ).fetchone()
+                    decision, (window, current, previous) = sliding_window(self.window_seconds, limit, now, state)
+                    if decision.allowed or state is None or state[0] != window:
+                        conn.execute(
+                            "INSERT INTO rate_limit (key, window, current, previous) VALUES (?, ?, ?, ?)"
+                            " ON CONFLICT (key) DO UPDATE SET"
+                            " window = excluded.window, current = excluded.current, previous = excluded.previous",
+                            (key, window, current, previous),
+                        )
+                    self._hits += 1
+                    if self._hits % self.prune_every == 0:
+                        conn.execute("DELETE FROM rate_limit WHERE window < ?", (window - 1,))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.OperationalError as exc:
+                # Base bloqueada por otro worker (o sin espacio): mejor admitir que trabar el loop
+                return _fail_open(self.window_seconds, limit, now, str(exc))
+        return decision
+
+
+def create_rate_limit_store(
+    backend: str = BACKEND_MEMORY,
+    window_seconds: int = 60,
+    max_keys: int = 100_000,
+    path: Optional[str] = None,
+) -> RateLimitStore:
+    """Crear el almacenamiento configurado (``memory``, ``shared_memory`` o ``sqlite``)"""
+    if backend == BACKEND_MEMORY:
+        return InMemoryRateLimitStore(window_seconds, max_keys=max_keys)
+    if backend == BACKEND_SHARED_MEMORY:
+        return SharedMemoryRateLimitStore(path, window_seconds=window_seconds, max_keys=max_keys)
+    if backend == BACKEND_SQLITE:
+        return SQLiteRateLimitStore(path, window_seconds=window_seconds)
+    raise ValueError(f"Backend de rate limiting desconocido: {backend}")
+
+
+def _shm_dir() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+__all__ = [
+    "BACKEND_MEMORY",
+    "BACKEND_SHARED_MEMORY",
+    "BACKEND_SQLITE",
+    "DEFAULT_LOCK_TIMEOUT_MS",
+    "InMemoryRateLimitStore",
+    "RateLimitDecision",
+    "RateLimitStore",
+    "SQLiteRateLimitStore",
+    "SharedMemoryRateLimitStore",
+    "create_rate_limit_store",
+    "sliding_window",
+]
@@ -4,7 +4,6 @@ Middleware de sanitización de entrada para prevenir inyecciones y ataques XSS.
 
 import json
 import logging
-import re
 from typing import Any, Dict
 
 from fastapi import status
@@ -12,6 +11,14 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
+from .injection_scanner import (
+    CATEGORY_PATH,
+    CATEGORY_SQL,
+    CATEGORY_XSS,
+    MAX_SCAN_LENGTH,
+    InjectionScanner,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +32,7 @@ class SanitizationMiddleware(BaseHTTPMiddleware):
     - Detecta path traversal
     - Valida tipos de contenido
     - Limita tamaño de payload
+    - Evalúa todos los patrones con un prefiltro de una sola pasada (ver ``InjectionScanner``)
     """
 
     # Patrones sospechosos para SQL Injection
@@ -71,12 +79,22 @@ class SanitizationMiddleware(BaseHTTPMiddleware):
         enable_sql_check: bool = True,
         enable_xss_check: bool = True,
         enable_path_check: bool = True,
+        max_scan_length: int = MAX_SCAN_LENGTH,  # Valores más largos se rechazan sin inspeccionar
     ):
         super().__init__(app)
         self.enable_sql_check = enable_sql_check
         self.enable_xss_check = enable_xss_check
         self.enable_path_check = enable_path_check
 
+        groups = []
+        if enable_sql_check:
+            groups.append((CATEGORY_SQL, self.SQL_INJECTION_PATTERNS))
+        if enable_xss_check:
+            groups.append((CATEGORY_XSS, self.XSS_PATTERNS))
+        if enable_path_check:
+            groups.append((CATEGORY_PATH, self.PATH_TRAVERSAL_PATTERNS))
+        self.scanner = InjectionScanner(groups, max_scan_length=max_scan_length)
+
     async def dispatch(self, request: Request, call_next) -> Response:
         """
         Procesa cada solicitud y aplica sanitización.
@@ -198,36 +216,12 @@ class SanitizationMiddleware(BaseHTTPMiddleware):
         Verifica si una cadena contiene patrones sospechosos.
         Retorna False si se detectan patrones sospechosos.
         """
-        value_lower = value.lower()
-
-        # Check SQL Injection
-        if self.enable_sql_check:
-            for pattern in self.SQL_INJECTION_PATTERNS:
-                if re.search(pattern, value_lower, re.IGNORECASE):
-                    logger.warning(
-                        f"Posible SQL Injection detectado en {field_name}: "
-                        f"patrón '{pattern}' desde {request.client.host}"
-                    )
-                    return False
-
-        # Check XSS
-        if self.enable_xss_check:
-            for pattern in self.XSS_PATTERNS:
-                if re.search(pattern, value_lower, re.IGNORECASE):
-                    logger.warning(
-                        f"Posible XSS detectado en {field_name}: "
-                        f"patrón '{pattern}' desde {request.client.host}"
-                    )
-                    return False
-
-        # Check Path Traversal
-        if self.enable_path_check:
-            for pattern in self.PATH_TRAVERSAL_PATTERNS:
-                if re.search(pattern, value_lower, re.IGNORECASE):
-                    logger.warning(
-                        f"Posible Path Traversal detectado en {field_name}: "
-                        f"patrón '{pattern}' desde {request.client.host}"
-                    )
-                    return False
+        hit = self.scanner.scan(value)
+        if hit is not None:
+            logger.warning(
+                f"Posible {hit.category} detectado en {field_name}: "
+                f"patrón '{hit.pattern}' desde {request.client.host}"
+            )
+            return False
 
         return True
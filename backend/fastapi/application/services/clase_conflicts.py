@@ -0,0 +1,136 @@
+"""
+Validación en lote de choques de horario entre clases
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import time
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from infrastructure.database.clase_occupancy import RESOURCES, ClaseSlot
+from infrastructure.repositories.bloque_repository import BloqueRepository
+from infrastructure.repositories.clase_repository import ClaseRepository
+
+
+@dataclass(frozen=True)
+class ClaseConflict:
+    """
+    Choque de la propuesta ``index`` del lote en ``resource`` (docente, sala o seccion).
+
+    ``clase_ids`` son las clases existentes con las que se traslapa y ``with_indexes`` las
+    otras propuestas del mismo lote.
+    """
+
+    index: int
+    resource: str
+    resource_id: int
+    bloque_id: int
+    clase_ids: Tuple[int, ...] = ()
+    with_indexes: Tuple[int, ...] = ()
+
+
+class UnknownBloquesError(ValueError):
+    def __init__(self, bloque_ids: Iterable[int]):
+        self.bloque_ids = sorted(bloque_ids)
+        super().__init__(f"Bloques no encontrados: {', '.join(map(str, self.bloque_ids))}")
+
+
+class ClaseConflictChecker:
+    """
+    Encuentra todos los choques de un lote de clases propuestas.
+
+    Dos clases chocan si comparten docente, sala o sección y sus bloques se traslapan en el
+    mismo día (no solo si es el mismo bloque). Los intervalos de los bloques de los días
+    involucrados se leen con una sola consulta; la ocupación existente sale del índice en
+    memoria, y por cada recurso y día se hace un barrido ordenado por hora de inicio.
+    """
+
+    def __init__(self, clase_repository: ClaseRepository, bloque_repository: BloqueRepository):
+        self.clase_repository = clase_repository
+        self.bloque_repository = bloque_repository
+
+    def check(self, proposals: Sequence[ClaseSlot], exclude: Iterable[int] = ()) -> List[ClaseConflict]:
+        """
+        Validar ``proposals`` contra las clases existentes y entre sí.
+
+        ``exclude`` son clases existentes que el lote reemplaza (por ejemplo, las que se
+        mueven) y que por lo tanto no cuentan como choque.
+        """
+        bloques = self.bloque_repository.get_intervalos_mismos_dias(p.bloque_id for p in proposals)
+        unknown = {p.bloque_id for p in proposals} - bloques.keys()
+        if unknown:
+            raise UnknownBloquesError(unknown)
+
+        # Bitmap de los bloques de cada día, para cruzarlo con los ocupados por un recurso
+        day_masks: Dict[int, int] = defaultdict(int)
+        for bloque_id, (dia, _, _) in bloques.items():
+            day_masks[dia] |= 1 << bloque_id
+
+        exclude = set(exclude)
+        conflicts: List[ClaseConflict] = []
+        for resource, column in RESOURCES:
+            groups: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+            for index, proposal in enumerate(proposals):
+                resource_id = getattr(proposal, column)
+                if resource_id is not None:
+                    groups[(resource_id, bloques[proposal.bloque_id][0])].append(index)
+
+            for (resource_id, dia), indexes in groups.items():
+                intervals = [(bloques[proposals[i].bloque_id][1:], i, None) for i in indexes]
+                busy = self.clase_repository.get_bloques_ocupados(resource, resource_id) & day_masks[dia]
+                for bloque_id in _bits(busy):
+                    clase_ids = self.clase_repository.get_ocupacion(resource, resource_id, bloque_id) - exclude
+                    if clase_ids:
+                        intervals.append((bloques[bloque_id][1:], None, clase_ids))
+
+                for index, clase_ids, others in _sweep(intervals):
+                    conflicts.append(
+                        ClaseConflict(
+                            index=index,
+                            resource=resource,
+                            resource_id=resource_id,
+                            bloque_id=proposals[index].bloque_id,
+                            clase_ids=tuple(sorted(clase_ids)),
+                            with_indexes=tuple(sorted(others)),
+                        )
+                    )
+
+        conflicts.sort(key=lambda conflict: (conflict.index, conflict.resource))
+        return conflicts
+
+
+def _bits(mask: int):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def _sweep(intervals) -> List[Tuple[int, Set[int], Set[int]]]:
+    """
+    Barrido por hora de inicio: cada intervalo se compara solo con los que siguen abiertos.
+
+    ``intervals`` son ``((inicio, fin), índice de propuesta o None, clases existentes o None)``.
+    Retorna ``(índice, clases, otras propuestas)`` de cada propuesta que se traslapa con algo.
+    """
+    hits: Dict[int, Tuple[Set[int], Set[int]]] = {}
+    active: List[Tuple[time, int, Set[int]]] = []
+    for (inicio, fin), index, clase_ids in sorted(intervals, key=lambda item: item[0]):
+        active = [item for item in active if item[0] > inicio]
+        for _, other_index, other_clases in active:
+            if index is not None:
+                clases, others = hits.setdefault(index, (set(), set()))
+                if other_index is None:
+                    clases |= other_clases
+                else:
+                    others.add(other_index)
+            if other_index is not None:
+                clases, others = hits.setdefault(other_index, (set(), set()))
+                if index is None:
+                    clases |= clase_ids
+                else:
+                    others.add(index)
+        active.append((fin, index, clase_ids))
+    return [(index, clases, others) for index, (clases, others) in hits.items()]
+
+
+__all__ = ["ClaseConflict", "ClaseConflictChecker", "UnknownBloquesError"]
@@ -0,0 +1,73 @@
+"""
+Compilación de las restricciones de horario de los docentes a restricciones de FET
+"""
+from collections import defaultdict
+from typing import Dict, Iterable
+
+from application.services.timetable_calendar import CalendarGrid
+from domain.models import RestriccionHorario
+from domain.timetable_schemas import NotAvailableSlot, TeacherNotAvailableConstraint
+
+# Peso de la restricción en FET: la disponibilidad del docente es obligatoria
+TEACHER_AVAILABILITY_WEIGHT = 100.0
+
+
+class TeacherAvailabilityCompiler:
+    """
+    Convierte las filas de ``restriccion_horario`` en un bitmap de slots no disponibles por
+    docente.
+
+    - Una restricción con ``disponible=False`` bloquea los bloques que se traslapan con su
+      intervalo.
+    - Si el docente declaró intervalos con ``disponible=True``, esa es su disponibilidad:
+      se bloquean además todos los bloques fuera de ellos.
+
+    Un bloque se considera afectado si el intervalo lo toca aunque sea en parte. Las
+    restricciones inactivas, de días fuera del calendario o con intervalos vacíos se ignoran.
+    """
+
+    def __init__(self, grid: CalendarGrid):
+        self.grid = grid
+
+    def compile(self, restricciones: Iterable[RestriccionHorario]) -> Dict[int, int]:
+        """``{docente_id: bitmap de slots no disponibles}`` (solo docentes con alguno)"""
+        blocked: Dict[int, int] = defaultdict(int)
+        available: Dict[int, int] = {}
+        for restriccion in restricciones:
+            if restriccion.activa is False:
+                continue
+            mask = self.grid.interval_mask(restriccion.dia_semana, restriccion.hora_inicio, restriccion.hora_fin)
+            if restriccion.disponible is False:
+                blocked[restriccion.docente_id] |= mask
+            else:
+                available[restriccion.docente_id] = available.get(restriccion.docente_id, 0) | mask
+
+        unavailable = {}
+        for docente_id in set(blocked) | set(available):
+            mask = blocked.get(docente_id, 0)
+            if docente_id in available:
+                mask |= self.grid.full_mask & ~available[docente_id]
+            if mask:
+                unavailable[docente_id] = mask
+        return unavailable
+
+    def constraint(self, docente_id: int, mask: int) -> TeacherNotAvailableConstraint:
+        """Una sola restricción por docente, con sus slots ordenados y sin repetir"""
+        return TeacherNotAvailableConstraint(
+            weight=TEACHER_AVAILABILITY_WEIGHT,
+            teacher_id=f"t-{docente_id}",
+            not_available_slots=[
+                NotAvailableSlot(day_index=day_index, hour_index=hour_index)
+                for day_index, hour_index in map(self.grid.position, self.grid.slots(mask))
+            ],
+        )
+
+    def constraints(self, restricciones: Iterable[RestriccionHorario]) -> Dict[int, TeacherNotAvailableConstraint]:
+        """Restricción de FET de cada docente con slots no disponibles"""
+        return {
+            docente_id: self.constraint(docente_id, mask)
+            for docente_id, mask in self.compile(restricciones).items()
+        }
+
+
+__all__ = ["TEACHER_AVAILABILITY_WEIGHT", "TeacherAvailabilityCompiler"]
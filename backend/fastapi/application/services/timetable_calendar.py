@@ -0,0 +1,91 @@
+"""
+Grilla de slots del calendario de FET (días x bloques)
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time
+from typing import Dict, Iterator, Optional, Tuple
+
+from domain.timetable_schemas import Calendar
+
+
+def parse_hour_range(name: str) -> Tuple[time, time]:
+    """``"08:00 - 09:00"`` -> ``(08:00, 09:00)``"""
+    inicio, fin = (part.strip() for part in name.split("-", 1))
+    return (
+        datetime.strptime(inicio, "%H:%M").time(),
+        datetime.strptime(fin, "%H:%M").time(),
+    )
+
+
+class CalendarGrid:
+    """
+    Slots de un ``Calendar`` numerados como FET: ``slot = día * horas_por_día + hora``.
+
+    Un conjunto de slots se representa como un entero usado de bitmap (bit ``slot``), así
+    que unir, restar o desplazar rangos completos son operaciones de una sola instrucción
+    sobre enteros en vez de recorrer slot por slot.
+
+    Los días del calendario empiezan en lunes (índice 0); ``dia_semana`` de la BD empieza en
+    domingo (0), de ahí que ``dia_semana = índice + 1``.
+    """
+
+    def __init__(self, calendar: Calendar):
+        hours = sorted(calendar.hours, key=lambda hour: hour.index)
+        self.hours_per_day = len(hours)
+        self.day_indexes = sorted(day.index for day in calendar.days)
+        self.hour_bounds = [parse_hour_range(hour.name) for hour in hours]
+        self._starts = [inicio for inicio, _ in self.hour_bounds]
+        self._ends = [fin for _, fin in self.hour_bounds]
+        self._day_mask = (1 << self.hours_per_day) - 1
+        self.full_mask = 0
+        for day_index in self.day_indexes:
+            self.full_mask |= self._day_mask << (day_index * self.hours_per_day)
+
+    def slot(self, day_index: int, hour_index: int) -> int:
+        return day_index * self.hours_per_day + hour_index
+
+    def position(self, slot: int) -> Tuple[int, int]:
+        """``slot`` -> ``(día, hora)``"""
+        return divmod(slot, self.hours_per_day)
+
+    def day_index(self, dia_semana: Optional[int]) -> Optional[int]:
+        """Índice del calendario para un ``dia_semana`` de la BD (None si no está en el calendario)"""
+        if dia_semana is None or dia_semana - 1 not in self.day_indexes:
+            return None
+        return dia_semana - 1
+
+    def bloque_key(self, slot: int) -> Tuple[int, time, time]:
+        """``(dia_semana, hora_inicio, hora_fin)`` del bloque de un slot"""
+        day_index, hour_index = self.position(slot)
+        if day_index not in self.day_indexes or not 0 <= hour_index < self.hours_per_day:
+            raise ValueError(f"Slot {slot} fuera del calendario")
+        inicio, fin = self.hour_bounds[hour_index]
+        return day_index + 1, inicio, fin
+
+    def interval_mask(self, dia_semana: Optional[int], inicio: Optional[time], fin: Optional[time]) -> int:
+        """
+        Bitmap de los slots de ese día que se traslapan con ``[inicio, fin)``.
+
+        Los bloques están ordenados y no se traslapan, así que los afectados son un rango
+        contiguo que se ubica con dos búsquedas binarias.
+        """
+        day_index = self.day_index(dia_semana)
+        if day_index is None or inicio is None or fin is None or fin <= inicio:
+            return 0
+        first = bisect_right(self._ends, inicio)
+        last = bisect_left(self._starts, fin)
+        if last <= first:
+            return 0
+        hours = ((1 << (last - first)) - 1) << first
+        return hours << (day_index * self.hours_per_day)
+
+    def slots(self, mask: int) -> Iterator[int]:
+        """Slots de un bitmap, en orden"""
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    def bloque_keys(self) -> Dict[int, Tuple[int, time, time]]:
+        """Bloque de cada slot del calendario"""
+        return {slot: self.bloque_key(slot) for slot in self.slots(self.full_mask)}
@@ -0,0 +1,106 @@
+"""
+Importación de horarios generados por FET a la tabla ``clase``
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from application.services.timetable_calendar import CalendarGrid
+from domain.timetable_schemas import Calendar, ScheduledActivity
+from infrastructure.repositories.clase_bulk_repository import BloqueKey, ClaseBulkRepository
+
+# Estado con que quedan las clases publicadas
+PUBLISHED_CLASS_STATUS = "programada"
+
+
+@dataclass
+class TimetableImportResult:
+    """Resumen de una importación"""
+
+    sections: List[int] = field(default_factory=list)
+    deleted_classes: int = 0
+    created_classes: int = 0
+    created_blocks: int = 0
+    unplaced_activities: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+
+class TimetableImportService:
+    """
+    Convierte el ``activities_schedule`` de FET en filas de ``clase``.
+
+    Cada slot (``día * horas_por_día + hora`` en el calendario del request) se traduce a un
+    ``Bloque`` (``dia_semana`` = día + 1, ya que 0 es domingo) y cada actividad a su sección
+    y docente según el mapeo guardado al enviar el job. Las clases de las secciones con
+    actividades ubicadas se reemplazan en una sola transacción; las secciones sin ninguna
+    actividad ubicada conservan sus clases y se informan como no ubicadas.
+    """
+
+    def __init__(self, bulk_repository: ClaseBulkRepository):
+        self.bulk_repository = bulk_repository
+
+    def import_schedule(
+        self,
+        calendar: Calendar,
+        activity_map: Dict[str, Sequence[int]],
+        schedule: Iterable[ScheduledActivity],
+    ) -> TimetableImportResult:
+        started = time.perf_counter()
+        slots = CalendarGrid(calendar).bloque_keys()
+
+        placements: Set[Tuple[int, int, int, BloqueKey]] = set()
+        placed_activities: Set[str] = set()
+        for entry in schedule:
+            activity_id = str(entry.id)
+            target = activity_map.get(activity_id)
+            if target is None or not entry.time_slots:
+                continue
+            seccion_id, docente_id = target
+            sala_id = self._sala_id(entry.room_id)
+            for slot in entry.time_slots:
+                if slot not in slots:
+                    raise ValueError(f"Slot {slot} fuera del calendario en la actividad {activity_id}")
+                placements.add((seccion_id, docente_id, sala_id, slots[slot]))
+            placed_activities.add(activity_id)
+
+        bloques, created_blocks = self.bulk_repository.get_or_create_bloques(
+            key for *_, key in placements
+        )
+        rows = [
+            {
+                "seccion_id": seccion_id,
+                "docente_id": docente_id,
+                "sala_id": sala_id,
+                "bloque_id": bloques[key],
+                "estado": PUBLISHED_CLASS_STATUS,
+            }
+            for seccion_id, docente_id, sala_id, key in sorted(placements, key=self._row_order)
+        ]
+        sections = sorted({row["seccion_id"] for row in rows})
+        deleted, created = self.bulk_repository.replace_for_secciones(sections, rows)
+
+        return TimetableImportResult(
+            sections=sections,
+            deleted_classes=deleted,
+            created_classes=created,
+            created_blocks=created_blocks,
+            unplaced_activities=sorted(set(activity_map) - placed_activities, key=self._activity_order),
+            elapsed_seconds=round(time.perf_counter() - started, 3),
+        )
+
+    def _sala_id(self, room_id) -> Optional[int]:
+        """``"r-12"`` -> ``12``; sin sala asignada la clase queda sin sala"""
+        if not room_id:
+            return None
+        if not str(room_id).startswith("r-"):
+            raise ValueError(f"Sala inválida en el horario generado: {room_id!r}")
+        return int(str(room_id)[len("r-"):])
+
+    @staticmethod
+    def _row_order(placement) -> tuple:
+        seccion_id, docente_id, sala_id, (dia, inicio, fin) = placement
+        return seccion_id, dia, inicio, fin, sala_id or 0, docente_id
+
+    @staticmethod
+    def _activity_order(activity_id: str) -> tuple:
+        return (0, int(activity_id), "") if activity_id.isdigit() else (1, 0, activity_id)
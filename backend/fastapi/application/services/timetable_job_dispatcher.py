@@ -0,0 +1,255 @@
+"""
+Envío y seguimiento en segundo plano de las generaciones de horario
+"""
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from application.services.timetable_request_cache import (
+    TimetableRequestCache,
+    timetable_request_cache,
+)
+from application.services.timetable_service import TimetableService
+from config import settings
+from domain.models import TimetableJob
+from domain.timetable_schemas import AgentJobInfo
+from infrastructure.agent_client import AgentClient, agent_client
+from infrastructure.database.config import SessionLocal
+from infrastructure.repositories.timetable_job_repository import TimetableJobRepository
+from infrastructure.repositories.timetable_snapshot_repository import TimetableSnapshotRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Las columnas DateTime de la BD no guardan zona horaria: se almacena en UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class TimetableJobDispatcher:
+    """
+    Lleva cada fila de ``timetable_job`` hasta ``succeeded`` o ``failed``.
+
+    En cada vuelta (cada ``poll_interval`` segundos, o antes si ``notify`` avisa de un job
+    nuevo) los jobs ``pending`` se toman (``dispatching``), se envían al agente y guardan el
+    id de su job, y los
+    ``queued``/``running`` se consultan al agente para actualizar estado, avance y ubicación
+    del resultado. Si el agente no está disponible se reintenta en la vuelta siguiente; si
+    ya no conoce un job (por ejemplo tras reiniciarse) se vuelve a enviar, hasta
+    ``max_attempts`` envíos. Si rechaza el request (4xx, p. ej. 422 por un payload
+    infactible) el job falla sin reintentos: el mismo request sería rechazado de nuevo.
+
+    Tomar el job es un ``UPDATE`` condicional, así que con varios workers o réplicas del
+    backend cada job se envía una sola vez; un ``dispatching`` de más de ``claim_timeout``
+    segundos quedó de un proceso caído y se vuelve a tomar.
+
+    El trabajo con la BD (leer los jobs, armar el request, guardar cada actualización) corre
+    en un thread con ``asyncio.to_thread``; en el event loop solo se espera al agente.
+
+    Como el estado vive en la BD, un reinicio del backend retoma los jobs donde quedaron.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        client: AgentClient = agent_client,
+        request_cache: Optional[TimetableRequestCache] = timetable_request_cache,
+        poll_interval: float = settings.timetable_poll_interval_seconds,
+        max_attempts: int = settings.timetable_job_max_attempts,
+        claim_timeout: float = settings.timetable_dispatch_claim_seconds,
+    ):
+        self.session_factory = session_factory
+        self.agent_client = client
+        self.request_cache = request_cache
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def notify(self) -> None:
+        """Adelantar la próxima vuelta (por ejemplo, al registrar un job nuevo)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Error al procesar las generaciones de horario")
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+
+    async def tick(self) -> None:
+        """Procesar una vez todos los jobs activos"""
+        session = self.session_factory()
+        try:
+            repository = TimetableJobRepository(session)
+            service = TimetableService(
+                snapshot_repository=TimetableSnapshotRepository(session),
+                request_cache=self.request_cache,
+                agent_client=self.agent_client,
+                job_repository=repository,
+            )
+            jobs = await asyncio.to_thread(repository.get_active)
+            # Separados de la sesión, los commits de cada actualización no los expiran y leer
+            # sus atributos en el event loop no vuelve a consultar la BD
+            session.expunge_all()
+            for job in jobs:
+                if job.status == "pending" or job.agent_job_id is None:
+                    await self._dispatch(service, repository, job)
+                else:
+                    await self._poll(service, repository, job)
+        finally:
+            await asyncio.to_thread(session.close)
+
+    async def _dispatch(
+        self, service: TimetableService, repository: TimetableJobRepository, job: TimetableJob
+    ) -> None:
+        now = _utcnow()
+        claimed = await asyncio.to_thread(
+            repository.claim_for_dispatch,
+            job.id,
+            now,
+            now - timedelta(seconds=self.claim_timeout),
+        )
+        if not claimed:
+            # Otro dispatcher ya lo está enviando
+            return
+
+        try:
+            request = await asyncio.to_thread(
+                service.build_request, job.semester, job.institution_name
+            )
+        except Exception as exc:
+            await asyncio.to_thread(
+                self._record_failure, repository, job, f"Error al generar horario: {exc}"
+            )
+            return
+
+        try:
+            agent_job = await service.submit_to_agent(request)
+        except HTTPException as exc:
+            if exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+                # Agente caído o saturado: no cuenta como intento
+                logger.warning("Generación %s en espera: %s", job.id, exc.detail)
+                await asyncio.to_thread(
+                    repository.update,
+                    job.id,
+                    {"status": "pending", "submitted_at": job.submitted_at},
+                )
+                return
+            # Un request rechazado por el agente no cambia al reenviarlo
+            rejected = (
+                400 <= exc.status_code < 500 and exc.status_code != status.HTTP_404_NOT_FOUND
+            )
+            await asyncio.to_thread(
+                self._record_failure, repository, job, str(exc.detail), terminal=rejected
+            )
+            return
+
+        logger.info("Generación %s enviada al agente como %s", job.id, agent_job.job_id)
+        await asyncio.to_thread(
+            self._apply,
+            service,
+            repository,
+            job,
+            agent_job,
+            agent_job_id=agent_job.job_id,
+            activity_map=service.activity_sections(request),
+            attempts=job.attempts + 1,
+            submitted_at=_utcnow(),
+            error=None,
+        )
+
+    async def _poll(
+        self, service: TimetableService, repository: TimetableJobRepository, job: TimetableJob
+    ) -> None:
+        try:
+            agent_job = await service.get_agent_job(job.agent_job_id)
+        except HTTPException as exc:
+            if exc.status_code == status.HTTP_404_NOT_FOUND:
+                # El agente perdió el job (reinicio): se vuelve a enviar
+                await asyncio.to_thread(
+                    self._record_failure, repository, job, str(exc.detail), resubmit=True
+                )
+            else:
+                logger.warning("No se pudo consultar la generación %s: %s", job.id, exc.detail)
+            return
+
+        await asyncio.to_thread(self._apply, service, repository, job, agent_job)
+
+    def _apply(
+        self,
+        service: TimetableService,
+        repository: TimetableJobRepository,
+        job: TimetableJob,
+        agent_job: AgentJobInfo,
+        **extra,
+    ) -> None:
+        data = {
+            "status": agent_job.status,
+            "started_at": _naive_utc(agent_job.started_at),
+            "finished_at": _naive_utc(agent_job.finished_at),
+            "placed_activities": agent_job.placed,
+            "total_activities": agent_job.total,
+            **extra,
+        }
+        if agent_job.status == "succeeded":
+            data["result_location"] = service.agent_result_location(agent_job.job_id)
+        elif agent_job.status == "failed":
+            data["error"] = agent_job.error
+        repository.update(job.id, data)
+
+    def _record_failure(
+        self,
+        repository: TimetableJobRepository,
+        job: TimetableJob,
+        error: str,
+        resubmit: bool = False,
+        terminal: bool = False,
+    ) -> None:
+        # Un reenvío por pérdida del job ya contó su envío; un envío fallido cuenta ahora
+        attempts = job.attempts if resubmit else job.attempts + 1
+        if terminal or attempts >= self.max_attempts:
+            logger.error("Generación %s fallida: %s", job.id, error)
+            repository.update(
+                job.id,
+                {"status": "failed", "attempts": attempts, "error": error, "finished_at": _utcnow()},
+            )
+            return
+        repository.update(
+            job.id,
+            {"status": "pending", "attempts": attempts, "agent_job_id": None, "error": error},
+        )
+
+
+timetable_job_dispatcher = TimetableJobDispatcher()
+
+
+__all__ = ["TimetableJobDispatcher", "timetable_job_dispatcher"]
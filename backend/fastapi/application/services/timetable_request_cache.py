@@ -0,0 +1,113 @@
+"""
+Caché del request de generación de horarios, versionado con los datos académicos
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from domain.timetable_schemas import (
+    Activity,
+    Space,
+    StudentGroup,
+    Subject,
+    Teacher,
+    TeacherNotAvailableConstraint,
+    TimetableGenerationRequest,
+)
+from infrastructure.database.academic_data_version import (
+    AcademicDataChange,
+    AcademicDataVersion,
+    academic_data_version,
+)
+
+
+@dataclass
+class CompiledSection:
+    """
+    Lo que aporta una sección al request: su grupo y, si tiene clases, su actividad.
+
+    ``clase_id`` es la primera clase de la sección y fija el orden de las actividades.
+    """
+
+    year: int
+    subject_id: Optional[int]
+    group: StudentGroup
+    clase_id: Optional[int] = None
+    activity: Optional[Activity] = None
+
+
+@dataclass
+class CompiledTimetable:
+    """Piezas ya construidas del request, indexadas por id para poder reemplazarlas"""
+
+    subjects: Dict[int, Subject] = field(default_factory=dict)
+    subject_durations: Dict[int, int] = field(default_factory=dict)
+    teachers: Dict[int, Teacher] = field(default_factory=dict)
+    sections: Dict[int, CompiledSection] = field(default_factory=dict)
+    teacher_availability: Dict[int, TeacherNotAvailableConstraint] = field(default_factory=dict)
+    space: Optional[Space] = None
+    request: Optional[TimetableGenerationRequest] = None
+
+    def copy(self) -> "CompiledTimetable":
+        """Copia de los índices (las piezas se comparten, nunca se modifican en sitio)"""
+        return CompiledTimetable(
+            subjects=dict(self.subjects),
+            subject_durations=dict(self.subject_durations),
+            teachers=dict(self.teachers),
+            sections=dict(self.sections),
+            teacher_availability=dict(self.teacher_availability),
+            space=self.space,
+        )
+
+
+# Recibe lo compilado antes (o None) y los cambios desde entonces; retorna lo nuevo
+Refresh = Callable[[Optional[CompiledTimetable], Optional[AcademicDataChange]], CompiledTimetable]
+
+
+class TimetableRequestCache:
+    """
+    Guarda el último ``CompiledTimetable`` junto a la versión de datos con que se armó.
+
+    Quien consulta pasa la versión confirmada (``datos_academicos_version``, leída una vez por
+    request). Si no cambió se reutiliza tal cual; si cambió se pide a ``refresh`` que aplique
+    solo los cambios acumulados, o que reconstruya todo cuando no se pueden acotar.
+    """
+
+    def __init__(self, history: AcademicDataVersion = academic_data_version):
+        self._history = history
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._compiled: Optional[CompiledTimetable] = None
+
+    def get(self, version: int, refresh: Refresh) -> CompiledTimetable:
+        with self._lock:
+            previous = self._compiled
+            change = None
+            if previous is not None:
+                if version == self._version:
+                    return previous
+                change = self._history.changes_since(self._version, version)
+                if change is None or change.full:
+                    previous, change = None, None
+
+            # La versión se lee antes de cargar: un commit concurrente solo provoca otro refresh
+            compiled = refresh(previous, change)
+            self._version = version
+            self._compiled = compiled
+            return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._compiled = None
+
+
+timetable_request_cache = TimetableRequestCache()
+
+
+__all__ = [
+    "CompiledSection",
+    "CompiledTimetable",
+    "TimetableRequestCache",
+    "timetable_request_cache",
+]
@@ -1,13 +1,22 @@
 """
 Servicio para generar horarios con FET
 """
-from typing import List
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
 import httpx
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 
 from domain.timetable_schemas import (
+    AgentJobInfo,
+    AgentRunSummary,
     TimetableGenerationRequest,
     TimetableGenerationResponse,
+    TimetablePublishResponse,
+    TimetableStatusResponse,
     TimetableMetadata,
     Calendar,
     CalendarDay,
@@ -27,37 +36,50 @@ from domain.timetable_schemas import (
     Room,
     BasicCompulsorySpaceConstraint,
 )
-from infrastructure.repositories.docente_repository import DocenteRepository
-from infrastructure.repositories.asignatura_repository import AsignaturaRepository
-from infrastructure.repositories.seccion_repository import SeccionRepository
-from infrastructure.repositories.clase_repository import ClaseRepository
-from infrastructure.repositories.sala_repository import SalaRepository
-from infrastructure.repositories.edificio_repository import SQLEdificioRepository
-from infrastructure.repositories.user_repository import SQLUserRepository
+from application.services.teacher_availability import TeacherAvailabilityCompiler
+from application.services.timetable_calendar import CalendarGrid
+from application.services.timetable_import_service import TimetableImportService
+from application.services.timetable_request_cache import (
+    CompiledSection,
+    CompiledTimetable,
+    TimetableRequestCache,
+)
+from domain.models import Asignatura, Clase, Docente, Edificio, Sala, Seccion
+from infrastructure.agent_client import AgentClient
+from infrastructure.agent_client import agent_client as default_agent_client
+from infrastructure.database.academic_data_version import AcademicDataChange
+from infrastructure.repositories.timetable_job_repository import TimetableJobRepository
+from infrastructure.repositories.timetable_snapshot_repository import (
+    TimetableSnapshot,
+    TimetableSnapshotRepository,
+)
 from config import settings
 
 
 class TimetableService:
-    """Servicio para generar horarios"""
+    """
+    Servicio para generar horarios.
+
+    Los datos académicos se leen una sola vez con ``TimetableSnapshotRepository`` y el
+    request para FET se arma desde esos diccionarios en memoria, sin consultas por fila.
+    Con un ``TimetableRequestCache`` las piezas ya armadas se reutilizan entre llamadas.
+    Las generaciones se registran en ``timetable_job`` y se envían al agente en segundo plano;
+    una vez terminadas se publican en ``clase`` con ``TimetableImportService``.
+    """
 
     def __init__(
         self,
-        docente_repository: DocenteRepository,
-        asignatura_repository: AsignaturaRepository,
-        seccion_repository: SeccionRepository,
-        clase_repository: ClaseRepository,
-        sala_repository: SalaRepository,
-        edificio_repository: SQLEdificioRepository,
-        user_repository: SQLUserRepository,
+        snapshot_repository: TimetableSnapshotRepository,
+        request_cache: Optional[TimetableRequestCache] = None,
+        agent_client: AgentClient = default_agent_client,
+        job_repository: Optional[TimetableJobRepository] = None,
+        import_service: Optional[TimetableImportService] = None,
     ):
-        self.docente_repository = docente_repository
-        self.asignatura_repository = asignatura_repository
-        self.seccion_repository = seccion_repository
-        self.clase_repository = clase_repository
-        self.sala_repository = sala_repository
-        self.edificio_repository = edificio_repository
-        self.user_repository = user_repository
-        self.agent_url = settings.agent_api_url or "http://agent:8200"
+        self.snapshot_repository = snapshot_repository
+        self.request_cache = request_cache
+        self.agent_client = agent_client
+        self.job_repository = job_repository
+        self.import_service = import_service
 
     def _get_static_calendar(self) -> Calendar:
         """Obtener calendario estático (5 días, 10 bloques)"""
@@ -84,39 +106,27 @@ class TimetableService:
 
         return Calendar(days=days, hours=hours)
 
-    def _get_static_student_years(self) -> List[StudentYear]:
+    def _group_id(self, seccion: Seccion) -> str:
+        """ID del grupo de estudiantes de una sección según su tipo"""
+        año = seccion.anio_academico
+        if seccion.tipo_grupo == "seccion":
+            return f"g-{año}-seccion-{seccion.id}"
+        elif seccion.tipo_grupo == "mencion":
+            return f"g-{año}-mencion-{seccion.id}"
+        elif seccion.tipo_grupo == "base":
+            return f"g-{año}-seccion-{seccion.id}"
+        return f"g-{año}-grupo-{seccion.id}"
+
+    def _get_static_student_years(self, sections: Dict[int, CompiledSection]) -> List[StudentYear]:
         """Obtener años y grupos desde la base de datos"""
-        from collections import defaultdict
-        
-        # Obtener todas las secciones
-        secciones_db = self.seccion_repository.get_all()
-        
         # Agrupar por año académico
         años_dict = defaultdict(lambda: {"grupos": [], "total": 0})
-        
-        for seccion in secciones_db:
-            año = seccion.anio_academico
-            
-            # Generar ID del grupo según tipo
-            if seccion.tipo_grupo == "seccion":
-                group_id = f"g-{año}-seccion-{seccion.id}"
-            elif seccion.tipo_grupo == "mencion":
-                group_id = f"g-{año}-mencion-{seccion.id}"
-            elif seccion.tipo_grupo == "base":
-                group_id = f"g-{año}-seccion-{seccion.id}"
-            else:
-                group_id = f"g-{año}-grupo-{seccion.id}"
-            
-            # Agregar grupo
-            años_dict[año]["grupos"].append(
-                StudentGroup(
-                    id=group_id,
-                    name=seccion.codigo,  # "1 sección 1", "5 mención 1", etc.
-                    students=seccion.numero_estudiantes
-                )
-            )
-            años_dict[año]["total"] += seccion.numero_estudiantes
-        
+
+        for seccion_id in sorted(sections):
+            section = sections[seccion_id]
+            años_dict[section.year]["grupos"].append(section.group)
+            años_dict[section.year]["total"] += section.group.students
+
         # Construir lista de StudentYear
         student_years = []
         for año in sorted(años_dict.keys()):
@@ -128,128 +138,112 @@ class TimetableService:
                     groups=años_dict[año]["grupos"]
                 )
             )
-        
+
         return student_years
 
-    def _build_subjects(self) -> List[Subject]:
-        """Construir lista de asignaturas desde la BD"""
-        asignaturas_db = self.asignatura_repository.get_all()
-        return [
-            Subject(
-                id=f"sub-{asig.id}",
-                name=asig.nombre,
-                code=asig.codigo,
-                comments="",
-            )
-            for asig in asignaturas_db
-        ]
+    def _build_subject(self, asig: Asignatura) -> Subject:
+        """Construir una asignatura desde la BD"""
+        return Subject(
+            id=f"sub-{asig.id}",
+            name=asig.nombre,
+            code=asig.codigo,
+            comments="",
+        )
 
-    def _build_teachers(self) -> List[Teacher]:
-        """Construir lista de docentes desde la BD"""
-        docentes_db = self.docente_repository.get_all()
-        teachers = []
-
-        for docente in docentes_db:
-            # Obtener el usuario asociado
-            user = self.user_repository.get_by_id(docente.user_id)
-            if user:
-                teachers.append(
-                    Teacher(
-                        id=f"t-{docente.user_id}",
-                        name=user.nombre,
-                        target_hours=0,
-                        comments=f"Departamento: {docente.departamento}",
-                    )
-                )
+    def _build_teacher(self, docente: Docente) -> Teacher:
+        """Construir un docente desde la BD (ya trae su usuario)"""
+        return Teacher(
+            id=f"t-{docente.user_id}",
+            name=docente.user.nombre,
+            target_hours=0,
+            comments=f"Departamento: {docente.departamento}",
+        )
 
-        return teachers
+    def _build_section(
+        self,
+        seccion: Seccion,
+        primera_clase: Optional[Clase],
+        subject_durations: Dict[int, int],
+    ) -> CompiledSection:
+        """Construir el grupo de una sección y su actividad (una por sección con clases)"""
+        group_id = self._group_id(seccion)
+        section = CompiledSection(
+            year=seccion.anio_academico,
+            subject_id=seccion.asignatura_id,
+            group=StudentGroup(
+                id=group_id,
+                name=seccion.codigo,  # "1 sección 1", "5 mención 1", etc.
+                students=seccion.numero_estudiantes
+            ),
+        )
+        total_duration = subject_durations.get(seccion.asignatura_id)
+        if primera_clase is None or total_duration is None:
+            return section
 
-    def _build_activities(self) -> List[Activity]:
-        """Construir actividades desde las clases programadas"""
-        clases_db = self.clase_repository.get_all()
-        activities = []
-        
-        # Agrupar clases por sección para calcular duración total
-        from collections import defaultdict
-        clases_por_seccion = defaultdict(list)
-        
-        for clase in clases_db:
-            if clase.seccion_id:
-                clases_por_seccion[clase.seccion_id].append(clase)
-        
-        activity_id = 1
-        for seccion_id, clases in clases_por_seccion.items():
-            # Obtener información de la primera clase
-            primera_clase = clases[0]
-            
-            # Obtener seccion
-            seccion = self.seccion_repository.get_by_id(seccion_id)
-            if not seccion:
-                continue
-                
-            # Obtener la asignatura
-            asignatura = self.asignatura_repository.get_by_id(seccion.asignatura_id)
-            if not asignatura:
-                continue
-
-            # Determinar referencia al grupo específico de la sección
-            if seccion.tipo_grupo == "seccion":
-                group_id = f"g-{seccion.anio_academico}-seccion-{seccion.id}"
-            elif seccion.tipo_grupo == "mencion":
-                group_id = f"g-{seccion.anio_academico}-mencion-{seccion.id}"
-            elif seccion.tipo_grupo == "base":
-                group_id = f"g-{seccion.anio_academico}-seccion-{seccion.id}"
-            else:
-                group_id = f"g-{seccion.anio_academico}-grupo-{seccion.id}"
-            
-            students_ref = StudentsReference(type="group", id=group_id)
-
-            # Calcular duración basada en horas de la asignatura
-            # Usar horas_presenciales como base (convertir a bloques de 1 hora)
-            total_duration = asignatura.horas_presenciales + asignatura.horas_mixtas
-            duration = min(2, total_duration)  # 2 bloques consecutivos por defecto, ajustable
-            
-            # Crear actividad
-            activities.append(
-                Activity(
-                    id=str(activity_id),
-                    group_id=str(seccion.id * 100),  # group_id como string
-                    teacher_id=f"t-{primera_clase.docente_id}",
-                    subject_id=f"sub-{asignatura.id}",
-                    students_reference=students_ref,
-                    duration=duration,
-                    total_duration=total_duration,
-                    active=True,
-                    comments=f"Sección: {seccion.codigo}",
-                )
-            )
-            activity_id += 1
+        # El id definitivo se asigna al armar el request, según el orden de las clases
+        section.clase_id = primera_clase.id
+        section.activity = Activity(
+            id="0",
+            group_id=str(seccion.id * 100),  # group_id como string
+            teacher_id=f"t-{primera_clase.docente_id}",
+            subject_id=f"sub-{seccion.asignatura_id}",
+            students_reference=StudentsReference(type="group", id=group_id),
+            duration=min(2, total_duration),  # 2 bloques consecutivos por defecto, ajustable
+            total_duration=total_duration,
+            active=True,
+            comments=f"Sección: {seccion.codigo}",
+        )
+        return section
+
+    def _total_duration(self, asig: Asignatura) -> int:
+        """Horas de la asignatura que se agendan (presenciales + mixtas, en bloques de 1 hora)"""
+        return asig.horas_presenciales + asig.horas_mixtas
 
+    def _build_activities(self, sections: Dict[int, CompiledSection]) -> List[Activity]:
+        """Numerar las actividades de las secciones en el orden de su primera clase"""
+        ordered = sorted(
+            (section for section in sections.values() if section.activity is not None),
+            key=lambda section: section.clase_id,
+        )
+        activities = []
+        for activity_id, section in enumerate(ordered, start=1):
+            activity = section.activity
+            if activity.id != str(activity_id):
+                activity = activity.model_copy(update={"id": str(activity_id)})
+            activities.append(activity)
         return activities
 
-    def _build_time_constraints(self) -> List[TimeConstraint]:
-        """Devolver restricciones de tiempo vacías (no se usan de momento)"""
-        return []
+    def _availability_compiler(self) -> TeacherAvailabilityCompiler:
+        return TeacherAvailabilityCompiler(CalendarGrid(self._get_static_calendar()))
+
+    def _build_time_constraints(self, compiled: CompiledTimetable) -> List[TimeConstraint]:
+        """Restricción básica más la disponibilidad de los docentes incluidos en el request"""
+        constraints: List[TimeConstraint] = [
+            BasicCompulsoryTimeConstraint(type="basic_compulsory_time", weight=100.0, active=True)
+        ]
+        constraints.extend(
+            compiled.teacher_availability[user_id]
+            for user_id in sorted(compiled.teacher_availability)
+            if user_id in compiled.teachers
+        )
+        return constraints
 
-    def _build_space(self) -> Space:
+    def _build_space(self, edificios: List[Edificio], salas: List[Sala]) -> Space:
         """Construir configuración de espacios"""
-        # Obtener edificios
-        edificios_db = self.edificio_repository.get_all()
         buildings = [
-            Building(id=f"b-{edif.id}", name=edif.nombre, comments="") for edif in edificios_db
+            Building(id=f"b-{edif.id}", name=edif.nombre, comments="")
+            for edif in edificios
         ]
 
-        # Obtener salas
-        salas_db = self.sala_repository.get_all()
         rooms = [
             Room(
                 id=f"r-{sala.id}",
-                name=sala.numero,
+                name=sala.codigo,
                 building_id=f"b-{sala.edificio_id}",
                 capacity=sala.capacidad,
                 comments="",
             )
-            for sala in salas_db
+            for sala in salas
         ]
 
         # Restricción básica de espacio
@@ -263,61 +257,355 @@ class TimetableService:
             buildings=buildings, rooms=rooms, space_constraints=space_constraints
         )
 
-    async def generate_timetable(
-        self, semester: str, institution_name: str
+    def _compile(self, snapshot: TimetableSnapshot) -> CompiledTimetable:
+        """Construir todas las piezas del request desde una foto completa de la BD"""
+        compiled = CompiledTimetable(
+            subjects={asig_id: self._build_subject(asig) for asig_id, asig in snapshot.asignaturas.items()},
+            subject_durations={
+                asig_id: self._total_duration(asig) for asig_id, asig in snapshot.asignaturas.items()
+            },
+            teachers={docente.user_id: self._build_teacher(docente) for docente in snapshot.docentes},
+            space=self._build_space(snapshot.edificios, snapshot.salas),
+            teacher_availability=self._availability_compiler().constraints(snapshot.restricciones),
+        )
+        for seccion_id, seccion in snapshot.secciones.items():
+            compiled.sections[seccion_id] = self._build_section(
+                seccion, snapshot.primeras_clases.get(seccion_id), compiled.subject_durations
+            )
+        return compiled
+
+    def _apply_changes(self, previous: CompiledTimetable, change: AcademicDataChange) -> CompiledTimetable:
+        """Reconstruir solo las piezas afectadas por ``change``, leyendo solo esas filas"""
+        compiled = previous.copy()
+        repository = self.snapshot_repository
+
+        if change.subject_ids:
+            asignaturas = repository.load_asignaturas(change.subject_ids)
+            for asig_id in change.subject_ids:
+                asig = asignaturas.get(asig_id)
+                if asig is None:
+                    compiled.subjects.pop(asig_id, None)
+                    compiled.subject_durations.pop(asig_id, None)
+                else:
+                    compiled.subjects[asig_id] = self._build_subject(asig)
+                    compiled.subject_durations[asig_id] = self._total_duration(asig)
+
+        if change.teacher_ids:
+            docentes = repository.load_docentes(change.teacher_ids)
+            for user_id in change.teacher_ids:
+                if user_id in docentes:
+                    compiled.teachers[user_id] = self._build_teacher(docentes[user_id])
+                else:
+                    compiled.teachers.pop(user_id, None)
+
+        if change.restricted_teacher_ids:
+            availability = self._availability_compiler().constraints(
+                repository.load_restricciones(change.restricted_teacher_ids)
+            )
+            for docente_id in change.restricted_teacher_ids:
+                if docente_id in availability:
+                    compiled.teacher_availability[docente_id] = availability[docente_id]
+                else:
+                    compiled.teacher_availability.pop(docente_id, None)
+
+        if change.rooms:
+            compiled.space = self._build_space(*repository.load_espacios())
+
+        # La duración de una actividad depende de su asignatura
+        section_ids = set(change.section_ids)
+        if change.subject_ids:
+            section_ids.update(
+                seccion_id
+                for seccion_id, section in compiled.sections.items()
+                if section.subject_id in change.subject_ids
+            )
+        if section_ids:
+            secciones, primeras_clases = repository.load_secciones(section_ids)
+            for seccion_id in section_ids:
+                seccion = secciones.get(seccion_id)
+                if seccion is None:
+                    compiled.sections.pop(seccion_id, None)
+                else:
+                    compiled.sections[seccion_id] = self._build_section(
+                        seccion, primeras_clases.get(seccion_id), compiled.subject_durations
+                    )
+        return compiled
+
+    def _refresh(
+        self,
+        previous: Optional[CompiledTimetable],
+        change: Optional[AcademicDataChange],
+    ) -> CompiledTimetable:
+        if previous is None or change is None:
+            compiled = self._compile(self.snapshot_repository.load())
+        else:
+            compiled = self._apply_changes(previous, change)
+
+        # La metadata depende de cada llamada y se reemplaza en build_request
+        compiled.request = TimetableGenerationRequest(
+            metadata=TimetableMetadata(timetable_id="", semester="", institution_name=""),
+            calendar=self._get_static_calendar(),
+            subjects=[compiled.subjects[asig_id] for asig_id in sorted(compiled.subjects)],
+            teachers=[compiled.teachers[user_id] for user_id in sorted(compiled.teachers)],
+            student_years=self._get_static_student_years(compiled.sections),
+            activities=self._build_activities(compiled.sections),
+            time_constraints=self._build_time_constraints(compiled),
+            space=compiled.space,
+        )
+        return compiled
+
+    def build_request(self, semester: str, institution_name: str) -> TimetableGenerationRequest:
+        """
+        Armar el request completo para FET.
+
+        Con ``request_cache`` el request se reutiliza mientras no cambie la versión de los
+        datos académicos (se lee de la BD una vez por llamada), y si cambió solo se releen y
+        reconstruyen las piezas afectadas.
+        Sin caché se arma desde una única lectura completa de la BD.
+        """
+        metadata = TimetableMetadata(
+            timetable_id=self._timetable_id(semester, institution_name),
+            semester=semester,
+            institution_name=institution_name,
+            comments="Generado desde SGH",
+        )
+
+        if self.request_cache is None:
+            compiled = self._refresh(None, None)
+        else:
+            compiled = self.request_cache.get(self.snapshot_repository.get_version(), self._refresh)
+        return compiled.request.model_copy(update={"metadata": metadata})
+
+    def create_generation(
+        self, semester: str, institution_name: str, user_id: Optional[int] = None
     ) -> TimetableGenerationResponse:
         """
-        Generar horario completo y enviarlo al agente
+        Registrar una generación de horario en ``timetable_job``.
+
+        El envío al agente y el seguimiento los hace ``TimetableJobDispatcher`` en segundo
+        plano, así que la petición HTTP no queda abierta mientras FET resuelve.
+        """
+        timetable_id = self._timetable_id(semester, institution_name)
+        job = self.job_repository.create(
+            {
+                "timetable_id": timetable_id,
+                "semester": semester,
+                "institution_name": institution_name,
+                "status": "pending",
+                "created_by": user_id,
+            }
+        )
+        return TimetableGenerationResponse(
+            success=True,
+            message="Generación registrada; se enviará al agente en segundo plano",
+            timetable_id=timetable_id,
+            job_id=str(job.id),
+            status=job.status,
+        )
+
+    def get_generation_status(self, job_id: int) -> TimetableStatusResponse:
+        """
+        Consultar el estado de una generación desde ``timetable_job``
+        """
+        job = self.job_repository.get_by_id(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No existe la generación {job_id}",
+            )
+
+        return TimetableStatusResponse(
+            job_id=job.id,
+            status=job.status,
+            timetable_id=job.timetable_id,
+            semester=job.semester,
+            institution_name=job.institution_name,
+            agent_job_id=job.agent_job_id,
+            attempts=job.attempts,
+            placed_activities=job.placed_activities,
+            total_activities=job.total_activities,
+            result_location=job.result_location,
+            error=job.error,
+            created_at=job.created_at,
+            submitted_at=job.submitted_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+
+    def activity_sections(self, request: TimetableGenerationRequest) -> Dict[str, List[int]]:
+        """
+        Sección y docente de cada actividad del request: ``{activity_id: [seccion_id, docente_id]}``.
+
+        Los ids de actividad son posicionales, así que el mapeo se guarda junto al job para
+        poder importar su resultado aunque los datos cambien después.
+        """
+        return {
+            activity.id: [int(activity.group_id) // 100, int(activity.teacher_id[len("t-"):])]
+            for activity in request.activities
+        }
+
+    async def submit_to_agent(self, request: TimetableGenerationRequest) -> AgentJobInfo:
+        """
+        Encolar el request en el agente (la corrida de FET es asíncrona).
+
+        Retorna el job creado por el agente.
         """
         try:
-            # Construir metadata
-            timetable_id = f"{semester}-{institution_name.lower().replace(' ', '-')}"
-            metadata = TimetableMetadata(
-                timetable_id=timetable_id,
-                semester=semester,
-                institution_name=institution_name,
-                comments="Generado desde SGH",
+            response = await self.agent_client.post_json(
+                "/fet/run",
+                request.model_dump_json(),
+                headers=self._agent_headers(),
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"No se pudo conectar con el agente: {str(e)}",
             )
 
-            # Construir request completo
-            request = TimetableGenerationRequest(
-                metadata=metadata,
-                calendar=self._get_static_calendar(),
-                subjects=self._build_subjects(),
-                teachers=self._build_teachers(),
-                student_years=self._get_static_student_years(),
-                activities=self._build_activities(),
-                time_constraints=self._build_time_constraints(),
-                space=self._build_space(),
+        if response.status_code == 503:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El agente está saturado, intenta más tarde",
+                headers={"Retry-After": response.headers.get("Retry-After", "60")},
+            )
+        if 400 <= response.status_code < 500 and response.status_code != 404:
+            # El agente rechazó el request (p. ej. 422 si el payload es infactible)
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"El agente rechazó el request: {response.text}",
+            )
+        if response.status_code != 202:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Error del agente: {response.text}",
             )
 
-            # Enviar al agente
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.post(
-                    f"{self.agent_url}/timetable/generate",
-                    json=request.model_dump(),
-                    headers={
-                        "Authorization": f"Bearer {settings.service_auth_token}",
-                        "X-Service-Name": "sgh-backend",
-                    },
-                )
+        return AgentJobInfo(**response.json())
 
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=status.HTTP_502_BAD_GATEWAY,
-                        detail=f"Error del agente: {response.text}",
-                    )
+    async def get_agent_job(self, agent_job_id: str) -> AgentJobInfo:
+        """
+        Consultar al agente el estado de uno de sus jobs
+        """
+        try:
+            response = await self.agent_client.get(
+                f"/fet/jobs/{agent_job_id}", headers=self._agent_headers()
+            )
+        except httpx.RequestError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"No se pudo conectar con el agente: {str(e)}",
+            )
 
-                result = response.json()
-                return TimetableGenerationResponse(**result)
+        if response.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"El agente no conoce el job {agent_job_id}",
+            )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Error del agente: {response.text}",
+            )
 
+        return AgentJobInfo(**response.json())
+
+    async def get_agent_result(self, agent_job_id: str) -> AgentRunSummary:
+        """
+        Obtener del agente el resumen de un job terminado
+        """
+        try:
+            response = await self.agent_client.get(
+                f"/fet/jobs/{agent_job_id}/result", headers=self._agent_headers()
+            )
         except httpx.RequestError as e:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail=f"No se pudo conectar con el agente: {str(e)}",
             )
-        except Exception as e:
+
+        if response.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"El agente ya no tiene el resultado del job {agent_job_id}",
+            )
+        if response.status_code != 200:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al generar horario: {str(e)}",
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Error del agente: {response.text}",
             )
+
+        return AgentRunSummary(**response.json())
+
+    async def publish_generation(self, job_id: int) -> TimetablePublishResponse:
+        """
+        Publicar el resultado de una generación terminada en la tabla ``clase``.
+
+        Las clases de las secciones ubicadas se reemplazan en una sola transacción; si algo
+        falla no cambia nada. Publicar de nuevo la misma generación deja el mismo horario.
+        El trabajo con la BD corre en un thread con ``asyncio.to_thread``; en el event loop
+        solo se espera al agente.
+        """
+        job = await asyncio.to_thread(self.job_repository.get_by_id, job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No existe la generación {job_id}",
+            )
+        if job.status != "succeeded":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"La generación {job_id} no ha terminado con éxito (estado: {job.status})",
+            )
+        if not job.activity_map:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"La generación {job_id} no tiene el mapeo de actividades para importarla",
+            )
+
+        summary = await self.get_agent_result(job.agent_job_id)
+        try:
+            result = await asyncio.to_thread(
+                self.import_service.import_schedule,
+                self._get_static_calendar(),
+                job.activity_map,
+                summary.activities_schedule,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Resultado inválido del agente: {str(e)}",
+            )
+        except IntegrityError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"El horario generado ya no es consistente con los datos: {str(e.orig)}",
+            )
+
+        published_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        # El commit de la importación expiró ``job``: leer sus atributos aquí volvería a
+        # consultar la BD en el event loop
+        await asyncio.to_thread(self.job_repository.update, job_id, {"published_at": published_at})
+        return TimetablePublishResponse(
+            job_id=job_id,
+            published_at=published_at,
+            sections=result.sections,
+            deleted_classes=result.deleted_classes,
+            created_classes=result.created_classes,
+            created_blocks=result.created_blocks,
+            unplaced_activities=result.unplaced_activities,
+            elapsed_seconds=result.elapsed_seconds,
+        )
+
+    def agent_result_location(self, agent_job_id: str) -> str:
+        """URL del resumen del job en el agente"""
+        return f"{self.agent_client.base_url}/fet/jobs/{agent_job_id}/result"
+
+    def _timetable_id(self, semester: str, institution_name: str) -> str:
+        return f"{semester}-{institution_name.lower().replace(' ', '-')}"
+
+    def _agent_headers(self) -> dict:
+        """Headers de autenticación servicio a servicio"""
+        return {
+            "Authorization": f"Bearer {settings.service_auth_token}",
+            "X-Service-Name": "sgh-backend",
+        }
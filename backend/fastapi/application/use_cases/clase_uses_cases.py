@@ -2,18 +2,25 @@ from typing import List, Optional
 
 from fastapi import HTTPException, status
 
-from domain.entities import Clase, ClaseCreate
-from domain.schemas import ClaseSecureCreate, ClaseSecurePatch
+from application.services.clase_conflicts import ClaseConflictChecker, UnknownBloquesError
+from domain.entities import Clase, ClaseConflicto, ClaseCreate, ClaseValidacionLote
+from domain.schemas import ClaseSecureCreate, ClaseSecurePatch, ClaseValidacionLoteSecure
+from infrastructure.database.clase_occupancy import ClaseSlot
+from infrastructure.repositories.bloque_repository import BloqueRepository
 from infrastructure.repositories.clase_repository import ClaseRepository
 from infrastructure.repositories.seccion_repository import SeccionRepository
 
 
 class ClaseUseCases:
     def __init__(
-        self, clase_repository: ClaseRepository, seccion_repository: SeccionRepository = None
+        self,
+        clase_repository: ClaseRepository,
+        seccion_repository: SeccionRepository = None,
+        bloque_repository: BloqueRepository = None,
     ):
         self.clase_repository = clase_repository
         self.seccion_repository = seccion_repository
+        self.bloque_repository = bloque_repository
 
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Clase]:
         """Obtener todas las clases con paginación"""
@@ -44,10 +51,12 @@ class ClaseUseCases:
                 # Fallback: no verificar conflictos de docente
                 docente_id = None
 
-        # Verificar conflictos de horario para el docente (solo si tenemos docente_id)
+        # Verificar conflictos de horario para el docente (solo si tenemos docente_id).
+        # El índice de ocupación compara clase_ocupacion_version una vez por transacción, así
+        # que también ve lo que confirmaron otros procesos
         if docente_id:
-            conflictos_docente = self.clase_repository.get_conflictos_docente(
-                docente_id, clase_data.bloque_id
+            conflictos_docente = self.clase_repository.get_ocupacion(
+                "docente", docente_id, clase_data.bloque_id
             )
             if conflictos_docente:
                 raise HTTPException(
@@ -56,8 +65,8 @@ class ClaseUseCases:
                 )
 
         # Verificar conflictos de horario para la sala
-        conflictos_sala = self.clase_repository.get_conflictos_sala(
-            clase_data.sala_id, clase_data.bloque_id
+        conflictos_sala = self.clase_repository.get_ocupacion(
+            "sala", clase_data.sala_id, clase_data.bloque_id
         )
         if conflictos_sala:
             raise HTTPException(
@@ -90,9 +99,9 @@ class ClaseUseCases:
             docente_id = update_data.get("docente_id", existing_clase.docente_id)
             bloque_id = update_data.get("bloque_id", existing_clase.bloque_id)
 
-            conflictos = self.clase_repository.get_conflictos_docente(docente_id, bloque_id)
+            conflictos = self.clase_repository.get_ocupacion("docente", docente_id, bloque_id)
             # Excluir la clase actual de los conflictos
-            conflictos = [c for c in conflictos if c.id != clase_id]
+            conflictos = conflictos - {clase_id}
             if conflictos:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -104,9 +113,9 @@ class ClaseUseCases:
             sala_id = update_data.get("sala_id", existing_clase.sala_id)
             bloque_id = update_data.get("bloque_id", existing_clase.bloque_id)
 
-            conflictos = self.clase_repository.get_conflictos_sala(sala_id, bloque_id)
+            conflictos = self.clase_repository.get_ocupacion("sala", sala_id, bloque_id)
             # Excluir la clase actual de los conflictos
-            conflictos = [c for c in conflictos if c.id != clase_id]
+            conflictos = conflictos - {clase_id}
             if conflictos:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -136,6 +145,47 @@ class ClaseUseCases:
             )
         return success
 
+    def validate_batch(self, lote: ClaseValidacionLoteSecure) -> ClaseValidacionLote:
+        """
+        Validar de una vez un lote de clases propuestas (nuevas o movidas).
+
+        Retorna los choques de docente, sala y sección de cada propuesta (por su posición en
+        el lote) contra las clases existentes y contra las otras propuestas, considerando
+        bloques distintos que se traslapan en horario. Una propuesta con ``clase_id`` mueve
+        esa clase, así que su posición actual no cuenta como choque.
+        """
+        if not self.bloque_repository:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Repositorio de bloques no configurado",
+            )
+
+        propuestas = [
+            ClaseSlot(p.seccion_id, p.docente_id, p.sala_id, p.bloque_id) for p in lote.propuestas
+        ]
+        movidas = [p.clase_id for p in lote.propuestas if p.clase_id is not None]
+        try:
+            conflictos = ClaseConflictChecker(self.clase_repository, self.bloque_repository).check(
+                propuestas, exclude=movidas
+            )
+        except UnknownBloquesError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+        return ClaseValidacionLote(
+            valido=not conflictos,
+            conflictos=[
+                ClaseConflicto(
+                    indice=c.index,
+                    tipo=c.resource,
+                    recurso_id=c.resource_id,
+                    bloque_id=c.bloque_id,
+                    clases=list(c.clase_ids),
+                    propuestas=list(c.with_indexes),
+                )
+                for c in conflictos
+            ],
+        )
+
     def get_by_seccion(self, seccion_id: int) -> List[Clase]:
         """Obtener clases de una sección específica"""
         return self.clase_repository.get_by_seccion(seccion_id)
@@ -1,3 +1,4 @@
+from datetime import time
 from typing import List, Optional
 
 from fastapi import HTTPException, status
@@ -136,3 +137,19 @@ class SalaUseCases:
     def get_salas_disponibles(self, bloque_id: int = None) -> List[Sala]:
         """Obtener salas disponibles en un bloque específico"""
         return self.sala_repository.get_salas_disponibles(bloque_id)
+
+    def get_salas_libres(
+        self,
+        dia_semana: int,
+        desde: time,
+        hasta: time,
+        capacidad_min: Optional[int] = None,
+        edificio_id: Optional[int] = None,
+    ) -> List[Sala]:
+        """Obtener salas sin clases en un intervalo de un día"""
+        if desde >= hasta:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La hora 'desde' debe ser anterior a la hora 'hasta'",
+            )
+        return self.sala_repository.get_libres(dia_semana, desde, hasta, capacidad_min, edificio_id)
@@ -0,0 +1,123 @@
+"""
+Benchmark del almacenamiento de rate limiting.
+
+Mide el costo por request de ``hit`` y la memoria de la tabla para distintas cantidades de
+IPs distintas y distintos almacenamientos, y compara el almacenamiento en memoria con el
+esquema anterior (lista de timestamps por IP que se filtra en cada request) a medida que
+crecen las requests por IP.
+
+Uso (desde ``backend/fastapi/``):
+
+    python -m benchmarks.rate_limit_benchmark --clients 1000 10000 100000 1000000
+    python -m benchmarks.rate_limit_benchmark --backends memory shared_memory sqlite --clients 10000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, List
+
+from application.middlewares.rate_limit_store import (
+    BACKEND_MEMORY,
+    InMemoryRateLimitStore,
+    create_rate_limit_store,
+)
+
+WINDOW_SECONDS = 60
+LIMIT = 200
+
+
+def client_ips(n_clients: int) -> List[str]:
+    return [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(n_clients)]
+
+
+def per_request_ns(fn: Callable[[], int]) -> float:
+    started = time.perf_counter()
+    requests = fn()
+    return (time.perf_counter() - started) / requests * 1e9
+
+
+def bench_clients(backend: str, n_clients: int, max_keys: int, rounds: int, tmp: str) -> None:
+    """Requests repartidas entre ``n_clients`` IPs (round-robin), a un ritmo constante"""
+    ips = client_ips(n_clients)
+    path = os.path.join(tmp, f"{backend}-{n_clients}")
+    store = create_rate_limit_store(backend, WINDOW_SECONDS, max_keys=max_keys, path=path)
+
+    def run() -> int:
+        now = 1_700_000_000.0
+        for _ in range(rounds):
+            for ip in ips:
+                store.hit(ip, LIMIT, now)
+                now += 0.0001
+        return rounds * len(ips)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    run()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Segunda pasada sin tracemalloc, con la tabla ya llena
+    ns = per_request_ns(run)
+    # Memoria del proceso para el de memoria; tamaño del archivo para los compartidos
+    size = after - before if backend == BACKEND_MEMORY else os.path.getsize(path)
+    store.close()
+    print(f"{backend:>13} {n_clients:>10} {max_keys:>9} {ns:>13.0f} {size / 2**20:>12.2f}")
+
+
+def bench_requests_per_client(requests_per_client: int) -> None:
+    """Una IP con ``requests_per_client`` requests en la ventana: esquema anterior vs actual"""
+    store = InMemoryRateLimitStore(WINDOW_SECONDS)
+    legacy = defaultdict(list)
+
+    def legacy_hit(ip: str, now: float) -> bool:
+        window_start = now - WINDOW_SECONDS
+        recent = [(ts, auth) for ts, auth in legacy[ip] if ts > window_start]
+        legacy[ip] = recent
+        if len(recent) >= requests_per_client:
+            return False
+        recent.append((now, False))
+        sum(1 for ts, _ in recent if ts > window_start)  # Headers
+        return True
+
+    def run(hit) -> Callable[[], int]:
+        def _run() -> int:
+            now = 1_700_000_000.0
+            for _ in range(requests_per_client):
+                hit("10.0.0.1", now)
+                now += 0.001
+            return requests_per_client
+
+        return _run
+
+    legacy_ns = per_request_ns(run(legacy_hit))
+    store_ns = per_request_ns(run(lambda ip, now: store.hit(ip, requests_per_client, now)))
+    print(f"{requests_per_client:>12} {legacy_ns:>14.0f} {store_ns:>13.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=[BACKEND_MEMORY])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--requests-per-client", type=int, nargs="+", default=[100, 1_000, 10_000])
+    args = parser.parse_args()
+
+    print(f"{'backend':>13} {'IPs':>10} {'max_keys':>9} {'ns/request':>13} {'memoria (MiB)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            for n_clients in args.clients:
+                bench_clients(backend, n_clients, args.max_keys, args.rounds, tmp)
+
+    print()
+    print(f"{'requests/IP':>12} {'anterior (ns)':>14} {'actual (ns)':>13}")
+    for requests_per_client in args.requests_per_client:
+        bench_requests_per_client(requests_per_client)
+
+
+if __name__ == "__main__":
+    main()
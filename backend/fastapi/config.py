@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 import pathlib
 
@@ -18,7 +18,32 @@ class Settings:
     debug: bool = environment == "development"
     
     # Agent API URL (para generación de horarios)
-    agent_api_url: str = os.getenv("AGENT_API_URL", "http://agent:8200")
+    agent_api_url: str = os.getenv("AGENT_API_URL", "http://agent:8200/api")
+
+    # Cliente HTTP hacia el agente: pool compartido con keep-alive y timeouts por fase
+    agent_connect_timeout: float = float(os.getenv("AGENT_CONNECT_TIMEOUT", "5"))
+    agent_read_timeout: float = float(os.getenv("AGENT_READ_TIMEOUT", "60"))
+    agent_write_timeout: float = float(os.getenv("AGENT_WRITE_TIMEOUT", "60"))
+    agent_pool_timeout: float = float(os.getenv("AGENT_POOL_TIMEOUT", "10"))
+    agent_max_connections: int = int(os.getenv("AGENT_MAX_CONNECTIONS", "20"))
+    agent_max_keepalive_connections: int = int(os.getenv("AGENT_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    agent_keepalive_expiry: float = float(os.getenv("AGENT_KEEPALIVE_EXPIRY", "30"))
+    # Cuerpos desde este tamaño (bytes) se envían comprimidos con gzip
+    agent_compression_min_bytes: int = int(os.getenv("AGENT_COMPRESSION_MIN_BYTES", "1024"))
+
+    # Generaciones de horario en segundo plano (tabla timetable_job)
+    timetable_poll_interval_seconds: float = float(os.getenv("TIMETABLE_POLL_INTERVAL_SECONDS", "5"))
+    timetable_job_max_attempts: int = int(os.getenv("TIMETABLE_JOB_MAX_ATTEMPTS", "3"))
+    # Un job en ``dispatching`` por más tiempo quedó de un proceso caído y se puede volver a tomar
+    timetable_dispatch_claim_seconds: float = float(
+        os.getenv("TIMETABLE_DISPATCH_CLAIM_SECONDS", "300")
+    )
+
+    # Rate limiting: "memory" (por proceso), "shared_memory" (workers del mismo host) o
+    # "sqlite" (compartido y persistente). RATE_LIMIT_PATH es el archivo de los dos últimos
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    rate_limit_path: Optional[str] = os.getenv("RATE_LIMIT_PATH")
+    rate_limit_max_clients: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
     
     # Service-to-Service Authentication
     # Token compartido entre backend y agent para comunicación interna
@@ -1,6 +1,6 @@
 import re
 from datetime import date, datetime, time
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
 
@@ -700,6 +700,24 @@ class Clase(ClaseBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ClaseConflicto(BaseModel):
+    """Choque de una clase propuesta con clases existentes u otras propuestas del lote"""
+
+    indice: int = Field(..., description="Posición de la propuesta en el lote")
+    tipo: Literal["docente", "sala", "seccion"] = Field(..., description="Recurso que choca")
+    recurso_id: int = Field(..., description="ID del docente, sala o sección")
+    bloque_id: int = Field(..., description="Bloque de la propuesta")
+    clases: List[int] = Field(default=[], description="Clases existentes con las que choca")
+    propuestas: List[int] = Field(default=[], description="Otras propuestas con las que choca")
+
+
+class ClaseValidacionLote(BaseModel):
+    """Resultado de validar un lote de clases propuestas"""
+
+    valido: bool = Field(..., description="Si ninguna propuesta tiene choques")
+    conflictos: List[ClaseConflicto] = Field(default=[], description="Choques encontrados")
+
+
 class RestriccionPatch(BaseModel):
     """DTO para actualizaciones parciales de restricciones"""
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Integer, String, Text, Time, UniqueConstraint, func
+from sqlalchemy import JSON, BigInteger, Boolean, Column, Date, DateTime, ForeignKey, Integer, String, Text, Time, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from infrastructure.database.config import Base
@@ -310,3 +310,71 @@ class PasswordResetAttempt(Base):
     
     # User agent para detección de bots
     user_agent = Column(Text, nullable=True)
+
+
+class TimetableJob(Base):
+    """
+    Generación de horario encargada al agente.
+
+    Es la fuente de verdad del estado de cada generación: el dispatcher la toma y la envía al
+    agente (``pending`` → ``dispatching`` → ``queued``) y el poller la sigue hasta
+    ``succeeded`` o ``failed``, así que sobrevive a desconexiones del cliente y a reinicios
+    del backend.
+    """
+    __tablename__ = "timetable_job"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    timetable_id = Column(Text, nullable=False)
+    semester = Column(String(20), nullable=False)
+    institution_name = Column(Text, nullable=False)
+
+    # pending | dispatching | queued | running | succeeded | failed
+    status = Column(String(20), nullable=False, default="pending", index=True)
+
+    # Job en el agente (NULL mientras no se haya enviado)
+    agent_job_id = Column(String(64), nullable=True, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    # Avance reportado por FET y ubicación del resultado en el agente
+    placed_activities = Column(Integer, nullable=True)
+    total_activities = Column(Integer, nullable=True)
+    result_location = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # {activity_id: [seccion_id, docente_id]} del request enviado, para importar el resultado
+    activity_map = Column(JSON, nullable=True)
+    published_at = Column(DateTime, nullable=True)
+
+    created_by = Column(Integer, ForeignKey("user.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=func.current_timestamp(), nullable=False)
+    updated_at = Column(DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
+    submitted_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ClaseOcupacionVersion(Base):
+    """
+    Contador de transacciones que escribieron clases o bloques (una sola fila).
+
+    Cada proceso del backend compara su índice de ocupación en memoria con este contador
+    para enterarse de lo que confirmaron los demás.
+    """
+    __tablename__ = "clase_ocupacion_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class DatosAcademicosVersion(Base):
+    """
+    Contador de transacciones que escribieron datos usados por la generación de horarios
+    (una sola fila).
+
+    Los cachés del request de generación comparan su versión con este contador, así que ven
+    también lo que confirmaron otros procesos.
+    """
+    __tablename__ = "datos_academicos_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
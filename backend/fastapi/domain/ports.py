@@ -1,4 +1,4 @@
-from typing import List, Optional, Protocol
+from typing import Iterator, List, Optional, Protocol
 
 from .entities import (
     Bloque,
@@ -17,6 +17,7 @@ class DocenteRepositoryPort(Protocol):
     def get_by_user_id(self, user_id: int) -> Optional[Docente]: ...
     def get_by_email(self, email: str) -> Optional[Docente]: ...
     def get_all(self) -> List[Docente]: ...
+    def iter_all(self, batch_size: int = 500) -> Iterator[Docente]: ...
     def update(self, user_id: int, docente_data: dict) -> Optional[Docente]: ...
     def delete(self, user_id: int) -> bool: ...
 
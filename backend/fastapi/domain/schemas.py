@@ -1339,6 +1339,30 @@ class ClaseSecurePatch(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class ClasePropuestaSecure(BaseModel):
+    """Clase propuesta (nueva o movida) para validar sus choques antes de guardarla"""
+
+    clase_id: Optional[conint(gt=0)] = Field(
+        None, description="Clase existente que se mueve (no choca consigo misma)"
+    )
+    seccion_id: conint(gt=0) = Field(..., description="ID de la sección")
+    docente_id: conint(gt=0) = Field(..., description="ID del docente (user_id del docente)")
+    sala_id: Optional[conint(gt=0)] = Field(None, description="ID de la sala")
+    bloque_id: conint(gt=0) = Field(..., description="ID del bloque horario")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ClaseValidacionLoteSecure(BaseModel):
+    """Lote de clases propuestas a validar en una sola llamada"""
+
+    propuestas: List[ClasePropuestaSecure] = Field(
+        ..., min_length=1, max_length=2000, description="Clases propuestas"
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
 # ============================================================================
 # SCHEMAS DE CONSULTA - Para filtros en endpoints
 # ============================================================================
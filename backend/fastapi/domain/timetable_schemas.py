@@ -1,7 +1,8 @@
 """
 Schemas para la generación de horarios con FET
 """
-from typing import List, Literal, Optional
+from datetime import datetime
+from typing import List, Literal, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -257,5 +258,79 @@ class TimetableGenerationResponse(BaseModel):
     success: bool = Field(..., description="Si la generación fue exitosa")
     message: str = Field(..., description="Mensaje descriptivo")
     timetable_id: str = Field(..., description="ID del horario generado")
+    job_id: Optional[str] = Field(None, description="ID del job de generación en el agente")
+    status: Optional[str] = Field(None, description="Estado del job de generación")
     file_url: Optional[str] = Field(None, description="URL del archivo FET generado")
     errors: List[str] = Field(default=[], description="Lista de errores si los hay")
+
+
+GenerationStatus = Literal["pending", "dispatching", "queued", "running", "succeeded", "failed"]
+
+
+class TimetableStatusResponse(BaseModel):
+    """Estado de una generación de horario registrada en el backend"""
+
+    job_id: int = Field(..., description="ID de la generación")
+    status: GenerationStatus = Field(..., description="Estado de la generación")
+    timetable_id: str = Field(..., description="ID del horario")
+    semester: str = Field(..., description="Semestre")
+    institution_name: str = Field(..., description="Nombre de la institución")
+    agent_job_id: Optional[str] = Field(None, description="ID del job en el agente, una vez enviado")
+    attempts: int = Field(0, description="Envíos al agente realizados")
+    placed_activities: Optional[int] = Field(None, description="Actividades ubicadas por FET")
+    total_activities: Optional[int] = Field(None, description="Actividades a ubicar")
+    result_location: Optional[str] = Field(None, description="URL del resultado en el agente")
+    error: Optional[str] = Field(None, description="Error de la generación")
+    created_at: datetime = Field(..., description="Fecha de registro")
+    submitted_at: Optional[datetime] = Field(None, description="Fecha de envío al agente")
+    started_at: Optional[datetime] = Field(None, description="Inicio de la ejecución")
+    finished_at: Optional[datetime] = Field(None, description="Fin de la ejecución")
+
+
+AgentJobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class AgentJobInfo(BaseModel):
+    """Estado de un job según lo reporta el agente"""
+
+    job_id: str = Field(..., description="ID del job en el agente")
+    status: AgentJobStatus = Field(..., description="Estado del job")
+    submitted_at: datetime = Field(..., description="Fecha de encolado en el agente")
+    started_at: Optional[datetime] = Field(None, description="Inicio de la ejecución")
+    finished_at: Optional[datetime] = Field(None, description="Fin de la ejecución")
+    error: Optional[str] = Field(None, description="Error reportado por el agente")
+    placed: Optional[int] = Field(None, description="Actividades ubicadas por FET")
+    total: Optional[int] = Field(None, description="Actividades a ubicar")
+
+
+class ScheduledActivity(BaseModel):
+    """Actividad ubicada por FET (entrada de ``activities_schedule`` del agente)"""
+
+    id: Union[int, str] = Field(..., description="ID de la actividad en el request")
+    time_slots: List[int] = Field(default=[], description="Slots ocupados (día * horas + hora)")
+    room_id: Optional[str] = Field(None, description="ID de la sala asignada (r-{id})")
+
+
+class AgentRunSummary(BaseModel):
+    """Resumen de una corrida de FET, tal como lo entrega el agente"""
+
+    timetable_id: str = Field(..., description="ID del horario")
+    activities_schedule: List[ScheduledActivity] = Field(
+        default=[], description="Actividades ubicadas"
+    )
+    unplaced_activities: List[str] = Field(default=[], description="Actividades sin ubicar")
+
+
+class TimetablePublishResponse(BaseModel):
+    """Resultado de publicar una generación en la tabla de clases"""
+
+    job_id: int = Field(..., description="ID de la generación")
+    published_at: datetime = Field(..., description="Fecha de publicación")
+    sections: List[int] = Field(default=[], description="Secciones cuyas clases se reemplazaron")
+    deleted_classes: int = Field(0, description="Clases anteriores eliminadas")
+    created_classes: int = Field(0, description="Clases creadas")
+    created_blocks: int = Field(0, description="Bloques nuevos creados")
+    unplaced_activities: List[str] = Field(
+        default=[], description="Actividades sin ubicar (sus secciones no se modificaron)"
+    )
+    elapsed_seconds: float = Field(0.0, description="Duración de la importación")
@@ -0,0 +1,102 @@
+"""
+Cliente HTTP compartido para la comunicación backend → agente de horarios
+"""
+import asyncio
+import gzip
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from config import settings
+
+
+class AgentClient:
+    """
+    Un único ``httpx.AsyncClient`` por aplicación, abierto en el arranque y cerrado al apagar.
+
+    Reutiliza conexiones (keep-alive) dentro de los límites del pool y aplica timeouts por
+    fase (conexión, lectura, escritura y espera de una conexión libre del pool). Los cuerpos
+    grandes se envían comprimidos con gzip; el agente los descomprime de forma transparente.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: httpx.Timeout,
+        limits: httpx.Limits,
+        compression_min_bytes: int,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limits = limits
+        self.compression_min_bytes = compression_min_bytes
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_settings(cls) -> "AgentClient":
+        return cls(
+            base_url=settings.agent_api_url or "http://agent:8200/api",
+            timeout=httpx.Timeout(
+                connect=settings.agent_connect_timeout,
+                read=settings.agent_read_timeout,
+                write=settings.agent_write_timeout,
+                pool=settings.agent_pool_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.agent_max_connections,
+                max_keepalive_connections=settings.agent_max_keepalive_connections,
+                keepalive_expiry=settings.agent_keepalive_expiry,
+            ),
+            compression_min_bytes=settings.agent_compression_min_bytes,
+        )
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=self.limits,
+            transport=self.transport,
+        )
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = self._new_client()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[httpx.AsyncClient]:
+        # Fuera del ciclo de vida de la app (scripts, tests) se usa un cliente de un solo uso
+        if self._client is not None:
+            yield self._client
+            return
+        async with self._new_client() as client:
+            yield client
+
+    async def post_json(self, path: str, body: str, headers: Dict[str, str]) -> httpx.Response:
+        """Enviar un JSON ya serializado, comprimido si supera ``compression_min_bytes``"""
+        content = body.encode("utf-8")
+        headers = {**headers, "Content-Type": "application/json"}
+        if len(content) >= self.compression_min_bytes:
+            # Comprimir varios MB toma tiempo de CPU: se hace fuera del event loop
+            content = await asyncio.to_thread(gzip.compress, content, 6)
+            headers["Content-Encoding"] = "gzip"
+
+        async with self._session() as client:
+            return await client.post(path, content=content, headers=headers)
+
+    async def get(self, path: str, headers: Dict[str, str]) -> httpx.Response:
+        async with self._session() as client:
+            return await client.get(path, headers=headers)
+
+
+agent_client = AgentClient.from_settings()
+
+
+__all__ = ["AgentClient", "agent_client"]
@@ -5,10 +5,15 @@ from sqlalchemy.orm import Session
 
 from application.use_cases.clase_uses_cases import ClaseUseCases
 from domain.authorization import Permission
-from domain.entities import Clase, User  # Response models
-from domain.schemas import ClaseSecureCreate, ClaseSecurePatch  # ✅ SCHEMAS SEGUROS
+from domain.entities import Clase, ClaseValidacionLote, User  # Response models
+from domain.schemas import (  # ✅ SCHEMAS SEGUROS
+    ClaseSecureCreate,
+    ClaseSecurePatch,
+    ClaseValidacionLoteSecure,
+)
 from infrastructure.database.config import get_db
 from infrastructure.dependencies import require_permission
+from infrastructure.repositories.bloque_repository import BloqueRepository
 from infrastructure.repositories.clase_repository import ClaseRepository
 
 router = APIRouter()
@@ -16,7 +21,7 @@ router = APIRouter()
 
 def get_clase_use_cases(db: Session = Depends(get_db)) -> ClaseUseCases:
     clase_repo = ClaseRepository(db)
-    return ClaseUseCases(clase_repo)
+    return ClaseUseCases(clase_repo, bloque_repository=BloqueRepository(db))
 
 
 @router.get(
@@ -100,6 +105,37 @@ async def create_clase(
         )
 
 
+@router.post(
+    "/validate-batch",
+    response_model=ClaseValidacionLote,
+    status_code=status.HTTP_200_OK,
+    summary="Validar choques de un lote de clases propuestas",
+    tags=["clases"],
+)
+async def validate_clases_batch(
+    lote: ClaseValidacionLoteSecure,
+    use_cases: ClaseUseCases = Depends(get_clase_use_cases),
+    current_user: User = Depends(require_permission(Permission.CLASE_WRITE)),
+):
+    """
+    Validar en una sola llamada un lote de clases propuestas, sin guardarlas.
+
+    Retorna todos los choques de docente, sala y sección (grupo de estudiantes) de cada
+    propuesta contra las clases existentes y contra las demás propuestas, incluidos bloques
+    distintos que se traslapan en horario. Para mover una clase existente se indica su
+    clase_id (requiere permiso CLASE:WRITE).
+    """
+    try:
+        return use_cases.validate_batch(lote)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al validar las clases: {str(e)}",
+        )
+
+
 @router.put(
     "/{clase_id}",
     response_model=Clase,
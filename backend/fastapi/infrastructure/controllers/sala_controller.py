@@ -1,6 +1,7 @@
-from typing import List
+from datetime import time
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from application.use_cases.sala_use_cases import SalaUseCases
@@ -64,6 +65,32 @@ async def get_all_salas(
         )
 
 
+@router.get("/libres", response_model=List[Sala])
+async def get_salas_libres(
+    dia: int = Query(..., ge=0, le=6, description="Día de la semana (0=Domingo, 6=Sábado)"),
+    desde: time = Query(..., description="Hora de inicio (HH:MM)"),
+    hasta: time = Query(..., description="Hora de término (HH:MM)"),
+    capacidad_min: Optional[int] = Query(None, ge=1, le=500, description="Capacidad mínima"),
+    edificio: Optional[int] = Query(None, gt=0, description="ID del edificio"),
+    sala_use_case: SalaUseCases = Depends(get_sala_use_case),
+    current_user=Depends(require_permission(Permission.SALA_READ)),
+):
+    """
+    Buscar salas libres en un intervalo de un día (requiere permiso SALA:READ).
+
+    Una sala está libre si está disponible y no tiene clases en ningún bloque que se
+    traslape con el intervalo, aunque sea en parte.
+    """
+    try:
+        return sala_use_case.get_salas_libres(dia, desde, hasta, capacidad_min, edificio)
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor"
+        )
+
+
 @router.get("/{sala_id}", response_model=Sala)
 async def get_sala_by_id(
     sala_id: int,
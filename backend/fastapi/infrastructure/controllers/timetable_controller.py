@@ -4,19 +4,22 @@ Controlador para generación de horarios
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from application.services.timetable_import_service import TimetableImportService
+from application.services.timetable_job_dispatcher import timetable_job_dispatcher
+from application.services.timetable_request_cache import timetable_request_cache
 from application.services.timetable_service import TimetableService
 from domain.authorization import Permission
 from domain.entities import User
-from domain.timetable_schemas import TimetableGenerationResponse
+from domain.timetable_schemas import (
+    TimetableGenerationResponse,
+    TimetablePublishResponse,
+    TimetableStatusResponse,
+)
 from infrastructure.database.config import get_db
 from infrastructure.dependencies import require_permission
-from infrastructure.repositories.asignatura_repository import AsignaturaRepository
-from infrastructure.repositories.docente_repository import DocenteRepository
-from infrastructure.repositories.edificio_repository import SQLEdificioRepository
-from infrastructure.repositories.clase_repository import ClaseRepository
-from infrastructure.repositories.sala_repository import SalaRepository
-from infrastructure.repositories.seccion_repository import SeccionRepository
-from infrastructure.repositories.user_repository import SQLUserRepository
+from infrastructure.repositories.clase_bulk_repository import ClaseBulkRepository
+from infrastructure.repositories.timetable_job_repository import TimetableJobRepository
+from infrastructure.repositories.timetable_snapshot_repository import TimetableSnapshotRepository
 
 router = APIRouter()
 
@@ -24,20 +27,17 @@ router = APIRouter()
 def get_timetable_service(db: Session = Depends(get_db)) -> TimetableService:
     """Dependencia para obtener el servicio de horarios"""
     return TimetableService(
-        docente_repository=DocenteRepository(db),
-        asignatura_repository=AsignaturaRepository(db),
-        seccion_repository=SeccionRepository(db),
-        clase_repository=ClaseRepository(db),
-        sala_repository=SalaRepository(db),
-        edificio_repository=SQLEdificioRepository(db),
-        user_repository=SQLUserRepository(db),
+        snapshot_repository=TimetableSnapshotRepository(db),
+        request_cache=timetable_request_cache,
+        job_repository=TimetableJobRepository(db),
+        import_service=TimetableImportService(ClaseBulkRepository(db)),
     )
 
 
 @router.post(
     "/generate",
     response_model=TimetableGenerationResponse,
-    status_code=status.HTTP_200_OK,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Generar horario con FET",
     tags=["timetable"],
 )
@@ -51,15 +51,19 @@ async def generate_timetable(
     Generar un horario completo usando el algoritmo FET.
     
     Este endpoint:
-    1. Obtiene todos los docentes, asignaturas, secciones y restricciones
-    2. Construye el JSON en formato FET
-    3. Envía al agente para generar el horario
-    4. Retorna el resultado
+    1. Registra la generación en la tabla timetable_job (estado pending)
+    2. Retorna de inmediato el ID para consultar su estado en /status/{job_id}
+
+    En segundo plano se arma el JSON en formato FET, se encola en el agente y se sigue
+    su avance, aunque el cliente se desconecte o el backend se reinicie.
     
     Requiere permisos de administrador (SYSTEM:CONFIG).
     """
     try:
-        result = await timetable_service.generate_timetable(semester, institution_name)
+        result = timetable_service.create_generation(
+            semester, institution_name, user_id=current_user.id
+        )
+        timetable_job_dispatcher.notify()
         return result
     except HTTPException:
         raise
@@ -71,25 +75,45 @@ async def generate_timetable(
 
 
 @router.get(
-    "/status/{timetable_id}",
+    "/status/{job_id}",
+    response_model=TimetableStatusResponse,
     status_code=status.HTTP_200_OK,
     summary="Consultar estado de generación",
     tags=["timetable"],
 )
 async def get_timetable_status(
-    timetable_id: str,
+    job_id: int,
     current_user: User = Depends(require_permission(Permission.SYSTEM_CONFIG)),
+    timetable_service: TimetableService = Depends(get_timetable_service),
 ):
     """
     Consultar el estado de una generación de horario.
-    
-    Este endpoint permitirá verificar si el horario está listo,
-    en proceso o ha fallado.
-    
-    TODO: Implementar cuando el agente soporte estados asíncronos.
+
+    Retorna el estado registrado en timetable_job (pending, queued, running, succeeded o
+    failed), el avance reportado por FET y la ubicación del resultado en el agente.
+    """
+    return timetable_service.get_generation_status(job_id)
+
+
+@router.post(
+    "/publish/{job_id}",
+    response_model=TimetablePublishResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Publicar horario generado",
+    tags=["timetable"],
+)
+async def publish_timetable(
+    job_id: int,
+    current_user: User = Depends(require_permission(Permission.SYSTEM_CONFIG)),
+    timetable_service: TimetableService = Depends(get_timetable_service),
+):
+    """
+    Publicar en la tabla de clases el horario de una generación terminada (succeeded).
+
+    Las clases de cada sección ubicada por FET se reemplazan por las generadas en una sola
+    transacción (COPY en PostgreSQL, INSERT por lotes en otros motores). Las secciones sin
+    actividades ubicadas conservan sus clases y se informan en unplaced_activities.
+
+    Requiere permisos de administrador (SYSTEM:CONFIG).
     """
-    return {
-        "timetable_id": timetable_id,
-        "status": "pending",
-        "message": "Función no implementada aún",
-    }
+    return await timetable_service.publish_generation(job_id)
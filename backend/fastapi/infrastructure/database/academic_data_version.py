@@ -0,0 +1,233 @@
+"""
+Versión global de los datos académicos que alimentan la generación de horarios.
+
+Cada transacción que toca secciones, clases, asignaturas, salas, edificios, docentes (o el
+nombre de su usuario) o restricciones de horario incrementa el contador de
+``datos_academicos_version`` dentro de la misma transacción, así que la versión la comparten
+todos los procesos (workers, scripts) y se mueve también con las escrituras fuera del ORM que
+llaman a ``record_change``.
+
+Además cada proceso recuerda qué cambió en las versiones que confirmó él mismo, para que los
+cachés puedan reconstruir solo lo afectado; si falta alguna versión del rango (la confirmó
+otro proceso) se reconstruye todo.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Set
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session, attributes
+
+from domain.models import (
+    Asignatura,
+    Clase,
+    DatosAcademicosVersion,
+    Docente,
+    Edificio,
+    RestriccionHorario,
+    Sala,
+    Seccion,
+    User,
+)
+
+# Cambios por versión que se recuerdan; si un caché quedó más atrás se reconstruye completo
+DEFAULT_HISTORY_SIZE = 1024
+
+_SESSION_KEY = "academic_data_change"
+_VERSION_KEY = "academic_data_version"
+_TRACKED_MODELS = (Asignatura, Clase, Docente, Edificio, RestriccionHorario, Sala, Seccion)
+
+_VERSION_TABLE = DatosAcademicosVersion.__table__
+_VERSION_ROW = 1
+
+
+@dataclass
+class AcademicDataChange:
+    """
+    Qué cambió en uno o más commits.
+
+    ``full`` indica un cambio que no se pudo acotar (por ejemplo un ``UPDATE``/``DELETE``
+    masivo), en cuyo caso hay que reconstruir todo.
+    """
+
+    full: bool = False
+    section_ids: Set[int] = field(default_factory=set)
+    subject_ids: Set[int] = field(default_factory=set)
+    teacher_ids: Set[int] = field(default_factory=set)
+    restricted_teacher_ids: Set[int] = field(default_factory=set)
+    rooms: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.full
+            or self.section_ids
+            or self.subject_ids
+            or self.teacher_ids
+            or self.restricted_teacher_ids
+            or self.rooms
+        )
+
+    def merge(self, other: "AcademicDataChange") -> None:
+        self.full = self.full or other.full
+        self.section_ids |= other.section_ids
+        self.subject_ids |= other.subject_ids
+        self.teacher_ids |= other.teacher_ids
+        self.restricted_teacher_ids |= other.restricted_teacher_ids
+        self.rooms = self.rooms or other.rooms
+
+
+class AcademicDataVersion:
+    """Cambios de las versiones confirmadas por este proceso (thread-safe)"""
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._history_size = history_size
+        self._history: "OrderedDict[int, AcademicDataChange]" = OrderedDict()
+
+    def record(self, version: int, change: AcademicDataChange) -> None:
+        """Registrar el cambio confirmado con ``version``"""
+        with self._lock:
+            self._history[version] = change
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+
+    def changes_since(self, version: int, current: int) -> Optional[AcademicDataChange]:
+        """
+        Retornar los cambios acumulados desde ``version`` hasta ``current``.
+
+        Es ``None`` si falta alguna versión del rango: la confirmó otro proceso o el historial
+        ya no la alcanza.
+        """
+        if version == current:
+            return AcademicDataChange()
+        with self._lock:
+            if version > current or current - version > len(self._history):
+                return None
+            merged = AcademicDataChange()
+            for change_version in range(version + 1, current + 1):
+                change = self._history.get(change_version)
+                if change is None:
+                    return None
+                merged.merge(change)
+            return merged
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history.clear()
+
+
+academic_data_version = AcademicDataVersion()
+
+
+def read_version(session: Session) -> int:
+    """Versión confirmada de los datos académicos, vista desde la transacción de ``session``"""
+    row = _VERSION_TABLE.c.id == _VERSION_ROW
+    return session.execute(select(_VERSION_TABLE.c.version).where(row)).scalar() or 0
+
+
+def _bump_version(session: Session) -> int:
+    """Incrementar la versión dentro de la transacción de ``session`` y retornar la nueva"""
+    connection = session.connection()
+    row = _VERSION_TABLE.c.id == _VERSION_ROW
+    # El UPDATE bloquea la fila hasta el commit: dos transacciones no toman el mismo número
+    result = connection.execute(update(_VERSION_TABLE).where(row).values(version=_VERSION_TABLE.c.version + 1))
+    if result.rowcount == 0:
+        connection.execute(insert(_VERSION_TABLE).values(id=_VERSION_ROW, version=1))
+    return connection.execute(select(_VERSION_TABLE.c.version).where(row)).scalar_one()
+
+
+def _ensure_bumped(session: Session) -> None:
+    change = session.info.get(_SESSION_KEY)
+    if change is not None and not change.is_empty and _VERSION_KEY not in session.info:
+        session.info[_VERSION_KEY] = _bump_version(session)
+
+
+def _pending(session: Session) -> AcademicDataChange:
+    return session.info.setdefault(_SESSION_KEY, AcademicDataChange())
+
+
+def record_change(session: Session, change: AcademicDataChange) -> None:
+    """
+    Registrar a mano un cambio que los listeners no ven (``INSERT``/``DELETE`` de Core o
+    ``COPY``); la versión se incrementa ya, en la transacción de ``session``, y se confirma o
+    descarta junto con ella.
+    """
+    _pending(session).merge(change)
+    _ensure_bumped(session)
+
+
+def _record(change: AcademicDataChange, instance, deleted: bool) -> None:
+    if isinstance(instance, Seccion):
+        change.section_ids.add(instance.id)
+    elif isinstance(instance, Clase):
+        # Si la clase cambió de sección se afectan la anterior y la nueva
+        history = attributes.get_history(instance, "seccion_id")
+        change.section_ids.update(seccion_id for seccion_id in history.sum() if seccion_id is not None)
+    elif isinstance(instance, Asignatura):
+        change.subject_ids.add(instance.id)
+    elif isinstance(instance, Docente):
+        change.teacher_ids.add(instance.user_id)
+    elif isinstance(instance, User):
+        if deleted or attributes.get_history(instance, "nombre").has_changes():
+            change.teacher_ids.add(instance.id)
+    elif isinstance(instance, RestriccionHorario):
+        history = attributes.get_history(instance, "docente_id")
+        change.restricted_teacher_ids.update(docente_id for docente_id in history.sum() if docente_id is not None)
+    elif isinstance(instance, (Sala, Edificio)):
+        change.rooms = True
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_changes(session: Session, flush_context) -> None:
+    change = _pending(session)
+    for instance in session.new:
+        _record(change, instance, deleted=False)
+    for instance in session.dirty:
+        if session.is_modified(instance, include_collections=False):
+            _record(change, instance, deleted=False)
+    for instance in session.deleted:
+        _record(change, instance, deleted=True)
+    _ensure_bumped(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _TRACKED_MODELS):
+        _pending(orm_execute_state.session).full = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_bulk_write(session: Session) -> None:
+    # Los UPDATE/DELETE masivos no pasan por after_flush; la versión igual tiene que moverse
+    _ensure_bumped(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_on_commit(session: Session) -> None:
+    change = session.info.pop(_SESSION_KEY, None)
+    version = session.info.pop(_VERSION_KEY, None)
+    if change is not None and not change.is_empty and version is not None:
+        academic_data_version.record(version, change)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, previous_transaction) -> None:
+    # Un rollback de savepoint no descarta lo ya registrado: sobra invalidar, no falta.
+    # Si la versión se tomó dentro del savepoint también se perdió; se vuelve a tomar
+    if previous_transaction.parent is None:
+        session.info.pop(_SESSION_KEY, None)
+    session.info.pop(_VERSION_KEY, None)
+
+
+__all__ = [
+    "AcademicDataChange",
+    "AcademicDataVersion",
+    "academic_data_version",
+    "read_version",
+    "record_change",
+]
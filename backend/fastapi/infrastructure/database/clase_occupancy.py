@@ -0,0 +1,411 @@
+"""
+Índice en memoria de la ocupación de bloques por docente, sala y sección.
+
+Cada clase ocupa su bloque para su docente, su sala y su sección. El índice guarda, para
+cada uno, qué clases hay en cada bloque y un bitmap de bloques ocupados (bit ``bloque_id``),
+así que detectar un choque es una búsqueda en diccionario en vez de una consulta. También
+guarda el horario de cada bloque por día, para pasar de un intervalo de tiempo al bitmap de
+bloques que lo tocan.
+
+El índice vive en la memoria de cada proceso y se mantiene con listeners de la sesión: los
+cambios de clases hechos con el ORM se aplican al confirmar la transacción y se descartan con
+el rollback. Las escrituras que no se pueden seguir fila a fila (``UPDATE``/``DELETE``
+masivos, Core o ``COPY``) marcan el índice como desactualizado y se reconstruye desde la BD
+en la siguiente consulta.
+
+Para que varios procesos (workers, scripts) no trabajen con un índice viejo, cada transacción
+que escribe clases o bloques incrementa el contador de ``clase_ocupacion_version``. Cada
+consulta compara ese contador con la versión con que se cargó el índice (una vez por
+transacción) y lo reconstruye si otro proceso escribió entre medio. Las reconstrucciones leen
+con una sesión nueva, que solo ve lo confirmado. Quien escriba clases o bloques sin pasar
+por el ORM (Core, ``COPY``, SQL directo) debe llamar a ``mark_stale`` en la misma transacción,
+como hace ``ClaseBulkRepository``: así el contador se mueve junto con sus filas.
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import time
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from domain.models import Bloque, Clase, ClaseOcupacionVersion
+from infrastructure.database.config import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "clase_occupancy_changes"
+_BLOQUE_KEY = "clase_occupancy_bloques"
+_STALE_KEY = "clase_occupancy_stale"
+_VERSION_KEY = "clase_occupancy_version"
+_CHECKED_KEY = "clase_occupancy_checked"
+
+_VERSION_TABLE = ClaseOcupacionVersion.__table__
+_VERSION_ROW = 1
+
+# Recursos que ocupa una clase: columna de clase y nombre usado en los choques
+RESOURCES = (("docente", "docente_id"), ("sala", "sala_id"), ("seccion", "seccion_id"))
+
+
+class ClaseSlot(NamedTuple):
+    """Lo que el índice sabe de una clase"""
+
+    seccion_id: Optional[int]
+    docente_id: Optional[int]
+    sala_id: Optional[int]
+    bloque_id: Optional[int]
+
+
+class BloqueSlot(NamedTuple):
+    """Horario de un bloque"""
+
+    dia_semana: Optional[int]
+    hora_inicio: Optional[time]
+    hora_fin: Optional[time]
+
+
+class _Occupancy:
+    """Clases por ``(recurso, bloque)`` y bitmap de bloques ocupados por recurso"""
+
+    def __init__(self):
+        self.clases: Dict[Tuple[int, int], Set[int]] = {}
+        self.bloques: Dict[int, int] = defaultdict(int)
+
+    def add(self, resource_id: Optional[int], bloque_id: Optional[int], clase_id: int) -> None:
+        if resource_id is None or bloque_id is None:
+            return
+        self.clases.setdefault((resource_id, bloque_id), set()).add(clase_id)
+        self.bloques[resource_id] |= 1 << bloque_id
+
+    def remove(self, resource_id: Optional[int], bloque_id: Optional[int], clase_id: int) -> None:
+        key = (resource_id, bloque_id)
+        clases = self.clases.get(key)
+        if clases is None:
+            return
+        clases.discard(clase_id)
+        if not clases:
+            del self.clases[key]
+            self.bloques[resource_id] &= ~(1 << bloque_id)
+            if not self.bloques[resource_id]:
+                del self.bloques[resource_id]
+
+    def get(self, resource_id: Optional[int], bloque_id: Optional[int]) -> FrozenSet[int]:
+        return frozenset(self.clases.get((resource_id, bloque_id), ()))
+
+
+def read_version(session: Session) -> int:
+    """Versión confirmada de las clases y bloques, vista desde la transacción de ``session``"""
+    row = _VERSION_TABLE.c.id == _VERSION_ROW
+    return session.execute(select(_VERSION_TABLE.c.version).where(row)).scalar() or 0
+
+
+def _bump_version(session: Session) -> int:
+    """Incrementar la versión dentro de la transacción de ``session`` y retornar la nueva"""
+    connection = session.connection()
+    row = _VERSION_TABLE.c.id == _VERSION_ROW
+    # El UPDATE bloquea la fila hasta el commit: dos transacciones no toman el mismo número
+    result = connection.execute(update(_VERSION_TABLE).where(row).values(version=_VERSION_TABLE.c.version + 1))
+    if result.rowcount == 0:
+        connection.execute(insert(_VERSION_TABLE).values(id=_VERSION_ROW, version=1))
+    return connection.execute(select(_VERSION_TABLE.c.version).where(row)).scalar_one()
+
+
+class ClaseOccupancyIndex:
+    """
+    Ocupación de bloques de todas las clases (thread-safe).
+
+    ``session_factory`` entrega las sesiones con que se reconstruye el índice; sin ella se lee
+    con la sesión de quien consulta (solo sirve si nadie más escribe en esa BD).
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory
+        self._lock = threading.RLock()
+        self._stale = True
+        # Cambia con cada escritura aplicada o invalidación; una reconstrucción que se
+        # cruzó con una escritura no deja el índice como vigente
+        self._generation = 0
+        # Valor de clase_ocupacion_version que refleja el índice
+        self._version: Optional[int] = None
+        self._clases: Dict[int, ClaseSlot] = {}
+        self._occupancy: Dict[str, _Occupancy] = {name: _Occupancy() for name, _ in RESOURCES}
+        self._bloques: Dict[int, BloqueSlot] = {}
+        self._dias: Dict[int, Dict[int, BloqueSlot]] = defaultdict(dict)
+
+    @property
+    def is_stale(self) -> bool:
+        return self._stale
+
+    def invalidate(self) -> None:
+        """Forzar la reconstrucción desde la BD en la próxima consulta"""
+        with self._lock:
+            self._stale = True
+            self._generation += 1
+
+    def _read(self, session: Session) -> Tuple[Dict[int, ClaseSlot], Dict[int, BloqueSlot]]:
+        rows = session.execute(
+            select(Clase.id, Clase.seccion_id, Clase.docente_id, Clase.sala_id, Clase.bloque_id)
+        )
+        clases = {clase_id: ClaseSlot(*slot) for clase_id, *slot in rows}
+        rows = session.execute(select(Bloque.id, Bloque.dia_semana, Bloque.hora_inicio, Bloque.hora_fin))
+        return clases, {bloque_id: BloqueSlot(*slot) for bloque_id, *slot in rows}
+
+    @contextmanager
+    def _reader(self, session: Session) -> Iterator[Session]:
+        """Sesión nueva para leer solo lo confirmado (o la del llamador, sin ``session_factory``)"""
+        if self.session_factory is None:
+            yield session
+            return
+        reader = self.session_factory()
+        try:
+            yield reader
+        finally:
+            reader.close()
+
+    def rebuild(self, session: Session) -> None:
+        """Cargar el índice completo (una consulta de clases y una de bloques)"""
+        with self._reader(session) as reader:
+            self._rebuild(reader)
+
+    def _rebuild(self, reader: Session) -> None:
+        with self._lock:
+            generation = self._generation
+        # La versión se lee antes que las filas: si algo se confirma entre medio, el índice
+        # queda con una versión más vieja que sus datos y solo se reconstruye de más
+        version = read_version(reader)
+        clases, bloques = self._read(reader)
+        with self._lock:
+            self._version = version
+            self._clases = {}
+            self._occupancy = {name: _Occupancy() for name, _ in RESOURCES}
+            for clase_id, slot in clases.items():
+                self._put(clase_id, slot)
+            self._bloques = {}
+            self._dias = defaultdict(dict)
+            for bloque_id, slot in bloques.items():
+                self._put_bloque(bloque_id, slot)
+            self._stale = generation != self._generation
+
+    def ensure_loaded(self, session: Session) -> None:
+        """Reconstruir el índice si está desactualizado o si otro proceso escribió clases"""
+        checked = session.info.setdefault(_CHECKED_KEY, set())
+        if not self._stale and id(self) in checked:
+            return
+        # La versión se compara una vez por transacción de ``session``
+        version = read_version(session)
+        if self._stale or version != self._version:
+            self.rebuild(session)
+        checked.add(id(self))
+
+    def verify(self, session: Session) -> bool:
+        """
+        Comparar el índice con la BD y reconstruirlo si difieren (o si estaba desactualizado).
+
+        Retorna si el índice estaba al día.
+        """
+        with self._reader(session) as reader:
+            clases, bloques = self._read(reader)
+            with self._lock:
+                consistent = not self._stale and clases == self._clases and bloques == self._bloques
+            if not consistent:
+                if not self._stale:
+                    logger.warning("Índice de ocupación de clases desalineado con la BD; se reconstruye")
+                self._rebuild(reader)
+        return consistent
+
+    def apply(
+        self,
+        changes: Dict[int, Optional[ClaseSlot]],
+        bloques: Optional[Dict[int, Optional[BloqueSlot]]] = None,
+        version: Optional[int] = None,
+    ) -> None:
+        """
+        Aplicar clases y bloques confirmados (``None`` = eliminado) con la ``version`` que
+        tomó su transacción.
+
+        Si la versión no sigue a la del índice, otro proceso confirmó algo que el índice no
+        tiene y se marca como desactualizado en vez de aplicar.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._stale:
+                return
+            if version is None or self._version is None or version != self._version + 1:
+                self._stale = True
+                return
+            self._version = version
+            for bloque_id, slot in (bloques or {}).items():
+                self._drop_bloque(bloque_id)
+                if slot is not None:
+                    self._put_bloque(bloque_id, slot)
+            for clase_id, slot in changes.items():
+                self._drop(clase_id)
+                if slot is not None:
+                    self._put(clase_id, slot)
+
+    def _put(self, clase_id: int, slot: ClaseSlot) -> None:
+        self._clases[clase_id] = slot
+        for name, column in RESOURCES:
+            self._occupancy[name].add(getattr(slot, column), slot.bloque_id, clase_id)
+
+    def _drop(self, clase_id: int) -> None:
+        slot = self._clases.pop(clase_id, None)
+        if slot is None:
+            return
+        for name, column in RESOURCES:
+            self._occupancy[name].remove(getattr(slot, column), slot.bloque_id, clase_id)
+
+    def _put_bloque(self, bloque_id: int, slot: BloqueSlot) -> None:
+        self._bloques[bloque_id] = slot
+        self._dias[slot.dia_semana][bloque_id] = slot
+
+    def _drop_bloque(self, bloque_id: int) -> None:
+        slot = self._bloques.pop(bloque_id, None)
+        if slot is not None:
+            self._dias[slot.dia_semana].pop(bloque_id, None)
+
+    def clases_en(
+        self, session: Session, resource: str, resource_id: Optional[int], bloque_id: Optional[int]
+    ) -> FrozenSet[int]:
+        """Clases de ``resource`` (docente, sala o seccion) en un bloque"""
+        self.ensure_loaded(session)
+        with self._lock:
+            return self._occupancy[resource].get(resource_id, bloque_id)
+
+    def bloques_ocupados(self, session: Session, resource: str, resource_id: int) -> int:
+        """Bitmap de bloques ocupados por ``resource`` (bit ``bloque_id``)"""
+        self.ensure_loaded(session)
+        with self._lock:
+            return self._occupancy[resource].bloques.get(resource_id, 0)
+
+    def bloques_entre(self, session: Session, dia_semana: int, desde: time, hasta: time) -> int:
+        """Bitmap de los bloques de ``dia_semana`` que se traslapan con ``[desde, hasta)``"""
+        self.ensure_loaded(session)
+        mask = 0
+        with self._lock:
+            for bloque_id, slot in self._dias.get(dia_semana, {}).items():
+                if slot.hora_inicio is not None and slot.hora_fin is not None:
+                    if slot.hora_inicio < hasta and slot.hora_fin > desde:
+                        mask |= 1 << bloque_id
+        return mask
+
+    def libres(self, session: Session, resource: str, resource_ids: Iterable[int], mask: int) -> List[int]:
+        """De ``resource_ids``, los que no ocupan ninguno de los bloques de ``mask``"""
+        self.ensure_loaded(session)
+        with self._lock:
+            ocupados = self._occupancy[resource].bloques
+            return [resource_id for resource_id in resource_ids if not ocupados.get(resource_id, 0) & mask]
+
+
+clase_occupancy = ClaseOccupancyIndex(session_factory=SessionLocal)
+
+
+def mark_stale(session: Session) -> None:
+    """
+    Avisar que la transacción de ``session`` escribió clases o bloques sin pasar por el ORM.
+
+    Incrementa ``clase_ocupacion_version`` en esa misma transacción (una vez por transacción)
+    y el índice se recarga desde la BD al confirmar.
+    """
+    session.info[_STALE_KEY] = True
+    if _VERSION_KEY not in session.info:
+        session.info[_VERSION_KEY] = _bump_version(session)
+
+
+def _slot(clase: Clase) -> ClaseSlot:
+    return ClaseSlot(clase.seccion_id, clase.docente_id, clase.sala_id, clase.bloque_id)
+
+
+def _bloque_slot(bloque: Bloque) -> BloqueSlot:
+    return BloqueSlot(bloque.dia_semana, bloque.hora_inicio, bloque.hora_fin)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_clases(session: Session, flush_context) -> None:
+    changes: Dict[int, Optional[ClaseSlot]] = {}
+    bloques: Dict[int, Optional[BloqueSlot]] = {}
+    for instance in session.new:
+        if isinstance(instance, Clase):
+            changes[instance.id] = _slot(instance)
+        elif isinstance(instance, Bloque):
+            bloques[instance.id] = _bloque_slot(instance)
+    for instance in session.dirty:
+        if not isinstance(instance, (Clase, Bloque)):
+            continue
+        if not session.is_modified(instance, include_collections=False):
+            continue
+        if isinstance(instance, Clase):
+            changes[instance.id] = _slot(instance)
+        elif isinstance(instance, Bloque):
+            bloques[instance.id] = _bloque_slot(instance)
+    for instance in session.deleted:
+        if isinstance(instance, Clase):
+            changes[instance.id] = None
+        elif isinstance(instance, Bloque):
+            bloques[instance.id] = None
+    if changes:
+        session.info.setdefault(_SESSION_KEY, {}).update(changes)
+    if bloques:
+        session.info.setdefault(_BLOQUE_KEY, {}).update(bloques)
+    if (changes or bloques) and _VERSION_KEY not in session.info:
+        session.info[_VERSION_KEY] = _bump_version(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_bulk_write(session: Session) -> None:
+    # Las escrituras masivas no pasan por after_flush; la versión igual tiene que moverse
+    if session.info.get(_STALE_KEY) and _VERSION_KEY not in session.info:
+        session.info[_VERSION_KEY] = _bump_version(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_clases(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, (Clase, Bloque)):
+        # La sentencia aún no se ejecuta: la versión se mueve en before_commit
+        orm_execute_state.session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session: Session) -> None:
+    changes = session.info.pop(_SESSION_KEY, None)
+    bloques = session.info.pop(_BLOQUE_KEY, None)
+    version = session.info.pop(_VERSION_KEY, None)
+    if session.info.pop(_STALE_KEY, False):
+        clase_occupancy.invalidate()
+    elif changes or bloques:
+        clase_occupancy.apply(changes or {}, bloques, version)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_SESSION_KEY, None)
+        session.info.pop(_BLOQUE_KEY, None)
+        session.info.pop(_STALE_KEY, None)
+        session.info.pop(_VERSION_KEY, None)
+    elif _SESSION_KEY in session.info or _BLOQUE_KEY in session.info:
+        # Lo registrado puede incluir filas del savepoint descartado: se recarga al confirmar.
+        # Si la versión se tomó dentro del savepoint también se perdió; se vuelve a tomar
+        session.info[_STALE_KEY] = True
+        session.info.pop(_VERSION_KEY, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_version_check(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_CHECKED_KEY, None)
+
+
+__all__ = [
+    "BloqueSlot",
+    "ClaseOccupancyIndex",
+    "ClaseSlot",
+    "clase_occupancy",
+    "mark_stale",
+    "read_version",
+]
@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from sqlalchemy.orm import Session
 
 from domain.entities import AsignaturaCreate
 from domain.models import Asignatura
+from infrastructure.repositories.pagination import DEFAULT_BATCH_SIZE, iter_keyset
 
 
 class AsignaturaRepository:
@@ -30,6 +31,10 @@ class AsignaturaRepository:
         """Obtener todas las asignaturas con paginación"""
         return self.session.query(Asignatura).offset(skip).limit(limit).all()
 
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Asignatura]:
+        """Recorrer todas las asignaturas por lotes, sin el límite de get_all"""
+        return iter_keyset(self.session.query(Asignatura), Asignatura.id, batch_size)
+
     def search_by_nombre(self, nombre: str) -> List[Asignatura]:
         """Buscar asignaturas por nombre"""
         return self.session.query(Asignatura).filter(Asignatura.nombre.ilike(f"%{nombre}%")).all()
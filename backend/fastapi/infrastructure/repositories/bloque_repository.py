@@ -1,5 +1,7 @@
-from typing import List, Optional
+from datetime import time
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from domain.entities import BloqueCreate
@@ -110,3 +112,14 @@ class BloqueRepository:
     def get_bloques_libres(self, dia_semana: int = None) -> List[Bloque]:
         """Obtener bloques que no tienen clases asignadas (alias para compatibilidad)"""
         return self.get_bloques_disponibles(dia_semana)
+
+    def get_intervalos_mismos_dias(self, bloque_ids: Iterable[int]) -> Dict[int, Tuple[int, time, time]]:
+        """
+        ``{id: (dia_semana, hora_inicio, hora_fin)}`` de los bloques indicados y de todos los
+        demás bloques de sus mismos días, en una sola consulta.
+        """
+        dias = select(Bloque.dia_semana).where(Bloque.id.in_(set(bloque_ids)))
+        rows = self.session.query(Bloque.id, Bloque.dia_semana, Bloque.hora_inicio, Bloque.hora_fin).filter(
+            Bloque.dia_semana.in_(dias)
+        )
+        return {bloque_id: (dia, inicio, fin) for bloque_id, dia, inicio, fin in rows}
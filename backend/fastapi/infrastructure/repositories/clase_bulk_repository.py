@@ -0,0 +1,117 @@
+import csv
+import io
+from datetime import time
+from typing import Dict, Iterable, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from domain.models import Bloque, Clase, Evento
+from infrastructure.database.academic_data_version import AcademicDataChange, record_change
+from infrastructure.database.clase_occupancy import mark_stale
+
+# Filas por sentencia INSERT de varias filas (y ids por IN)
+DEFAULT_INSERT_BATCH_SIZE = 1000
+
+# Columnas de clase que se escriben al importar, en el orden del COPY
+CLASE_COLUMNS = ("seccion_id", "docente_id", "sala_id", "bloque_id", "estado")
+
+BloqueKey = Tuple[int, time, time]
+
+
+class ClaseBulkRepository:
+    """
+    Escrituras masivas sobre ``clase`` para publicar horarios generados.
+
+    Todo ocurre en una sola transacción: o se reemplazan todas las clases de las secciones
+    indicadas o no cambia nada. Las filas se insertan con ``COPY`` en PostgreSQL (psycopg2)
+    y con ``INSERT`` de varias filas por lote en los demás motores.
+    """
+
+    def __init__(self, session: Session, batch_size: int = DEFAULT_INSERT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+
+    def get_or_create_bloques(self, keys: Iterable[BloqueKey]) -> Tuple[Dict[BloqueKey, int], int]:
+        """
+        Obtener el id del bloque de cada ``(dia_semana, hora_inicio, hora_fin)``, creando los
+        que falten (sin confirmar la transacción). Retorna el mapeo y cuántos se crearon.
+        """
+        wanted = set(keys)
+        bloques: Dict[BloqueKey, int] = {}
+        rows = self.session.execute(
+            select(Bloque.id, Bloque.dia_semana, Bloque.hora_inicio, Bloque.hora_fin).order_by(Bloque.id)
+        )
+        for bloque_id, dia_semana, hora_inicio, hora_fin in rows:
+            bloques.setdefault((dia_semana, hora_inicio, hora_fin), bloque_id)
+
+        missing = sorted(wanted - bloques.keys())
+        nuevos = [Bloque(dia_semana=dia, hora_inicio=inicio, hora_fin=fin) for dia, inicio, fin in missing]
+        if nuevos:
+            self.session.add_all(nuevos)
+            self.session.flush()
+            for bloque in nuevos:
+                bloques[(bloque.dia_semana, bloque.hora_inicio, bloque.hora_fin)] = bloque.id
+        return {key: bloques[key] for key in wanted}, len(nuevos)
+
+    def replace_for_secciones(self, seccion_ids: Iterable[int], rows: Sequence[dict]) -> Tuple[int, int]:
+        """
+        Reemplazar atómicamente las clases de ``seccion_ids`` por ``rows``.
+
+        Los eventos asociados a clases eliminadas quedan sin clase (``clase_id`` es opcional).
+        Retorna ``(eliminadas, insertadas)``.
+        """
+        ids = sorted(set(seccion_ids))
+        clase = Clase.__table__
+        try:
+            deleted = 0
+            for chunk in self._chunks(ids):
+                clase_ids = select(clase.c.id).where(clase.c.seccion_id.in_(chunk))
+                self.session.execute(
+                    update(Evento.__table__)
+                    .where(Evento.__table__.c.clase_id.in_(clase_ids))
+                    .values(clase_id=None)
+                )
+                deleted += self.session.execute(
+                    delete(clase).where(clase.c.seccion_id.in_(chunk))
+                ).rowcount
+
+            if self._supports_copy():
+                self._copy(rows)
+            else:
+                for chunk in self._chunks(rows):
+                    self.session.execute(insert(clase), list(chunk))
+
+            # Core y COPY no pasan por los listeners de la sesión: la versión de la ocupación
+            # se incrementa aquí, en la misma transacción que las filas
+            record_change(self.session, AcademicDataChange(section_ids=set(ids)))
+            mark_stale(self.session)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return deleted, len(rows)
+
+    def _supports_copy(self) -> bool:
+        dialect = self.session.get_bind().dialect
+        return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+    def _copy(self, rows: Sequence[dict]) -> None:
+        # En CSV un campo vacío sin comillas es NULL
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row.get(column) for column in CLASE_COLUMNS])
+        buffer.seek(0)
+
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY clase ({', '.join(CLASE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+    def _chunks(self, items: Sequence) -> Iterable[Sequence]:
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
@@ -1,14 +1,17 @@
-from typing import List, Optional
+from typing import FrozenSet, Iterator, List, Optional
 
 from sqlalchemy.orm import Session
 
 from domain.entities import ClaseCreate
 from domain.models import Clase
+from infrastructure.database.clase_occupancy import ClaseOccupancyIndex, clase_occupancy
+from infrastructure.repositories.pagination import DEFAULT_BATCH_SIZE, iter_keyset
 
 
 class ClaseRepository:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, occupancy: ClaseOccupancyIndex = clase_occupancy):
         self.session = session
+        self.occupancy = occupancy
 
     def create(self, clase: ClaseCreate) -> Clase:
         """Crear una nueva clase"""
@@ -32,6 +35,10 @@ class ClaseRepository:
         """Obtener todas las clases con paginación"""
         return self.session.query(Clase).offset(skip).limit(limit).all()
 
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Clase]:
+        """Recorrer todas las clases por lotes, sin el límite de get_all"""
+        return iter_keyset(self.session.query(Clase), Clase.id, batch_size)
+
     def get_by_seccion(self, seccion_id: int) -> List[Clase]:
         """Obtener clases de una sección específica"""
         return self.session.query(Clase).filter(Clase.seccion_id == seccion_id).all()
@@ -81,6 +88,16 @@ class ClaseRepository:
             query = query.filter(Clase.sala_id == sala_id)
         return query.all()
 
+    def get_ocupacion(
+        self, recurso: str, recurso_id: Optional[int], bloque_id: Optional[int]
+    ) -> FrozenSet[int]:
+        """IDs de las clases del docente, sala o sección (``recurso``) en un bloque, según el índice"""
+        return self.occupancy.clases_en(self.session, recurso, recurso_id, bloque_id)
+
+    def get_bloques_ocupados(self, recurso: str, recurso_id: int) -> int:
+        """Bitmap (bit ``bloque_id``) de los bloques ocupados por un docente, sala o sección"""
+        return self.occupancy.bloques_ocupados(self.session, recurso, recurso_id)
+
     def update(self, clase_id: int, clase_data: dict) -> Optional[Clase]:
         """Actualizar una clase"""
         db_clase = self.get_by_id(clase_id)
@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from sqlalchemy.orm import Session, joinedload
 
 from domain.entities import DocenteCreate
 from domain.models import Docente
+from infrastructure.repositories.pagination import DEFAULT_BATCH_SIZE, iter_keyset
 
 
 class DocenteRepository:
@@ -56,6 +57,11 @@ class DocenteRepository:
             .all()
         )
 
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Docente]:
+        """Recorrer todos los docentes por lotes, sin el límite de get_all"""
+        query = self.session.query(Docente).options(joinedload(Docente.user))
+        return iter_keyset(query, Docente.user_id, batch_size)
+
     def update(self, user_id: int, docente_data: dict) -> Optional[Docente]:
         """Actualizar un docente por su user_id (PK)"""
         db_docente = self.get_by_user_id(user_id)
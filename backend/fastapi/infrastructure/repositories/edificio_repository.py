@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from sqlalchemy.orm import Session
 
 from domain.entities import EdificioCreate
 from domain.models import Edificio
+from infrastructure.repositories.pagination import DEFAULT_BATCH_SIZE, iter_keyset
 
 
 class SQLEdificioRepository:
@@ -32,6 +33,10 @@ class SQLEdificioRepository:
         """Obtener todos los edificios con paginación"""
         return self.session.query(Edificio).offset(skip).limit(limit).all()
 
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Edificio]:
+        """Recorrer todos los edificios por lotes, sin el límite de get_all"""
+        return iter_keyset(self.session.query(Edificio), Edificio.id, batch_size)
+
     def delete(self, edificio_id: int) -> bool:
         """Eliminar un edificio"""
         db_edificio = self.get_by_id(edificio_id)
@@ -0,0 +1,31 @@
+from typing import Any, Iterator
+
+from sqlalchemy.orm import Query
+
+# Tamaño de lote por defecto para los recorridos completos de una tabla
+DEFAULT_BATCH_SIZE = 500
+
+
+def iter_keyset(query: Query, key_column: Any, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Any]:
+    """
+    Recorrer ``query`` completo en lotes de ``batch_size`` ordenados por ``key_column``.
+
+    Cada lote pide las filas con llave mayor a la última entregada (paginación keyset), así
+    que el costo por lote no crece con la posición como ocurre con OFFSET. Las filas de cada
+    lote se leen con un cursor del lado del servidor (``yield_per``) cuando el driver
+    lo soporta, por lo que en memoria nunca hay más de un lote.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size debe ser mayor que 0")
+
+    last_key = None
+    while True:
+        page = query if last_key is None else query.filter(key_column > last_key)
+        page = page.order_by(key_column).limit(batch_size).yield_per(batch_size)
+        count = 0
+        for row in page:
+            count += 1
+            last_key = getattr(row, key_column.key)
+            yield row
+        if count < batch_size:
+            return
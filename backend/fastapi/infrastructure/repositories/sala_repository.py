@@ -1,14 +1,18 @@
-from typing import List, Optional
+from datetime import time
+from typing import Iterator, List, Optional
 
 from sqlalchemy.orm import Session
 
 from domain.entities import SalaCreate
 from domain.models import Sala
+from infrastructure.database.clase_occupancy import ClaseOccupancyIndex, clase_occupancy
+from infrastructure.repositories.pagination import DEFAULT_BATCH_SIZE, iter_keyset
 
 
 class SalaRepository:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, occupancy: ClaseOccupancyIndex = clase_occupancy):
         self.session = session
+        self.occupancy = occupancy
 
     def create(self, sala: SalaCreate) -> Sala:
         """Crear una nueva sala"""
@@ -37,6 +41,10 @@ class SalaRepository:
         """Obtener todas las salas con paginación"""
         return self.session.query(Sala).offset(skip).limit(limit).all()
 
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Sala]:
+        """Recorrer todas las salas por lotes, sin el límite de get_all"""
+        return iter_keyset(self.session.query(Sala), Sala.id, batch_size)
+
     def get_by_tipo(self, tipo: str) -> List[Sala]:
         """Obtener salas por tipo (laboratorio, aula, auditorio, etc.)"""
         return self.session.query(Sala).filter(Sala.tipo == tipo).all()
@@ -54,13 +62,39 @@ class SalaRepository:
         """Obtener salas disponibles y opcionalmente que no tienen clases en un bloque específico"""
         from domain.models import Clase
 
-        query = self.session.query(Sala).filter(Sala.disponible == True)
+        query = self.session.query(Sala).filter(Sala.disponible.is_(True))
         if bloque_id:
             query = query.outerjoin(Clase).filter(
                 (Clase.sala_id == None) | (Clase.bloque_id != bloque_id)
             )
         return query.all()
 
+    def get_libres(
+        self,
+        dia_semana: int,
+        desde: time,
+        hasta: time,
+        capacidad_min: Optional[int] = None,
+        edificio_id: Optional[int] = None,
+    ) -> List[Sala]:
+        """
+        Obtener salas disponibles sin clases en ningún bloque que se traslape con
+        ``[desde, hasta)`` el ``dia_semana`` indicado.
+
+        Las salas candidatas salen de una consulta por sus atributos; la ocupación se
+        resuelve con el índice en memoria de clases (bitmap de bloques por sala).
+        """
+        query = self.session.query(Sala).filter(Sala.disponible.is_(True))
+        if capacidad_min is not None:
+            query = query.filter(Sala.capacidad >= capacidad_min)
+        if edificio_id is not None:
+            query = query.filter(Sala.edificio_id == edificio_id)
+        salas = query.order_by(Sala.id).all()
+
+        mask = self.occupancy.bloques_entre(self.session, dia_semana, desde, hasta)
+        libres = set(self.occupancy.libres(self.session, "sala", (sala.id for sala in salas), mask))
+        return [sala for sala in salas if sala.id in libres]
+
     def get_by_edificio(self, edificio_id: int) -> List[Sala]:
         """Obtener salas por edificio"""
         return self.session.query(Sala).filter(Sala.edificio_id == edificio_id).all()
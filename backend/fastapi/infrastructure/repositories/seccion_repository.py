@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from sqlalchemy.orm import Session
 
 from domain.entities import SeccionCreate
 from domain.models import Seccion
+from infrastructure.repositories.pagination import DEFAULT_BATCH_SIZE, iter_keyset
 
 
 class SeccionRepository:
@@ -30,6 +31,10 @@ class SeccionRepository:
         """Obtener todas las secciones con paginación"""
         return self.session.query(Seccion).offset(skip).limit(limit).all()
 
+    def iter_all(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Seccion]:
+        """Recorrer todas las secciones por lotes, sin el límite de get_all"""
+        return iter_keyset(self.session.query(Seccion), Seccion.id, batch_size)
+
     def get_by_asignatura(self, asignatura_id: int) -> List[Seccion]:
         """Obtener secciones de una asignatura específica"""
         return self.session.query(Seccion).filter(Seccion.asignatura_id == asignatura_id).all()
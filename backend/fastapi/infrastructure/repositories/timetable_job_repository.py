@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from domain.models import TimetableJob
+
+# Estados en que el dispatcher todavía tiene trabajo con el job
+ACTIVE_STATUSES = ("pending", "dispatching", "queued", "running")
+
+
+class TimetableJobRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def create(self, job_data: dict) -> TimetableJob:
+        """Registrar una nueva generación de horario"""
+        db_job = TimetableJob(**job_data)
+        self.session.add(db_job)
+        self.session.commit()
+        self.session.refresh(db_job)
+        return db_job
+
+    def get_by_id(self, job_id: int) -> Optional[TimetableJob]:
+        """Obtener una generación por ID"""
+        return self.session.query(TimetableJob).filter(TimetableJob.id == job_id).first()
+
+    def get_all(self, skip: int = 0, limit: int = 100) -> List[TimetableJob]:
+        """Obtener las generaciones, de la más reciente a la más antigua"""
+        return (
+            self.session.query(TimetableJob)
+            .order_by(TimetableJob.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def get_active(self) -> List[TimetableJob]:
+        """Obtener las generaciones que aún no terminan, en orden de creación"""
+        return (
+            self.session.query(TimetableJob)
+            .filter(TimetableJob.status.in_(ACTIVE_STATUSES))
+            .order_by(TimetableJob.id)
+            .all()
+        )
+
+    def claim_for_dispatch(self, job_id: int, now: datetime, stale_before: datetime) -> bool:
+        """
+        Tomar una generación sin enviar para enviarla al agente (``dispatching``).
+
+        El ``UPDATE`` condicional es atómico: si dos dispatchers leen el mismo job ``pending``,
+        solo uno lo toma y el otro recibe ``False``. Un ``dispatching`` cuyo ``submitted_at``
+        es anterior a ``stale_before`` quedó de un proceso caído y se puede volver a tomar.
+        """
+        result = self.session.execute(
+            update(TimetableJob)
+            .where(
+                TimetableJob.id == job_id,
+                TimetableJob.agent_job_id.is_(None),
+                TimetableJob.status.in_(ACTIVE_STATUSES),
+                or_(
+                    TimetableJob.status != "dispatching",
+                    TimetableJob.submitted_at < stale_before,
+                ),
+            )
+            .values(status="dispatching", submitted_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.commit()
+        return result.rowcount == 1
+
+    def update(self, job_id: int, job_data: dict) -> Optional[TimetableJob]:
+        """Actualizar una generación"""
+        db_job = self.get_by_id(job_id)
+        if db_job:
+            for key, value in job_data.items():
+                setattr(db_job, key, value)
+            self.session.commit()
+            self.session.refresh(db_job)
+        return db_job
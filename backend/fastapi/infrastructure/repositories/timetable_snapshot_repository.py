@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from domain.models import Asignatura, Clase, Docente, Edificio, RestriccionHorario, Sala, Seccion
+from infrastructure.database.academic_data_version import read_version
+from infrastructure.repositories.asignatura_repository import AsignaturaRepository
+from infrastructure.repositories.clase_repository import ClaseRepository
+from infrastructure.repositories.docente_repository import DocenteRepository
+from infrastructure.repositories.edificio_repository import SQLEdificioRepository
+from infrastructure.repositories.pagination import DEFAULT_BATCH_SIZE
+from infrastructure.repositories.sala_repository import SalaRepository
+from infrastructure.repositories.seccion_repository import SeccionRepository
+
+
+@dataclass
+class TimetableSnapshot:
+    """
+    Datos académicos necesarios para armar una generación de horarios, ya indexados.
+
+    ``primeras_clases`` guarda, para cada sección con clases, su primera clase (en orden de
+    id): su docente es el que se asigna a la actividad de la sección.
+    """
+
+    docentes: List[Docente] = field(default_factory=list)
+    asignaturas: Dict[int, Asignatura] = field(default_factory=dict)
+    secciones: Dict[int, Seccion] = field(default_factory=dict)
+    primeras_clases: Dict[int, Clase] = field(default_factory=dict)
+    edificios: List[Edificio] = field(default_factory=list)
+    salas: List[Sala] = field(default_factory=list)
+    restricciones: List[RestriccionHorario] = field(default_factory=list)
+
+
+class TimetableSnapshotRepository:
+    """
+    Carga en bloque todo lo que usa ``TimetableService``.
+
+    Cada tabla se recorre completa con ``iter_all`` de su repositorio (paginación keyset en
+    lotes de ``batch_size``; los docentes junto a su usuario), así que no hay consultas por
+    fila ni truncamiento: la cantidad de consultas depende solo del número de lotes.
+
+    Los métodos ``load_*`` leen solo las filas indicadas, para refrescar un request ya armado.
+    """
+
+    def __init__(self, session: Session, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self.docente_repository = DocenteRepository(session)
+        self.asignatura_repository = AsignaturaRepository(session)
+        self.seccion_repository = SeccionRepository(session)
+        self.clase_repository = ClaseRepository(session)
+        self.sala_repository = SalaRepository(session)
+        self.edificio_repository = SQLEdificioRepository(session)
+
+    def get_version(self) -> int:
+        """Versión confirmada de los datos académicos (una consulta a ``datos_academicos_version``)"""
+        return read_version(self.session)
+
+    def load(self) -> TimetableSnapshot:
+        """Obtener una foto completa de los datos académicos"""
+        batch_size = self.batch_size
+
+        primeras_clases: Dict[int, Clase] = {}
+        for clase in self.clase_repository.iter_all(batch_size):
+            if clase.seccion_id is not None:
+                primeras_clases.setdefault(clase.seccion_id, clase)
+
+        return TimetableSnapshot(
+            docentes=[
+                docente
+                for docente in self.docente_repository.iter_all(batch_size)
+                if docente.user is not None
+            ],
+            asignaturas={
+                asignatura.id: asignatura
+                for asignatura in self.asignatura_repository.iter_all(batch_size)
+            },
+            secciones={
+                seccion.id: seccion for seccion in self.seccion_repository.iter_all(batch_size)
+            },
+            primeras_clases=primeras_clases,
+            edificios=list(self.edificio_repository.iter_all(batch_size)),
+            salas=list(self.sala_repository.iter_all(batch_size)),
+            restricciones=self.load_restricciones(),
+        )
+
+    def load_secciones(self, ids: Iterable[int]) -> Tuple[Dict[int, Seccion], Dict[int, Clase]]:
+        """Obtener las secciones indicadas y la primera clase de cada una"""
+        secciones = {
+            seccion.id: seccion for seccion in self._by_ids(self.session.query(Seccion), Seccion.id, ids)
+        }
+        primeras_clases: Dict[int, Clase] = {}
+        clases = self._by_ids(self.session.query(Clase), Clase.seccion_id, secciones)
+        for clase in sorted(clases, key=lambda clase: clase.id):
+            primeras_clases.setdefault(clase.seccion_id, clase)
+        return secciones, primeras_clases
+
+    def load_asignaturas(self, ids: Iterable[int]) -> Dict[int, Asignatura]:
+        """Obtener las asignaturas indicadas"""
+        query = self.session.query(Asignatura)
+        return {asignatura.id: asignatura for asignatura in self._by_ids(query, Asignatura.id, ids)}
+
+    def load_docentes(self, user_ids: Iterable[int]) -> Dict[int, Docente]:
+        """Obtener los docentes indicados junto a su usuario"""
+        query = self.session.query(Docente).options(joinedload(Docente.user))
+        return {
+            docente.user_id: docente
+            for docente in self._by_ids(query, Docente.user_id, user_ids)
+            if docente.user is not None
+        }
+
+    def load_restricciones(self, docente_ids: Optional[Iterable[int]] = None) -> List[RestriccionHorario]:
+        """Obtener las restricciones de horario activas (todas, o las de los docentes indicados)"""
+        query = self.session.query(RestriccionHorario).filter(RestriccionHorario.activa.isnot(False))
+        if docente_ids is None:
+            return query.order_by(RestriccionHorario.id).all()
+        return self._by_ids(query, RestriccionHorario.docente_id, docente_ids)
+
+    def load_espacios(self) -> Tuple[List[Edificio], List[Sala]]:
+        """Obtener todos los edificios y salas"""
+        return (
+            list(self.edificio_repository.iter_all(self.batch_size)),
+            list(self.sala_repository.iter_all(self.batch_size)),
+        )
+
+    def _by_ids(self, query, column, ids: Iterable[int]) -> List:
+        # IN en trozos de batch_size para no armar sentencias gigantes
+        ids = sorted(set(ids))
+        rows = []
+        for start in range(0, len(ids), self.batch_size):
+            rows.extend(query.filter(column.in_(ids[start:start + self.batch_size])).all())
+        return rows
@@ -8,20 +8,50 @@ from application.middlewares import (
     RateLimitMiddleware,
     SecurityLoggingMiddleware
 )
+from application.middlewares.rate_limit_store import create_rate_limit_store
 from application.logging_config import configure_logging
+from application.services.timetable_job_dispatcher import timetable_job_dispatcher
+from infrastructure.agent_client import agent_client
+from infrastructure.database.clase_occupancy import clase_occupancy
+from infrastructure.database.config import SessionLocal
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 # Configurar logging
 configure_logging(level="INFO" if settings.environment == "production" else "DEBUG")
 logger = logging.getLogger(__name__)
 
+
+def _load_clase_occupancy() -> None:
+    session = SessionLocal()
+    try:
+        clase_occupancy.verify(session)
+    finally:
+        session.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Índice en memoria de la ocupación de bloques, cargado y verificado contra la BD
+    await asyncio.to_thread(_load_clase_occupancy)
+    # Cliente HTTP hacia el agente compartido por toda la aplicación (pool + keep-alive)
+    await agent_client.start()
+    # Envía y sigue en segundo plano las generaciones registradas en timetable_job
+    await timetable_job_dispatcher.start()
+    yield
+    await timetable_job_dispatcher.stop()
+    await agent_client.close()
+
+
 app = FastAPI(
     title="SGH - Sistema de Gestión de Horarios", 
     version="1.0.0",
     description="API REST para la gestión de horarios académicos",
     docs_url="/api/docs", 
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 logger.info(f"Iniciando aplicación en modo {settings.environment}")
@@ -81,7 +111,13 @@ app.add_middleware(
     RateLimitMiddleware,
     requests_limit=100,  # 100 requests por minuto para no autenticados
     window_seconds=60,
-    auth_requests_limit=200  # 200 requests por minuto para autenticados
+    auth_requests_limit=200,  # 200 requests por minuto para autenticados
+    store=create_rate_limit_store(
+        settings.rate_limit_backend,
+        window_seconds=60,
+        max_keys=settings.rate_limit_max_clients,
+        path=settings.rate_limit_path,
+    ),
 )
 
 # 3. Sanitization - validar y sanitizar entrada
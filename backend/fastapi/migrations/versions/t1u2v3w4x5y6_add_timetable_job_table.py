@@ -0,0 +1,60 @@
+"""add_timetable_job_table
+
+Revision ID: t1u2v3w4x5y6
+Revises: 3dc2453812ae
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 't1u2v3w4x5y6'
+down_revision: Union[str, Sequence[str], None] = '3dc2453812ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Crear la tabla de generaciones de horario.
+
+    Cada fila registra una generación encargada al agente: su job en el agente, el estado,
+    el avance reportado por FET y dónde quedó el resultado.
+    """
+    op.create_table(
+        'timetable_job',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('timetable_id', sa.Text(), nullable=False),
+        sa.Column('semester', sa.String(length=20), nullable=False),
+        sa.Column('institution_name', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('agent_job_id', sa.String(length=64), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('placed_activities', sa.Integer(), nullable=True),
+        sa.Column('total_activities', sa.Integer(), nullable=True),
+        sa.Column('result_location', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('submitted_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['user.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # El poller consulta los jobs activos por estado
+    op.create_index('ix_timetable_job_status', 'timetable_job', ['status'])
+    op.create_index('ix_timetable_job_agent_job_id', 'timetable_job', ['agent_job_id'])
+
+
+def downgrade() -> None:
+    """Revertir la creación de la tabla timetable_job"""
+    op.drop_index('ix_timetable_job_agent_job_id', table_name='timetable_job')
+    op.drop_index('ix_timetable_job_status', table_name='timetable_job')
+    op.drop_table('timetable_job')
@@ -0,0 +1,33 @@
+"""add_activity_map_to_timetable_job
+
+Revision ID: u2v3w4x5y6z7
+Revises: t1u2v3w4x5y6
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'u2v3w4x5y6z7'
+down_revision: Union[str, Sequence[str], None] = 't1u2v3w4x5y6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Guardar en cada generación la sección y el docente de sus actividades, y cuándo se
+    publicó su resultado en la tabla clase.
+    """
+    op.add_column('timetable_job', sa.Column('activity_map', sa.JSON(), nullable=True))
+    op.add_column('timetable_job', sa.Column('published_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Revertir las columnas de publicación de timetable_job"""
+    op.drop_column('timetable_job', 'published_at')
+    op.drop_column('timetable_job', 'activity_map')
@@ -0,0 +1,37 @@
+"""add_clase_ocupacion_version_table
+
+Revision ID: w3x4y5z6a7b8
+Revises: u2v3w4x5y6z7
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'w3x4y5z6a7b8'
+down_revision: Union[str, Sequence[str], None] = 'u2v3w4x5y6z7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Contador de escrituras de clases y bloques, con el que cada proceso del backend detecta
+    que su índice de ocupación quedó atrás.
+    """
+    op.create_table(
+        'clase_ocupacion_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("INSERT INTO clase_ocupacion_version (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    """Eliminar la tabla clase_ocupacion_version"""
+    op.drop_table('clase_ocupacion_version')
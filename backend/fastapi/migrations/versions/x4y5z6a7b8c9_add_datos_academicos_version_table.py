@@ -0,0 +1,37 @@
+"""add_datos_academicos_version_table
+
+Revision ID: x4y5z6a7b8c9
+Revises: w3x4y5z6a7b8
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'x4y5z6a7b8c9'
+down_revision: Union[str, Sequence[str], None] = 'w3x4y5z6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Contador de escrituras de los datos académicos, con el que cada proceso del backend
+    detecta que su caché del request de generación quedó atrás.
+    """
+    op.create_table(
+        'datos_academicos_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("INSERT INTO datos_academicos_version (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    """Eliminar la tabla datos_academicos_version"""
+    op.drop_table('datos_academicos_version')
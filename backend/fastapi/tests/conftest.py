@@ -64,9 +64,20 @@ def db_engine():
         Seccion,
         User,
     )
+    from application.services.timetable_request_cache import timetable_request_cache
+    from infrastructure.database.academic_data_version import academic_data_version
+    from infrastructure.database.clase_occupancy import clase_occupancy
 
     # Crear todas las tablas con la estructura actual
     Base.metadata.create_all(bind=engine)
+    # Cada test parte de una BD vacía: el índice en memoria se recarga desde ella
+    clase_occupancy.invalidate()
+    # Con StaticPool todas las sesiones comparten una conexión: cerrar una sesión nueva para
+    # reconstruir el índice descartaría la transacción del test, así que lee con la del llamador
+    clase_occupancy.session_factory = None
+    # La versión de los datos académicos vuelve a partir de cero con cada BD
+    academic_data_version.clear()
+    timetable_request_cache.clear()
     yield engine
     Base.metadata.drop_all(bind=engine)
 
@@ -326,3 +337,115 @@ def edificio_completo(client, auth_headers_admin, campus_completo):
     response = client.post("/api/edificios/", json=edificio_data, headers=auth_headers_admin)
     assert response.status_code == 201
     return response.json()
+
+
+@pytest.fixture
+def crear_datos_academicos(db_session):
+    """
+    Fábrica del árbol Campus → Edificio → Sala, Bloque, User/Docente y Asignatura → Sección
+    que usan los tests de clases y horarios.
+
+    Cada llamada crea un árbol nuevo, lo confirma y retorna sus objetos por nombre
+    (``campus``, ``edificios``, ``salas``, ``bloques``, ``docentes``, ``asignaturas`` y
+    ``secciones``). ``prefijo`` distingue los correos y códigos cuando se llama más de una vez.
+    ``salas`` es una cantidad o una lista de atributos por sala (``edificio`` es el índice del
+    edificio). La sección ``i`` usa la asignatura, el docente y la sala ``i`` módulo su
+    cantidad, y pertenece al año ``i % anios + 1``.
+    """
+    from domain.models import Asignatura, Bloque, Campus, Clase, Docente, Edificio, Sala, Seccion, User
+
+    def crear(
+        prefijo: str = "",
+        edificios: int = 1,
+        salas=1,
+        bloques=(),
+        docentes: int = 1,
+        asignaturas: int = 1,
+        secciones: int = 1,
+        anios: int = 1,
+        clases_por_seccion: int = 0,
+    ) -> dict:
+        campus = Campus(nombre=f"Campus {prefijo}".strip())
+        db_session.add(campus)
+        db_session.flush()
+        db_edificios = [
+            Edificio(campus_id=campus.id, nombre=f"Edificio {prefijo}{i}", pisos=1) for i in range(edificios)
+        ]
+        db_session.add_all(db_edificios)
+        db_session.flush()
+
+        if isinstance(salas, int):
+            salas = [{} for _ in range(salas)]
+        db_salas = []
+        for i, atributos in enumerate(salas):
+            atributos = {"codigo": f"S-{prefijo}{i}", "capacidad": 40, "tipo": "aula", **atributos}
+            edificio = db_edificios[atributos.pop("edificio", 0)]
+            db_salas.append(Sala(edificio_id=edificio.id, **atributos))
+        db_bloques = [
+            Bloque(dia_semana=dia, hora_inicio=inicio, hora_fin=fin) for dia, inicio, fin in bloques
+        ]
+        db_session.add_all(db_salas + db_bloques)
+
+        db_docentes = []
+        for i in range(docentes):
+            user = User(
+                nombre=f"Docente {prefijo}{i}",
+                email=f"docente.{prefijo}{i}@test.com",
+                pass_hash="x",
+                rol="docente",
+            )
+            db_session.add(user)
+            db_session.flush()
+            db_session.add(Docente(user_id=user.id, departamento="Informática"))
+            db_docentes.append(user)
+
+        db_asignaturas = [
+            Asignatura(
+                codigo=f"INF-{prefijo}{i}",
+                nombre=f"Asignatura {i}",
+                horas_presenciales=2,
+                horas_mixtas=1,
+                horas_autonomas=3,
+                cantidad_creditos=4,
+                semestre=1,
+            )
+            for i in range(asignaturas)
+        ]
+        db_session.add_all(db_asignaturas)
+        db_session.flush()
+
+        db_secciones = []
+        for i in range(secciones):
+            anio = i % anios + 1
+            seccion = Seccion(
+                codigo=f"{anio} sección {i}",
+                anio_academico=anio,
+                semestre=1,
+                asignatura_id=db_asignaturas[i % asignaturas].id,
+                tipo_grupo="seccion",
+                numero_estudiantes=30,
+            )
+            db_session.add(seccion)
+            db_session.flush()
+            for _ in range(clases_por_seccion):
+                db_session.add(
+                    Clase(
+                        seccion_id=seccion.id,
+                        docente_id=db_docentes[i % docentes].id,
+                        sala_id=db_salas[i % len(db_salas)].id,
+                        estado="programada",
+                    )
+                )
+            db_secciones.append(seccion)
+        db_session.commit()
+        return {
+            "campus": campus,
+            "edificios": db_edificios,
+            "salas": db_salas,
+            "bloques": db_bloques,
+            "docentes": db_docentes,
+            "asignaturas": db_asignaturas,
+            "secciones": db_secciones,
+        }
+
+    return crear
@@ -0,0 +1,74 @@
+import gzip
+import json
+
+import httpx
+import pytest
+
+from infrastructure.agent_client import AgentClient
+
+
+def _cliente(handler, compression_min_bytes: int = 1024) -> AgentClient:
+    return AgentClient(
+        base_url="http://agent/api",
+        timeout=httpx.Timeout(connect=1.0, read=2.0, write=2.0, pool=1.0),
+        limits=httpx.Limits(max_connections=2, max_keepalive_connections=1),
+        compression_min_bytes=compression_min_bytes,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+@pytest.mark.asyncio
+async def test_post_json_comprime_cuerpos_grandes():
+    recibidos = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        recibidos.append(request)
+        return httpx.Response(202, json={"job_id": "1", "status": "queued"})
+
+    cliente = _cliente(handler)
+    cuerpo = json.dumps({"activities": [{"id": str(i)} for i in range(500)]})
+    response = await cliente.post_json("/fet/run", cuerpo, headers={"X-Service-Name": "sgh-backend"})
+
+    request = recibidos[0]
+    assert response.status_code == 202
+    assert str(request.url) == "http://agent/api/fet/run"
+    assert request.headers["content-encoding"] == "gzip"
+    assert request.headers["content-type"] == "application/json"
+    assert request.headers["x-service-name"] == "sgh-backend"
+    assert len(request.content) < len(cuerpo)
+    assert gzip.decompress(request.content).decode("utf-8") == cuerpo
+
+
+@pytest.mark.asyncio
+async def test_post_json_no_comprime_cuerpos_chicos():
+    recibidos = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        recibidos.append(request)
+        return httpx.Response(202, json={})
+
+    await _cliente(handler).post_json("/fet/run", '{"a": 1}', headers={})
+
+    assert "content-encoding" not in recibidos[0].headers
+    assert recibidos[0].content == b'{"a": 1}'
+
+
+@pytest.mark.asyncio
+async def test_cliente_compartido_durante_el_ciclo_de_vida():
+    cliente = _cliente(lambda request: httpx.Response(200, json={}))
+
+    await cliente.start()
+    compartido = cliente._client
+    await cliente.get("/fet/jobs/1", headers={})
+    await cliente.get("/fet/jobs/2", headers={})
+    assert cliente._client is compartido
+    assert compartido.timeout.connect == 1.0 and compartido.timeout.read == 2.0
+
+    await cliente.close()
+    assert compartido.is_closed
+    assert cliente._client is None
+
+    # Sin iniciar se usa un cliente de un solo uso
+    response = await cliente.get("/fet/jobs/3", headers={})
+    assert response.status_code == 200
+    assert cliente._client is None
@@ -0,0 +1,199 @@
+from datetime import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from application.use_cases.clase_uses_cases import ClaseUseCases
+from domain.models import Base, Clase
+from domain.schemas import ClaseSecureCreate, ClaseSecurePatch
+from infrastructure.database.clase_occupancy import ClaseOccupancyIndex, clase_occupancy, mark_stale, read_version
+from infrastructure.repositories.clase_bulk_repository import ClaseBulkRepository
+from infrastructure.repositories.clase_repository import ClaseRepository
+
+
+@pytest.fixture
+def datos(crear_datos_academicos):
+    datos = crear_datos_academicos(
+        salas=2, bloques=[(1, time(8 + i), time(9 + i)) for i in range(3)], docentes=2
+    )
+    return {**datos, "seccion": datos["secciones"][0]}
+
+
+def _casos(db_session, occupancy=clase_occupancy) -> ClaseUseCases:
+    return ClaseUseCases(ClaseRepository(db_session, occupancy))
+
+
+def _crear(db_session, datos, docente=0, sala=0, bloque=0, occupancy=clase_occupancy) -> Clase:
+    return _casos(db_session, occupancy).create(
+        ClaseSecureCreate(
+            seccion_id=datos["seccion"].id,
+            docente_id=datos["docentes"][docente].id,
+            sala_id=datos["salas"][sala].id,
+            bloque_id=datos["bloques"][bloque].id,
+            estado="programada",
+        )
+    )
+
+
+def _contar_consultas(db_session, funcion):
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        resultado = funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return resultado, len(consultas)
+
+
+def test_el_indice_consulta_la_bd_una_vez_por_transaccion(db_session, datos):
+    clase = _crear(db_session, datos)
+    repositorio = ClaseRepository(db_session)
+    bloque = datos["bloques"][0].id
+    docente = datos["docentes"][0].id
+    sala = datos["salas"][0].id
+    clase_id = clase.id
+    clase_occupancy.ensure_loaded(db_session)
+    db_session.commit()
+
+    # Solo se lee la versión de la ocupación, y solo en la primera consulta de la transacción
+    ocupacion, consultas = _contar_consultas(
+        db_session, lambda: repositorio.get_ocupacion("docente", docente, bloque)
+    )
+    assert ocupacion == {clase_id}
+    assert consultas == 1
+    ocupacion, consultas = _contar_consultas(db_session, lambda: repositorio.get_ocupacion("sala", sala, bloque))
+    assert ocupacion == {clase_id}
+    assert consultas == 0
+    assert repositorio.get_ocupacion("docente", datos["docentes"][1].id, bloque) == frozenset()
+
+    with pytest.raises(HTTPException, match="docente"):
+        _crear(db_session, datos, sala=1)
+    with pytest.raises(HTTPException, match="sala"):
+        _crear(db_session, datos, docente=1)
+
+
+def test_mover_o_eliminar_una_clase_libera_su_bloque(db_session, datos):
+    clase = _crear(db_session, datos)
+    casos = _casos(db_session)
+
+    casos.update(clase.id, ClaseSecurePatch(bloque_id=datos["bloques"][1].id))
+    # Mover a su propio bloque no es un choque consigo misma
+    casos.update(clase.id, ClaseSecurePatch(sala_id=datos["salas"][1].id))
+    otra = _crear(db_session, datos)
+
+    casos.delete(otra.id)
+    assert clase_occupancy.clases_en(db_session, "docente", datos["docentes"][0].id, datos["bloques"][0].id) == frozenset()
+    assert clase_occupancy.bloques_ocupados(db_session, "docente", datos["docentes"][0].id) == 1 << datos["bloques"][1].id
+    assert clase_occupancy.verify(db_session)
+
+
+def test_rollback_no_modifica_el_indice(db_session, datos):
+    clase_occupancy.ensure_loaded(db_session)
+    db_session.add(
+        Clase(
+            seccion_id=datos["seccion"].id,
+            docente_id=datos["docentes"][0].id,
+            sala_id=datos["salas"][0].id,
+            bloque_id=datos["bloques"][0].id,
+        )
+    )
+    db_session.flush()
+    db_session.rollback()
+
+    assert clase_occupancy.clases_en(db_session, "sala", datos["salas"][0].id, datos["bloques"][0].id) == frozenset()
+    assert clase_occupancy.verify(db_session)
+
+
+def test_escrituras_fuera_del_orm_reconstruyen_el_indice(db_session, datos):
+    _crear(db_session, datos)
+    seccion_id = datos["seccion"].id
+    docente_id = datos["docentes"][1].id
+    bloque_id = datos["bloques"][2].id
+    version = read_version(db_session)
+
+    # El reemplazo masivo avisa al índice y mueve la versión en su transacción
+    ClaseBulkRepository(db_session).replace_for_secciones(
+        [seccion_id],
+        [{"seccion_id": seccion_id, "docente_id": docente_id, "sala_id": None, "bloque_id": bloque_id, "estado": "programada"}],
+    )
+    assert clase_occupancy.is_stale
+    assert read_version(db_session) == version + 1
+    assert len(clase_occupancy.clases_en(db_session, "docente", docente_id, bloque_id)) == 1
+    assert clase_occupancy.clases_en(db_session, "docente", datos["docentes"][0].id, datos["bloques"][0].id) == frozenset()
+
+    # SQL directo no se ve: la verificación lo detecta y reconstruye
+    db_session.execute(
+        text("INSERT INTO clase (seccion_id, docente_id, bloque_id) VALUES (:s, :d, :b)"),
+        {"s": seccion_id, "d": docente_id, "b": datos["bloques"][0].id},
+    )
+    db_session.commit()
+    assert not clase_occupancy.verify(db_session)
+    assert len(clase_occupancy.clases_en(db_session, "docente", docente_id, datos["bloques"][0].id)) == 1
+    assert clase_occupancy.verify(db_session)
+
+
+def test_otro_proceso_ve_las_clases_confirmadas_por_la_version(db_session, datos):
+    # Un índice aparte hace de índice de otro proceso: los listeners no le avisan nada
+    otro_proceso = ClaseOccupancyIndex()
+    docente_id = datos["docentes"][0].id
+    bloque_id = datos["bloques"][0].id
+    clase_occupancy.ensure_loaded(db_session)
+    assert otro_proceso.clases_en(db_session, "docente", docente_id, bloque_id) == frozenset()
+    db_session.commit()
+    version = read_version(db_session)
+
+    clase = _crear(db_session, datos)
+    assert read_version(db_session) == version + 1
+    assert otro_proceso.clases_en(db_session, "docente", docente_id, bloque_id) == {clase.id}
+    # El índice del proceso que escribió se actualizó sin reconstruirse
+    assert not clase_occupancy.is_stale
+    assert clase_occupancy.clases_en(db_session, "docente", docente_id, bloque_id) == {clase.id}
+
+
+def test_crear_rechaza_choques_que_confirmo_otro_escritor(db_session, datos):
+    # Un índice aparte hace de índice de otro proceso: los listeners no le avisan nada
+    otro_proceso = ClaseOccupancyIndex()
+    otro_proceso.ensure_loaded(db_session)
+    db_session.commit()
+    # SQL directo que, como ClaseBulkRepository, mueve la versión en su transacción
+    db_session.execute(
+        text("INSERT INTO clase (seccion_id, docente_id, sala_id, bloque_id) VALUES (:s, :d, :sala, :b)"),
+        {"s": datos["seccion"].id, "d": datos["docentes"][0].id, "sala": datos["salas"][1].id, "b": datos["bloques"][0].id},
+    )
+    mark_stale(db_session)
+    db_session.commit()
+
+    # La validación usa el índice, que compara la versión y se reconstruye
+    with pytest.raises(HTTPException, match="docente"):
+        _crear(db_session, datos, occupancy=otro_proceso)
+    with pytest.raises(HTTPException, match="sala"):
+        _crear(db_session, datos, docente=1, sala=1, occupancy=otro_proceso)
+    clase = _crear(db_session, datos, docente=1, bloque=1, occupancy=otro_proceso)
+    assert otro_proceso.clases_en(db_session, "sala", datos["salas"][0].id, datos["bloques"][1].id) == {clase.id}
+
+
+def test_la_reconstruccion_no_incluye_filas_sin_confirmar(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ocupacion.db'}")
+    Base.metadata.create_all(bind=engine)
+    sesiones = sessionmaker(bind=engine)
+    indice = ClaseOccupancyIndex(session_factory=sesiones)
+    session = sesiones()
+    try:
+        session.add(Clase(seccion_id=1, docente_id=1, sala_id=1, bloque_id=1))
+        session.flush()
+        assert session.query(Clase).count() == 1
+
+        indice.rebuild(session)
+        assert indice.clases_en(session, "sala", 1, 1) == frozenset()
+        session.commit()
+        assert len(indice.clases_en(session, "sala", 1, 1)) == 1
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,170 @@
+from datetime import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from application.use_cases.clase_uses_cases import ClaseUseCases
+from domain.schemas import ClaseSecureCreate, ClaseValidacionLoteSecure
+from infrastructure.database.clase_occupancy import clase_occupancy
+from infrastructure.repositories.bloque_repository import BloqueRepository
+from infrastructure.repositories.clase_repository import ClaseRepository
+
+
+@pytest.fixture
+def datos(crear_datos_academicos):
+    datos = crear_datos_academicos(
+        salas=2,
+        bloques=[
+            (1, time(8, 0), time(9, 0)),
+            (1, time(8, 30), time(9, 30)),
+            (1, time(9, 30), time(10, 30)),
+            (2, time(8, 0), time(9, 0)),
+        ],
+        docentes=2,
+        secciones=2,
+    )
+    return {
+        nombre: [objeto.id for objeto in datos[nombre]]
+        for nombre in ("salas", "bloques", "docentes", "secciones")
+    }
+
+
+def _casos(db_session) -> ClaseUseCases:
+    return ClaseUseCases(ClaseRepository(db_session), bloque_repository=BloqueRepository(db_session))
+
+
+def _crear(db_session, datos, seccion=0, docente=0, sala=0, bloque=0):
+    return _casos(db_session).create(
+        ClaseSecureCreate(
+            seccion_id=datos["secciones"][seccion],
+            docente_id=datos["docentes"][docente],
+            sala_id=datos["salas"][sala],
+            bloque_id=datos["bloques"][bloque],
+            estado="programada",
+        )
+    )
+
+
+def _propuesta(datos, seccion=0, docente=0, sala=0, bloque=0, clase_id=None) -> dict:
+    return {
+        "clase_id": clase_id,
+        "seccion_id": datos["secciones"][seccion],
+        "docente_id": datos["docentes"][docente],
+        "sala_id": datos["salas"][sala],
+        "bloque_id": datos["bloques"][bloque],
+    }
+
+
+def _validar(db_session, propuestas):
+    return _casos(db_session).validate_batch(ClaseValidacionLoteSecure(propuestas=propuestas))
+
+
+def test_bloques_distintos_que_se_traslapan_chocan(db_session, datos):
+    existente = _crear(db_session, datos)
+
+    # 08:30-09:30 se traslapa con la clase existente de 08:00-09:00 en docente, sala y sección
+    resultado = _validar(db_session, [_propuesta(datos, bloque=1)])
+
+    assert not resultado.valido
+    assert [(c.tipo, c.clases, c.propuestas) for c in resultado.conflictos] == [
+        ("docente", [existente.id], []),
+        ("sala", [existente.id], []),
+        ("seccion", [existente.id], []),
+    ]
+    # 09:30-10:30 empieza justo cuando termina el bloque de 08:30, y el martes es otro día
+    assert _validar(db_session, [_propuesta(datos, bloque=2), _propuesta(datos, bloque=3)]).valido
+
+
+def test_choques_entre_propuestas_del_mismo_lote(db_session, datos):
+    resultado = _validar(
+        db_session,
+        [
+            _propuesta(datos, seccion=0, docente=0, sala=0, bloque=0),
+            _propuesta(datos, seccion=1, docente=0, sala=1, bloque=1),  # mismo docente
+            _propuesta(datos, seccion=0, docente=1, sala=1, bloque=3),  # otro día
+        ],
+    )
+
+    assert [(c.indice, c.tipo, c.recurso_id, c.propuestas) for c in resultado.conflictos] == [
+        (0, "docente", datos["docentes"][0], [1]),
+        (1, "docente", datos["docentes"][0], [0]),
+    ]
+
+
+def test_mover_una_clase_no_choca_consigo_misma(db_session, datos):
+    existente = _crear(db_session, datos)
+
+    resultado = _validar(db_session, [_propuesta(datos, bloque=1, clase_id=existente.id)])
+    assert resultado.valido
+    # Y deja libre su bloque actual para otra propuesta del lote
+    resultado = _validar(
+        db_session,
+        [_propuesta(datos, bloque=2, clase_id=existente.id), _propuesta(datos, seccion=1, bloque=0)],
+    )
+    assert resultado.valido
+
+
+def test_lote_grande_no_consulta_por_propuesta(db_session, datos):
+    _crear(db_session, datos)
+    clase_occupancy.ensure_loaded(db_session)
+    db_session.commit()
+    propuestas = [_propuesta(datos, seccion=i % 2, docente=i % 2, sala=i % 2, bloque=3) for i in range(400)]
+    casos = _casos(db_session)
+    lote = ClaseValidacionLoteSecure(propuestas=propuestas)
+
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        resultado = casos.validate_batch(lote)
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+    # Los bloques del lote y la versión del índice de ocupación
+    assert len(consultas) == 2
+    assert len(resultado.conflictos) == 400 * 3
+    assert len(resultado.conflictos[0].propuestas) == 199
+
+
+def test_bloque_inexistente(db_session, datos):
+    with pytest.raises(HTTPException) as error:
+        _validar(db_session, [_propuesta(datos) | {"bloque_id": 999_999}])
+    assert error.value.status_code == 404
+
+
+def test_endpoint_validate_batch(client, admin_token, db_session, datos):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    existente = _crear(db_session, datos)
+
+    response = client.post(
+        "/api/clases/validate-batch",
+        json={"propuestas": [_propuesta(datos, docente=1, sala=1, seccion=1, bloque=1)]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"valido": True, "conflictos": []}
+
+    response = client.post(
+        "/api/clases/validate-batch",
+        json={"propuestas": [_propuesta(datos, seccion=1, docente=1, bloque=1)]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["conflictos"] == [
+        {
+            "indice": 0,
+            "tipo": "sala",
+            "recurso_id": datos["salas"][0],
+            "bloque_id": datos["bloques"][1],
+            "clases": [existente.id],
+            "propuestas": [],
+        }
+    ]
+
+    response = client.post("/api/clases/validate-batch", json={"propuestas": []}, headers=headers)
+    assert response.status_code == 422
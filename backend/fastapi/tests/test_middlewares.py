@@ -2,6 +2,13 @@
 Tests para los middlewares de seguridad.
 """
 
+import fcntl
+import multiprocessing
+import os
+import re
+import sqlite3
+import time
+
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -11,6 +18,19 @@ from application.middlewares import (
     SanitizationMiddleware,
     SecurityLoggingMiddleware,
 )
+from application.middlewares.injection_scanner import (
+    CATEGORY_SQL,
+    CATEGORY_TOO_LONG,
+    CATEGORY_XSS,
+    InjectionScanner,
+)
+from application.middlewares.rate_limit_store import (
+    BACKEND_SHARED_MEMORY,
+    BACKEND_SQLITE,
+    InMemoryRateLimitStore,
+    SQLiteRateLimitStore,
+    create_rate_limit_store,
+)
 
 
 # Fixture: App básica con middlewares
@@ -164,6 +184,86 @@ class TestSanitizationMiddleware:
         assert response.status_code == 413
 
 
+class TestInjectionScanner:
+    """Tests para la detección de patrones en una sola pasada."""
+
+    GROUPS = [
+        (CATEGORY_SQL, SanitizationMiddleware.SQL_INJECTION_PATTERNS),
+        (CATEGORY_XSS, SanitizationMiddleware.XSS_PATTERNS),
+        ("Path Traversal", SanitizationMiddleware.PATH_TRAVERSAL_PATTERNS),
+    ]
+
+    @staticmethod
+    def _evaluacion_original(groups, value):
+        """Evaluación patrón por patrón, como la hacía el middleware."""
+        for category, patterns in groups:
+            for pattern in patterns:
+                if re.search(pattern, value.lower(), re.IGNORECASE):
+                    return category, pattern
+        return None
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "Programación orientada a objetos",
+            "https://universidad.cl/perfil?id=12&tab=horario",
+            "select\nfrom",
+            "SELECT nombre FROM docentes",
+            "ſelect * from docentes",
+            "Unıon all select 1",
+            "' OR '1'='1'",
+            "'or'\n'='",
+            "admin'; DROP TABLE users; --",
+            "exec (",
+            "<ScRiPt src=x>\n</script>",
+            "<script>\nalert(1)\n</script>",
+            "<iframe\n src=x\n>",
+            "<object data=x",
+            "<img src=x OnError = alert(1)>",
+            "..\\windows",
+            "%252E%252E%252F",
+        ],
+    )
+    def test_mismo_resultado_que_los_patrones_originales(self, value):
+        """El escáner retorna el mismo primer patrón que la evaluación uno a uno."""
+        hit = InjectionScanner(self.GROUPS).scan(value)
+        assert (tuple(hit) if hit else None) == self._evaluacion_original(self.GROUPS, value)
+
+    def test_patrones_desconocidos_se_evaluan_siempre(self):
+        """Los patrones sin equivalente conocido se evalúan con re.search."""
+        groups = [(CATEGORY_XSS, [r"vbscript\s*:"])]
+        scanner = InjectionScanner(groups)
+        assert tuple(scanner.scan("VBScript: msgbox")) == (CATEGORY_XSS, r"vbscript\s*:")
+        assert scanner.scan("texto normal") is None
+
+    def test_valores_demasiado_largos_se_rechazan(self):
+        """Un valor sobre max_scan_length se rechaza sin inspeccionarlo."""
+        scanner = InjectionScanner(self.GROUPS, max_scan_length=10)
+        assert scanner.scan("x" * 10) is None
+        assert scanner.scan("x" * 11).category == CATEGORY_TOO_LONG
+
+        app = FastAPI()
+        app.add_middleware(SanitizationMiddleware, max_scan_length=10)
+
+        @app.post("/test")
+        async def test_endpoint(data: dict):
+            return {"message": "success"}
+
+        client = TestClient(app)
+        assert client.post("/test", json={"a": "x" * 10}).status_code == 200
+        assert client.post("/test", json={"a": "x" * 11}).status_code == 400
+
+    def test_tiempo_lineal_en_valores_patologicos(self):
+        """Los patrones con .* no retroceden en valores largos sin coincidencia."""
+        scanner = InjectionScanner(self.GROUPS)
+        values = ["select " * 14_000, "'or' " * 20_000, "<iframe " * 12_000, "; " * 50_000]
+        started = time.perf_counter()
+        for value in values:
+            assert scanner.scan(value) is None
+        # La evaluación original tarda minutos con estos valores
+        assert time.perf_counter() - started < 2
+
+
 # ============================================================================
 # Tests para RateLimitMiddleware
 # ============================================================================
@@ -226,6 +326,157 @@ class TestRateLimitMiddleware:
         assert response.status_code == 429
 
 
+class TestInMemoryRateLimitStore:
+    """Tests para los contadores de ventana deslizante."""
+
+    def test_ventana_anterior_pesa_segun_lo_que_se_solapa(self):
+        """El conteo de la ventana anterior se descuenta a medida que avanza la actual."""
+        store = InMemoryRateLimitStore(window_seconds=60)
+        for _ in range(10):
+            assert store.hit("ip", 10, now=30.0).allowed
+        assert not store.hit("ip", 10, now=59.0).allowed
+
+        # A los 15 s de la ventana siguiente aún pesan 7.5 de las 10 requests anteriores
+        decision = store.hit("ip", 10, now=75.0)
+        assert decision.allowed
+        assert decision.remaining == 1
+        assert store.hit("ip", 10, now=75.0).allowed
+        rechazo = store.hit("ip", 10, now=75.0)
+        assert not rechazo.allowed
+        # Se admite de nuevo cuando 10 * (1 - f) + 2 + 1 <= 10, es decir a los 18 s
+        assert rechazo.retry_after == 3
+        assert store.hit("ip", 10, now=78.0).allowed
+
+        # Una ventana sin requests reinicia los contadores
+        assert store.hit("ip", 10, now=200.0).remaining == 9
+
+    def test_tabla_lru_acotada(self):
+        """Al superar max_keys se descarta la IP usada hace más tiempo."""
+        store = InMemoryRateLimitStore(window_seconds=60, max_keys=2)
+        store.hit("a", 1, now=0.0)
+        store.hit("b", 1, now=0.0)
+        assert not store.hit("a", 1, now=1.0).allowed  # "a" pasa a ser la más reciente
+        store.hit("c", 1, now=2.0)
+
+        assert len(store) == 2
+        assert not store.hit("a", 1, now=3.0).allowed
+        assert store.hit("b", 1, now=3.0).allowed  # "b" fue descartada y parte de cero
+
+    def test_retry_after_en_la_respuesta(self, app_with_rate_limit):
+        """El 429 informa cuándo reintentar según la ventana deslizante."""
+        client = TestClient(app_with_rate_limit)
+        for _ in range(5):
+            client.get("/test")
+
+        response = client.get("/test")
+        assert response.status_code == 429
+        retry_after = int(response.headers["Retry-After"])
+        assert 1 <= retry_after <= 120
+        assert response.json()["retry_after"] == retry_after
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
+def _hits_admitidos(args):
+    backend, path, requests = args
+    store = create_rate_limit_store(backend, window_seconds=60, max_keys=1_000, path=path)
+    admitidos = sum(store.hit("10.0.0.1", 100, now=30.0).allowed for _ in range(requests))
+    store.close()
+    return admitidos
+
+
+@pytest.mark.parametrize("backend", [BACKEND_SHARED_MEMORY, BACKEND_SQLITE])
+class TestSharedRateLimitStores:
+    """Tests para los almacenamientos compartidos entre workers."""
+
+    def test_limite_global_entre_procesos(self, backend, tmp_path):
+        """Varios procesos sobre el mismo archivo respetan un único límite."""
+        path = str(tmp_path / "rate-limit")
+        with multiprocessing.get_context("fork").Pool(4) as pool:
+            admitidos = pool.map(_hits_admitidos, [(backend, path, 60)] * 4)
+
+        assert sum(admitidos) == 100
+
+    def test_contadores_sobreviven_al_reabrir(self, backend, tmp_path):
+        """Los contadores quedan en el archivo al cerrar y reabrir el almacenamiento."""
+        path = str(tmp_path / "rate-limit")
+        store = create_rate_limit_store(backend, window_seconds=60, max_keys=1_000, path=path)
+        for _ in range(3):
+            store.hit("10.0.0.1", 3, now=10.0)
+        store.close()
+
+        store = create_rate_limit_store(backend, window_seconds=60, max_keys=1_000, path=path)
+        assert not store.hit("10.0.0.1", 3, now=20.0).allowed
+        assert store.hit("10.0.0.2", 3, now=20.0).remaining == 2
+        store.close()
+
+    def test_memoria_acotada_con_muchas_ips(self, backend, tmp_path):
+        """Muchas más IPs que max_keys no hacen crecer el almacenamiento sin límite."""
+        path = tmp_path / "rate-limit"
+        if backend == BACKEND_SQLITE:
+            store = SQLiteRateLimitStore(str(path), window_seconds=60, prune_every=500)
+        else:
+            store = create_rate_limit_store(backend, window_seconds=60, max_keys=100, path=str(path))
+        for ventana in range(5):
+            for i in range(1_000):
+                assert store.hit(f"10.{ventana}.{i >> 8}.{i & 255}", 5, now=ventana * 60.0).allowed
+
+        if backend == BACKEND_SQLITE:
+            # Solo quedan las IPs de las dos últimas ventanas
+            filas = store._conn.execute("SELECT COUNT(*) FROM rate_limit").fetchone()[0]
+            assert filas <= 2_000
+        else:
+            assert path.stat().st_size < 10_000
+        store.close()
+
+    def test_bloqueo_ocupado_admite_sin_contar(self, backend, tmp_path, caplog):
+        """Si otro worker retiene el bloqueo, la request se admite sin trabar el event loop."""
+        path = str(tmp_path / "rate-limit")
+        store = create_rate_limit_store(backend, window_seconds=60, max_keys=1_000, path=path)
+        if backend == BACKEND_SQLITE:
+            otro = sqlite3.connect(path, isolation_level=None)
+            otro.execute("BEGIN IMMEDIATE")
+        else:
+            otro = os.open(path, os.O_RDWR)
+            fcntl.flock(otro, fcntl.LOCK_EX)
+
+        inicio = time.monotonic()
+        with caplog.at_level("WARNING"):
+            decisiones = [store.hit("10.0.0.1", 1, now=10.0) for _ in range(3)]
+        assert time.monotonic() - inicio < 1.0
+        assert all(decision.allowed for decision in decisiones)
+        assert "se admite la request sin contarla" in caplog.text
+
+        # Al liberarse el bloqueo se vuelve a contar: nada de lo admitido quedó registrado
+        if backend == BACKEND_SQLITE:
+            otro.execute("ROLLBACK")
+            otro.close()
+        else:
+            os.close(otro)
+        assert store.hit("10.0.0.1", 1, now=10.0).allowed
+        assert not store.hit("10.0.0.1", 1, now=10.0).allowed
+        store.close()
+
+
+def test_rate_limit_con_almacenamiento_compartido(tmp_path):
+    """El middleware usa el almacenamiento que se le indica."""
+    store = create_rate_limit_store(BACKEND_SQLITE, window_seconds=60, path=str(tmp_path / "rl.sqlite3"))
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, requests_limit=2, window_seconds=60, store=store)
+
+    @app.get("/test")
+    async def test_endpoint():
+        return {"message": "success"}
+
+    client = TestClient(app)
+    assert [client.get("/test").status_code for _ in range(3)] == [200, 200, 429]
+    # Otra instancia (otro worker) sobre el mismo archivo ve la misma cuenta
+    otro = create_rate_limit_store(BACKEND_SQLITE, window_seconds=60, path=str(tmp_path / "rl.sqlite3"))
+    assert not otro.hit("testclient", 2).allowed
+
+    with pytest.raises(ValueError):
+        RateLimitMiddleware(app, window_seconds=30, store=store)
+
+
 # ============================================================================
 # Tests para SecurityLoggingMiddleware
 # ============================================================================
@@ -0,0 +1,156 @@
+import time as reloj
+from datetime import time
+
+import pytest
+from fastapi import HTTPException
+
+from application.use_cases.clase_uses_cases import ClaseUseCases
+from application.use_cases.sala_use_cases import SalaUseCases
+from domain.models import Bloque, Clase
+from domain.schemas import ClaseSecurePatch
+from infrastructure.database.clase_occupancy import (
+    BloqueSlot,
+    ClaseOccupancyIndex,
+    ClaseSlot,
+    clase_occupancy,
+)
+from infrastructure.repositories.clase_repository import ClaseRepository
+from infrastructure.repositories.edificio_repository import SQLEdificioRepository
+from infrastructure.repositories.sala_repository import SalaRepository
+
+LUNES, MARTES = 1, 2
+
+
+@pytest.fixture
+def datos(crear_datos_academicos):
+    datos = crear_datos_academicos(
+        edificios=2,
+        salas=[
+            {"capacidad": 30},
+            {"capacidad": 60},
+            {"capacidad": 60, "edificio": 1},
+            {"capacidad": 60, "edificio": 1, "disponible": False},
+        ],
+        bloques=[
+            (LUNES, time(8, 0), time(9, 0)),
+            (LUNES, time(9, 10), time(10, 10)),
+            (MARTES, time(8, 0), time(9, 0)),
+        ],
+    )
+    return {
+        "edificios": [edificio.id for edificio in datos["edificios"]],
+        "salas": [sala.id for sala in datos["salas"]],
+        "bloques": [bloque.id for bloque in datos["bloques"]],
+        "seccion": datos["secciones"][0].id,
+        "docente": datos["docentes"][0].id,
+    }
+
+
+def _casos(db_session) -> SalaUseCases:
+    return SalaUseCases(SalaRepository(db_session), SQLEdificioRepository(db_session))
+
+
+def _libres(db_session, dia, desde, hasta, **filtros):
+    return [sala.id for sala in _casos(db_session).get_salas_libres(dia, desde, hasta, **filtros)]
+
+
+def _clase(db_session, datos, sala=0, bloque=0) -> int:
+    clase = Clase(
+        seccion_id=datos["seccion"],
+        docente_id=datos["docente"],
+        sala_id=datos["salas"][sala],
+        bloque_id=datos["bloques"][bloque],
+    )
+    db_session.add(clase)
+    db_session.commit()
+    return clase.id
+
+
+def test_sala_ocupada_en_un_bloque_que_toca_el_intervalo(db_session, datos):
+    sala_0, sala_1, sala_2, _ = datos["salas"]
+    _clase(db_session, datos, sala=0, bloque=0)
+
+    assert _libres(db_session, LUNES, time(8, 30), time(9, 30)) == [sala_1, sala_2]
+    # 09:00-09:10 queda entre los dos bloques del lunes; el martes es otro día
+    assert _libres(db_session, LUNES, time(9, 0), time(9, 10)) == [sala_0, sala_1, sala_2]
+    assert _libres(db_session, MARTES, time(8, 0), time(9, 0)) == [sala_0, sala_1, sala_2]
+    # Filtros por capacidad y edificio
+    assert _libres(db_session, MARTES, time(8, 0), time(9, 0), capacidad_min=40) == [sala_1, sala_2]
+    assert _libres(db_session, MARTES, time(8, 0), time(9, 0), edificio_id=datos["edificios"][1]) == [sala_2]
+
+
+def test_el_indice_se_actualiza_con_las_escrituras_de_clases_y_bloques(db_session, datos):
+    sala_0 = datos["salas"][0]
+    clase_id = _clase(db_session, datos, sala=0, bloque=0)
+    assert sala_0 not in _libres(db_session, LUNES, time(8, 0), time(9, 0))
+
+    ClaseUseCases(ClaseRepository(db_session)).update(clase_id, ClaseSecurePatch(bloque_id=datos["bloques"][1]))
+    assert sala_0 in _libres(db_session, LUNES, time(8, 0), time(9, 0))
+    assert sala_0 not in _libres(db_session, LUNES, time(10, 0), time(11, 0))
+
+    # Un bloque nuevo entra al índice sin reconstruirlo
+    bloque = Bloque(dia_semana=MARTES, hora_inicio=time(18, 0), hora_fin=time(19, 0))
+    db_session.add(bloque)
+    db_session.commit()
+    db_session.add(
+        Clase(seccion_id=datos["seccion"], docente_id=datos["docente"], sala_id=sala_0, bloque_id=bloque.id)
+    )
+    db_session.commit()
+
+    assert not clase_occupancy.is_stale
+    assert sala_0 not in _libres(db_session, MARTES, time(18, 30), time(20, 0))
+    assert clase_occupancy.verify(db_session)
+
+
+def test_intervalo_invalido(db_session, datos):
+    with pytest.raises(HTTPException) as error:
+        _libres(db_session, LUNES, time(10, 0), time(9, 0))
+    assert error.value.status_code == 400
+
+
+def test_busqueda_en_memoria_con_miles_de_salas_y_bloques(monkeypatch):
+    indice = ClaseOccupancyIndex()
+    # Sin BD: el índice se carga a mano y no se compara con la versión confirmada
+    monkeypatch.setattr(indice, "ensure_loaded", lambda session: None)
+    indice._stale = False
+    indice._version = 0
+    bloques = {
+        dia * 100 + hora: BloqueSlot(dia, time(hora % 24, 0), time(hora % 24, 50))
+        for dia in range(1, 6)
+        for hora in range(24)
+    }
+    salas = range(1, 5001)
+    clases = {
+        sala * 10 + i: ClaseSlot(None, None, sala, list(bloques)[(sala * 7 + i * 13) % len(bloques)])
+        for sala in salas
+        for i in range(5)
+    }
+    indice.apply(clases, bloques, version=1)
+
+    inicio = reloj.perf_counter()
+    for _ in range(100):
+        mask = indice.bloques_entre(None, LUNES, time(10, 0), time(12, 0))
+        libres = indice.libres(None, "sala", salas, mask)
+    promedio = (reloj.perf_counter() - inicio) / 100
+
+    assert mask == (1 << 110) | (1 << 111)
+    assert 0 < len(libres) < len(salas)
+    assert promedio < 0.005
+
+
+def test_endpoint_salas_libres(client, admin_token, db_session, datos):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    _clase(db_session, datos, sala=1, bloque=0)
+
+    response = client.get(
+        "/api/salas/libres",
+        params={"dia": LUNES, "desde": "08:00", "hasta": "09:00", "capacidad_min": 40},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [sala["id"] for sala in response.json()] == [datos["salas"][2]]
+
+    response = client.get(
+        "/api/salas/libres", params={"dia": 7, "desde": "08:00", "hasta": "09:00"}, headers=headers
+    )
+    assert response.status_code == 422
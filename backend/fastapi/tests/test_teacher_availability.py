@@ -0,0 +1,96 @@
+from datetime import time
+
+import pytest
+
+from application.services.teacher_availability import TeacherAvailabilityCompiler
+from application.services.timetable_calendar import CalendarGrid
+from application.services.timetable_service import TimetableService
+from domain.models import Docente, RestriccionHorario, User
+from infrastructure.repositories.timetable_snapshot_repository import TimetableSnapshotRepository
+
+LUNES, MARTES, DOMINGO = 1, 2, 0
+
+
+def _compilador() -> TeacherAvailabilityCompiler:
+    calendario = TimetableService(snapshot_repository=None)._get_static_calendar()
+    return TeacherAvailabilityCompiler(CalendarGrid(calendario))
+
+
+def _restriccion(dia, inicio, fin, disponible=False, docente_id=1, activa=True) -> RestriccionHorario:
+    return RestriccionHorario(
+        docente_id=docente_id,
+        dia_semana=dia,
+        hora_inicio=inicio,
+        hora_fin=fin,
+        disponible=disponible,
+        activa=activa,
+    )
+
+
+def _slots(restricciones, docente_id=1):
+    constraint = _compilador().constraints(restricciones).get(docente_id)
+    if constraint is None:
+        return []
+    return [(slot.day_index, slot.hour_index) for slot in constraint.not_available_slots]
+
+
+def test_intervalo_bloquea_los_bloques_que_toca():
+    # 09:30-11:00 toca el bloque 09:10-10:10 y el 10:20-11:20
+    assert _slots([_restriccion(MARTES, time(9, 30), time(11, 0))]) == [(1, 1), (1, 2)]
+    # Justo entre dos bloques no toca ninguno
+    assert _slots([_restriccion(MARTES, time(9, 0), time(9, 10))]) == []
+
+
+def test_intervalos_superpuestos_se_unen_en_una_restriccion():
+    restricciones = [
+        _restriccion(LUNES, time(8, 0), time(10, 0)),
+        _restriccion(LUNES, time(9, 0), time(11, 0)),
+        _restriccion(MARTES, time(18, 0), time(21, 0)),
+    ]
+    assert _slots(restricciones) == [(0, 0), (0, 1), (0, 2), (1, 8), (1, 9)]
+
+
+def test_disponibilidad_declarada_bloquea_el_resto_del_calendario():
+    restricciones = [_restriccion(LUNES, time(8, 0), time(12, 30), disponible=True)]
+    slots = _slots(restricciones)
+
+    assert len(slots) == 5 * 10 - 4
+    assert not {(0, 0), (0, 1), (0, 2), (0, 3)} & set(slots)
+
+
+@pytest.mark.parametrize(
+    "restriccion",
+    [
+        _restriccion(DOMINGO, time(8, 0), time(20, 0)),
+        _restriccion(LUNES, time(8, 0), time(12, 0), activa=False),
+        _restriccion(LUNES, time(12, 0), time(8, 0)),
+    ],
+    ids=["fuera_del_calendario", "inactiva", "intervalo_vacio"],
+)
+def test_restricciones_sin_efecto_se_ignoran(restriccion):
+    assert _slots([restriccion]) == []
+
+
+def test_build_request_incluye_la_disponibilidad_de_los_docentes(db_session):
+    user = User(nombre="Docente Restringido", email="restringido@test.com", pass_hash="x", rol="docente")
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(Docente(user_id=user.id, departamento="Informática"))
+    db_session.add_all(
+        [
+            _restriccion(LUNES, time(8, 0), time(9, 0), docente_id=user.id),
+            _restriccion(LUNES, time(8, 0), time(9, 0), docente_id=user.id, activa=False),
+            # Docente que no está en el request
+            _restriccion(LUNES, time(8, 0), time(9, 0), docente_id=user.id + 1000),
+        ]
+    )
+    db_session.commit()
+
+    request = TimetableService(
+        snapshot_repository=TimetableSnapshotRepository(db_session)
+    ).build_request("2025-1", "Depto")
+
+    basica, docente = request.time_constraints
+    assert basica.type == "basic_compulsory_time"
+    assert docente.teacher_id == f"t-{user.id}"
+    assert [(slot.day_index, slot.hour_index) for slot in docente.not_available_slots] == [(0, 0)]
@@ -0,0 +1,223 @@
+import threading
+import time
+from datetime import date, time as hora
+
+import httpx
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from application.services.timetable_import_service import TimetableImportService
+from application.services.timetable_service import TimetableService
+from domain.models import Bloque, Clase, Evento, Seccion, TimetableJob
+from domain.timetable_schemas import ScheduledActivity
+from infrastructure.agent_client import AgentClient
+from infrastructure.database.academic_data_version import academic_data_version, read_version
+from infrastructure.repositories.clase_bulk_repository import ClaseBulkRepository
+from infrastructure.repositories.timetable_job_repository import TimetableJobRepository
+from infrastructure.repositories.timetable_snapshot_repository import TimetableSnapshotRepository
+
+HORAS_POR_DIA = 10
+
+
+@pytest.fixture
+def datos(crear_datos_academicos):
+    datos = crear_datos_academicos(salas=3, secciones=3, clases_por_seccion=1)
+    # Cada sección parte con una clase sin bloque (la sección i en la sala i)
+    return {**datos, "docente": datos["docentes"][0]}
+
+
+def _importador(db_session) -> TimetableImportService:
+    return TimetableImportService(ClaseBulkRepository(db_session, batch_size=100))
+
+
+def _calendario():
+    return TimetableService(snapshot_repository=None)._get_static_calendar()
+
+
+def _clases(db_session, seccion_id: int):
+    db_session.expire_all()
+    return db_session.query(Clase).filter(Clase.seccion_id == seccion_id).all()
+
+
+def test_importa_slots_como_clases_con_sus_bloques(db_session, datos):
+    seccion = datos["secciones"][0]
+    sala = datos["salas"][1]
+    mapa = {"1": [seccion.id, datos["docente"].id]}
+    # Martes 10:20 y 11:30 (día 1, horas 2 y 3)
+    horario = [ScheduledActivity(id=1, time_slots=[HORAS_POR_DIA + 2, HORAS_POR_DIA + 3], room_id=f"r-{sala.id}")]
+
+    resultado = _importador(db_session).import_schedule(_calendario(), mapa, horario)
+
+    assert resultado.sections == [seccion.id]
+    assert (resultado.deleted_classes, resultado.created_classes, resultado.created_blocks) == (1, 2, 2)
+    clases = _clases(db_session, seccion.id)
+    assert sorted((c.bloque.dia_semana, c.bloque.hora_inicio) for c in clases) == [
+        (2, hora(10, 20)),
+        (2, hora(11, 30)),
+    ]
+    assert {(c.sala_id, c.docente_id, c.estado) for c in clases} == {(sala.id, datos["docente"].id, "programada")}
+
+    # Los bloques existentes se reutilizan
+    resultado = _importador(db_session).import_schedule(_calendario(), mapa, horario)
+    assert (resultado.deleted_classes, resultado.created_classes, resultado.created_blocks) == (2, 2, 0)
+    assert db_session.query(Bloque).count() == 2
+
+
+def test_secciones_sin_actividades_ubicadas_conservan_sus_clases(db_session, datos):
+    ubicada, sin_ubicar, ajena = datos["secciones"]
+    docente_id = datos["docente"].id
+    mapa = {"1": [ubicada.id, docente_id], "2": [sin_ubicar.id, docente_id]}
+    horario = [ScheduledActivity(id="1", time_slots=[0], room_id=f"r-{datos['salas'][0].id}")]
+
+    resultado = _importador(db_session).import_schedule(_calendario(), mapa, horario)
+
+    assert resultado.unplaced_activities == ["2"]
+    assert resultado.sections == [ubicada.id]
+    assert [c.bloque_id for c in _clases(db_session, sin_ubicar.id)] == [None]
+    assert [c.bloque_id for c in _clases(db_session, ajena.id)] == [None]
+
+
+def test_reemplazo_deja_eventos_sin_clase_e_invalida_la_version(db_session, datos):
+    seccion = datos["secciones"][0]
+    anterior_id = _clases(db_session, seccion.id)[0].id
+    evento = Evento(
+        docente_id=datos["docente"].id,
+        clase_id=anterior_id,
+        nombre="Prueba",
+        fecha=date(2025, 3, 10),
+        hora_inicio=hora(8),
+        hora_cierre=hora(9),
+    )
+    db_session.add(evento)
+    db_session.commit()
+    version = read_version(db_session)
+
+    _importador(db_session).import_schedule(
+        _calendario(), {"1": [seccion.id, datos["docente"].id]}, [ScheduledActivity(id=1, time_slots=[5])]
+    )
+
+    db_session.refresh(evento)
+    assert evento.clase_id is None
+    assert db_session.query(Clase).filter(Clase.id == anterior_id).count() == 0
+    assert [c.sala_id for c in _clases(db_session, seccion.id)] == [None]
+    assert read_version(db_session) == version + 1
+    cambio = academic_data_version.changes_since(version, version + 1)
+    assert cambio.section_ids == {seccion.id} and not cambio.full
+
+
+def test_error_al_insertar_revierte_todo(db_session, datos):
+    seccion = datos["secciones"][0]
+    version = read_version(db_session)
+    # Sin docente la fila viola NOT NULL después de borrar las clases anteriores
+    mapa = {"1": [seccion.id, None]}
+
+    with pytest.raises(IntegrityError):
+        _importador(db_session).import_schedule(_calendario(), mapa, [ScheduledActivity(id=1, time_slots=[0])])
+
+    assert [c.sala_id for c in _clases(db_session, seccion.id)] == [datos["salas"][0].id]
+    assert db_session.query(Bloque).count() == 0
+    assert read_version(db_session) == version
+
+
+def test_importa_miles_de_clases_en_segundos(db_session, datos):
+    docente_id = datos["docente"].id
+    salas = [sala.id for sala in datos["salas"]]
+    secciones = []
+    for numero in range(100):
+        seccion = Seccion(
+            codigo=f"Masiva {numero}",
+            anio_academico=2,
+            semestre=1,
+            asignatura_id=datos["secciones"][0].asignatura_id,
+            tipo_grupo="seccion",
+            numero_estudiantes=30,
+        )
+        db_session.add(seccion)
+        secciones.append(seccion)
+    db_session.commit()
+
+    # 100 secciones x 50 slots = 5000 clases
+    mapa = {str(i + 1): [seccion.id, docente_id] for i, seccion in enumerate(secciones)}
+    horario = [
+        ScheduledActivity(id=i + 1, time_slots=list(range(50)), room_id=f"r-{salas[i % 3]}")
+        for i in range(len(secciones))
+    ]
+
+    inicio = time.perf_counter()
+    resultado = _importador(db_session).import_schedule(_calendario(), mapa, horario)
+    duracion = time.perf_counter() - inicio
+
+    assert resultado.created_classes == 5000
+    assert db_session.query(Clase).filter(Clase.seccion_id.in_([s.id for s in secciones])).count() == 5000
+    assert duracion < 10
+
+
+def _servicio(db_session, handler) -> TimetableService:
+    cliente = AgentClient(
+        base_url="http://agent/api",
+        timeout=httpx.Timeout(2.0),
+        limits=httpx.Limits(),
+        compression_min_bytes=1024,
+        transport=httpx.MockTransport(handler),
+    )
+    return TimetableService(
+        snapshot_repository=TimetableSnapshotRepository(db_session),
+        agent_client=cliente,
+        job_repository=TimetableJobRepository(db_session),
+        import_service=_importador(db_session),
+    )
+
+
+@pytest.mark.asyncio
+async def test_publicar_generacion_terminada(db_session, datos, monkeypatch):
+    hilos = []
+    import_schedule = TimetableImportService.import_schedule
+
+    def import_schedule_registrando_hilo(self, *args):
+        hilos.append(threading.current_thread())
+        return import_schedule(self, *args)
+
+    monkeypatch.setattr(TimetableImportService, "import_schedule", import_schedule_registrando_hilo)
+    seccion = datos["secciones"][0]
+    job = TimetableJob(
+        timetable_id="2025-1-depto",
+        semester="2025-1",
+        institution_name="Depto",
+        status="succeeded",
+        agent_job_id="agent-1",
+        activity_map={"1": [seccion.id, datos["docente"].id]},
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    def agente(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/fet/jobs/agent-1/result"
+        return httpx.Response(
+            200,
+            json={
+                "timetable_id": "2025-1-depto",
+                "status": "success",
+                "activities_schedule": [
+                    {"id": 1, "subject": "sub-1", "time_slots": [0, 1], "room_id": f"r-{datos['salas'][2].id}"}
+                ],
+            },
+        )
+
+    respuesta = await _servicio(db_session, agente).publish_generation(job.id)
+
+    assert respuesta.created_classes == 2
+    assert respuesta.sections == [seccion.id]
+    # La importación corre fuera del event loop
+    assert hilos and threading.current_thread() not in hilos
+    db_session.refresh(job)
+    assert job.published_at is not None
+
+
+def test_publicar_requiere_generacion_terminada(client, admin_token, db_session):
+    job = TimetableJob(timetable_id="2025-1-depto", semester="2025-1", institution_name="Depto")
+    db_session.add(job)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    assert client.post(f"/api/timetable/publish/{job.id}", headers=headers).status_code == 409
+    assert client.post("/api/timetable/publish/9999", headers=headers).status_code == 404
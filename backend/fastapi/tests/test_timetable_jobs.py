@@ -0,0 +1,219 @@
+import threading
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from application.services.timetable_job_dispatcher import TimetableJobDispatcher
+from application.services.timetable_service import TimetableService
+from domain.models import TimetableJob
+from infrastructure.agent_client import AgentClient
+
+
+class _AgenteFalso:
+    """Responde como el agente: /fet/run encola y /fet/jobs/{id} informa el estado"""
+
+    def __init__(self):
+        self.run_status = 202
+        self.jobs = {}
+        self.enviados = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/fet/run":
+            if self.run_status != 202:
+                return httpx.Response(self.run_status, text="no disponible")
+            self.enviados += 1
+            job_id = f"agent-{self.enviados}"
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "timetable_id": "x",
+                "semester": "2025-1",
+                "submitted_at": "2026-01-01T10:00:00+00:00",
+            }
+            return httpx.Response(202, json=self.jobs[job_id])
+
+        job_id = request.url.path.rsplit("/", 1)[-1]
+        if job_id not in self.jobs:
+            return httpx.Response(404, json={"detail": "no existe"})
+        return httpx.Response(200, json=self.jobs[job_id])
+
+
+@pytest.fixture
+def agente():
+    return _AgenteFalso()
+
+
+@pytest.fixture
+def dispatcher(db_engine, agente):
+    cliente = AgentClient(
+        base_url="http://agent/api",
+        timeout=httpx.Timeout(2.0),
+        limits=httpx.Limits(),
+        compression_min_bytes=1024,
+        transport=httpx.MockTransport(agente),
+    )
+    return TimetableJobDispatcher(
+        session_factory=sessionmaker(bind=db_engine),
+        client=cliente,
+        request_cache=None,
+        max_attempts=2,
+    )
+
+
+def _crear_job(db_session, **datos) -> TimetableJob:
+    job = TimetableJob(timetable_id="2025-1-depto", semester="2025-1", institution_name="Depto", **datos)
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+def _recargar(db_session, job: TimetableJob) -> TimetableJob:
+    db_session.expire_all()
+    return db_session.get(TimetableJob, job.id)
+
+
+def test_generate_registra_el_job_y_status_lo_lee_de_la_tabla(client, admin_token, db_session):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    response = client.post("/api/timetable/generate?semester=2025-1", headers=headers)
+    assert response.status_code == 202
+    job_id = int(response.json()["job_id"])
+    assert response.json()["status"] == "pending"
+
+    job = db_session.get(TimetableJob, job_id)
+    assert job.status == "pending"
+    assert job.created_by is not None
+
+    estado = client.get(f"/api/timetable/status/{job_id}", headers=headers)
+    assert estado.status_code == 200
+    assert estado.json()["status"] == "pending"
+    assert estado.json()["semester"] == "2025-1"
+
+    assert client.get("/api/timetable/status/9999", headers=headers).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_envia_y_sigue_el_job_hasta_terminar(db_session, dispatcher, agente):
+    job = _crear_job(db_session)
+
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "queued"
+    assert job.agent_job_id == "agent-1"
+    assert job.attempts == 1
+    assert job.submitted_at is not None
+
+    agente.jobs["agent-1"].update(
+        status="running", started_at="2026-01-01T10:00:05+00:00", placed=12, total=40
+    )
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "running"
+    assert (job.placed_activities, job.total_activities) == (12, 40)
+    assert job.started_at.tzinfo is None
+
+    agente.jobs["agent-1"].update(status="succeeded", finished_at="2026-01-01T10:01:00+00:00", placed=40)
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "succeeded"
+    assert job.result_location == "http://agent/api/fet/jobs/agent-1/result"
+    assert job.finished_at is not None
+
+    # Los jobs terminados ya no se consultan
+    await dispatcher.tick()
+    assert agente.enviados == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_no_envia_un_job_que_otro_ya_tomo(db_session, dispatcher, agente):
+    # Otro worker lo tomó al leerlo en la misma vuelta y todavía lo está enviando
+    job = _crear_job(db_session, status="dispatching", submitted_at=datetime.utcnow())
+
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "dispatching"
+    assert agente.enviados == 0
+
+    # Una toma más antigua que claim_timeout quedó de un proceso caído
+    job.submitted_at = datetime.utcnow() - timedelta(seconds=dispatcher.claim_timeout + 1)
+    db_session.commit()
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "queued"
+    assert agente.enviados == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_reenvia_si_el_agente_perdio_el_job(db_session, dispatcher, agente):
+    job = _crear_job(db_session, status="running", agent_job_id="perdido", attempts=1)
+
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "pending"
+    assert job.agent_job_id is None
+    assert job.attempts == 1
+
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "queued"
+    assert job.attempts == 2
+
+    # Sin más intentos disponibles la generación falla
+    agente.jobs.clear()
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "failed"
+    assert "no conoce" in job.error
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_espera_si_el_agente_esta_saturado(db_session, dispatcher, agente):
+    job = _crear_job(db_session)
+    agente.run_status = 503
+
+    await dispatcher.tick()
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "pending"
+    assert job.attempts == 0
+
+    agente.run_status = 500
+    await dispatcher.tick()
+    assert _recargar(db_session, job).status == "pending"
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert "Error del agente" in job.error
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_no_reintenta_si_el_agente_rechaza_el_request(db_session, dispatcher, agente):
+    job = _crear_job(db_session)
+    agente.run_status = 422
+
+    await dispatcher.tick()
+    job = _recargar(db_session, job)
+    assert job.status == "failed"
+    assert job.attempts == 1
+    assert "rechazó" in job.error
+    assert job.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_arma_el_request_fuera_del_event_loop(db_session, dispatcher, monkeypatch):
+    hilos = []
+    build_request = TimetableService.build_request
+
+    def build_request_registrando_hilo(self, *args):
+        hilos.append(threading.current_thread())
+        return build_request(self, *args)
+
+    monkeypatch.setattr(TimetableService, "build_request", build_request_registrando_hilo)
+    job = _crear_job(db_session)
+
+    await dispatcher.tick()
+    assert hilos and threading.current_thread() not in hilos
+    assert _recargar(db_session, job).status == "queued"
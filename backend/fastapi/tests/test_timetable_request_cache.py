@@ -0,0 +1,220 @@
+from datetime import time
+
+import pytest
+from sqlalchemy import event
+
+from application.services.timetable_request_cache import TimetableRequestCache
+from application.services.timetable_service import TimetableService
+from domain.models import Asignatura, Clase, Docente, RestriccionHorario, Sala, Seccion, User
+from infrastructure.database.academic_data_version import (
+    AcademicDataChange,
+    AcademicDataVersion,
+    academic_data_version,
+    read_version,
+)
+from infrastructure.repositories.timetable_snapshot_repository import TimetableSnapshotRepository
+
+
+def _crear_docente(db_session, nombre: str) -> User:
+    user = User(nombre=nombre, email=f"{nombre.lower().replace(' ', '.')}@test.com", pass_hash="x", rol="docente")
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(Docente(user_id=user.id, departamento="Informática"))
+    return user
+
+
+def _crear_seccion(db_session, asignatura: Asignatura, numero: int, docente: User, sala: Sala) -> Seccion:
+    seccion = Seccion(
+        codigo=f"1 sección {numero}",
+        anio_academico=numero % 3 + 1,
+        semestre=1,
+        asignatura_id=asignatura.id,
+        tipo_grupo="seccion",
+        numero_estudiantes=30,
+    )
+    db_session.add(seccion)
+    db_session.flush()
+    db_session.add(Clase(seccion_id=seccion.id, docente_id=docente.id, sala_id=sala.id))
+    return seccion
+
+
+@pytest.fixture
+def datos(crear_datos_academicos):
+    datos = crear_datos_academicos(docentes=3, asignaturas=3, secciones=6, anios=3, clases_por_seccion=1)
+    return {**datos, "edificio": datos["edificios"][0], "sala": datos["salas"][0]}
+
+
+def _contar_consultas(db_session, funcion):
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        resultado = funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return resultado, len(consultas)
+
+
+def _build_request(db_session, cache=None):
+    service = TimetableService(
+        snapshot_repository=TimetableSnapshotRepository(db_session), request_cache=cache
+    )
+    return service.build_request("2025-1", "Departamento de Prueba")
+
+
+def _sin_cache(db_session):
+    db_session.expire_all()
+    return _build_request(db_session).model_dump()
+
+
+def test_sin_cambios_reutiliza_el_request_leyendo_solo_la_version(db_session, datos):
+    """Mientras la versión no cambie solo se consulta la versión"""
+    cache = TimetableRequestCache()
+    primero = _build_request(db_session, cache)
+
+    segundo, consultas = _contar_consultas(
+        db_session, lambda: _build_request(db_session, cache)
+    )
+    assert consultas == 1
+    assert segundo.model_dump() == primero.model_dump()
+
+    otro = TimetableService(
+        snapshot_repository=TimetableSnapshotRepository(db_session), request_cache=cache
+    ).build_request("2025-2", "Otra Institución")
+    assert otro.metadata.semester == "2025-2"
+    assert otro.activities == primero.activities
+
+
+def test_el_commit_incrementa_la_version_y_el_rollback_no(db_session, datos):
+    version = read_version(db_session)
+
+    datos["secciones"][0].numero_estudiantes = 45
+    db_session.flush()
+    db_session.rollback()
+    assert read_version(db_session) == version
+
+    seccion = datos["secciones"][0]
+    seccion.numero_estudiantes = 45
+    db_session.commit()
+    assert read_version(db_session) == version + 1
+    cambio = academic_data_version.changes_since(version, version + 1)
+    assert cambio.section_ids == {seccion.id}
+
+    # Escrituras que no afectan la generación no invalidan
+    datos["docentes"][0].email = "nuevo.correo@test.com"
+    db_session.commit()
+    assert read_version(db_session) == version + 1
+
+
+def test_otro_proceso_ve_los_cambios_por_la_version(db_session, datos):
+    """Una versión que este proceso no registró obliga a reconstruir todo"""
+    cache = TimetableRequestCache()
+    _build_request(db_session, cache)
+
+    # Otro proceso confirmó un cambio: la versión de la BD avanza sin historial local
+    datos["secciones"][0].numero_estudiantes = 7
+    db_session.commit()
+    academic_data_version.clear()
+
+    request = _build_request(db_session, cache)
+    grupos = [group for year in request.student_years for group in year.groups]
+    assert 7 in {group.students for group in grupos}
+    assert request.model_dump() == _sin_cache(db_session)
+
+
+def test_cambio_en_una_seccion_relee_solo_esa_seccion(db_session, datos):
+    cache = TimetableRequestCache()
+    _, consultas_completas = _contar_consultas(db_session, lambda: _build_request(db_session, cache))
+
+    seccion = datos["secciones"][2]
+    seccion.numero_estudiantes = 12
+    seccion.codigo = "1 sección renombrada"
+    db_session.commit()
+
+    request, consultas = _contar_consultas(db_session, lambda: _build_request(db_session, cache))
+    # La versión, la sección y sus clases
+    assert consultas == 3
+    assert consultas < consultas_completas
+    assert request.model_dump() == _sin_cache(db_session)
+
+
+@pytest.mark.parametrize(
+    "escenario",
+    [
+        "nueva_seccion",
+        "borrar_seccion",
+        "mover_clase",
+        "horas_asignatura",
+        "nombre_docente",
+        "nueva_sala",
+        "restriccion_docente",
+    ],
+)
+def test_reconstruccion_parcial_equivale_a_la_completa(db_session, datos, escenario):
+    cache = TimetableRequestCache()
+    _build_request(db_session, cache)
+
+    if escenario == "nueva_seccion":
+        docente = _crear_docente(db_session, "Docente Nuevo")
+        _crear_seccion(db_session, datos["asignaturas"][0], 99, docente, datos["sala"])
+    elif escenario == "borrar_seccion":
+        seccion = datos["secciones"][1]
+        for clase in db_session.query(Clase).filter(Clase.seccion_id == seccion.id):
+            db_session.delete(clase)
+        db_session.delete(seccion)
+    elif escenario == "mover_clase":
+        clase = db_session.query(Clase).filter(Clase.seccion_id == datos["secciones"][0].id).one()
+        clase.seccion_id = datos["secciones"][5].id
+    elif escenario == "horas_asignatura":
+        datos["asignaturas"][1].horas_presenciales = 0
+        datos["asignaturas"][1].horas_mixtas = 1
+    elif escenario == "nombre_docente":
+        datos["docentes"][2].nombre = "Docente Renombrado"
+    elif escenario == "nueva_sala":
+        db_session.add(Sala(edificio_id=datos["edificio"].id, codigo="S-2", capacidad=20, tipo="lab"))
+    elif escenario == "restriccion_docente":
+        db_session.add(
+            RestriccionHorario(
+                docente_id=datos["docentes"][1].id,
+                dia_semana=3,
+                hora_inicio=time(8, 0),
+                hora_fin=time(10, 0),
+                disponible=False,
+            )
+        )
+    db_session.commit()
+
+    parcial = _build_request(db_session, cache).model_dump()
+    assert parcial == _sin_cache(db_session)
+
+
+def test_cambio_masivo_reconstruye_todo(db_session, datos):
+    cache = TimetableRequestCache()
+    _build_request(db_session, cache)
+
+    db_session.query(Seccion).filter(Seccion.id == datos["secciones"][0].id).update(
+        {"numero_estudiantes": 5}
+    )
+    db_session.commit()
+
+    request = _build_request(db_session, cache)
+    grupos = [group for year in request.student_years for group in year.groups]
+    assert 5 in {group.students for group in grupos}
+    assert request.model_dump() == _sin_cache(db_session)
+
+
+def test_historial_insuficiente_pide_reconstruccion_completa():
+    version = AcademicDataVersion(history_size=2)
+    for seccion_id in range(3):
+        version.record(seccion_id + 1, AcademicDataChange(section_ids={seccion_id}))
+
+    assert version.changes_since(0, 3) is None
+    assert version.changes_since(1, 3).section_ids == {1, 2}
+    assert version.changes_since(3, 3).is_empty
+    # Una versión que confirmó otro proceso no está en el historial
+    version.record(5, AcademicDataChange(section_ids={4}))
+    assert version.changes_since(3, 5) is None
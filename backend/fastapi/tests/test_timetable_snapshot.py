@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import event
+
+from application.services.timetable_service import TimetableService
+from infrastructure.repositories.timetable_snapshot_repository import TimetableSnapshotRepository
+
+
+def _poblar(crear_datos_academicos, cantidad: int, prefijo: str = "a") -> None:
+    """Crea ``cantidad`` docentes, asignaturas, secciones (con dos clases cada una) y salas"""
+    crear_datos_academicos(
+        prefijo=prefijo,
+        salas=cantidad,
+        docentes=cantidad,
+        asignaturas=cantidad,
+        secciones=cantidad,
+        anios=5,
+        clases_por_seccion=2,
+    )
+
+
+def _contar_consultas(db_session, funcion):
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        resultado = funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return resultado, len(consultas)
+
+
+def _build_request(db_session, batch_size: int = 500):
+    repository = TimetableSnapshotRepository(db_session, batch_size=batch_size)
+    service = TimetableService(snapshot_repository=repository)
+    return service.build_request("2025-1", "Departamento de Prueba")
+
+
+@pytest.mark.parametrize("cantidad", [3, 150])
+def test_build_request_incluye_todos_los_datos(db_session, crear_datos_academicos, cantidad):
+    """El request no se trunca y trae una actividad por sección con su docente"""
+    _poblar(crear_datos_academicos, cantidad)
+    request = _build_request(db_session)
+
+    assert len(request.teachers) == cantidad
+    assert len(request.subjects) == cantidad
+    assert len(request.activities) == cantidad
+    assert len(request.space.rooms) == cantidad
+    assert sum(len(year.groups) for year in request.student_years) == cantidad
+    assert {activity.teacher_id for activity in request.activities} == {
+        teacher.id for teacher in request.teachers
+    }
+
+
+def test_build_request_usa_cantidad_fija_de_consultas(db_session, crear_datos_academicos):
+    """La cantidad de consultas no crece con el volumen de datos (sin N+1)"""
+    _poblar(crear_datos_academicos, 2)
+    _, consultas_pocas = _contar_consultas(db_session, lambda: _build_request(db_session))
+
+    _poblar(crear_datos_academicos, 60, prefijo="b")
+    db_session.expire_all()
+    request, consultas_muchas = _contar_consultas(db_session, lambda: _build_request(db_session))
+
+    assert len(request.activities) == 62
+    assert consultas_muchas == consultas_pocas
+    assert consultas_muchas <= 7
+
+
+def test_build_request_por_lotes_no_trunca(db_session, crear_datos_academicos):
+    """Con lotes chicos se recorren todas las filas, sin duplicados ni faltantes"""
+    _poblar(crear_datos_academicos, 23)
+    request, consultas = _contar_consultas(
+        db_session, lambda: _build_request(db_session, batch_size=5)
+    )
+
+    assert len(request.teachers) == 23
+    assert len({activity.id for activity in request.activities}) == 23
+    assert [room.name for room in request.space.rooms] == [f"S-a{i}" for i in range(23)]
+    # 4 tablas de 23 filas (5 lotes), 46 clases (10 lotes), 1 edificio (1 lote) y las
+    # restricciones de horario (una consulta)
+    assert consultas == 4 * 5 + 10 + 1 + 1
+
+
+def test_iter_all_recorre_mas_alla_del_limite_de_get_all(db_session, crear_datos_academicos):
+    """iter_all entrega todas las filas en orden aunque get_all corte en 100"""
+    from infrastructure.repositories.sala_repository import SalaRepository
+
+    _poblar(crear_datos_academicos, 120)
+    repository = SalaRepository(db_session)
+
+    assert len(repository.get_all()) == 100
+    ids = [sala.id for sala in repository.iter_all(batch_size=50)]
+    assert len(ids) == 120
+    assert ids == sorted(ids)